@@ -0,0 +1,165 @@
+"""
+benchmark_ca_refresh.py — Wall time and peak RSS of the CA dataset refresh.
+
+Usage:
+    python scripts/benchmark_ca_refresh.py [--rows N] [--encoding cp1252|utf-8] [--zip PATH]
+
+Builds a synthetic CAEPI export (pipe-delimited TXT inside a ZIP, same header as
+the MTE file) unless --zip points to a real one, then runs each loader in its own
+subprocess so ru_maxrss is not shared:
+  - legacy:    extract the TXT, pandas.read_csv retried per encoding, to_parquet;
+  - streaming: CADataProcessor fed by the local ZIP (source_zip_path) instead of
+               the FTP, i.e. build_ca_parquet_from_zip.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_ca_refresh")
+
+_HEADER = [
+    "NR REGISTRO CA", "DATA DE VALIDADE", "SITUACAO", "NR PROCESSO", "CNPJ", "RAZAO SOCIAL",
+    "NATUREZA", "EQUIPAMENTO", "DESCRICAO EQUIPAMENTO", "MARCA CA", "REFERENCIA", "COR",
+    "APROVADO PARA LAUDO", "RESTRICAO LAUDO", "OBSERVACAO ANALISE LAUDO", "CNPJ LABORATORIO",
+    "RAZAO SOCIAL LABORATORIO", "NR LAUDO", "NORMA",
+]
+_EQUIPAMENTOS = ["LUVA", "CAPACETE", "ÓCULOS", "PROTETOR AUDITIVO", "RESPIRADOR", "CALÇADO", "CINTURÃO"]
+_SITUACOES = ["VÁLIDO", "VENCIDO", "SUSPENSO", "CANCELADO"]
+_CORES = ["AZUL", "PRETA", "BRANCA", "AMARELA", "VERDE"]
+
+
+def write_synthetic_zip(path: str, rows: int, encoding: str, seed: int = 42) -> None:
+    from safety_ai_app.ca_data_processor import EXTRACTED_FILENAME
+
+    rnd = random.Random(seed)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(EXTRACTED_FILENAME, "w") as member:
+            member.write(("|".join(_HEADER) + "\r\n").encode(encoding))
+            lines = []
+            for i in range(1, rows + 1):
+                equip = rnd.choice(_EQUIPAMENTOS)
+                lines.append("|".join([
+                    str(i), f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.randint(2015, 2030)}",
+                    rnd.choice(_SITUACOES), f"46000.{rnd.randint(100000, 999999)}/2020-11",
+                    f"{rnd.randint(10**13, 10**14 - 1)}", f"FABRICANTE {rnd.randint(1, 1500):04d} INDÚSTRIA",
+                    "Importado" if i % 3 else "Nacional", equip,
+                    f"{equip} para proteção contra agentes mecânicos, confeccionado em material sintético",
+                    "Gravado no produto", f"REF-{rnd.randint(1000, 99999)}", rnd.choice(_CORES),
+                    "PROTEÇÃO CONTRA RISCOS MECÂNICOS", "", "", f"{rnd.randint(10**13, 10**14 - 1)}",
+                    "LABORATÓRIO DE ENSAIOS LTDA", f"{rnd.randint(1000, 9999)}/20", "EN 388:2016",
+                ]))
+                if len(lines) == 10_000:
+                    member.write(("\r\n".join(lines) + "\r\n").encode(encoding))
+                    lines = []
+            if lines:
+                member.write(("\r\n".join(lines) + "\r\n").encode(encoding))
+
+
+def run_legacy(zip_path: str, out_dir: str) -> int:
+    """Previous refresh path: extract the member, retry read_csv per encoding, to_parquet."""
+    import pandas as pd
+    from safety_ai_app.ca_data_processor import CA_COLUMN_MAPPING, EXTRACTED_FILENAME
+
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        zip_ref.extract(EXTRACTED_FILENAME, out_dir)
+    txt_path = os.path.join(out_dir, EXTRACTED_FILENAME)
+    df = None
+    for encoding in ["utf-8", "cp1252", "latin1", "iso-8859-1"]:
+        try:
+            df = pd.read_csv(txt_path, sep="|", encoding=encoding, low_memory=False)
+            break
+        except UnicodeDecodeError:
+            continue
+    df.columns = [col.strip().upper() for col in df.columns]
+    df.rename(columns={k: v for k, v in CA_COLUMN_MAPPING.items() if k in df.columns}, inplace=True)
+    df["ca_numero"] = df["ca_numero"].astype(str).str.strip()
+    df["validade_ca"] = pd.to_datetime(df["validade_ca"], errors="coerce", format="%d/%m/%Y")
+    df.to_parquet(os.path.join(out_dir, "ca_data.parquet"), index=False)
+    os.remove(txt_path)
+    return len(df)
+
+
+def run_streaming(zip_path: str, out_dir: str) -> int:
+    import safety_ai_app.ca_data_processor as ca_module
+
+    ca_module.LOCAL_DATA_DIR = out_dir
+    ca_module.LOCAL_CA_FILE = os.path.join(out_dir, "ca_data.parquet")
+    ca_module.LAST_UPDATE_FILE = os.path.join(out_dir, "ca_last_update.txt")
+    processor = ca_module.CADataProcessor(source_zip_path=zip_path)
+    if not processor._update_ca_data():
+        raise RuntimeError("Atualização em streaming falhou.")
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(ca_module.LOCAL_CA_FILE).metadata.num_rows
+
+
+def child(mode: str, zip_path: str) -> None:
+    with tempfile.TemporaryDirectory() as out_dir:
+        started = time.perf_counter()
+        rows = run_legacy(zip_path, out_dir) if mode == "legacy" else run_streaming(zip_path, out_dir)
+        wall = time.perf_counter() - started
+        size_mb = os.path.getsize(os.path.join(out_dir, "ca_data.parquet")) / 1e6
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"rows": rows, "wall_s": wall, "peak_rss_mb": peak_kb / 1024, "parquet_mb": size_mb}))
+
+
+def measure(mode: str, zip_path: str) -> Dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--zip", zip_path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--encoding", default="cp1252")
+    parser.add_argument("--zip", default=None, help="ZIP do CAEPI existente (pula a geração sintética)")
+    parser.add_argument("--child", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.zip)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        zip_path = args.zip
+        if not zip_path:
+            zip_path = os.path.join(work_dir, "tgg_export_caepi.zip")
+            logger.info("Gerando ZIP sintético com %d registros (%s)...", args.rows, args.encoding)
+            write_synthetic_zip(zip_path, args.rows, args.encoding)
+        logger.info("ZIP: %.1f MB", os.path.getsize(zip_path) / 1e6)
+
+        results = {mode: measure(mode, zip_path) for mode in ("legacy", "streaming")}
+
+    print(f"\n{'':<12}{'rows':>10}{'wall (s)':>11}{'peak RSS (MB)':>16}{'parquet (MB)':>15}")
+    for mode, r in results.items():
+        print(f"{mode:<12}{r['rows']:>10}{r['wall_s']:>11.1f}{r['peak_rss_mb']:>16.0f}{r['parquet_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+benchmark_ca_search.py — Compares the CA search scan against the inverted index.
+
+Usage:
+    python scripts/benchmark_ca_search.py [--rows N] [--queries N] [--seed N]
+
+A synthetic CA table (default 500k rows) with the columns produced by
+CADataProcessor._parse_ca_txt_to_df is generated in memory. For a mix of
+CA-number, single-word, prefix and multi-word queries it reports:
+  - p50/p95 search latency of the previous full-scan approach
+    (astype(str).str.contains over every searchable column);
+  - p50/p95 latency of CASearchIndex.search (postings intersection);
+  - index build time, peak allocation while searching and index size.
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from safety_ai_app.ca_data_processor import SEARCHABLE_COLUMNS, CASearchIndex  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_ca_search")
+
+_EQUIPAMENTOS = [
+    "LUVA", "CAPACETE", "ÓCULOS", "PROTETOR AUDITIVO", "RESPIRADOR PURIFICADOR DE AR",
+    "CALÇADO", "CINTURÃO DE SEGURANÇA", "VESTIMENTA", "MÁSCARA DE SOLDA", "TRAVA-QUEDA",
+]
+_MATERIAIS = [
+    "nitrílica", "látex", "couro", "vaqueta", "policarbonato", "algodão", "PVC",
+    "aramida", "poliéster", "borracha", "silicone", "neoprene",
+]
+_USOS = [
+    "proteção das mãos contra agentes abrasivos", "proteção do crânio contra impactos",
+    "proteção dos olhos contra partículas volantes", "proteção auditiva tipo concha",
+    "proteção respiratória contra poeiras e névoas", "proteção contra agentes térmicos",
+    "proteção contra quedas com diferença de nível", "proteção contra umidade",
+]
+_FABRICANTES = [
+    "3M DO BRASIL LTDA", "MSA DO BRASIL", "DANNY EPI", "VOLK DO BRASIL", "KALIPSO",
+    "MARLUVAS", "PLASTCOR", "LEAL EQUIPAMENTOS", "CARBOGRAFITE", "BRACOL",
+] + [f"FABRICANTE {i:04d} INDÚSTRIA E COMÉRCIO" for i in range(1500)]
+_SITUACOES = ["VÁLIDO", "VENCIDO", "SUSPENSO", "CANCELADO"]
+_CORES = ["AZUL", "PRETA", "BRANCA", "AMARELA", "VERDE", "CINZA", "LARANJA"]
+
+
+def build_synthetic_table(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    equip = np.array(_EQUIPAMENTOS, dtype=object)[rng.integers(0, len(_EQUIPAMENTOS), rows)]
+    mat = np.array(_MATERIAIS, dtype=object)[rng.integers(0, len(_MATERIAIS), rows)]
+    uso = np.array(_USOS, dtype=object)[rng.integers(0, len(_USOS), rows)]
+    refs = rng.integers(1000, 999999, rows).astype(str).astype(object)
+    return pd.DataFrame({
+        "ca_numero": rng.permutation(np.arange(1, rows + 1)).astype(str),
+        "equipamento_tipo": equip,
+        "descricao_detalhada": equip + " confeccionada em " + mat + " para " + uso + " ref " + refs,
+        "fabricante_nome": np.array(_FABRICANTES, dtype=object)[rng.integers(0, len(_FABRICANTES), rows)],
+        "referencia_fabricante": "REF-" + refs,
+        "aprovacao_ca": np.array(["Para proteção conforme NR-6"] * rows, dtype=object),
+        "situacao_ca": np.array(_SITUACOES, dtype=object)[rng.integers(0, len(_SITUACOES), rows)],
+        "marca_ca": np.array(["Gravado no produto", "Etiqueta"], dtype=object)[rng.integers(0, 2, rows)],
+        "cor_equipamento": np.array(_CORES, dtype=object)[rng.integers(0, len(_CORES), rows)],
+    })
+
+
+def build_queries(df: pd.DataFrame, count: int, seed: int) -> List[str]:
+    rnd = random.Random(seed)
+    sample_cas = df["ca_numero"].sample(n=count, random_state=seed).tolist()
+    pool = [
+        lambda i: sample_cas[i],
+        lambda i: rnd.choice(["luva", "capacete", "3m", "respirador", "calçado"]),
+        lambda i: rnd.choice(["cap", "resp", "vaq", "nitr", "prot"]),
+        lambda i: rnd.choice(["luva nitrílica", "protetor auditivo", "fabricante 0042", "oculos policarbonato"]),
+    ]
+    return [pool[i % len(pool)](i) for i in range(count)]
+
+
+def legacy_scan(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
+    """The search_ca implementation this index replaced (kept here for comparison only)."""
+    term = search_term.strip().lower()
+    mask = pd.Series([False] * len(df), index=df.index)
+    mask = mask | (df["ca_numero"].astype(str).str.strip().fillna("") == term)
+    for col in SEARCHABLE_COLUMNS:
+        if col in df.columns:
+            col_data = df[col].astype(str).str.strip().fillna("")
+            mask = mask | col_data.str.contains(term, case=False, na=False)
+    return df[mask]
+
+
+def time_queries(fn: Callable[[str], object], queries: List[str]) -> Dict[str, float]:
+    latencies = []
+    tracemalloc.start()
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "peak_alloc_mb": peak / 1e6,
+    }
+
+
+def index_size_mb(index: CASearchIndex) -> float:
+    arrays = index._postings.nbytes + index._offsets.nbytes
+    arrays += sum(rows.nbytes for rows in index._ca_exact.values())
+    strings = sum(sys.getsizeof(t) for t in index._folded_rows) + sum(sys.getsizeof(t) for t in index._vocab)
+    return (arrays + strings) / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logger.info("Gerando tabela sintética com %d registros...", args.rows)
+    df = build_synthetic_table(args.rows, args.seed)
+    queries = build_queries(df, args.queries, args.seed)
+    logger.info("DataFrame: %.1f MB", df.memory_usage(deep=True).sum() / 1e6)
+
+    started = time.perf_counter()
+    index = CASearchIndex(df)
+    build_s = time.perf_counter() - started
+
+    legacy = time_queries(lambda q: legacy_scan(df, q), queries)
+    indexed = time_queries(lambda q: df.iloc[index.search(q, limit=50)[0]], queries)
+
+    print(f"\n{'':<18}{'p50 (ms)':>12}{'p95 (ms)':>12}{'peak alloc (MB)':>18}")
+    print(f"{'full scan':<18}{legacy['p50_ms']:>12.1f}{legacy['p95_ms']:>12.1f}{legacy['peak_alloc_mb']:>18.1f}")
+    print(f"{'inverted index':<18}{indexed['p50_ms']:>12.2f}{indexed['p95_ms']:>12.2f}{indexed['peak_alloc_mb']:>18.1f}")
+    print(f"\nindex build: {build_s:.1f}s, index size: ~{index_size_mb(index):.0f} MB")
+    print(f"p95 speed-up: {legacy['p95_ms'] / max(indexed['p95_ms'], 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
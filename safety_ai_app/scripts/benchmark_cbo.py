@@ -0,0 +1,185 @@
+"""
+benchmark_cbo.py — CBO hierarchy build and occupation search: before vs after.
+
+Usage:
+    python scripts/benchmark_cbo.py [--occupations N] [--rows-per-occupation N] [--repeat N]
+
+Builds a synthetic CBO2025 sheet (default ~2700 occupations, ~40 activity rows
+each, close to the real file) and compares:
+  - load: the previous iterrows build vs CBODatabase._process_cbo_data_static,
+    plus the warm start from the md5-keyed snapshot (no download, no parsing);
+  - per call: the previous get_all_cargos (sorted on every call) and the page's
+    substring filter vs the precomputed list and CBODatabase.search_cargos.
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import pandas as pd  # noqa: E402
+
+import safety_ai_app.cbo_data_processor as cbo_module  # noqa: E402
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_cbo")
+
+_WORDS = [
+    "técnico", "engenheiro", "segurança", "trabalho", "operador", "máquinas", "auxiliar",
+    "enfermagem", "eletricista", "manutenção", "soldador", "mecânico", "supervisor", "produção",
+    "analista", "sistemas", "motorista", "caminhão", "pedreiro", "carpinteiro", "químico",
+]
+_AREAS = [
+    "Planejar atividades", "Inspecionar locais", "Elaborar documentos", "Executar manutenção",
+    "Orientar trabalhadores", "Comunicar-se", "Demonstrar competências pessoais",
+]
+
+
+def synthetic_sheet(occupations: int, rows_per_occupation: int, seed: int = 42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    rows: List[Dict[str, Any]] = []
+    for n in range(occupations):
+        code = f"{rnd.randint(1, 9)}{n:05d}"
+        cargo = " ".join(rnd.sample(_WORDS, 3)).capitalize()
+        for _ in range(rows_per_occupation):
+            area_no = rnd.randrange(len(_AREAS))
+            rows.append({
+                "COD_OCUPACAO": code,
+                "CARGO": cargo,
+                "SGL_GRANDE_AREA": chr(ord("A") + area_no),
+                "NOME_GRANDE_AREA": _AREAS[area_no],
+                "COD_ATIVIDADE": f"{chr(ord('A') + area_no)}.{rnd.randint(1, 30)}",
+                "NOME_ATIVIDADE": " ".join(rnd.sample(_WORDS, 4)),
+            })
+    return pd.DataFrame(rows)
+
+
+def legacy_process(data: pd.DataFrame) -> Dict[str, Any]:
+    """The iterrows build this change replaced (kept here for comparison only)."""
+    cargos_dict: Dict[str, Any] = {}
+    for _, row in data.iterrows():
+        cod_ocupacao = str(row['COD_OCUPACAO']).strip()
+        cargo_nome = str(row['CARGO']).strip()
+        nome_grande_area = str(row['NOME_GRANDE_AREA']).strip()
+        cod_atividade = str(row['COD_ATIVIDADE']).strip()
+        nome_atividade = str(row['NOME_ATIVIDADE']).strip()
+
+        if cod_ocupacao not in cargos_dict:
+            cargos_dict[cod_ocupacao] = {"CARGO": cargo_nome, "AREAS_DE_ATUACAO": {}}
+        areas = cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"]
+        if nome_grande_area not in areas:
+            areas[nome_grande_area] = []
+        areas[nome_grande_area].append({"COD_ATIVIDADE": cod_atividade, "NOME_ATIVIDADE": nome_atividade})
+
+    for cod_ocupacao in cargos_dict:
+        for area in cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"]:
+            cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"][area].sort(key=lambda x: x["NOME_ATIVIDADE"])
+    return cargos_dict
+
+
+def legacy_get_all_cargos(cargos_dict: Dict[str, Any]) -> List[Dict[str, str]]:
+    return sorted(
+        [{"COD_OCUPACAO": k, "CARGO": v["CARGO"]} for k, v in cargos_dict.items()],
+        key=lambda x: x["CARGO"],
+    )
+
+
+def _normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def legacy_search(cargos_dict: Dict[str, Any], term: str) -> List[Dict[str, str]]:
+    """Page-side filter before search_cargos: get_all_cargos + substring scan per keystroke."""
+    normalized = _normalize_text(term)
+    return [
+        c for c in legacy_get_all_cargos(cargos_dict)
+        if normalized in _normalize_text(c["CARGO"]) or normalized in _normalize_text(c["COD_OCUPACAO"])
+    ]
+
+
+def timed(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50": statistics.median(samples), "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--occupations", type=int, default=2700)
+    parser.add_argument("--rows-per-occupation", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    data = synthetic_sheet(args.occupations, args.rows_per_occupation)
+    print(f"\nplanilha sintética: {len(data)} linhas, {data['COD_OCUPACAO'].nunique()} ocupações")
+
+    started = time.perf_counter()
+    legacy_dict = legacy_process(data)
+    legacy_build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cargos_dict = cbo_module.CBODatabase._process_cbo_data_static(data)
+    index = cbo_module._CargoIndex(cargos_dict)
+    new_build_s = time.perf_counter() - started
+
+    # Áreas agora vêm ordenadas; o conteúdo de cada área deve ser idêntico
+    same = all(
+        dict(sorted(legacy_dict[k]["AREAS_DE_ATUACAO"].items())) == v["AREAS_DE_ATUACAO"]
+        for k, v in cargos_dict.items()
+    ) and legacy_dict.keys() == cargos_dict.keys()
+
+    cbo_module.CBO_SNAPSHOT_FILE = str(Path(tempfile.mkdtemp()) / "cbo_snapshot.pkl")
+    cbo_module.CBODatabase._save_snapshot("md5-sintetico", data, cargos_dict)
+    started = time.perf_counter()
+    snapshot = cbo_module.CBODatabase._load_snapshot("md5-sintetico")
+    cbo_module._CargoIndex(snapshot[1])
+    snapshot_s = time.perf_counter() - started
+
+    print(f"\n{'carga':<34}{'tempo (s)':>12}")
+    print(f"{'iterrows (anterior)':<34}{legacy_build_s:>12.2f}")
+    print(f"{'groupby vetorizado + índice':<34}{new_build_s:>12.2f}")
+    print(f"{'snapshot (md5 igual no Drive)':<34}{snapshot_s:>12.2f}")
+    print(f"estrutura idêntica à anterior: {same}")
+
+    db = object.__new__(cbo_module.CBODatabase)
+    db._data, db._cargos_dict, db._cargo_index = data, cargos_dict, index
+
+    sample_code = next(iter(cargos_dict))
+    cases = [
+        ("get_all_cargos", lambda: legacy_get_all_cargos(legacy_dict), db.get_all_cargos),
+        ("busca 'seguranca'", lambda: legacy_search(legacy_dict, "seguranca"), lambda: db.search_cargos("seguranca")),
+        ("busca 'tec trab'", lambda: legacy_search(legacy_dict, "tec trab"), lambda: db.search_cargos("tec trab")),
+        (f"busca código '{sample_code[:3]}'", lambda: legacy_search(legacy_dict, sample_code[:3]),
+         lambda: db.search_cargos(sample_code[:3])),
+    ]
+    print(f"\n{'por chamada':<28}{'anterior p50 (ms)':>19}{'novo p50 (ms)':>16}{'novo p95 (ms)':>16}")
+    for label, legacy_fn, new_fn in cases:
+        legacy = timed(legacy_fn, args.repeat)
+        new = timed(new_fn, args.repeat)
+        print(f"{label:<28}{legacy['p50']:>19.2f}{new['p50']:>16.3f}{new['p95']:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
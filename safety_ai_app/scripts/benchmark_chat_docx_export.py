@@ -0,0 +1,120 @@
+"""
+benchmark_chat_docx_export.py — chat page rerun: full-history hash vs incremental hash chain.
+
+Usage:
+    python scripts/benchmark_chat_docx_export.py [--sizes 10,50,200] [--reruns 500] [--chars 1500]
+
+For each conversation size the DOCX is exported once and the page is then
+rerun --reruns times, each rerun calling ChatDocxExporter.cached_for on the
+history as render_page does. Compares:
+  - the previous cached_for (SHA-1 chain recomputed over the whole history on
+    every rerun; copied below for comparison only);
+  - ChatDocxExporter.cached_for (re-hashes only the first and last known
+    messages and the messages appended since the previous call).
+A last step appends a question and an answer and reruns again (cache miss,
+the export button shows up). Needs python-docx, as the page does. Exits with
+status 1 if the two versions disagree on any rerun.
+"""
+
+import argparse
+import importlib.util
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+# _logic.py is loaded from its file: the chat package pulls in Streamlit, the API client and the Drive integrator
+_logic_path = _src_path / "safety_ai_app" / "web_interface" / "pages" / "chat" / "_logic.py"
+_spec = importlib.util.spec_from_file_location("chat_logic", _logic_path)
+chat_logic = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(chat_logic)
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_chat_docx_export")
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+class LegacyChatDocxExporter(chat_logic.ChatDocxExporter):
+    def cached_for(self, messages: list) -> Optional[bytes]:
+        if self._bytes is not None and self._bytes_hash == self.conversation_hash(messages):
+            return self._bytes
+        return None
+
+
+def make_messages(count: int, chars: int) -> List[dict]:
+    messages = []
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        body = f"Mensagem {i} sobre NR-{i % 38 + 1}. " * (chars // 30 + 1)
+        messages.append({"role": role, "content": body[:chars]})
+    return messages
+
+
+def time_reruns(exporter: Any, messages: List[dict], reruns: int) -> tuple:
+    results = []
+    started = time.perf_counter()
+    for _ in range(reruns):
+        results.append(exporter.cached_for(messages))
+    return (time.perf_counter() - started) / reruns, results
+
+
+def scenario(label: str, legacy: Any, current: Any, messages: List[dict], reruns: int,
+             report: Callable[[str, float, float, bool], None]) -> None:
+    old_s, old_results = time_reruns(legacy, messages, reruns)
+    new_s, new_results = time_reruns(current, messages, reruns)
+    same = [r is None for r in old_results] == [r is None for r in new_results] and all(
+        o == n for o, n in zip(old_results, new_results) if o is not None
+    )
+    report(label, old_s, new_s, same)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,50,200", help="tamanhos de conversa, separados por vírgula")
+    parser.add_argument("--reruns", type=int, default=500)
+    parser.add_argument("--chars", type=int, default=1500, help="caracteres por mensagem")
+    args = parser.parse_args()
+
+    try:
+        import docx  # noqa: F401
+    except ImportError:
+        logger.error("Biblioteca 'python-docx' não encontrada.")
+        sys.exit(1)
+
+    print(f"\n{args.reruns} reruns por cenário, {args.chars} caracteres por mensagem")
+    print(f"  {'cenário':<34}{'anterior µs':>13}{'atual µs':>11}{'ganho':>9}   confere")
+    ok = True
+
+    def report(label: str, old_s: float, new_s: float, same: bool) -> None:
+        nonlocal ok
+        ok = ok and same
+        gain = old_s / new_s if new_s else float("inf")
+        print(f"  {label:<34}{old_s * 1e6:>13.1f}{new_s * 1e6:>11.1f}{gain:>8.1f}x   {same}")
+
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        messages = make_messages(size, args.chars)
+        legacy, current = LegacyChatDocxExporter(), chat_logic.ChatDocxExporter()
+        ok = ok and bool(legacy.export(messages)) and bool(current.export(messages))
+        scenario(f"{size} mensagens, DOCX exportado", legacy, current, messages, args.reruns, report)
+
+        messages = messages + make_messages(2, args.chars)
+        scenario(f"{size} + 2 novas (DOCX antigo)", legacy, current, messages, args.reruns, report)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+benchmark_cid_search.py — CID-10 local search: linear scan vs CID10Index.
+
+Usage:
+    python scripts/benchmark_cid_search.py [--xlsx PATH/CID10.xlsx] [--repeat N]
+
+With --xlsx the full CID-10 table is loaded with the same parser the app uses
+(CIDDatabase._process_cid10_excel_file_static); otherwise a synthetic table of
+the same size (~14k categories and subcategories) is generated. Reports p50/p95
+latency for code-prefix queries (A0, A00, A00.1, A001) and free-text queries,
+plus the index build time.
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from safety_ai_app.cid_data_processor import CID10Index, CIDDatabase  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_cid_search")
+
+_WORDS = [
+    "doença", "infecção", "aguda", "crônica", "não", "especificada", "lesão", "traumatismo",
+    "fratura", "ombro", "braço", "coluna", "lombar", "dor", "transtorno", "ansiedade",
+    "depressivo", "perda", "audição", "ruído", "dermatite", "contato", "intoxicação", "chumbo",
+    "pneumoconiose", "sílica", "asbesto", "tendinite", "sinovite", "punho", "mão", "olho",
+]
+
+CODE_QUERIES = ["A0", "A00", "A00.1", "A001", "M5", "M54", "M54.5", "S62", "T56.0", "J6"]
+TEXT_QUERIES = ["dor lombar", "fratura", "perda audicao", "intoxicacao chumbo", "tendin", "dermatite de contato", "silica"]
+
+
+def synthetic_table(seed: int = 42) -> List[Dict[str, str]]:
+    rnd = random.Random(seed)
+    entries = []
+    for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        for cat in range(0, 100, 2):
+            code = f"{letter}{cat:02d}"
+            entries.append({"COD_CID": code, "DESCRICAO_CID": " ".join(rnd.sample(_WORDS, 4)).capitalize()})
+            for sub in range(rnd.randint(3, 10)):
+                entries.append({"COD_CID": f"{code}{sub}", "DESCRICAO_CID": " ".join(rnd.sample(_WORDS, 7)).capitalize()})
+    return sorted(entries, key=lambda e: e["COD_CID"])
+
+
+def legacy_scan(entries: List[Dict[str, str]], query: str) -> List[Dict[str, str]]:
+    """The linear search this index replaced (kept here for comparison only)."""
+    normalized_query = CIDDatabase._normalize_text_static(query)
+    results = []
+    for entry in entries:
+        normalized_code = CIDDatabase._normalize_text_static(entry["COD_CID"])
+        normalized_description = CIDDatabase._normalize_text_static(entry["DESCRICAO_CID"])
+        if normalized_query in normalized_code or normalized_query in normalized_description:
+            results.append(entry)
+    return results
+
+
+def latencies_ms(fn: Callable[[str], object], queries: List[str], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xlsx", default=None, help="Caminho para o CID10.xlsx completo")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = CIDDatabase._process_cid10_excel_file_static(args.xlsx) if args.xlsx else synthetic_table()
+    if not entries:
+        logger.error("Nenhuma entrada de CID-10 carregada.")
+        sys.exit(1)
+    logger.info("Tabela CID-10 com %d entradas.", len(entries))
+
+    started = time.perf_counter()
+    index = CID10Index(entries)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n{'':<26}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for label, queries in (("código (prefixo)", CODE_QUERIES), ("texto livre", TEXT_QUERIES)):
+        legacy = latencies_ms(lambda q: legacy_scan(entries, q), queries, max(1, args.repeat // 10))
+        indexed = latencies_ms(index.search, queries, args.repeat)
+        print(f"{label + ' / varredura':<26}{legacy['p50']:>10.2f}{legacy['p95']:>10.2f}")
+        print(f"{label + ' / índice':<26}{indexed['p50']:>10.3f}{indexed['p95']:>10.3f}")
+    print(f"\nconstrução do índice: {build_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+benchmark_cnae_lookup.py — CNAE getters served from the local snapshot vs the IBGE API.
+
+Usage:
+    python scripts/benchmark_cnae_lookup.py [--latency-ms N] [--repeat N]
+
+Starts a local fake of the IBGE CNAE v2 endpoints (sections → subclasses with the
+same nested parent objects as the real API, ~1300 subclasses) that counts every
+request, points cnae_data_processor at it with a temporary snapshot file and:
+  1. builds the snapshot (expect one upstream request per level);
+  2. times live API getters vs snapshot getters and description search;
+  3. checks that snapshot items match the API's (nested parents up to the
+     section, subclass activities), after a reload of the snapshot file too;
+  4. stops the fake server and checks the getters still answer from the snapshot.
+Exits with status 1 if any check fails.
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from urllib.parse import unquote
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import safety_ai_app.cnae_data_processor as cnae_module  # noqa: E402
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_cnae_lookup")
+
+_WORDS = [
+    "cultivo", "criação", "fabricação", "comércio", "atacadista", "varejista", "serviços",
+    "transporte", "construção", "extração", "produtos", "alimentícios", "metálicos", "máquinas",
+    "equipamentos", "veículos", "confecção", "peças", "agricultura", "pecuária", "obras",
+]
+
+
+def synthetic_hierarchy(seed: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    rnd = random.Random(seed)
+
+    def desc(n: int) -> str:
+        return " ".join(rnd.sample(_WORDS, n)).capitalize()
+
+    levels: Dict[str, List[Dict[str, Any]]] = {level: [] for level in cnae_module.CNAE_LEVELS}
+    division_no = 0
+    for letter in "ABCDEFGHIJKLMNOPQRSTU":
+        secao = {"id": letter, "descricao": desc(3).upper()}
+        levels["secoes"].append(secao)
+        for _ in range(4):
+            division_no += 1
+            divisao = {"id": f"{division_no:02d}", "descricao": desc(4).upper(), "secao": secao}
+            levels["divisoes"].append(divisao)
+            for g in range(1, 4):
+                grupo = {"id": f"{division_no:02d}{g}", "descricao": desc(4), "divisao": divisao}
+                levels["grupos"].append(grupo)
+                for c in range(1, 4):
+                    classe = {"id": f"{grupo['id']}{c}{rnd.randint(0, 9)}", "descricao": desc(5), "grupo": grupo}
+                    levels["classes"].append(classe)
+                    for sc in range(1, 3):
+                        levels["subclasses"].append(
+                            {"id": f"{classe['id']}{sc:02d}", "descricao": desc(6), "classe": classe,
+                             "atividades": [desc(4).lower() for _ in range(rnd.randint(1, 4))]}
+                        )
+    return levels
+
+
+class FakeIBGEServer:
+    """Serves /<level> and /<level>/<ids> from the synthetic hierarchy, counting hits."""
+
+    def __init__(self, levels: Dict[str, List[Dict[str, Any]]], latency_s: float) -> None:
+        self.hits = 0
+        self._lock = threading.Lock()
+        by_id = {level: {item["id"]: item for item in items} for level, items in levels.items()}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.hits += 1
+                time.sleep(latency_s)
+                parts = [p for p in unquote(self.path.split("?")[0]).split("/") if p]
+                if len(parts) == 1 and parts[0] in levels:
+                    payload: Any = levels[parts[0]]
+                elif len(parts) == 2 and parts[0] in by_id:
+                    payload = [by_id[parts[0]][i] for i in parts[1].split("|") if i in by_id[parts[0]]]
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+class _NoRisk:
+    """Grau de risco fora do escopo deste benchmark (evita baixar a planilha do Drive)."""
+
+    def get_risk_level(self, cnae_code: str):
+        return None
+
+
+def timed(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50": statistics.median(samples), "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    levels = synthetic_hierarchy()
+    fake = FakeIBGEServer(levels, args.latency_ms / 1000)
+    cnae_module.CNAE_BASE_URL = fake.base_url
+    cnae_module.CNAE_SNAPSHOT_FILE = str(Path(tempfile.mkdtemp()) / "cnae_hierarchy_snapshot.json")
+
+    processor = object.__new__(cnae_module.CNAEDataProcessor)
+    processor._risk_processor = _NoRisk()
+    processor._hierarchy = None
+
+    started = time.perf_counter()
+    processor.refresh_snapshot()
+    print(f"\nsnapshot: {time.perf_counter() - started:.2f}s, {fake.hits} requisições ao IBGE")
+
+    sample_class = levels["classes"][len(levels["classes"]) // 2]["id"]
+    sample_section = "C"
+    cases = [
+        ("classe por id", lambda: processor.get_classes(sample_class), lambda: processor._make_api_request("classes", sample_class)),
+        ("subclasses da seção", lambda: processor.get_subclasses(section_ids=sample_section), None),
+        ("todas as subclasses", lambda: processor.get_subclasses(), lambda: processor._make_api_request("subclasses")),
+        ("descrição 'fabric metal'", lambda: processor.search_cnae_by_description("fabric metal"), None),
+    ]
+    print(f"\n{'consulta':<28}{'API p50 (ms)':>14}{'snapshot p50':>14}{'snapshot p95':>14}")
+    for label, local_fn, api_fn in cases:
+        local = timed(local_fn, args.repeat)
+        api = f"{timed(api_fn, max(1, args.repeat // 10))['p50']:>14.1f}" if api_fn else f"{'—':>14}"
+        print(f"{label:<28}{api}{local['p50']:>14.3f}{local['p95']:>14.3f}")
+
+    sample_subclasses = "|".join(item["id"] for item in levels["subclasses"][::97])
+    same_as_api = (
+        processor.get_classes(sample_class) == processor._make_api_request("classes", sample_class)
+        and processor.get_subclasses(sample_subclasses) == processor._make_api_request("subclasses", sample_subclasses)
+    )
+    processor._hierarchy = processor._load_snapshot()
+    same_after_reload = processor._hierarchy is not None and (
+        processor.get_subclasses(sample_subclasses) == processor._make_api_request("subclasses", sample_subclasses)
+    )
+    print(f"\nitens do snapshot iguais aos da API = {same_as_api} (após recarregar o arquivo: {same_after_reload})")
+
+    fake.httpd.shutdown()
+    fake.httpd.server_close()
+    hits_before = fake.hits
+    still_served = len(processor.get_divisions(section_ids="A")) > 0
+    print(f"API fora do ar: getters respondem do snapshot = {still_served} "
+          f"(requisições adicionais: {fake.hits - hits_before})")
+    sys.exit(0 if same_as_api and same_after_reload and still_served else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+benchmark_cnae_risk.py — CNAE risk-grade lookup: DataFrame filtering vs hash map.
+
+Usage:
+    python scripts/benchmark_cnae_risk.py [--classes N] [--bulk N]
+
+Builds a synthetic grau_de_risco table (default ~1300 classes, as in the NR-4
+Annex I) and compares:
+  - single lookups: the previous `.values` scan + boolean filter per call vs
+    CNAERiskDataProcessor._get_risk_level_cached (dict with subclass → class →
+    group fallback);
+  - bulk lookups of --bulk codes (e.g. a spreadsheet of establishments): a loop
+    over the previous lookup vs the vectorized get_risk_levels.
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import pandas as pd  # noqa: E402
+
+from safety_ai_app.cnae_risk_data_processor import CNAERiskDataProcessor  # noqa: E402
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_cnae_risk")
+
+
+def synthetic_table(classes: int, seed: int = 42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    codes = sorted({f"{rnd.randint(1, 99):02d}{rnd.randint(1, 9)}{rnd.randint(1, 9)}{rnd.randint(0, 9)}" for _ in range(classes)})
+    return pd.DataFrame({"CNAE": codes, "Grau de Risco": [rnd.randint(1, 4) for _ in codes]})
+
+
+def legacy_lookup(df: pd.DataFrame, cnae_code: str) -> Optional[int]:
+    """The lookup this hash map replaced (kept here for comparison only)."""
+    cleaned = str(cnae_code).replace('.', '').replace('-', '').replace('/', '').strip()
+    lookup = cleaned[:5] if len(cleaned) == 7 else cleaned
+    if len(cleaned) not in (5, 7) or lookup not in df['CNAE'].values:
+        return None
+    result = df[df['CNAE'] == lookup]
+    return int(result['Grau de Risco'].iloc[0]) if not result.empty else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=1300)
+    parser.add_argument("--bulk", type=int, default=50_000)
+    args = parser.parse_args()
+
+    df = synthetic_table(args.classes)
+    # Usa a tabela sintética sem baixar a planilha do Drive
+    CNAERiskDataProcessor._data = df
+    CNAERiskDataProcessor._risk_map, CNAERiskDataProcessor._group_risk_map = CNAERiskDataProcessor._build_risk_maps(df)
+    CNAERiskDataProcessor._is_loaded = True
+    processor = CNAERiskDataProcessor()
+
+    rnd = random.Random(7)
+    classes = df["CNAE"].tolist()
+    queries = [f"{c[:4]}-{c[4]}/{rnd.randint(1, 99):02d}" if i % 2 else c for i, c in enumerate(rnd.choices(classes, k=2000))]
+
+    def per_call_us(fn) -> float:
+        samples = []
+        for q in queries:
+            started = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - started) * 1e6)
+        return statistics.median(samples)
+
+    legacy_single = per_call_us(lambda q: legacy_lookup(df, q))
+    new_single = per_call_us(CNAERiskDataProcessor._get_risk_level_cached)
+
+    bulk_codes = pd.Series(rnd.choices(queries, k=args.bulk))
+    started = time.perf_counter()
+    legacy_bulk = [legacy_lookup(df, c) for c in bulk_codes]
+    legacy_bulk_s = time.perf_counter() - started
+    started = time.perf_counter()
+    new_bulk = processor.get_risk_levels(bulk_codes)
+    new_bulk_s = time.perf_counter() - started
+
+    mismatches = sum(1 for old, new in zip(legacy_bulk, new_bulk) if old is not None and old != new)
+    print(f"\n{'':<22}{'anterior':>14}{'hash map':>14}")
+    print(f"{'consulta única (µs)':<22}{legacy_single:>14.1f}{new_single:>14.2f}")
+    print(f"{f'lote de {args.bulk} (s)':<22}{legacy_bulk_s:>14.2f}{new_bulk_s:>14.3f}")
+    print(f"\ndivergências com a implementação anterior: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+benchmark_download_metadata.py — download-metadata store: JSON rewrite vs SQLite (WAL).
+
+Usage:
+    python scripts/benchmark_download_metadata.py [--files N] [--processes P] [--writes W]
+
+Times a synthetic sync of --files downloaded files:
+  - the previous JSON store (load + rewrite the whole .download_metadata.json
+    per file, copied below for comparison only);
+  - DownloadMetadataStore.upsert (one transaction per file);
+  - DownloadMetadataStore.batch (one transaction per 200 files);
+and the should_download lookup (full JSON load vs primary-key SELECT).
+
+Then runs a multi-process writer stress test: --processes processes each upsert
+--writes distinct files (plus a shared file id all of them overwrite) into the
+same store, concurrently with a JSON migration, and checks every row is present.
+Exits with status 1 if any update was lost.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from safety_ai_app.download_metadata_store import DownloadMetadataStore  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_download_metadata")
+
+
+def remote_meta(i: int, revision: int = 0) -> Dict[str, Any]:
+    return {
+        "modified_time": f"2025-01-01T00:00:{i % 60:02d}.{revision:03d}Z",
+        "md5_checksum": f"{i:08x}{revision:024x}",
+    }
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+class LegacyJsonStore:
+    def __init__(self, data_dir: str) -> None:
+        self.path = os.path.join(data_dir, ".download_metadata.json")
+
+    def load(self) -> Dict[str, Any]:
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def update(self, file_id: str, local_path: str, meta: Dict[str, Any]) -> None:
+        all_meta = self.load()
+        all_meta[file_id] = {
+            "local_path": local_path,
+            "modified_time": meta.get("modified_time"),
+            "md5_checksum": meta.get("md5_checksum"),
+            "downloaded_at": datetime.now().isoformat(),
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(all_meta, f, indent=2, ensure_ascii=False)
+
+
+def bench_sync(files: int) -> None:
+    rows = []
+
+    work_dir = tempfile.mkdtemp()
+    legacy = LegacyJsonStore(work_dir)
+    started = time.perf_counter()
+    for i in range(files):
+        legacy.update(f"file-{i}", f"/data/docs/{i}.pdf", remote_meta(i))
+    rows.append(("JSON (reescrita por arquivo)", time.perf_counter() - started))
+    lookups = []
+    for i in range(0, files, max(1, files // 200)):
+        t = time.perf_counter()
+        legacy.load().get(f"file-{i}")
+        lookups.append(time.perf_counter() - t)
+    legacy_lookup_ms = statistics.median(lookups) * 1000
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    work_dir = tempfile.mkdtemp()
+    store = DownloadMetadataStore(work_dir)
+    started = time.perf_counter()
+    for i in range(files):
+        store.upsert(f"file-{i}", f"/data/docs/{i}.pdf", remote_meta(i))
+    rows.append(("SQLite (upsert por arquivo)", time.perf_counter() - started))
+    store.close()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    work_dir = tempfile.mkdtemp()
+    store = DownloadMetadataStore(work_dir)
+    started = time.perf_counter()
+    with store.batch():
+        for i in range(files):
+            store.upsert(f"file-{i}", f"/data/docs/{i}.pdf", remote_meta(i))
+    rows.append(("SQLite (lote de 200)", time.perf_counter() - started))
+    lookups = []
+    for i in range(0, files, max(1, files // 200)):
+        t = time.perf_counter()
+        store.get(f"file-{i}")
+        lookups.append(time.perf_counter() - t)
+    sqlite_lookup_ms = statistics.median(lookups) * 1000
+    store.close()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\nsincronização de {files} arquivos:")
+    print(f"  {'armazenamento':<32}{'total (s)':>10}{'por arquivo (ms)':>18}")
+    for name, seconds in rows:
+        print(f"  {name:<32}{seconds:>10.2f}{seconds / files * 1000:>18.3f}")
+    print(f"\nshould_download (consulta local, p50): JSON {legacy_lookup_ms:.3f} ms, SQLite {sqlite_lookup_ms:.4f} ms")
+
+
+def _writer(data_dir: str, worker: int, writes: int, batched: bool) -> None:
+    store = DownloadMetadataStore(data_dir)
+    if batched:
+        with store.batch(batch_size=25):
+            for i in range(writes):
+                store.upsert(f"w{worker}-{i}", f"/data/w{worker}/{i}.pdf", remote_meta(i, worker))
+                store.upsert("shared", f"/data/w{worker}/shared.pdf", remote_meta(0, worker))
+    else:
+        for i in range(writes):
+            store.upsert(f"w{worker}-{i}", f"/data/w{worker}/{i}.pdf", remote_meta(i, worker))
+            store.upsert("shared", f"/data/w{worker}/shared.pdf", remote_meta(0, worker))
+    store.close()
+
+
+def stress(processes: int, writes: int) -> int:
+    work_dir = tempfile.mkdtemp()
+    legacy_rows = 500
+    with open(os.path.join(work_dir, ".download_metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({f"legacy-{i}": {"local_path": f"/data/legacy/{i}.pdf", **remote_meta(i)}
+                   for i in range(legacy_rows)}, f)
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_writer, args=(work_dir, w, writes, w % 2 == 1)) for w in range(processes)]
+    started = time.perf_counter()
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    failed = sum(1 for p in workers if p.exitcode != 0)
+    rows = DownloadMetadataStore(work_dir).all()
+    expected = {f"w{w}-{i}" for w in range(processes) for i in range(writes)}
+    expected |= {f"legacy-{i}" for i in range(legacy_rows)} | {"shared"}
+    lost = expected - set(rows)
+    wrong = [k for k in expected - lost if k.startswith("w")
+             and rows[k]["local_path"] != f"/data/{k.split('-')[0]}/{k.split('-')[1]}.pdf"]
+    shared_ok = rows.get("shared", {}).get("local_path") in {f"/data/w{w}/shared.pdf" for w in range(processes)}
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\nestresse: {processes} processos × {writes} arquivos ({processes * writes * 2} upserts) em {elapsed:.2f}s")
+    print(f"  processos com erro: {failed}   linhas perdidas: {len(lost)}   "
+          f"linhas incorretas: {len(wrong)}   linha compartilhada válida: {shared_ok}")
+    return failed + len(lost) + len(wrong) + (0 if shared_ok else 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+
+    bench_sync(args.files)
+    errors = stress(args.processes, args.writes)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+benchmark_drive_change_feed.py — central library sync cycle: full listing vs changes.list feed.
+
+Usage:
+    python scripts/benchmark_drive_change_feed.py [--sizes 1000,10000,50000] [--changes N] [--cycles C]
+
+Runs against a fake Drive (files.list over an in-memory tree, plus a
+changes.getStartPageToken / changes.list endpoint backed by a change log, with
+a simulated round-trip latency per call). For each library size it applies
+--changes random mutations per cycle — new files, new revisions, renames,
+trashed and permanently deleted files, folders moved out of and into the tree,
+new folders with files, and edits outside the library — and measures one sync
+cycle of:
+  - the previous approach (crawl the whole tree, compare every file);
+  - DriveChangeTracker.poll (only the changes since the stored token).
+After every cycle the tracker's "to index / to remove" output is applied to a
+simulated index, which must match a fresh crawl of the fake tree. A last cycle
+expires the token to exercise the full-crawl fallback. Exits with status 1 on
+any mismatch.
+"""
+
+import argparse
+import logging
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import httplib2  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from safety_ai_app.drive_changes import DriveChangeTracker  # noqa: E402
+from safety_ai_app.drive_crawler import FOLDER_MIME, DriveCrawler  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_change_feed")
+
+_PDF_MIME = "application/pdf"
+_ROOT = "library"
+_OUTSIDE = "outside"
+_PARENTS_RE = re.compile(r"'([^']+)' in parents")
+_MIME_RE = re.compile(r"mimeType='([^']+)'")
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, **_: Any):
+        return self._fn()
+
+
+class FakeDrive:
+    """files().list + changes() over an in-memory Drive, fixed latency per call."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.log: List[str] = []
+        self.expired_before = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._next = 0
+        self._clock = 0
+
+    # -- mutations ------------------------------------------------------
+
+    def _touch(self, item_id: str) -> None:
+        self._clock += 1
+        self.items[item_id]["modifiedTime"] = f"2026-01-01T00:00:00.{self._clock:06d}Z"
+        self.log.append(item_id)
+
+    def add(self, parent: str, folder: bool = False) -> str:
+        self._next += 1
+        item_id = f"{'fld' if folder else 'fil'}{self._next}"
+        self.items[item_id] = {
+            "id": item_id, "name": item_id if folder else f"{item_id}.pdf",
+            "mimeType": FOLDER_MIME if folder else _PDF_MIME, "parents": [parent], "trashed": False,
+            "size": None if folder else "2048", "md5Checksum": None if folder else f"md5-{item_id}-0",
+        }
+        self._touch(item_id)
+        return item_id
+
+    def revise(self, item_id: str) -> None:
+        item = self.items[item_id]
+        item["md5Checksum"] = f"md5-{item_id}-{self._clock}"
+        self._touch(item_id)
+
+    def rename(self, item_id: str) -> None:
+        self.items[item_id]["name"] = f"renomeado-{self._clock}-{self.items[item_id]['name']}"
+        self._touch(item_id)
+
+    def trash(self, item_id: str) -> None:
+        self.items[item_id]["trashed"] = True
+        self._touch(item_id)
+
+    def delete(self, item_id: str) -> None:
+        del self.items[item_id]
+        self.log.append(item_id)
+
+    def move(self, item_id: str, new_parent: str) -> None:
+        self.items[item_id]["parents"] = [new_parent]
+        self._touch(item_id)
+
+    # -- API ------------------------------------------------------------
+
+    def _call(self, fn):
+        def run():
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.latency_s)
+            return fn()
+        return _Request(run)
+
+    def files(self) -> "FakeDrive":
+        return self
+
+    def changes(self) -> "FakeDrive":
+        return self
+
+    def list(self, q: str = "", pageSize: int = 100, pageToken: Optional[str] = None, **kwargs: Any) -> _Request:
+        if "includeRemoved" in kwargs:
+            return self._call(lambda: self._changes_page(pageToken, pageSize))
+
+        def run():
+            parents = set(_PARENTS_RE.findall(q))
+            mimes = set(_MIME_RE.findall(q))
+            matches = [dict(i) for i in self.items.values()
+                       if not i["trashed"] and parents & set(i["parents"]) and (not mimes or i["mimeType"] in mimes)]
+            start = int(pageToken or 0)
+            resp = {"files": matches[start:start + pageSize]}
+            if start + pageSize < len(matches):
+                resp["nextPageToken"] = str(start + pageSize)
+            return resp
+        return self._call(run)
+
+    def getStartPageToken(self) -> _Request:
+        return self._call(lambda: {"startPageToken": str(len(self.log))})
+
+    def _changes_page(self, token: str, page_size: int) -> Dict[str, Any]:
+        start = int(token)
+        if start < self.expired_before:
+            raise HttpError(httplib2.Response({"status": 404}), b'{"error": {"message": "Invalid pageToken"}}')
+        end = min(start + page_size, len(self.log))
+        changes = []
+        for file_id in self.log[start:end]:
+            item = self.items.get(file_id)
+            changes.append({"fileId": file_id, "removed": True} if item is None
+                           else {"fileId": file_id, "removed": False, "file": dict(item)})
+        resp: Dict[str, Any] = {"changes": changes}
+        if end < len(self.log):
+            resp["nextPageToken"] = str(end)
+        else:
+            resp["newStartPageToken"] = str(end)
+        return resp
+
+    # -- ground truth ---------------------------------------------------
+
+    def library(self) -> Dict[str, Tuple[Any, ...]]:
+        """Every live PDF under the library root -> (name, modifiedTime, md5)."""
+        folders = {_ROOT}
+        changed = True
+        while changed:
+            changed = False
+            for item in self.items.values():
+                if (item["mimeType"] == FOLDER_MIME and not item["trashed"] and item["id"] not in folders
+                        and set(item["parents"]) & folders):
+                    folders.add(item["id"])
+                    changed = True
+        return {i["id"]: (i["name"], i["modifiedTime"], i["md5Checksum"]) for i in self.items.values()
+                if i["mimeType"] == _PDF_MIME and not i["trashed"] and set(i["parents"]) & folders}
+
+
+def build_library(drive: FakeDrive, files: int, files_per_folder: int = 25, branching: int = 6) -> None:
+    folders, level = [], [_ROOT]
+    while len(folders) * files_per_folder < files:
+        next_level = [drive.add(parent, folder=True) for parent in level for _ in range(branching)]
+        folders.extend(next_level)
+        level = next_level
+    for i in range(files):
+        drive.add(folders[i % len(folders)])
+    outside_folder = drive.add(_OUTSIDE, folder=True)
+    for _ in range(files_per_folder):
+        drive.add(outside_folder)
+
+
+def mutate(drive: FakeDrive, count: int, rnd: random.Random) -> None:
+    for _ in range(count):
+        library = list(drive.library())
+        live = [i for i in drive.items.values() if not i["trashed"]]
+        folders = [i["id"] for i in live if i["mimeType"] == FOLDER_MIME]
+        op = rnd.choice(["add", "revise", "revise", "rename", "trash", "delete",
+                         "move_out", "move_in", "new_folder", "outside"])
+        if op == "add":
+            drive.add(rnd.choice(folders))
+        elif op == "revise" and library:
+            drive.revise(rnd.choice(library))
+        elif op == "rename" and library:
+            drive.rename(rnd.choice(library))
+        elif op == "trash" and library:
+            drive.trash(rnd.choice(library))
+        elif op == "delete" and library:
+            drive.delete(rnd.choice(library))
+        elif op == "move_out":
+            drive.move(rnd.choice(folders), _OUTSIDE)
+        elif op == "move_in":
+            outside = [i["id"] for i in live if i["mimeType"] == FOLDER_MIME and _OUTSIDE in i["parents"]]
+            if outside:
+                drive.move(rnd.choice(outside), rnd.choice(folders))
+        elif op == "new_folder":
+            folder = drive.add(rnd.choice(folders), folder=True)
+            for _ in range(3):
+                drive.add(folder)
+        else:
+            drive.add(_OUTSIDE)
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_cycle(drive: FakeDrive, index: Dict[str, Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    files = DriveCrawler(drive).crawl(_ROOT, mime_filter=[_PDF_MIME], file_fields="id, name, mimeType, size, md5Checksum")
+    return [f for f in files if f["id"] not in index]
+
+
+def apply_to_index(index: Dict[str, Tuple[Any, ...]], to_index: List[Dict[str, Any]], to_remove: List[str]) -> None:
+    for file_id in to_remove:
+        index.pop(file_id, None)
+    for item in to_index:
+        index[item["id"]] = (item["name"], item["modifiedTime"], item["md5Checksum"])
+
+
+def run_size(files: int, changes: int, cycles: int, latency_s: float, seed: int) -> bool:
+    rnd = random.Random(seed)
+    drive = FakeDrive(latency_s)
+    build_library(drive, files)
+    data_dir = tempfile.mkdtemp()
+    tracker = DriveChangeTracker(drive, _ROOT, data_dir, mime_filter=[_PDF_MIME])
+    index: Dict[str, Tuple[Any, ...]] = {}
+    ok = True
+
+    def cycle(label: str) -> None:
+        nonlocal ok
+        drive.calls = 0
+        started = time.perf_counter()
+        to_index, to_remove = tracker.poll(lambda: list(index))
+        elapsed = time.perf_counter() - started
+        apply_to_index(index, to_index, to_remove)
+        tracker.mark_indexed(i["id"] for i in to_index)
+        tracker.mark_removed(to_remove)
+        same = index == drive.library()
+        ok = ok and same
+        print(f"    {label:<16}{tracker.last_mode:<9}{drive.calls:>6}{elapsed:>9.3f}"
+              f"{len(to_index):>9}{len(to_remove):>9}   {same}")
+
+    cycle("inicial")
+    legacy_s, legacy_calls = [], []
+    for n in range(cycles):
+        mutate(drive, changes, rnd)
+        drive.calls = 0
+        started = time.perf_counter()
+        legacy_cycle(drive, index)
+        legacy_s.append(time.perf_counter() - started)
+        legacy_calls.append(drive.calls)
+        cycle(f"ciclo {n + 1}")
+
+    mutate(drive, changes, rnd)
+    drive.expired_before = len(drive.log)
+    cycle("token expirado")
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+    print(f"    listagem completa (anterior): {sum(legacy_calls) / len(legacy_calls):.0f} requisições, "
+          f"{sum(legacy_s) / len(legacy_s):.3f} s por ciclo")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    ok = True
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"\nbiblioteca com {size} arquivos, {args.changes} alterações por ciclo, "
+              f"latência {args.latency_ms:.0f} ms")
+        print(f"    {'ciclo':<16}{'modo':<9}{'req':>6}{'tempo s':>9}{'indexar':>9}{'remover':>9}   confere")
+        ok = run_size(size, args.changes, args.cycles, args.latency_ms / 1000, args.seed) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
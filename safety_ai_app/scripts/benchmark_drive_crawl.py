@@ -0,0 +1,196 @@
+"""
+benchmark_drive_crawl.py — Drive folder crawl: sequential recursion vs concurrent BFS.
+
+Usage:
+    python scripts/benchmark_drive_crawl.py [--latency-ms N] [--workers W]
+
+Builds fake Drive trees answering files.list with a simulated round-trip
+latency (default 60 ms, Drive's default page size of 100 when pageSize is not
+given, at most 1000) and crawls them with:
+  - the previous get_processable_files (one paginated query per folder,
+    recursing depth-first; copied below for comparison only);
+  - DriveCrawler (breadth-first, sibling folders batched into one
+    "'a' in parents or ..." query, thread pool, token bucket).
+Trees: "wide" (one level of many folders), "deep" (a long chain of nested
+folders with a few side folders per level) and "mixed". Prints wall time and
+request count, and exits with status 1 if the file sets differ.
+"""
+
+import argparse
+import logging
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from safety_ai_app.drive_crawler import (  # noqa: E402
+    DEFAULT_BURST,
+    DEFAULT_QUERIES_PER_SECOND,
+    FOLDER_MIME,
+    DriveCrawler,
+    TokenBucket,
+)
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_crawl")
+
+_PDF_MIME = "application/pdf"
+_PARENTS_RE = re.compile(r"'([^']+)' in parents")
+_DEFAULT_PAGE_SIZE = 100
+_MAX_PAGE_SIZE = 1000
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, **_: Any):
+        return self._fn()
+
+
+class FakeDrive:
+    """files().list over an in-memory tree with a fixed latency per call."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self.children: Dict[str, List[Dict[str, Any]]] = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def add(self, parent: str, folder: bool) -> str:
+        self._next += 1
+        item_id = f"{'fld' if folder else 'fil'}{self._next}"
+        self.children.setdefault(parent, []).append({
+            "id": item_id, "name": f"{item_id}.pdf" if not folder else item_id,
+            "mimeType": FOLDER_MIME if folder else _PDF_MIME, "size": "1024",
+        })
+        return item_id
+
+    def files(self) -> "FakeDrive":
+        return self
+
+    def list(self, q: str = "", pageSize: int = _DEFAULT_PAGE_SIZE, pageToken: str = None, **_: Any) -> _Request:
+        def run():
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.latency_s)
+            items = [item for parent in _PARENTS_RE.findall(q) for item in self.children.get(parent, [])]
+            size = min(pageSize or _DEFAULT_PAGE_SIZE, _MAX_PAGE_SIZE)
+            start = int(pageToken or 0)
+            resp = {"files": [dict(i) for i in items[start:start + size]]}
+            if start + size < len(items):
+                resp["nextPageToken"] = str(start + size)
+            return resp
+        return _Request(run)
+
+
+def build_wide(drive: FakeDrive, folders: int = 300, files_per_folder: int = 12) -> None:
+    for _ in range(folders):
+        folder = drive.add("root", folder=True)
+        for _ in range(files_per_folder):
+            drive.add(folder, folder=False)
+
+
+def build_deep(drive: FakeDrive, depth: int = 40, side_folders: int = 3, files_per_folder: int = 4) -> None:
+    parent = "root"
+    for _ in range(depth):
+        for _ in range(files_per_folder):
+            drive.add(parent, folder=False)
+        for _ in range(side_folders):
+            side = drive.add(parent, folder=True)
+            for _ in range(files_per_folder):
+                drive.add(side, folder=False)
+        parent = drive.add(parent, folder=True)
+
+
+def build_mixed(drive: FakeDrive, branching: int = 5, depth: int = 4, files_per_folder: int = 6) -> None:
+    level = ["root"]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for _ in range(files_per_folder):
+                drive.add(parent, folder=False)
+            next_level.extend(drive.add(parent, folder=True) for _ in range(branching))
+        level = next_level
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_get_processable_files(service: Any, folder_id: str) -> List[Dict[str, str]]:
+    files: List[Dict[str, str]] = []
+    query = f"'{folder_id}' in parents and trashed=false and (mimeType='{_PDF_MIME}' or mimeType='{FOLDER_MIME}')"
+    page_token = None
+    while True:
+        results = service.files().list(
+            pageSize=1000, q=query,
+            fields="nextPageToken, files(id, name, mimeType, size)",
+            pageToken=page_token
+        ).execute()
+        for item in results.get('files', []):
+            if item['mimeType'] == FOLDER_MIME:
+                files.extend(legacy_get_processable_files(service, item['id']))
+            elif item['mimeType'] == _PDF_MIME:
+                files.append({'id': item['id'], 'name': item['name'],
+                              'mimeType': item['mimeType'], 'size': item.get('size')})
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+    return files
+
+
+def run_tree(name: str, builder, latency_s: float, workers: int) -> bool:
+    drive = FakeDrive(latency_s)
+    builder(drive)
+
+    started = time.perf_counter()
+    legacy = legacy_get_processable_files(drive, "root")
+    legacy_s, legacy_calls = time.perf_counter() - started, drive.calls
+
+    drive.calls = 0
+    limiter = TokenBucket(DEFAULT_QUERIES_PER_SECOND, DEFAULT_BURST)
+    started = time.perf_counter()
+    crawled = DriveCrawler(drive, max_workers=workers, limiter=limiter).crawl("root", mime_filter=[_PDF_MIME])
+    bfs_s, bfs_calls = time.perf_counter() - started, drive.calls
+
+    same: bool = {f["id"] for f in legacy} == {f["id"] for f in crawled}
+    folders: Set[str] = {i["id"] for items in drive.children.values() for i in items if i["mimeType"] == FOLDER_MIME}
+    print(f"  {name:<8}{len(folders):>8}{len(legacy):>9}"
+          f"{legacy_s:>11.2f}{legacy_calls:>7}{bfs_s:>11.2f}{bfs_calls:>7}{legacy_s / bfs_s:>9.1f}x   {same}")
+    return same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    latency_s = args.latency_ms / 1000
+    print(f"\nlatência simulada: {args.latency_ms:.0f} ms por files.list, {args.workers} workers")
+    print(f"  {'árvore':<8}{'pastas':>8}{'arquivos':>9}"
+          f"{'anterior s':>11}{'req':>7}{'BFS s':>11}{'req':>7}{'ganho':>10}   iguais")
+    ok = all([
+        run_tree("wide", build_wide, latency_s, args.workers),
+        run_tree("deep", build_deep, latency_s, args.workers),
+        run_tree("mixed", build_mixed, latency_s, args.workers),
+    ])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
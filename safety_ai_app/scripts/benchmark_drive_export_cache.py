@@ -0,0 +1,210 @@
+"""
+benchmark_drive_export_cache.py — native Google documents: export on every sync vs revision-keyed export cache.
+
+Usage:
+    python scripts/benchmark_drive_export_cache.py [--native N] [--pdfs P] [--edited E]
+
+Syncs a fake folder of --native Google Docs/Sheets/Slides plus --pdfs PDFs into
+an empty index twice in a row (the second time after clearing the index, as a
+rebuild does), then edits --edited native documents (new version) and syncs
+again. Runs once without the export cache (the previous behaviour: every sync
+exports and extracts every native document again) and once with ExportCache,
+counting export calls and the time spent extracting text. A last run with a
+cache bound far below the folder's export size checks that LRU eviction keeps
+the cache within the bound and the syncs still index everything. The export
+endpoint costs a round trip plus conversion time; extraction a fixed time plus
+time per KB. Exits with status 1 if the index ends up different from the folder.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from safety_ai_app import drive_sync  # noqa: E402
+from safety_ai_app.export_cache import ExportCache  # noqa: E402
+from safety_ai_app.nr_rag_qa import NRQuestionAnswering  # noqa: E402
+from safety_ai_app.text_extractors import GOOGLE_NATIVE_EXPORT_MIMES  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_export_cache")
+
+_PDF_MIME = "application/pdf"
+_NATIVE_MIMES = [
+    "application/vnd.google-apps.document",
+    "application/vnd.google-apps.spreadsheet",
+    "application/vnd.google-apps.presentation",
+]
+_SOURCE_TYPE = "app_central_library_sync"
+
+
+class FakeFolder:
+    """Listing + get_media / export of one folder; exports convert the document server-side."""
+
+    def __init__(self, native: int, pdfs: int, latency_s: float, export_s: float,
+                 export_cache: Optional[ExportCache] = None) -> None:
+        self.service = object()
+        self.latency_s = latency_s
+        self.export_s = export_s
+        self.exports = 0
+        self.downloads = 0
+        self._lock = threading.Lock()
+        if export_cache is not None:
+            self.export_cache = export_cache
+        self.files: Dict[str, Dict[str, Any]] = {}
+        for i in range(native):
+            self._add(f"nat{i}", _NATIVE_MIMES[i % len(_NATIVE_MIMES)])
+        for i in range(pdfs):
+            self._add(f"pdf{i}", _PDF_MIME, size=str(200 * 1024), md5=f"md5-pdf{i}")
+
+    def _add(self, file_id: str, mime: str, size: Optional[str] = None, md5: Optional[str] = None) -> None:
+        self.files[file_id] = {"id": file_id, "name": f"{file_id}", "mimeType": mime, "size": size,
+                               "md5Checksum": md5, "modifiedTime": "2026-01-01T00:00:00Z", "version": "1"}
+
+    def edit(self, file_id: str) -> None:
+        item = self.files[file_id]
+        item["version"] = str(int(item["version"]) + 1)
+        item["modifiedTime"] = f"2026-01-02T00:00:{int(item['version']):02d}Z"
+
+    def list_processable_drive_files_in_folder(self, folder_id: str) -> List[Dict[str, Any]]:
+        time.sleep(self.latency_s)
+        return [dict(f) for f in self.files.values()]
+
+    def _download_file_to_path_internal(self, file_id: str, original_mime: str, export_mime: str,
+                                        local_path: str, expected_md5: Any = None, **_: Any) -> bool:
+        native = original_mime in GOOGLE_NATIVE_EXPORT_MIMES
+        with self._lock:
+            if native:
+                self.exports += 1
+            else:
+                self.downloads += 1
+        time.sleep(self.latency_s + (self.export_s if native else 0.0))
+        with open(local_path, "wb") as f:
+            f.write(f"{file_id} v{self.files[file_id]['version']} ".encode() * 2000)
+        return True
+
+
+class InMemoryQA(NRQuestionAnswering):
+    """NRQuestionAnswering whose index is a dict; extraction costs simulated time."""
+
+    def __init__(self, extract_base_s: float, extract_s_per_kb: float) -> None:
+        self._extract_base_s = extract_base_s
+        self._extract_s_per_kb = extract_s_per_kb
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self.extractions = 0
+        self.extract_seconds = 0.0
+
+    def load_documents(self, file_path: str, file_type: str) -> List[Document]:
+        started = time.perf_counter()
+        with open(file_path, "rb") as f:
+            data = f.read()
+        time.sleep(self._extract_base_s + len(data) / 1024 * self._extract_s_per_kb)
+        self.extractions += 1
+        self.extract_seconds += time.perf_counter() - started
+        return [Document(page_content=data.decode(), metadata={"page": 0, "extraction_method": "fake"})]
+
+    def process_document_to_chroma(self, file_path: str, document_name: str, source: str = "Local",
+                                   file_type: str = _PDF_MIME, additional_metadata: Optional[Dict[str, Any]] = None,
+                                   documents: Optional[List[Document]] = None):
+        if documents is None:
+            documents = self.load_documents(file_path, file_type)
+        meta = dict(additional_metadata or {})
+        meta["content"] = documents[0].page_content.split(" ", 2)[:2]
+        self.chunks[meta["drive_file_id"]] = meta
+
+    def get_drive_file_revisions_in_chroma(self, source_type: Optional[str] = None):
+        return {fid: {"modifiedTime": m.get("drive_modified_time"), "md5Checksum": m.get("drive_md5_checksum")}
+                for fid, m in self.chunks.items() if m.get("source_type") == source_type}
+
+    def remove_document_by_id(self, document_metadata_id: str) -> int:
+        return 1 if self.chunks.pop(document_metadata_id, None) is not None else 0
+
+    def clear_docs_by_source_type(self, source_type_to_remove: str) -> int:
+        ids = [fid for fid, m in self.chunks.items() if m.get("source_type") == source_type_to_remove]
+        for fid in ids:
+            del self.chunks[fid]
+        return len(ids)
+
+
+def index_matches(folder: FakeFolder, qa: InMemoryQA) -> bool:
+    # Every file indexed, with the text of its current version
+    return {fid: m["content"] for fid, m in qa.chunks.items()} == {
+        fid: [fid, f"v{f['version']}"] for fid, f in folder.files.items()
+    }
+
+
+def sync(label: str, folder: FakeFolder, qa: InMemoryQA) -> bool:
+    folder.exports, qa.extractions, qa.extract_seconds = 0, 0, 0.0
+    started = time.perf_counter()
+    drive_sync.synchronize_drive_folder_to_chroma(folder, "pasta", qa, "Biblioteca", _SOURCE_TYPE)
+    elapsed = time.perf_counter() - started
+    same = index_matches(folder, qa)
+    print(f"  {label:<36}{elapsed:>9.2f}{folder.exports:>11}{qa.extractions:>10}{qa.extract_seconds:>14.2f}   {same}")
+    return same
+
+
+def run(label: str, args: argparse.Namespace, cache_dir: Optional[str], max_bytes: int) -> bool:
+    cache = ExportCache(cache_dir, max_bytes=max_bytes) if cache_dir else None
+    folder = FakeFolder(args.native, args.pdfs, args.latency_ms / 1000, args.export_ms / 1000, cache)
+    qa = InMemoryQA(args.extract_ms / 1000, args.extract_ms_per_kb / 1000)
+    print(f"\n{label}")
+    print(f"  {'sincronização':<36}{'tempo s':>9}{'exports':>11}{'extrações':>10}{'extração s':>14}   confere")
+    ok = sync("1ª (índice vazio)", folder, qa)
+    qa.clear_docs_by_source_type(_SOURCE_TYPE)
+    ok &= sync("2ª (índice recriado)", folder, qa)
+    for file_id in list(folder.files)[:args.edited]:
+        folder.edit(file_id)
+    ok &= sync(f"3ª ({args.edited} documento(s) editado(s))", folder, qa)
+    if cache is not None:
+        within = cache.total_bytes() <= max_bytes
+        print(f"  cache: {len(cache)} entrada(s), {cache.total_bytes() / 1024:.0f} KB "
+              f"(limite {max_bytes / 1024:.0f} KB) — {'ok' if within else 'ACIMA DO LIMITE'}")
+        ok &= within
+        cache.close()
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--native", type=int, default=60)
+    parser.add_argument("--pdfs", type=int, default=20)
+    parser.add_argument("--edited", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--export-ms", type=float, default=400.0)
+    parser.add_argument("--extract-ms", type=float, default=60.0)
+    parser.add_argument("--extract-ms-per-kb", type=float, default=1.0)
+    args = parser.parse_args()
+
+    ok = run("sem cache (anterior)", args, None, 0)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        ok &= run("com cache de exportação", args, os.path.join(cache_dir, "amplo"), 512 * 1024 * 1024)
+        # Room for about a third of the exports: eviction has to kick in
+        ok &= run("com cache limitado a 1 MB", args, os.path.join(cache_dir, "limitado"), 1024 * 1024)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
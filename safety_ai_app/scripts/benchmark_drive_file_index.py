@@ -0,0 +1,197 @@
+"""
+benchmark_drive_file_index.py — chat document suggestions: live Drive search vs local library name index.
+
+Usage:
+    python scripts/benchmark_drive_file_index.py [--files 5000] [--queries 200] [--changes 20] [--cycles 3]
+
+Builds a library of --files documents with real-looking names in the fake Drive
+of benchmark_drive_change_feed.py (files.list + changes.list with a round-trip
+latency per call), plus name/fullText search. Then:
+  1. builds DriveFileIndex (full crawl through DriveChangeTracker / DriveCrawler);
+  2. runs --cycles refreshes after --changes random mutations each (new files,
+     renames, trash, deletes, folders moved into and out of the tree...), then
+     moves a folder that already holds files into the library and back out;
+  3. reopens the index on the same data dir, as a new process would;
+  4. times --queries keyword lookups with the previous live search (one
+     files.list "name contains / fullText contains" per answer; copied below for
+     comparison only) and with DriveFileIndex.search.
+After every refresh the indexed ids must equal the files under the library
+root, and every indexed name must be found by its own words. Exits with status
+1 on any mismatch.
+"""
+
+import argparse
+import logging
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from benchmark_drive_change_feed import _OUTSIDE, _ROOT, FakeDrive, build_library, mutate  # noqa: E402
+
+from safety_ai_app.drive_file_index import DriveFileIndex, fold_text  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_file_index")
+
+_WORDS = [
+    "modelo", "apr", "pgr", "pcmso", "ordem", "serviço", "checklist", "nr-35", "nr-10", "nr-12",
+    "altura", "espaço", "confinado", "inspeção", "extintor", "treinamento", "cipa", "ata", "laudo",
+    "insalubridade", "periculosidade", "ergonomia", "epi", "ficha", "permissão", "trabalho", "análise",
+    "risco", "elétrica", "máquinas", "andaime", "brigada", "emergência", "plano", "ação",
+]
+
+
+class NamedDrive(FakeDrive):
+    """The change-feed fake Drive with document names and a name / fullText search."""
+
+    def __init__(self, latency_s: float, search_latency_s: float, seed: int) -> None:
+        super().__init__(latency_s)
+        self.search_extra_s = max(0.0, search_latency_s - latency_s)
+        self._rnd = random.Random(seed)
+
+    def add(self, parent: str, folder: bool = False) -> str:
+        item_id = super().add(parent, folder)
+        if not folder:
+            words = self._rnd.sample(_WORDS, 3)
+            self.items[item_id]["name"] = f"{' '.join(words).title()} {item_id}.pdf"
+        return item_id
+
+    def list(self, q: str = "", pageSize: int = 100, pageToken: Optional[str] = None, **kwargs: Any):
+        if "contains" not in q:
+            return super().list(q=q, pageSize=pageSize, pageToken=pageToken, **kwargs)
+        keyword = fold_text(q.split("name contains '", 1)[1].split("'", 1)[0])
+        time.sleep(self.search_extra_s)
+        return self._call(lambda: {"files": [
+            {"id": i["id"], "name": i["name"], "mimeType": i["mimeType"], "webViewLink": ""}
+            for i in self.items.values() if not i["trashed"] and keyword in fold_text(i["name"])
+        ][:pageSize]})
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_live_search(service: Any, keyword: str, max_results: int = 10) -> List[Dict[str, str]]:
+    safe_kw = keyword.replace("'", "\\'")
+    query = (
+        f"(name contains '{safe_kw}' or fullText contains '{safe_kw}') "
+        f"and trashed = false"
+    )
+    try:
+        resp = service.files().list(
+            q=query, spaces='drive', fields="files(id,name,mimeType,webViewLink)", pageSize=max_results,
+        ).execute()
+        return resp.get('files', [])
+    except Exception as e:
+        logger.warning(f"[list_drive_files_by_keyword] Drive search error: {e}")
+        return []
+
+
+def percentiles(fn: Callable[[str], object], keywords: List[str]) -> Dict[str, float]:
+    samples = []
+    for keyword in keywords:
+        started = time.perf_counter()
+        fn(keyword)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50": statistics.median(samples), "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))]}
+
+
+def index_matches(drive: NamedDrive, index: DriveFileIndex) -> bool:
+    """Indexed ids == files under the library root, and each file is found by its own name."""
+    library = drive.library()
+    if set(index._files) != set(library):
+        return False
+    for file_id in list(library)[:200]:
+        name = drive.items[file_id]["name"]
+        if file_id not in {r["id"] for r in index.search(name, max_results=50)}:
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--search-latency-ms", type=float, default=150.0,
+                        help="latência de uma busca fullText (mais lenta que uma listagem)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    drive = NamedDrive(args.latency_ms / 1000, args.search_latency_ms / 1000, args.seed)
+    build_library(drive, args.files)
+    data_dir = tempfile.mkdtemp()
+    ok = True
+    try:
+        print(f"\nbiblioteca com {args.files} arquivos, latência {args.latency_ms:.0f} ms por requisição "
+              f"({args.search_latency_ms:.0f} ms por busca fullText)")
+        print(f"  {'atualização do índice':<34}{'modo':<9}{'req':>6}{'tempo s':>9}{'arquivos':>10}   confere")
+        index = DriveFileIndex(drive, _ROOT, data_dir)
+
+        def refresh(label: str) -> None:
+            nonlocal ok
+            drive.calls = 0
+            started = time.perf_counter()
+            index.refresh()
+            elapsed = time.perf_counter() - started
+            same = index.is_ready and index_matches(drive, index)
+            ok = ok and same
+            print(f"  {label:<34}{index.tracker.last_mode:<9}{drive.calls:>6}{elapsed:>9.2f}"
+                  f"{len(index._files):>10}   {same}")
+
+        refresh("inicial (varredura completa)")
+        for n in range(args.cycles):
+            mutate(drive, args.changes, rnd)
+            refresh(f"ciclo {n + 1} ({args.changes} alterações)")
+
+        # A folder that already holds files enters the tree (no change entries for its files), then leaves
+        moved = drive.add(_OUTSIDE, folder=True)
+        for _ in range(10):
+            drive.add(moved)
+        refresh("pasta nova fora da biblioteca")
+        drive.move(moved, _ROOT)
+        refresh("pasta (10 arq.) movida p/ dentro")
+        drive.move(moved, _OUTSIDE)
+        refresh("a mesma pasta movida p/ fora")
+
+        drive.calls = 0
+        reopened = DriveFileIndex(drive, _ROOT, data_dir)
+        same = reopened.is_ready and set(reopened._files) == set(index._files)
+        reopened.refresh()
+        same = same and index_matches(drive, reopened)
+        ok = ok and same
+        print(f"  {'novo processo (estado salvo)':<34}{reopened.tracker.last_mode:<9}{drive.calls:>6}{'':>9}"
+              f"{len(reopened._files):>10}   {same}")
+
+        keywords = [rnd.choice(_WORDS) for _ in range(args.queries)]
+        live = percentiles(lambda kw: legacy_live_search(drive, kw), keywords[:max(1, args.queries // 10)])
+        local = percentiles(lambda kw: index.search(kw), keywords)
+        print(f"\n  {'busca por palavra-chave':<34}{'p50 ms':>10}{'p95 ms':>10}")
+        print(f"  {'anterior: files.list ao vivo':<34}{live['p50']:>10.1f}{live['p95']:>10.1f}")
+        print(f"  {'DriveFileIndex.search':<34}{local['p50']:>10.3f}{local['p95']:>10.3f}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
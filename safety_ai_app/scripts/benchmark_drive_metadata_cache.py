@@ -0,0 +1,177 @@
+"""
+benchmark_drive_metadata_cache.py — Drive file metadata: per-process files.get vs the shared sqlite cache.
+
+Usage:
+    python scripts/benchmark_drive_metadata_cache.py [--files 200] [--latency-ms 20] [--qps Q]
+
+Checks the metadata (modifiedTime, md5) of --files files against a fake Drive
+with a round-trip latency per HTTP request, once in this process and once in a
+second process (as the FastAPI process, the indexer subprocess and the
+scheduler thread each do):
+  - the previous get_file_metadata: one files.get per file, memoized only
+    inside the process (st.cache_data; copied below for comparison only), so
+    the second process asks Drive again;
+  - DriveMetadataFetcher: files.get through the process-wide limiter (--qps,
+    default the real quota share), a fraction of the calls answered 429 and
+    retried; the second process is served by the sqlite cache in the same data
+    dir, with no requests.
+Exits with status 1 if any scenario returns metadata different from the fake
+Drive's.
+"""
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import httplib2  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from safety_ai_app import drive_crawler, drive_metadata_cache  # noqa: E402
+from safety_ai_app.drive_metadata_cache import DriveMetadataCache, DriveMetadataFetcher  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_metadata_cache")
+
+
+class _Request:
+    def __init__(self, fn: Callable[[], Dict[str, Any]]):
+        self._fn = fn
+
+    def execute(self, **_: Any):
+        return self._fn()
+
+
+class FakeDrive:
+    """files().get over a fixed set of files; one round trip per HTTP request."""
+
+    def __init__(self, files: int, latency_s: float, rate_limited_fraction: float = 0.0, seed: int = 3) -> None:
+        self.latency_s = latency_s
+        self.rate_limited_fraction = rate_limited_fraction
+        self.rnd = random.Random(seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.items = {f"file{i}": {"id": f"file{i}", "modifiedTime": f"2026-01-01T00:00:{i % 60:02d}Z",
+                                   "md5Checksum": f"md5-{i}"} for i in range(files)}
+
+    def files(self) -> "FakeDrive":
+        return self
+
+    def get(self, fileId: str, fields: str = "") -> _Request:
+        def run():
+            with self._lock:
+                self.requests += 1
+            time.sleep(self.latency_s)
+            if self.rnd.random() < self.rate_limited_fraction:
+                raise HttpError(httplib2.Response({"status": 429}), b"rateLimitExceeded")
+            return dict(self.items[fileId])
+        return _Request(run)
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_get_file_metadata(service: Any, file_id: str) -> Dict[str, Any]:
+    try:
+        meta = service.files().get(fileId=file_id, fields='id, modifiedTime, md5Checksum').execute()
+        return {"file_id": file_id, "modified_time": meta.get('modifiedTime'), "md5_checksum": meta.get('md5Checksum')}
+    except Exception as e:
+        logger.error(f"Erro ao obter metadados do arquivo {file_id}: {e}")
+        return {"file_id": file_id, "modified_time": None, "md5_checksum": None}
+
+
+def expected(drive: FakeDrive) -> Dict[str, Dict[str, Any]]:
+    return {fid: {"file_id": fid, "modified_time": f["modifiedTime"], "md5_checksum": f["md5Checksum"]}
+            for fid, f in drive.items.items()}
+
+
+def configure(args: argparse.Namespace) -> None:
+    # Time scale of the benchmark: retries after tens of ms instead of seconds
+    drive_metadata_cache.FETCH_BACKOFF_BASE_SECONDS = 0.05
+    drive_crawler._shared_limiter = drive_crawler.TokenBucket(args.qps, drive_crawler.DEFAULT_BURST)
+
+
+def check_all(drive: FakeDrive, get_metadata: Callable[[str], Any]) -> tuple:
+    drive.requests = 0
+    started = time.perf_counter()
+    result = {fid: get_metadata(fid) for fid in drive.items}
+    return drive.requests, time.perf_counter() - started, result == expected(drive)
+
+
+def child(args: argparse.Namespace) -> None:
+    configure(args)
+    drive = FakeDrive(args.files, args.latency_ms / 1000)
+    fetcher = DriveMetadataFetcher(drive, DriveMetadataCache(args.data_dir))
+    requests, seconds, same = check_all(drive, fetcher.fetch)
+    print(json.dumps({"seconds": seconds, "requests": requests, "same": same}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--qps", type=float, default=drive_crawler.DEFAULT_QUERIES_PER_SECOND)
+    parser.add_argument("--rate-limited", type=float, default=0.02, help="fração de chamadas respondidas com 429")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    configure(args)
+    print(f"\n{args.files} arquivos, latência {args.latency_ms:.0f} ms por requisição, "
+          f"limite {args.qps:.0f} chamadas/s, {args.rate_limited:.0%} das chamadas com 429")
+    print(f"  {'cenário':<40}{'requisições':>12}{'tempo s':>10}   confere")
+    ok = True
+
+    def report(label: str, requests: int, seconds: float, same: bool) -> None:
+        nonlocal ok
+        ok = ok and same
+        print(f"  {label:<40}{requests:>12}{seconds:>10.2f}   {same}")
+
+    # st.cache_data lives inside one process: the second process starts with nothing
+    drive = FakeDrive(args.files, args.latency_ms / 1000)
+    report("anterior: files.get por arquivo", *check_all(drive, lambda fid: legacy_get_file_metadata(drive, fid)))
+    report("anterior: outro processo (sem cache)", *check_all(drive, lambda fid: legacy_get_file_metadata(drive, fid)))
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        drive = FakeDrive(args.files, args.latency_ms / 1000, rate_limited_fraction=args.rate_limited)
+        fetcher = DriveMetadataFetcher(drive, DriveMetadataCache(data_dir))
+        report("DriveMetadataFetcher, cache vazio", *check_all(drive, fetcher.fetch))
+
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", "--data-dir", data_dir, "--files", str(args.files),
+             "--latency-ms", str(args.latency_ms), "--qps", str(args.qps)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        data = json.loads(out.strip().splitlines()[-1])
+        report("outro processo, cache compartilhado", data["requests"], data["seconds"], data["same"])
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+benchmark_drive_path_cache.py — Drive API calls spent resolving spreadsheet paths.
+
+Usage:
+    python scripts/benchmark_drive_path_cache.py [--loads N]
+
+Builds an in-memory fake Drive (folders + files, counting every files.list /
+files.get call) with the spreadsheets the data processors load by path or by
+folder + name, and counts API calls for --loads app loads:
+  - without the path cache (previous behaviour: one files.list per segment, every time);
+  - with DrivePathCache (segments shared between paths, persisted);
+  - after a restart (new cache object reading the persisted file);
+  - a missing path asked repeatedly (negative caching);
+  - a spreadsheet replaced on Drive (cached id answers 404: invalidated, resolved again);
+  - a folder replaced on Drive (a new file under the stale cached folder id is
+    not found there, which triggers a fresh resolve).
+Exits with status 1 if any scenario resolves a wrong id.
+"""
+
+import argparse
+import logging
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import httplib2  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from safety_ai_app.drive_downloader import DriveDownloader  # noqa: E402
+from safety_ai_app.drive_path_cache import DrivePathCache  # noqa: E402
+
+logging.basicConfig(
+    level=logging.CRITICAL,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_drive_path_cache")
+
+_FOLDER_MIME = "application/vnd.google-apps.folder"
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_PARENT_RE = re.compile(r"'([^']+)' in parents")
+_NAME_RE = re.compile(r"name = '([^']+)'")
+
+# Caminhos no formato usado pelos processadores (fines/quiz) e pastas + nome (SESMT/jogos)
+PATHS = [
+    "SafetyAI - Conhecimento Base/Tabelas/NR-28 Multas.xlsx",
+    "SafetyAI - Conhecimento Base/Jogos/Perguntas.xlsx",
+    "SafetyAI - Conhecimento Base/Jogos/palavrascruzadas.xlsx",
+    "SafetyAI - Conhecimento Base/Tabelas/SESMT/Dimensionamento_SESMT.xlsx",
+]
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeDrive:
+    """files().list / files().get over an in-memory tree, counting calls."""
+
+    def __init__(self) -> None:
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self._next = 0
+
+    def add(self, parent: str, name: str, folder: bool = False) -> str:
+        self._next += 1
+        item_id = f"{'fld' if folder else 'fil'}-{self._next}"
+        self.items[item_id] = {"id": item_id, "name": name, "parents": [parent],
+                               "mimeType": _FOLDER_MIME if folder else _XLSX_MIME}
+        return item_id
+
+    def add_path(self, path: str) -> str:
+        parent = "root"
+        for part in path.split("/")[:-1]:
+            existing = [i for i in self.items.values()
+                        if i["name"] == part and parent in i["parents"] and i["mimeType"] == _FOLDER_MIME]
+            parent = existing[0]["id"] if existing else self.add(parent, part, folder=True)
+        return self.add(parent, path.split("/")[-1])
+
+    def files(self) -> "FakeDrive":
+        return self
+
+    def list(self, q: str = "", **_: Any) -> _Request:
+        def run():
+            self.calls["files.list"] += 1
+            parent = _PARENT_RE.search(q)
+            name = _NAME_RE.search(q).group(1)
+            folders_only = _FOLDER_MIME in q
+            found = [i for i in self.items.values()
+                     if i["name"] == name and (parent is None or parent.group(1) in i["parents"])
+                     and (not folders_only or i["mimeType"] == _FOLDER_MIME)]
+            return {"files": [dict(i) for i in found]}
+        return _Request(run)
+
+    def get(self, fileId: str, **_: Any) -> _Request:
+        def run():
+            self.calls["files.get"] += 1
+            if fileId not in self.items:
+                raise HttpError(httplib2.Response({"status": 404}), b'{"error": {"code": 404}}')
+            return dict(self.items[fileId])
+        return _Request(run)
+
+
+class CountingDownloader(DriveDownloader):
+    """Serves the file bytes from the fake Drive (media download is not exercised here)."""
+
+    def download_bytes(self, file_id: str, original_mime_type: str, export_mime_type: str) -> bytes:
+        self.service.calls["files.get_media"] += 1
+        return f"conteúdo de {file_id}".encode("utf-8")
+
+
+def app_load(dl: DriveDownloader, drive: FakeDrive) -> List[Optional[str]]:
+    """What one app start resolves: fines + quiz + games by path, SESMT by folder + name."""
+    ids = [dl.get_file_id_by_path(p) for p in PATHS[:3]]
+    sesmt_folder = drive.items[drive_id_of(drive, PATHS[3])]["parents"][0]
+    ids.append(dl.get_file_id_in_folder(sesmt_folder, "Dimensionamento_SESMT.xlsx"))
+    return ids
+
+
+def drive_id_of(drive: FakeDrive, path: str) -> str:
+    parent = "root"
+    for part in path.split("/"):
+        parent = next(i["id"] for i in drive.items.values() if i["name"] == part and parent in i["parents"])
+    return parent
+
+
+def run_loads(dl: DriveDownloader, drive: FakeDrive, loads: int) -> Dict[str, int]:
+    drive.calls.clear()
+    expected = [drive_id_of(drive, p) for p in PATHS]
+    wrong = 0
+    for _ in range(loads):
+        if app_load(dl, drive) != expected:
+            wrong += 1
+    return {"files.list": drive.calls["files.list"], "errados": wrong}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loads", type=int, default=50)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    drive = FakeDrive()
+    for path in PATHS:
+        drive.add_path(path)
+    failures = 0
+    rows = []
+
+    legacy = run_loads(CountingDownloader(drive, work_dir), drive, args.loads)
+    rows.append(("sem cache (anterior)", legacy))
+
+    cache = DrivePathCache(work_dir)
+    cached = run_loads(CountingDownloader(drive, work_dir, path_cache=cache), drive, args.loads)
+    rows.append(("com cache", cached))
+
+    restarted = run_loads(CountingDownloader(drive, work_dir, path_cache=DrivePathCache(work_dir)), drive, args.loads)
+    rows.append(("após reinício (cache persistido)", restarted))
+
+    print(f"\n{args.loads} cargas do app ({len(PATHS)} planilhas cada):")
+    print(f"  {'cenário':<36}{'files.list':>12}{'por carga':>12}")
+    for name, counts in rows:
+        failures += counts["errados"]
+        print(f"  {name:<36}{counts['files.list']:>12}{counts['files.list'] / args.loads:>12.2f}")
+
+    dl = CountingDownloader(drive, work_dir, path_cache=DrivePathCache(work_dir))
+
+    drive.calls.clear()
+    missing = [dl.get_file_id_by_path("SafetyAI - Conhecimento Base/Tabelas/Inexistente.xlsx") for _ in range(args.loads)]
+    failures += sum(1 for m in missing if m is not None)
+    print(f"\ncaminho inexistente × {args.loads}: {drive.calls['files.list']} files.list (cache negativo)")
+
+    # Planilha substituída no Drive: o id em cache passa a responder 404
+    quiz_path = PATHS[1]
+    old_id = drive_id_of(drive, quiz_path)
+    parent = drive.items.pop(old_id)["parents"][0]
+    new_id = drive.add(parent, quiz_path.split("/")[-1])
+    drive.calls.clear()
+    ok = dl.download_by_path(quiz_path, str(Path(work_dir) / "out" / "Perguntas.xlsx"))
+    resolved = dl.get_file_id_by_path(quiz_path)
+    failures += 0 if ok and resolved == new_id else 1
+    print(f"planilha substituída (404): baixada={ok}, novo id resolvido={resolved == new_id}, "
+          f"chamadas={dict(drive.calls)}")
+
+    # Pasta substituída no Drive: o id de pasta em cache fica órfão (a busca abaixo dele volta vazia)
+    games_folder = drive.items[drive_id_of(drive, PATHS[2])]["parents"][0]
+    base_folder = drive.items[games_folder]["parents"][0]
+    children = [i for i in drive.items.values() if games_folder in i["parents"]]
+    del drive.items[games_folder]
+    new_folder = drive.add(base_folder, "Jogos", folder=True)
+    for child in children:
+        child["parents"] = [new_folder]
+    new_path = PATHS[2].rsplit("/", 1)[0] + "/Forca.xlsx"
+    new_file = drive.add(new_folder, "Forca.xlsx")
+    drive.calls.clear()
+    resolved = dl.get_file_id_by_path(new_path)
+    failures += 0 if resolved == new_file else 1
+    print(f"pasta substituída: novo arquivo resolvido={resolved == new_file}, "
+          f"files.list={drive.calls['files.list']}")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+benchmark_fines.py — NR-28 fines: instantiation and total-fine calculation, before vs after.
+
+Usage:
+    python scripts/benchmark_fines.py [--items N] [--repeat N]
+
+Writes a synthetic fines workbook (the three sheets read by FinesDataProcessor,
+default 6000 rows in "Itens") and serves it through a local stand-in for the
+Drive integrator. Compares:
+  - instantiation: the previous download + parse on every instance vs the first
+    instance (download, parse, parquet snapshot), a new instance in the same
+    process (md5 unchanged) and a new process reading the snapshot;
+  - calculate_total_fine for 1, 50 and 500 selected items: the previous
+    per-item filtering vs the merge-based calculation.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import pandas as pd  # noqa: E402
+
+import safety_ai_app.fines_data_processor as fines_module  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_fines")
+
+_RANGES = ["01-10", "11-25", "26-50", "51-100", "101-250", "251-500", "501-1000", "Mais de 1000"]
+
+
+def _brl(value: float) -> str:
+    return fines_module.format_currency_br(value)
+
+
+def write_workbook(path: str, items: int, seed: int = 42) -> None:
+    rnd = random.Random(seed)
+
+    def gradacao() -> pd.DataFrame:
+        rows = []
+        for level in range(1, 5):
+            for n, faixa in enumerate(_RANGES):
+                minimo = 400.0 * level * (n + 1)
+                rows.append([level, faixa, _brl(minimo), _brl(minimo * 1.8), _brl(minimo * 3.6)])
+        return pd.DataFrame(rows, columns=["Infração", "Empregados", "Mínimo", "Máximo", "Reincidência"])
+
+    itens = pd.DataFrame(
+        [
+            [rnd.randint(1, 38), "", f"{rnd.randint(1, 40)}.{rnd.randint(1, 20)}.{rnd.randint(1, 9)}",
+             f"{100000 + i:06d}-{rnd.randint(0, 9)}", rnd.randint(1, 4), rnd.choice(["SEG", "MED"])]
+            for i in range(items)
+        ],
+        columns=["NR", "Anexo", "Item/Subitem", "Código", "Infração", "Tipo"],
+    )
+    with pd.ExcelWriter(path) as writer:
+        gradacao().to_excel(writer, sheet_name="MULTAS_EM_REAIS_SEG", index=False)
+        gradacao().to_excel(writer, sheet_name="MULTAS_EM_REAIS_MED", index=False)
+        itens.to_excel(writer, sheet_name="Itens", index=False)
+
+
+class FakeIntegrator:
+    """Serves the workbook as if it were on Drive, counting downloads."""
+
+    def __init__(self, workbook_path: str) -> None:
+        self.workbook_path = workbook_path
+        self.downloads = 0
+        with open(workbook_path, "rb") as f:
+            self.md5 = hashlib.md5(f.read()).hexdigest()
+
+    def get_file_id_by_path(self, drive_file_path: str) -> Optional[str]:
+        return "fake-fines-id"
+
+    def get_file_metadata(self, file_id: str) -> Dict[str, Any]:
+        return {"file_id": file_id, "modified_time": None, "md5_checksum": self.md5}
+
+    def download_file_by_path(self, drive_file_path: str, local_save_path: str) -> bool:
+        self.downloads += 1
+        shutil.copyfile(self.workbook_path, local_save_path)
+        return True
+
+
+class LegacyFines:
+    """Load and calculation this change replaced (kept here for comparison only)."""
+
+    def __init__(self, excel_path: str) -> None:
+        with pd.ExcelFile(excel_path) as xls:
+            self.df_gradacao_sst = pd.read_excel(xls, sheet_name="MULTAS_EM_REAIS_SEG", header=0)
+            self.df_gradacao_med = pd.read_excel(xls, sheet_name="MULTAS_EM_REAIS_MED", header=0)
+            self.df_itens = pd.read_excel(xls, sheet_name="Itens", header=0)
+        self._clean_data()
+
+    def _clean_data(self) -> None:
+        _range_map = {
+            "01-10": "01 à 10", "11-25": "11 à 25", "26-50": "26 à 50",
+            "51-100": "51 à 100", "101-250": "101 à 250",
+            "251-500": "251 à 500", "501-1000": "501 à 1000",
+            "Mais de 1000": "Mais de 1000",
+        }
+        for attr in ["df_gradacao_sst", "df_gradacao_med"]:
+            df = getattr(self, attr).copy()
+            df.columns = ["infracao", "num_empregados", "minimo", "maximo", "reincidencia"]
+            for col in ["minimo", "maximo", "reincidencia"]:
+                df[col] = df[col].astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+            df["num_empregados"] = df["num_empregados"].astype(str).replace(_range_map).str.strip()
+            df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce")
+            setattr(self, attr, df)
+
+        df = self.df_itens.copy()
+        df.columns = ["nr", "anexo", "item_subitem", "codigo", "infracao", "tipo"]
+        df = df.dropna(how="all")
+        df["nr"] = pd.to_numeric(df["nr"], errors="coerce")
+        df["anexo"] = df["anexo"].fillna("").astype(str)
+        df["item_subitem"] = df["item_subitem"].astype(str)
+        df["codigo"] = df["codigo"].astype(str)
+        df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce")
+        df["tipo"] = df["tipo"].astype(str)
+        self.df_itens = df
+
+    def calculate_total_fine(self, employee_range_str: str, has_recidivism: bool,
+                             selected_item_codes: List[str]) -> Tuple[float, float, float, List[Dict[str, Any]]]:
+        total_base = total_seg = total_med = 0.0
+        details: List[Dict[str, Any]] = []
+        for item_code in selected_item_codes:
+            item_info = self.df_itens[self.df_itens["codigo"] == item_code]
+            if item_info.empty:
+                continue
+            level = pd.to_numeric(item_info["infracao"].iloc[0], errors="coerce")
+            if pd.isna(level):
+                continue
+            tipo = item_info["tipo"].iloc[0]
+            gradacao_df = self.df_gradacao_sst if tipo == "SEG" else self.df_gradacao_med
+            fine_data = gradacao_df[
+                (pd.to_numeric(gradacao_df["infracao"], errors="coerce") == level)
+                & (gradacao_df["num_empregados"] == employee_range_str)
+            ]
+            if fine_data.empty:
+                continue
+            current = fine_data["reincidencia" if has_recidivism else "maximo"].iloc[0]
+            total_base += current
+            if tipo == "SEG":
+                total_seg += current
+            else:
+                total_med += current
+            details.append({"item_codigo": item_code, "valor_multa": current})
+        return total_base, total_seg, total_med, details
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=6000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    workbook = os.path.join(work_dir, "multas_nr28.xlsx")
+    write_workbook(workbook, args.items)
+    fines_module.FINES_SNAPSHOT_DIR = os.path.join(work_dir, "fines_snapshot")
+    integrator = FakeIntegrator(workbook)
+    drive_path = "SafetyAI/Multas/multas_nr28.xlsx"
+
+    def new_instance() -> fines_module.FinesDataProcessor:
+        return fines_module.FinesDataProcessor(integrator, drive_path, work_dir)
+
+    legacy_ms = timed(lambda: LegacyFines(workbook), max(1, args.repeat // 10))
+    started = time.perf_counter()
+    processor = new_instance()
+    cold_ms = (time.perf_counter() - started) * 1000
+    warm_ms = timed(new_instance, args.repeat)
+
+    def from_snapshot() -> None:
+        fines_module._tables_cache.clear()
+        new_instance()
+
+    snapshot_ms = timed(from_snapshot, args.repeat)
+
+    print(f"\n{'instanciação':<40}{'p50 (ms)':>12}")
+    print(f"{'anterior (download + parse sempre)':<40}{legacy_ms:>12.1f}")
+    print(f"{'primeira (download + parse + snapshot)':<40}{cold_ms:>12.1f}")
+    print(f"{'mesmo processo, md5 inalterado':<40}{warm_ms:>12.2f}")
+    print(f"{'novo processo, snapshot parquet':<40}{snapshot_ms:>12.1f}")
+    print(f"downloads do Drive: {integrator.downloads} (1 esperado)")
+
+    legacy = LegacyFines(workbook)
+    codes = processor.df_itens["codigo"].tolist()
+    rnd = random.Random(7)
+    print(f"\n{'cálculo':<16}{'anterior p50 (ms)':>19}{'merge p50 (ms)':>16}{'totais iguais':>15}")
+    faixa = "51 à 100"
+    for n in (1, 50, 500):
+        selected = rnd.sample(codes, n)
+        old = legacy.calculate_total_fine(faixa, False, selected)
+        new = processor.calculate_total_fine(faixa, False, selected)
+        same = abs(old[0] - new[0]) < 1e-6 and len(old[3]) == len(new[3])
+        old_ms = timed(lambda: legacy.calculate_total_fine(faixa, False, selected), args.repeat)
+        new_ms = timed(lambda: processor.calculate_total_fine(faixa, False, selected), args.repeat)
+        print(f"{f'{n} itens':<16}{old_ms:>19.2f}{new_ms:>16.2f}{str(same):>15}")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+benchmark_icd11_client.py — Upstream hit count of the ICD-11 client under concurrent load.
+
+Usage:
+    python scripts/benchmark_icd11_client.py [--threads N] [--latency-ms N]
+
+Starts a local fake of the WHO token and search endpoints that counts every
+request it receives, points cid_data_processor at it (with a temporary disk
+cache) and runs concurrent searches through CIDDatabase.search_cid11_text:
+  1. N threads, same query, cold cache      -> expect 1 token + 1 search upstream;
+  2. N threads, same query, warm cache      -> expect 0 upstream calls;
+  3. TTL forced to 0 (stale entry)          -> served from cache + 1 background revalidation;
+  4. N threads over 4 distinct queries      -> expect 4 searches upstream.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import safety_ai_app.cid_data_processor as cid_module  # noqa: E402
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_icd11_client")
+
+
+class FakeICDServer:
+    """WHO ICD API stand-in: /token and /search, with per-endpoint hit counters."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.hits: Dict[str, int] = {"token": 0, "search": 0}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server._count("token")
+                time.sleep(latency_s)
+                self._reply({"access_token": "fake-token", "expires_in": 3600})
+
+            def do_GET(self) -> None:
+                server._count("search")
+                time.sleep(latency_s)
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                self._reply({"destinationEntities": [
+                    {"theCode": f"X{i:02d}", "title": {"@value": f"{query} resultado {i}"}} for i in range(5)
+                ]})
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.hits[endpoint] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.hits)
+
+
+def run_round(db, queries, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: db.search_cid11_text(queries[i % len(queries)], fallback_to_local=False), range(threads)))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    fake = FakeICDServer(args.latency_ms / 1000)
+    cache_dir = tempfile.mkdtemp(prefix="icd11_cache_")
+    cid_module.ICD_API_AUTH_URL = f"{fake.base_url}/token"
+    cid_module.ICD_11_API_SEARCH_ENDPOINT = f"{fake.base_url}/search"
+    cid_module.ICD_API_CLIENT_ID = "fake-client"
+    cid_module.ICD_API_CLIENT_SECRET = "fake-secret"
+    cid_module._icd_cache.cache_dir = cache_dir
+
+    # Sem carregar o CID-10 do Drive: só o cliente da API é exercitado
+    db = object.__new__(cid_module.CIDDatabase)
+    db._cid10_local_data = []
+
+    rounds = [
+        ("mesma busca, cache frio", ["lombalgia"], None),
+        ("mesma busca, cache quente", ["lombalgia"], None),
+        ("entrada expirada (SWR)", ["lombalgia"], 0),
+        ("4 buscas distintas", ["asma", "dermatite", "perda auditiva", "tendinite"], None),
+    ]
+    print(f"\n{'rodada':<28}{'token':>7}{'search':>8}{'tempo (s)':>11}")
+    for label, queries, ttl in rounds:
+        if ttl is not None:
+            cid_module.ICD_CACHE_TTL_SECONDS = ttl
+        before = fake.snapshot()
+        elapsed = run_round(db, queries, args.threads)
+        time.sleep(args.latency_ms / 1000 * 3)  # deixa a revalidação em segundo plano terminar
+        after = fake.snapshot()
+        print(f"{label:<28}{after['token'] - before['token']:>7}{after['search'] - before['search']:>8}{elapsed:>11.2f}")
+        cid_module.ICD_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+    fake.httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+benchmark_sesmt_load.py — SESMT table load: per-process iterrows parse vs compiled table.
+
+Usage:
+    python scripts/benchmark_sesmt_load.py [--repeat N]
+
+Writes a synthetic Dimensionamento_SESMT.xlsx with the same header layout as
+the Drive file, serves it through a local stand-in for GoogleDriveIntegrator
+that counts downloads, and times:
+  - the previous load (download + iterrows parse, repeated by every process);
+  - a cold load (download + vectorized parse + compiled table written);
+  - a warm load in a "new process" (lru_cache cleared, md5 unchanged: no download);
+  - a load after the Drive file changed (md5 differs: download and recompile).
+Also checks the vectorized parse returns exactly the previous structures.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+for _path in (_src_path, _project_root):
+    # sesmt_data_processor importa o integrador como "src.safety_ai_app..."
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+import pandas as pd  # noqa: E402
+
+from safety_ai_app import sesmt_data_processor as sesmt  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_sesmt_load")
+
+_ABOVE_5000 = "Acima de 5.000\nPara cada grupo\nDe 4.000 ou fração acima 2.000**"
+_PROFESSIONALS = list(sesmt.PROFESSIONAL_COLUMN_MAP)
+
+
+def write_workbook(path: str, bump: int = 0) -> None:
+    rows = [["Grau de\nRisco", "Profissionais"] + list(sesmt.EMPLOYEE_RANGE_COLUMNS) + [_ABOVE_5000]]
+    for grau in range(1, 5):
+        for p, name in enumerate(_PROFESSIONALS):
+            values = []
+            for r in range(len(sesmt.EMPLOYEE_RANGE_COLUMNS)):
+                qty = (grau + r + p + bump) // 3
+                values.append(None if qty == 0 else (f"{qty}*" if p in (1, 3) and r < 3 else qty))
+            rows.append([grau if p == 0 else None, name] + values + [max(1, grau // 2)])
+    pd.DataFrame(rows).to_excel(path, header=False, index=False)
+
+
+class FakeIntegrator:
+    """Stand-in for GoogleDriveIntegrator() serving the synthetic workbook."""
+
+    workbook_path = ""
+    downloads = 0
+
+    def _get_file_id_in_folder(self, parent_folder_id: str, file_name: str, is_folder: bool = False) -> Optional[str]:
+        return "fake-sesmt-id"
+
+    def get_file_metadata(self, file_id: str) -> Dict[str, Any]:
+        with open(FakeIntegrator.workbook_path, "rb") as f:
+            return {"file_id": file_id, "modified_time": None, "md5_checksum": hashlib.md5(f.read()).hexdigest()}
+
+    def download_file_from_folder(self, folder_id: str, file_name: str, local_path: str) -> Optional[str]:
+        FakeIntegrator.downloads += 1
+        shutil.copyfile(FakeIntegrator.workbook_path, local_path)
+        return local_path
+
+
+def legacy_parse(path: str):
+    """The iterrows parse this change replaced (kept here for comparison only)."""
+    df_raw = pd.read_excel(path, sheet_name=0, header=None)
+    names = [sesmt._clean_text(c) for c in df_raw.iloc[0]]
+    if len(names) > 9 and "Acima de 5.000" in names[9]:
+        names[9] = "Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**"
+    df = df_raw.iloc[1:].copy()
+    df.columns = names[:len(df.columns)]
+    above = "Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**"
+    df["Grau de Risco"] = df["Grau de Risco"].ffill()
+    df = df.dropna(subset=["Grau de Risco", "Profissionais"])
+    table = {gr: {} for gr in range(1, 5)}
+    rule = {gr: {} for gr in range(1, 5)}
+    for _, row in df.iterrows():
+        grau = int(row["Grau de Risco"])
+        key = sesmt.PROFESSIONAL_COLUMN_MAP.get(sesmt._clean_text(row["Profissionais"]))
+        if not key:
+            continue
+        for col, rng in sesmt.EMPLOYEE_RANGE_COLUMNS.items():
+            if rng not in table[grau]:
+                table[grau][rng] = {pk: '0' for pk in sesmt.PROFESSIONAL_COLUMN_MAP.values()}
+            table[grau][rng][key] = str(row[col]).strip() if pd.notna(row[col]) else '0'
+        rule[grau][key] = str(row[above]).strip() if pd.notna(row[above]) else '0'
+    return table, rule
+
+
+def timed_load() -> float:
+    sesmt._load_sesmt_data_from_drive.cache_clear()
+    started = time.perf_counter()
+    sesmt._load_sesmt_data_from_drive()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    FakeIntegrator.workbook_path = os.path.join(work_dir, "Dimensionamento_SESMT.xlsx")
+    write_workbook(FakeIntegrator.workbook_path)
+    sesmt.GoogleDriveIntegrator = FakeIntegrator
+    sesmt.SESMT_COMPILED_TABLE_FILE = os.path.join(work_dir, "sesmt_compiled_table.pkl")
+    sesmt.LOCAL_TEMP_DIR = os.path.join(work_dir, "temp_docs_local")
+    sesmt.LOCAL_SESMT_FILE_PATH = os.path.join(sesmt.LOCAL_TEMP_DIR, sesmt.SESMT_EXCEL_FILE_NAME)
+
+    legacy_samples = []
+    for _ in range(max(1, args.repeat // 4)):
+        started = time.perf_counter()
+        FakeIntegrator().download_file_from_folder("", "", os.path.join(work_dir, "legacy.xlsx"))
+        legacy = legacy_parse(os.path.join(work_dir, "legacy.xlsx"))
+        legacy_samples.append((time.perf_counter() - started) * 1000)
+
+    FakeIntegrator.downloads = 0
+    cold_ms = timed_load()
+    same = sesmt._load_sesmt_data_from_drive() == legacy
+    warm_ms = statistics.median(timed_load() for _ in range(args.repeat))
+    downloads_after_warm = FakeIntegrator.downloads
+
+    write_workbook(FakeIntegrator.workbook_path, bump=1)
+    changed_ms = timed_load()
+
+    print(f"\n{'carga':<44}{'p50 (ms)':>10}")
+    print(f"{'anterior (download + iterrows, todo processo)':<44}{statistics.median(legacy_samples):>10.1f}")
+    print(f"{'fria (download + parse vetorizado + compila)':<44}{cold_ms:>10.1f}")
+    print(f"{'quente (novo processo, md5 inalterado)':<44}{warm_ms:>10.2f}")
+    print(f"{'arquivo alterado no Drive (md5 diferente)':<44}{changed_ms:>10.1f}")
+    print(f"\ndownloads: {downloads_after_warm} após {args.repeat} cargas quentes, "
+          f"{FakeIntegrator.downloads} após a alteração")
+    print(f"estruturas idênticas ao parse anterior: {same}")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+benchmark_stream_render.py — streamed chat answer: re-render per chunk vs StreamRenderThrottle.
+
+Usage:
+    python scripts/benchmark_stream_render.py [--tokens 4000] [--tokens-per-s 40] [--chars-per-token 4]
+
+Streams a Markdown answer of --tokens tokens (headings, lists, a table and a
+code block, one chunk per token) into a fake placeholder, the way render_page
+does, and compares:
+  - the previous loop (accumulated text + cursor converted with
+    get_safe_markdown and pushed to the placeholder on every chunk; copied
+    below for comparison only);
+  - StreamRenderThrottle with the page's defaults (STREAM_RENDER_MAX_FPS,
+    STREAM_RENDER_MAX_WAIT_S).
+Chunk arrival follows a simulated clock at --tokens-per-s, so the run does not
+wait for the model; CPU is the process time spent converting and pushing
+HTML. "bytes enviados" is the HTML handed to the placeholder, i.e. the
+websocket payload. Exits with status 1 if the final HTML differs.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from safety_ai_app.web_interface.pages.chat._renderer import StreamRenderThrottle  # noqa: E402
+from safety_ai_app.web_interface.pages.chat._security import get_safe_markdown  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_stream_render")
+
+_SECTION = """## {n}. Requisitos da NR-{nr}
+
+A NR-{nr} estabelece medidas de prevenção que o empregador deve adotar, com
+avaliação dos riscos, capacitação dos trabalhadores e registro das ações.
+
+- Identificar os perigos e avaliar os riscos ocupacionais;
+- Definir as medidas de prevenção e o cronograma de implantação;
+- Manter a documentação disponível para a fiscalização.
+
+| Item | Exigência | Periodicidade |
+|------|-----------|---------------|
+| {nr}.1 | Inventário de riscos | Revisão a cada 2 anos |
+| {nr}.2 | Treinamento inicial | Antes do início das atividades |
+| {nr}.3 | Reciclagem | Anual |
+
+```text
+Checklist NR-{nr}: EPI conferido, permissão de trabalho emitida, área isolada.
+```
+
+"""
+
+
+class FakePlaceholder:
+    """st.empty(): conta o HTML enviado a cada markdown()."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.bytes_sent = 0
+        self.last = ""
+
+    def markdown(self, body: str, unsafe_allow_html: bool = False) -> None:
+        self.calls += 1
+        self.bytes_sent += len(body.encode("utf-8"))
+        self.last = body
+
+
+class SimulatedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_chunks(tokens: int, chars_per_token: int) -> List[str]:
+    target = tokens * chars_per_token
+    parts, size, n = [], 0, 1
+    while size < target:
+        section = _SECTION.format(n=n, nr=n % 38 + 1)
+        parts.append(section)
+        size += len(section)
+        n += 1
+    text = "".join(parts)[:target]
+    return [text[i:i + chars_per_token] for i in range(0, len(text), chars_per_token)]
+
+
+def bubble(content_html: str) -> str:
+    return f'<div class="msg-ai"><div class="msg-ai-avatar"></div><div class="msg-ai-content">{content_html}</div></div>'
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_stream(chunks: List[str], stream_slot: FakePlaceholder, clock: SimulatedClock, step_s: float) -> str:
+    full_text = ""
+    for chunk in chunks:
+        clock.now += step_s
+        full_text += chunk
+        content_html = get_safe_markdown(full_text + " ▌")
+        stream_slot.markdown(bubble(content_html), unsafe_allow_html=True)
+    # A mensagem final (sem cursor) era desenhada no rerun seguinte
+    stream_slot.markdown(bubble(get_safe_markdown(full_text)), unsafe_allow_html=True)
+    return full_text
+
+
+def throttled_stream(chunks: List[str], stream_slot: FakePlaceholder, clock: SimulatedClock, step_s: float) -> str:
+    def _render_stream(text: str, cursor: bool) -> None:
+        content_html = get_safe_markdown(text + " ▌" if cursor else text)
+        stream_slot.markdown(bubble(content_html), unsafe_allow_html=True)
+
+    throttle = StreamRenderThrottle(_render_stream, clock=clock)
+    for chunk in chunks:
+        clock.now += step_s
+        throttle.feed(chunk)
+    return throttle.flush()
+
+
+def run(label: str, stream: Callable, chunks: List[str], step_s: float, report: Callable) -> str:
+    slot, clock = FakePlaceholder(), SimulatedClock()
+    started = time.process_time()
+    text = stream(chunks, slot, clock, step_s)
+    cpu_s = time.process_time() - started
+    same = text == "".join(chunks) and slot.last == bubble(get_safe_markdown(text))
+    report(label, slot.calls, slot.bytes_sent, cpu_s, same)
+    return slot.last
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=4000)
+    parser.add_argument("--tokens-per-s", type=float, default=40.0)
+    parser.add_argument("--chars-per-token", type=int, default=4)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.tokens, args.chars_per_token)
+    step_s = 1.0 / args.tokens_per_s
+    print(f"\nResposta de {len(chunks)} tokens ({sum(len(c) for c in chunks)} caracteres), "
+          f"{args.tokens_per_s:.0f} tokens/s simulados")
+    print(f"  {'versão':<28}{'renders':>9}{'bytes enviados':>16}{'CPU s':>9}   confere")
+    ok = True
+
+    def report(label: str, renders: int, bytes_sent: int, cpu_s: float, same: bool) -> None:
+        nonlocal ok
+        ok = ok and same
+        print(f"  {label:<28}{renders:>9}{bytes_sent:>16,}{cpu_s:>9.2f}   {same}")
+
+    old_html = run("anterior: render por chunk", legacy_stream, chunks, step_s, report)
+    new_html = run("StreamRenderThrottle", throttled_stream, chunks, step_s, report)
+    ok = ok and old_html == new_html
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
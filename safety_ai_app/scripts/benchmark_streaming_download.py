@@ -0,0 +1,212 @@
+"""
+benchmark_streaming_download.py — peak RSS of Drive downloads: BytesIO vs streaming.
+
+Usage:
+    python scripts/benchmark_streaming_download.py [--total-mb N] [--files F] [--fail-rate R]
+
+Writes --files fixtures totalling --total-mb MB (default 500 MB in 5 files) and
+serves them from a local HTTP server that honours Range requests and, with
+--fail-rate, cuts that fraction of responses off halfway (a dropped connection).
+A fake Drive service maps files().get_media to that server. Each mode runs in
+its own subprocess so ru_maxrss is measured per mode:
+  - bytes: the previous path (download_bytes into a BytesIO, then written to a
+    temp file as drive_sync did);
+  - stream: DriveDownloader.download_stream_to_path (8 MB chunks to a .part,
+    md5 checked while streaming, Range resume, atomic rename).
+Exits with status 1 if a streamed file is missing or its md5 differs.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_streaming_download")
+
+_PDF_MIME = "application/pdf"
+
+
+def write_fixtures(fixture_dir: str, total_mb: int, files: int) -> Dict[str, str]:
+    """Returns {file_id: md5}. Content is pseudo-random so nothing compresses it away."""
+    checksums = {}
+    block = os.urandom(1024 * 1024)
+    per_file_mb = max(1, total_mb // files)
+    for i in range(files):
+        file_id = f"fixture{i}"
+        digest = hashlib.md5()
+        with open(os.path.join(fixture_dir, file_id), "wb") as f:
+            for mb in range(per_file_mb):
+                chunk = bytes([mb % 256]) + block[1:]
+                f.write(chunk)
+                digest.update(chunk)
+        checksums[file_id] = digest.hexdigest()
+    return checksums
+
+
+def serve(fixture_dir: str, fail_rate: float) -> ThreadingHTTPServer:
+    rnd = random.Random(7)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *_: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            path = os.path.join(fixture_dir, self.path.split("?")[0].rsplit("/", 1)[-1])
+            size = os.path.getsize(path)
+            start, end = 0, size - 1
+            range_header = self.headers.get("range")
+            if range_header:
+                first, last = range_header.split("=", 1)[1].split("-")
+                start, end = int(first), min(int(last) if last else size - 1, size - 1)
+                if start >= size:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self.send_response(200)
+            length = end - start + 1
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            cut = length // 2 if rnd.random() < fail_rate else None
+            with open(path, "rb") as f:
+                f.seek(start)
+                sent = 0
+                while sent < length:
+                    block = f.read(min(1024 * 1024, length - sent))
+                    if cut is not None and sent + len(block) > cut:
+                        self.wfile.write(block[:cut - sent])
+                        self.close_connection = True
+                        return
+                    self.wfile.write(block)
+                    sent += len(block)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _MediaRequest:
+    """What files().get_media returns, pointed at the local server."""
+
+    def __init__(self, uri: str) -> None:
+        import httplib2
+        self.uri = uri
+        self.http = httplib2.Http(timeout=30)
+        self.headers: Dict[str, str] = {}
+        self.method = "GET"
+        self.body = None
+        self.resumable = None
+
+
+class FakeDriveService:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+
+    def files(self) -> "FakeDriveService":
+        return self
+
+    def get_media(self, fileId: str) -> _MediaRequest:
+        return _MediaRequest(f"{self.base_url}/files/{fileId}?alt=media")
+
+    def export_media(self, fileId: str, mimeType: str) -> _MediaRequest:
+        return self.get_media(fileId)
+
+
+def child(mode: str, base_url: str, out_dir: str, checksums: Dict[str, str]) -> None:
+    from safety_ai_app.drive_downloader import DriveDownloader
+
+    dl = DriveDownloader(FakeDriveService(base_url), out_dir)
+    started = time.perf_counter()
+    bad = 0
+    for file_id, md5 in checksums.items():
+        local_path = os.path.join(out_dir, f"{mode}-{file_id}.pdf")
+        if mode == "bytes":
+            data = dl.download_bytes(file_id, _PDF_MIME, _PDF_MIME)
+            with open(local_path, "wb") as f:
+                f.write(data)
+            ok = hashlib.md5(data).hexdigest() == md5
+            del data
+        else:
+            ok = dl.download_stream_to_path(file_id, _PDF_MIME, _PDF_MIME, local_path, expected_md5=md5)
+        bad += 0 if ok else 1
+        if os.path.exists(local_path):
+            os.remove(local_path)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_mb": peak_kb / 1024, "bad": bad}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--total-mb", type=int, default=500)
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--checksums", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.base_url, args.out_dir, json.loads(args.checksums))
+        return
+
+    work_dir = tempfile.mkdtemp()
+    fixture_dir = os.path.join(work_dir, "fixtures")
+    out_dir = os.path.join(work_dir, "out")
+    os.makedirs(fixture_dir)
+    os.makedirs(out_dir)
+    checksums = write_fixtures(fixture_dir, args.total_mb, args.files)
+    server = serve(fixture_dir, args.fail_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"\n{args.files} arquivos, {args.total_mb} MB no total, falhas simuladas: {args.fail_rate:.0%}")
+    print(f"  {'modo':<8}{'tempo (s)':>11}{'RSS pico (MB)':>15}{'md5 errado':>12}")
+    failures = 0
+    modes = ["stream"] if args.fail_rate else ["bytes", "stream"]
+    for mode in modes:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--base-url", base_url,
+             "--out-dir", out_dir, "--checksums", json.dumps(checksums)],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(out)
+        if mode == "stream":
+            failures += result["bad"]
+        print(f"  {mode:<8}{result['seconds']:>11.2f}{result['peak_mb']:>15.1f}{result['bad']:>12}")
+
+    server.shutdown()
+    shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+benchmark_user_drive_resync.py — user Drive folder resync: wipe-and-reindex vs reconcile.
+
+Usage:
+    python scripts/benchmark_user_drive_resync.py [--files N] [--workers W]
+
+Indexes a fake --files folder (default 300) once, then changes a single file
+(new md5) and times a resync with:
+  - the previous synchronize_user_drive_folder (delete every user_uploaded_drive
+    chunk, then download and embed the whole folder; copied below for
+    comparison only);
+  - drive_sync.synchronize_user_drive_folder (three-way reconcile on drive
+    file id + md5 / modifiedTime).
+A last round trashes one file and adds another. Downloads cost a round trip
+plus size / bandwidth; embedding a fixed time plus time per MB. The QA system
+is NRQuestionAnswering with an in-memory index instead of Chroma. Exits with
+status 1 if the index ends up different from the folder.
+"""
+
+import argparse
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+from safety_ai_app import drive_sync  # noqa: E402
+from safety_ai_app.nr_rag_qa import NRQuestionAnswering  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_user_drive_resync")
+
+_PDF_MIME = "application/pdf"
+_SOURCE_TYPE = "user_uploaded_drive"
+
+
+class FakeUserDrive:
+    """Listing + downloads of one folder with a round trip per call."""
+
+    def __init__(self, files: int, latency_s: float, mb_per_s: float, seed: int = 5) -> None:
+        self.service = object()
+        self.latency_s = latency_s
+        self.mb_per_s = mb_per_s
+        self.downloads = 0
+        self._lock = threading.Lock()
+        self._rnd = random.Random(seed)
+        self._clock = 0
+        self.files: Dict[str, Dict[str, Any]] = {}
+        for _ in range(files):
+            self.add()
+
+    def add(self) -> str:
+        file_id = f"user{len(self.files) + self._clock}"
+        size = int(min(self._rnd.lognormvariate(13, 1.0), 40 * 1024 * 1024))
+        self.files[file_id] = {"id": file_id, "name": f"{file_id}.pdf", "mimeType": _PDF_MIME, "size": str(size)}
+        self.revise(file_id)
+        return file_id
+
+    def revise(self, file_id: str) -> None:
+        self._clock += 1
+        self.files[file_id]["md5Checksum"] = f"md5-{file_id}-{self._clock}"
+        self.files[file_id]["modifiedTime"] = f"2026-01-01T00:00:{self._clock:06d}Z"
+
+    def get_processable_drive_files_in_folder(self, folder_id: str) -> List[Dict[str, Any]]:
+        time.sleep(self.latency_s)
+        return [dict(f) for f in self.files.values()]
+
+    list_processable_drive_files_in_folder = get_processable_drive_files_in_folder
+
+    def _download_file_to_path_internal(self, file_id: str, original_mime: str, export_mime: str,
+                                        local_path: str, expected_md5: Any = None, **_: Any) -> bool:
+        with self._lock:
+            self.downloads += 1
+        time.sleep(self.latency_s + int(self.files[file_id]["size"]) / (1024 * 1024) / self.mb_per_s)
+        with open(local_path, "wb") as f:
+            f.write(file_id.encode())
+        return True
+
+
+class InMemoryQA(NRQuestionAnswering):
+    """NRQuestionAnswering whose index is a dict; embedding costs simulated time."""
+
+    def __init__(self, drive: FakeUserDrive, embed_base_s: float, embed_s_per_mb: float) -> None:
+        self._drive = drive
+        self._embed_base_s = embed_base_s
+        self._embed_s_per_mb = embed_s_per_mb
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self.embedded = 0
+
+    def process_document_to_chroma(self, file_path: str, document_name: str, source: str = "Local",
+                                   file_type: str = _PDF_MIME, additional_metadata: Optional[Dict[str, Any]] = None,
+                                   documents: Any = None):
+        meta = dict(additional_metadata or {})
+        size_mb = int(self._drive.files.get(meta["drive_file_id"], {}).get("size", 0)) / (1024 * 1024)
+        time.sleep(self._embed_base_s + size_mb * self._embed_s_per_mb)
+        self.embedded += 1
+        self.chunks[meta["drive_file_id"]] = meta
+
+    def get_drive_file_ids_in_chroma(self, source_type: Optional[str] = None) -> List[str]:
+        return [fid for fid, m in self.chunks.items() if m.get("source_type") == source_type]
+
+    def get_drive_file_revisions_in_chroma(self, source_type: Optional[str] = None):
+        return {fid: {"modifiedTime": m.get("drive_modified_time"), "md5Checksum": m.get("drive_md5_checksum")}
+                for fid, m in self.chunks.items() if m.get("source_type") == source_type}
+
+    def remove_document_by_id(self, document_metadata_id: str) -> int:
+        return 1 if self.chunks.pop(document_metadata_id, None) is not None else 0
+
+    def clear_docs_by_source_type(self, source_type_to_remove: str) -> int:
+        ids = self.get_drive_file_ids_in_chroma(source_type_to_remove)
+        for fid in ids:
+            del self.chunks[fid]
+        return len(ids)
+
+
+# --- Implementação anterior (mantida aqui apenas para comparação) ---
+
+def legacy_synchronize_user_drive_folder(integrator: Any, folder_id: str, qa_system: Any) -> int:
+    qa_system.clear_docs_by_source_type(source_type_to_remove=_SOURCE_TYPE)
+    all_files = integrator.get_processable_drive_files_in_folder(folder_id)
+    existing_ids = qa_system.get_drive_file_ids_in_chroma(source_type=_SOURCE_TYPE)
+    files_to_process = [f for f in all_files if f['id'] not in existing_ids]
+    temp_dir = tempfile.mkdtemp()
+
+    def _process(item: Dict[str, Any], temp_path: str, export_mime_type: str) -> bool:
+        qa_system.process_document_to_chroma(
+            file_path=temp_path, document_name=item['name'], source="Google Drive do Usuário",
+            file_type=export_mime_type,
+            additional_metadata={"source_type": _SOURCE_TYPE, "drive_file_id": item['id'],
+                                 **drive_sync._revision_metadata(item)},
+        )
+        return True
+
+    try:
+        return drive_sync.download_and_process(integrator, files_to_process, _process, temp_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def index_matches(drive: FakeUserDrive, qa: InMemoryQA) -> bool:
+    return qa.get_drive_file_revisions_in_chroma(_SOURCE_TYPE) == {
+        fid: {"modifiedTime": f["modifiedTime"], "md5Checksum": f["md5Checksum"]} for fid, f in drive.files.items()
+    }
+
+
+def timed(label: str, drive: FakeUserDrive, qa: InMemoryQA, fn) -> bool:
+    drive.downloads, qa.embedded = 0, 0
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    same = index_matches(drive, qa)
+    print(f"  {label:<34}{elapsed:>9.2f}{drive.downloads:>11}{qa.embedded:>10}   {same}")
+    return same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=drive_sync.DEFAULT_DOWNLOAD_WORKERS)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--mb-per-s", type=float, default=40.0)
+    parser.add_argument("--embed-ms", type=float, default=30.0)
+    parser.add_argument("--embed-ms-per-mb", type=float, default=40.0)
+    args = parser.parse_args()
+
+    def setup():
+        drive = FakeUserDrive(args.files, args.latency_ms / 1000, args.mb_per_s)
+        qa = InMemoryQA(drive, args.embed_ms / 1000, args.embed_ms_per_mb / 1000)
+        drive_sync.synchronize_user_drive_folder(drive, "pasta", qa)
+        return drive, qa
+
+    print(f"\npasta do usuário: {args.files} arquivos, {args.workers} workers")
+    print(f"  {'cenário':<34}{'tempo s':>9}{'downloads':>11}{'embeds':>10}   confere")
+    ok = True
+
+    drive, qa = setup()
+    changed = next(iter(drive.files))
+    drive.revise(changed)
+    ok &= timed("anterior: 1 arquivo alterado", drive, qa, lambda: legacy_synchronize_user_drive_folder(drive, "pasta", qa))
+
+    drive, qa = setup()
+    drive.revise(changed)
+    ok &= timed("reconcile: 1 arquivo alterado", drive, qa,
+                lambda: drive_sync.synchronize_user_drive_folder(drive, "pasta", qa))
+    ok &= timed("reconcile: nada alterado", drive, qa,
+                lambda: drive_sync.synchronize_user_drive_folder(drive, "pasta", qa))
+    del drive.files[changed]
+    drive.add()
+    ok &= timed("reconcile: 1 removido + 1 novo", drive, qa,
+                lambda: drive_sync.synchronize_user_drive_folder(drive, "pasta", qa))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
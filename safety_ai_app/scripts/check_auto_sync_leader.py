@@ -0,0 +1,358 @@
+"""
+check_auto_sync_leader.py — several auto-sync scheduler processes against one fake Drive.
+
+Usage:
+    python scripts/check_auto_sync_leader.py [--processes N] [--seconds S] [--interval-s I]
+
+Starts --processes worker processes, each running its own AutoSyncScheduler
+(interval --interval-s seconds instead of minutes) on a shared state
+directory. The fake Drive is an append-only change log file shared by all
+processes, served through files.list / changes.getStartPageToken /
+changes.list; every scheduler cycle runs the real DriveChangeTracker on it and
+"embeds" each file to index by appending (pid, file id, md5) to a shared file.
+Meanwhile the parent edits files in bursts separated by idle periods, kills the
+leader halfway through (SIGKILL, so the OS has to release its lock), has a
+follower ask for an immediate sync, then has a follower pause the scheduled
+syncs and another one resume them. At the end each worker prints its
+get_status().
+
+Checks (exit status 1 if any fails):
+  - every final revision was embedded;
+  - no revision was embedded twice, except when one copy came from the killed
+    leader's interrupted cycle;
+  - at most one live worker reports itself leader, and a new leader took over
+    after the kill;
+  - "sync now" from a follower of the new leader (picked after the failover,
+    so any process can win the election and be killed) was served before the
+    interval ran out;
+  - an edit made while a follower had paused the syncs was not indexed until
+    another follower resumed them, and every worker reports the syncs enabled.
+Also prints the leader's adaptive interval, cycle durations and the skipped
+cycle counts of every worker.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("check_auto_sync_leader")
+
+_PDF_MIME = "application/pdf"
+_ROOT = "library"
+_LOG_FILENAME = "drive_log.jsonl"
+_EMBEDS_FILENAME = "embeds.tsv"
+_SYNC_NOW_PREFIX = "sync_now."
+_DISABLE_PREFIX = "disable."
+_ENABLE_PREFIX = "enable."
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, **_: Any):
+        return self._fn()
+
+
+class SharedLogDrive:
+    """Drive fake over an append-only JSON-lines change log shared by every process."""
+
+    def __init__(self, shared_dir: str, latency_s: float = 0.02) -> None:
+        self.log_path = os.path.join(shared_dir, _LOG_FILENAME)
+        self.latency_s = latency_s
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        time.sleep(self.latency_s)
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def files(self) -> "SharedLogDrive":
+        return self
+
+    def changes(self) -> "SharedLogDrive":
+        return self
+
+    def list(self, q: str = "", pageSize: int = 100, pageToken: Optional[str] = None, **kwargs: Any) -> _Request:
+        if "includeRemoved" in kwargs:
+            return _Request(lambda: self._changes_page(int(pageToken), pageSize))
+
+        def run():
+            latest: Dict[str, Dict[str, Any]] = {}
+            for entry in self._entries():
+                latest[entry["id"]] = entry
+            live = [e for e in latest.values() if not e["trashed"] and f"'{_ROOT}' in parents" in q]
+            start = int(pageToken or 0)
+            resp = {"files": live[start:start + pageSize]}
+            if start + pageSize < len(live):
+                resp["nextPageToken"] = str(start + pageSize)
+            return resp
+        return _Request(run)
+
+    def getStartPageToken(self) -> _Request:
+        return _Request(lambda: {"startPageToken": str(len(self._entries()))})
+
+    def _changes_page(self, start: int, page_size: int) -> Dict[str, Any]:
+        entries = self._entries()
+        end = min(start + page_size, len(entries))
+        resp: Dict[str, Any] = {"changes": [{"fileId": e["id"], "removed": False, "file": e} for e in entries[start:end]]}
+        if end < len(entries):
+            resp["nextPageToken"] = str(end)
+        else:
+            resp["newStartPageToken"] = str(end)
+        return resp
+
+
+def write_revision(shared_dir: str, file_id: str, revision: int) -> None:
+    entry = {"id": file_id, "name": f"{file_id}.pdf", "mimeType": _PDF_MIME, "parents": [_ROOT],
+             "trashed": False, "size": "1024", "md5Checksum": f"{file_id}-r{revision}",
+             "modifiedTime": f"2026-01-01T00:00:00.{revision:06d}Z"}
+    with open(os.path.join(shared_dir, _LOG_FILENAME), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def child(shared_dir: str, interval_s: float, stop_file: str) -> None:
+    from safety_ai_app import auto_sync_scheduler
+    from safety_ai_app.drive_changes import DriveChangeTracker
+
+    # Time scale of the check: seconds instead of minutes
+    auto_sync_scheduler._TRIGGER_POLL_SECONDS = 0.1
+    drive = SharedLogDrive(shared_dir)
+    embeds_path = os.path.join(shared_dir, _EMBEDS_FILENAME)
+    tracker: Dict[str, DriveChangeTracker] = {}
+
+    def sync(drive_service: Any, qa: Any) -> int:
+        # Built on first use, i.e. once this process leads, so it loads the latest persisted state
+        if "t" not in tracker:
+            tracker["t"] = DriveChangeTracker(drive_service, _ROOT, shared_dir, mime_filter=[_PDF_MIME])
+        to_index, _ = tracker["t"].poll(lambda: [])
+        for item in to_index:
+            time.sleep(0.05)  # embedding
+            with open(embeds_path, "a", encoding="utf-8") as f:
+                f.write(f"{os.getpid()}\t{item['id']}\t{item['md5Checksum']}\t{time.time()}\n")
+        tracker["t"].mark_indexed(i["id"] for i in to_index)
+        return len(to_index)
+
+    scheduler = auto_sync_scheduler.AutoSyncScheduler(
+        interval_minutes=interval_s / 60, state_dir=shared_dir, initial_delay_seconds=0.5,
+    )
+    scheduler.configure(get_qa=lambda: object(), get_drive_service=lambda: drive, sync_fn=sync)
+    scheduler.start()
+
+    # The parent asks followers (chosen after the failover) to press "sync now" and the enable toggle
+    sync_now_request = os.path.join(shared_dir, f"{_SYNC_NOW_PREFIX}{os.getpid()}")
+    toggle_requests = {os.path.join(shared_dir, f"{_DISABLE_PREFIX}{os.getpid()}"): False,
+                       os.path.join(shared_dir, f"{_ENABLE_PREFIX}{os.getpid()}"): True}
+    while not os.path.exists(stop_file):
+        if os.path.exists(sync_now_request):
+            os.remove(sync_now_request)
+            accepted = scheduler.trigger_now()
+            print(json.dumps({"triggered_at": time.time(), "leader": scheduler.is_leader, "accepted": accepted}),
+                  flush=True)
+        for path, enabled in toggle_requests.items():
+            if os.path.exists(path):
+                os.remove(path)
+                scheduler.set_enabled(enabled)
+        time.sleep(0.05)
+    status = scheduler.get_status()
+    scheduler.stop()
+    for key in ("last_run_time", "next_run_time"):
+        status[key] = status[key].isoformat() if status[key] else None
+    print(json.dumps({"pid": os.getpid(), **status}), flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Parent
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--interval-s", type=float, default=2.0)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--shared-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--stop-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.shared_dir, args.interval_s, args.stop_file)
+        return
+
+    shared_dir = tempfile.mkdtemp()
+    stop_file = os.path.join(shared_dir, "stop")
+    revisions = {f"doc{i}": 1 for i in range(args.files)}
+    for file_id in revisions:
+        write_revision(shared_dir, file_id, 1)
+
+    trigger_at = args.seconds * 0.8
+    procs = []
+    for _ in range(args.processes):
+        cmd = [sys.executable, __file__, "--child", "--shared-dir", shared_dir, "--stop-file", stop_file,
+               "--interval-s", str(args.interval_s)]
+        procs.append(subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True))
+
+    outputs: Dict[int, List[str]] = {p.pid: [] for p in procs}
+
+    def _drain(proc: subprocess.Popen) -> None:
+        for line in proc.stdout:
+            outputs[proc.pid].append(line)
+
+    readers = [threading.Thread(target=_drain, args=(p,), daemon=True) for p in procs]
+    for r in readers:
+        r.start()
+
+    def leader_pid() -> Optional[int]:
+        try:
+            with open(os.path.join(shared_dir, ".auto_sync_status.json"), "r", encoding="utf-8") as f:
+                return json.load(f).get("leader_pid")
+        except (OSError, ValueError):
+            return None
+
+    def edit_burst(count: int, start: int) -> None:
+        for i in range(count):
+            file_id = f"doc{(start + i) % args.files}"
+            revisions[file_id] += 1
+            write_revision(shared_dir, file_id, revisions[file_id])
+
+    began = time.monotonic()
+    killed_pid: Optional[int] = None
+    first_leader: Optional[int] = None
+    phase = 0
+    last_edit_time = 0.0
+    while time.monotonic() - began < args.seconds:
+        elapsed = time.monotonic() - began
+        # Bursts of edits in the first 60% of the run, then idle (the interval should back off)
+        if elapsed < args.seconds * 0.6 and int(elapsed / 3) != phase:
+            phase = int(elapsed / 3)
+            edit_burst(8, phase * 8)
+        if killed_pid is None and elapsed > args.seconds * 0.4:
+            first_leader = leader_pid()
+            if any(p.pid == first_leader for p in procs):
+                os.kill(first_leader, signal.SIGKILL)
+                killed_pid = first_leader
+        if killed_pid is not None and not last_edit_time and elapsed >= trigger_at:
+            # A follower of the new leader asks for the sync, right after an edit
+            current = leader_pid()
+            follower = next((p.pid for p in procs if p.pid not in (current, killed_pid)), None)
+            if current not in (None, killed_pid) and follower is not None:
+                edit_burst(1, 0)
+                last_edit_time = time.time()
+                with open(os.path.join(shared_dir, f"{_SYNC_NOW_PREFIX}{follower}"), "w") as f:
+                    f.write("1")
+        time.sleep(0.05)
+
+    def embedded(file_id: str) -> bool:
+        with open(os.path.join(shared_dir, _EMBEDS_FILENAME), "r", encoding="utf-8") as f:
+            return any(line.split("\t")[1:3] == [file_id, f"{file_id}-r{revisions[file_id]}"] for line in f)
+
+    def ask_follower(prefix: str, skip: Optional[int] = None) -> Optional[int]:
+        current = leader_pid()
+        follower = next((p.pid for p in procs if p.pid not in (current, killed_pid, skip)), None)
+        if follower is not None:
+            with open(os.path.join(shared_dir, f"{prefix}{follower}"), "w") as f:
+                f.write("1")
+        return follower
+
+    # A follower pauses the scheduled syncs: the leader must not index an edit made meanwhile
+    paused_by = ask_follower(_DISABLE_PREFIX)
+    time.sleep(args.interval_s)
+    edit_burst(1, 1)
+    time.sleep(args.interval_s * 3)
+    pause_ok = paused_by is not None and not embedded("doc1")
+    ask_follower(_ENABLE_PREFIX, skip=paused_by)
+
+    # Let the leader catch up with the last edits, then stop everyone
+    time.sleep(args.interval_s * 5)
+    with open(stop_file, "w") as f:
+        f.write("stop")
+    for p in procs:
+        p.wait(timeout=30)
+    for r in readers:
+        r.join(timeout=5)
+
+    statuses = {}
+    trigger_reply = None
+    for pid, lines in outputs.items():
+        for line in lines:
+            data = json.loads(line)
+            if "triggered_at" in data:
+                trigger_reply = data
+            else:
+                statuses[pid] = data
+
+    embeds: Dict[tuple, List[int]] = {}
+    embed_times: Dict[tuple, float] = {}
+    with open(os.path.join(shared_dir, _EMBEDS_FILENAME), "r", encoding="utf-8") as f:
+        for line in f:
+            pid, file_id, md5, ts = line.rstrip("\n").split("\t")
+            embeds.setdefault((file_id, md5), []).append(int(pid))
+            embed_times.setdefault((file_id, md5), float(ts))
+
+    final = {(fid, f"{fid}-r{rev}") for fid, rev in revisions.items()}
+    missing = final - set(embeds)
+    duplicates = {k: v for k, v in embeds.items() if len(v) > 1}
+    bad_duplicates = {k: v for k, v in duplicates.items() if killed_pid not in v}
+    leaders = [pid for pid, s in statuses.items() if s.get("is_leader")]
+    new_leader = leader_pid()
+    trigger_ok = False
+    if trigger_reply and last_edit_time and not trigger_reply["leader"]:
+        served = embed_times.get(("doc0", f"doc0-r{revisions['doc0']}"))
+        trigger_ok = served is not None and served - trigger_reply["triggered_at"] < args.interval_s * 4
+
+    print(f"\n{args.processes} processos, {args.seconds:.0f} s, intervalo configurado {args.interval_s:.1f} s, "
+          f"{len(embeds)} revisões indexadas")
+    print(f"  {'pid':>8}  {'líder':<6}{'ciclos':>7}{'intervalo atual s':>19}{'duração média s':>17}   ignorados")
+    for pid, s in statuses.items():
+        interval_now = (s.get("current_interval_minutes") or 0) * 60
+        avg = s.get("avg_cycle_seconds") or 0.0
+        print(f"  {pid:>8}  {str(s.get('is_leader')):<6}{s.get('cycles_run', 0):>7}"
+              f"{interval_now:>19.2f}{avg:>17.3f}   {s.get('skipped_cycles')}")
+    print(f"  líder inicial {first_leader} (morto: {killed_pid}); líder final {new_leader}")
+    checks = {
+        "todas as revisões finais indexadas": not missing,
+        "nenhuma revisão indexada em dobro": not bad_duplicates,
+        "no máximo um líder vivo": len(leaders) <= 1,
+        "novo líder após a queda": killed_pid is not None and new_leader not in (None, killed_pid),
+        "'sincronizar agora' de um seguidor atendido": trigger_ok,
+        "pausa pedida por um seguidor respeitada pelo líder": pause_ok,
+        "todos os processos com a sincronização reativada": all(s.get("enabled") for s in statuses.values()),
+    }
+    for name, passed in checks.items():
+        print(f"  {'ok ' if passed else 'FALHOU'} {name}")
+    if duplicates:
+        print(f"  ({len(duplicates)} revisão(ões) reindexada(s) após o ciclo interrompido do líder morto)")
+
+    shutil.rmtree(shared_dir, ignore_errors=True)
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
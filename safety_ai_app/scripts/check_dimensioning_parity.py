@@ -0,0 +1,205 @@
+"""
+check_dimensioning_parity.py — parity and timing of the batch dimensioning engine.
+
+Usage:
+    python scripts/check_dimensioning_parity.py [--rows N] [--skip-sesmt]
+
+Checks that the batch paths return exactly what the per-establishment functions
+return, then times both on a synthetic portfolio of --rows establishments:
+  - CIPA: get_cipa_dimensioning_batch vs get_cipa_dimensioning and vs the
+    previous range-dict walk (copied below), for grades 0-5 and 0-40000 employees;
+  - working days: numpy.busday_offset versions vs the previous day-by-day loops
+    for every start day from 2024-12 to 2027-12 and offsets 0-40;
+  - election schedule: calculate_election_schedules vs calculate_election_schedule
+    for every mandate end date from 2025-03 to 2027-10;
+  - SESMT (needs the Drive spreadsheet): get_sesmt_dimensioning_batch vs
+    get_sesmt_dimensioning. Skipped when the tables cannot be loaded.
+Exits with status 1 on any mismatch.
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+import pandas as pd  # noqa: E402
+
+from safety_ai_app import cipa_data_processor as cipa  # noqa: E402
+from safety_ai_app.dimensioning_engine import dimension_portfolio  # noqa: E402
+
+logging.basicConfig(
+    level=logging.ERROR,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("check_dimensioning_parity")
+
+HOLIDAYS = cipa.BRAZILIAN_NATIONAL_HOLIDAYS
+
+
+# --- Implementações anteriores (mantidas aqui apenas para comparação) ---
+
+def legacy_cipa(grau_risco: int, num_employees: int) -> Dict[str, Any]:
+    if num_employees < 20:
+        return {'efetivos': 0, 'suplentes': 0, 'observacao': cipa.CIPA_OBS_BELOW_20}
+    if grau_risco not in cipa.CIPA_DIMENSIONING_TABLE:
+        return {'efetivos': 0, 'suplentes': 0, 'observacao': cipa.CIPA_OBS_INVALID_GRADE}
+    for (min_emp, max_emp), data in cipa.CIPA_DIMENSIONING_TABLE[grau_risco].items():
+        if min_emp <= num_employees <= max_emp:
+            if max_emp == float('inf'):
+                efetivos, suplentes = data['base_efetivos'], data['base_suplentes']
+                remaining = num_employees - data['increment_base']
+                if remaining > 0:
+                    groups = (remaining + data['increment_per_group'] - 1) // data['increment_per_group']
+                    efetivos += groups * data['efetivos_add']
+                    suplentes += groups * data['suplentes_add']
+                return {'efetivos': efetivos, 'suplentes': suplentes}
+            return {'efetivos': data['efetivos'], 'suplentes': data['suplentes']}
+    return {'efetivos': 0, 'suplentes': 0, 'observacao': cipa.CIPA_OBS_NOT_FOUND}
+
+
+def legacy_is_working_day(day: date, holidays: List[date]) -> bool:
+    return day.weekday() < 5 and day not in holidays
+
+
+def legacy_next(day: date, holidays: List[date]) -> date:
+    while not legacy_is_working_day(day, holidays):
+        day += timedelta(days=1)
+    return day
+
+
+def legacy_previous(day: date, holidays: List[date]) -> date:
+    while not legacy_is_working_day(day, holidays):
+        day -= timedelta(days=1)
+    return day
+
+
+def legacy_add(day: date, days_to_add: int, holidays: List[date]) -> date:
+    day = legacy_next(day, holidays)
+    while days_to_add > 0:
+        day += timedelta(days=1)
+        if legacy_is_working_day(day, holidays):
+            days_to_add -= 1
+    return day
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def check_cipa() -> int:
+    cases = [(g, n) for g in range(0, 6) for n in list(range(0, 400)) + list(range(400, 40001, 37))]
+    grades, employees = zip(*cases)
+    efetivos, suplentes, status = cipa.get_cipa_dimensioning_batch(grades, employees)
+    mismatches = 0
+    for i, (g, n) in enumerate(cases):
+        expected = legacy_cipa(g, n)
+        single = cipa.get_cipa_dimensioning(g, n)
+        batch_obs = {
+            cipa.CIPA_STATUS_BELOW_20: cipa.CIPA_OBS_BELOW_20,
+            cipa.CIPA_STATUS_INVALID_GRADE: cipa.CIPA_OBS_INVALID_GRADE,
+            cipa.CIPA_STATUS_NOT_FOUND: cipa.CIPA_OBS_NOT_FOUND,
+        }.get(int(status[i]))
+        batch = {'efetivos': int(efetivos[i]), 'suplentes': int(suplentes[i])}
+        if batch_obs:
+            batch['observacao'] = batch_obs
+        if not (expected == single == batch):
+            mismatches += 1
+    print(f"CIPA: {len(cases)} casos, divergências: {mismatches}")
+    return mismatches
+
+
+def check_working_days() -> int:
+    mismatches = 0
+    days = _days(date(2024, 12, 1), date(2027, 12, 20))
+    for day in days:
+        if cipa.find_next_working_day(day, HOLIDAYS) != legacy_next(day, HOLIDAYS):
+            mismatches += 1
+        if cipa.find_previous_working_day(day, HOLIDAYS) != legacy_previous(day, HOLIDAYS):
+            mismatches += 1
+        for offset in (0, 1, 5, 30, 40):
+            if cipa.add_working_days(day, offset, HOLIDAYS) != legacy_add(day, offset, HOLIDAYS):
+                mismatches += 1
+    print(f"Dias úteis: {len(days)} datas × 7 operações, divergências: {mismatches}")
+    return mismatches
+
+
+def check_schedules() -> int:
+    today = date(2025, 1, 15)
+    ends = _days(date(2025, 3, 1), date(2027, 10, 31))
+    batch = cipa.calculate_election_schedules(ends, HOLIDAYS, today=today)
+    mismatches = 0
+    for i, end in enumerate(ends):
+        single = cipa.calculate_election_schedule(end, HOLIDAYS)
+        for column in cipa.ELECTION_SCHEDULE_COLUMNS:
+            if batch[column][i].astype(date) != single[column]:
+                mismatches += 1
+    print(f"Cronogramas: {len(ends)} mandatos × {len(cipa.ELECTION_SCHEDULE_COLUMNS)} datas, divergências: {mismatches}")
+    return mismatches
+
+
+def check_sesmt() -> int:
+    try:
+        from safety_ai_app import sesmt_data_processor as sesmt
+    except Exception as e:
+        print(f"SESMT: ignorado (tabelas indisponíveis: {e})")
+        return 0
+    if not sesmt.SESMT_DIMENSIONING_TABLE:
+        print("SESMT: ignorado (tabelas não carregadas do Drive)")
+        return 0
+    cases = [(g, n) for g in range(0, 6) for n in list(range(-1, 120)) + list(range(120, 30001, 53))]
+    grades, employees = zip(*cases)
+    batch = sesmt.get_sesmt_dimensioning_batch(grades, employees)
+    mismatches = sum(1 for (g, n), b in zip(cases, batch) if sesmt.get_sesmt_dimensioning(g, n) != b)
+    print(f"SESMT: {len(cases)} casos, divergências: {mismatches}")
+    return mismatches
+
+
+def benchmark(rows: int) -> None:
+    rnd = random.Random(42)
+    portfolio = pd.DataFrame({
+        "grau_risco": [rnd.randint(1, 4) for _ in range(rows)],
+        "num_empregados": [int(rnd.lognormvariate(5, 1.5)) for _ in range(rows)],
+        "fim_mandato": [date(2025, 6, 1) + timedelta(days=rnd.randint(0, 800)) for _ in range(rows)],
+    })
+
+    started = time.perf_counter()
+    for g, n, end in portfolio.itertuples(index=False):
+        legacy_cipa(g, n)
+        cipa.calculate_election_schedule(end, HOLIDAYS)
+    per_row_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dimension_portfolio(portfolio, include_sesmt=False)
+    batch_s = time.perf_counter() - started
+    print(f"\ncarteira de {rows} estabelecimentos (CIPA + cronograma):")
+    print(f"  linha a linha: {per_row_s:.2f}s   lote: {batch_s:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--skip-sesmt", action="store_true")
+    args = parser.parse_args()
+
+    mismatches = check_cipa() + check_working_days() + check_schedules()
+    if not args.skip_sesmt:
+        mismatches += check_sesmt()
+    benchmark(args.rows)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ evaluate_rag.py — Lightweight RAG pipeline evaluation script.
 
 Usage:
     python scripts/evaluate_rag.py [--golden-set PATH] [--output-dir PATH] [--limit N]
+    python scripts/evaluate_rag.py --nr-retrieval [--k N]
 
 Metrics computed (without external APIs):
   - faithfulness:       fraction of answer sentences with significant overlap with retrieved context
@@ -10,6 +11,10 @@ Metrics computed (without external APIs):
   - context_recall:     fraction of expected-answer key-terms found in retrieved context
   - context_precision:  fraction of retrieved chunks that contain expected-answer key-terms
 
+With --nr-retrieval only retrieval is run (no LLM): for golden questions tied to
+an NR, latency and precision@k (fraction of chunks whose nr_number matches) are
+compared between the global hybrid retriever and the NR-scoped retriever.
+
 Alerts are emitted (WARNING) when any metric drops below the configured thresholds.
 Results are saved as JSON in data/eval/results/<timestamp>.json.
 """
@@ -303,6 +308,80 @@ def run_evaluation(
     return output_path
 
 
+# ---------------------------------------------------------------------------
+# NR-scoped retrieval benchmark
+# ---------------------------------------------------------------------------
+
+def _nr_precision_at_k(docs: List[Any], relevant_nr: int, k: int) -> float:
+    from safety_ai_app.rag.indexer import normalize_nr_number
+
+    top = docs[:k]
+    if not top:
+        return 0.0
+    hits = sum(1 for d in top if normalize_nr_number(d.metadata.get("nr_number")) == relevant_nr)
+    return round(hits / len(top), 4)
+
+
+def run_nr_retrieval_benchmark(
+    golden_set_path: Path,
+    output_dir: Path,
+    k: int,
+    limit: Optional[int] = None,
+) -> Path:
+    with open(golden_set_path, encoding="utf-8") as f:
+        golden_data = json.load(f)
+    questions = [q for q in golden_data.get("questions", []) if q.get("relevant_nr")]
+    if limit:
+        questions = questions[:limit]
+
+    from safety_ai_app.nr_rag_qa import NRQuestionAnswering
+    from safety_ai_app.rag.indexer import normalize_nr_number
+    qa_system = NRQuestionAnswering()
+    # Warm up embeddings, BM25 and shards so the first question is not penalized.
+    if questions:
+        qa_system._get_retriever_for_query(questions[0]["question"]).invoke(questions[0]["question"])
+
+    results = []
+    for item in questions:
+        question = item["question"]
+        relevant_nr = normalize_nr_number(item["relevant_nr"])
+        row: Dict[str, Any] = {"id": item["id"], "relevant_nr": item["relevant_nr"]}
+        for label, retriever in (
+            ("global", qa_system.retriever),
+            ("scoped", qa_system._get_retriever_for_query(question)),
+        ):
+            t_start = time.perf_counter()
+            docs = retriever.invoke(question)
+            row[f"{label}_latency_ms"] = round((time.perf_counter() - t_start) * 1000, 1)
+            row[f"{label}_precision_at_k"] = _nr_precision_at_k(docs, relevant_nr, k)
+        results.append(row)
+        logger.info(
+            "%s: global p@%d=%.2f (%.0fms) | scoped p@%d=%.2f (%.0fms)",
+            item["id"], k, row["global_precision_at_k"], row["global_latency_ms"],
+            k, row["scoped_precision_at_k"], row["scoped_latency_ms"],
+        )
+
+    aggregate = {
+        key: _average([r[key] for r in results])
+        for key in ("global_precision_at_k", "scoped_precision_at_k", "global_latency_ms", "scoped_latency_ms")
+    }
+    print("\n" + "=" * 60)
+    print(f"NR-SCOPED RETRIEVAL ({len(results)} perguntas, k={k})")
+    print("=" * 60)
+    for key, value in aggregate.items():
+        print(f"  {key:<24} {value:.4f}")
+    print("=" * 60)
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"nr_retrieval_{timestamp}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": timestamp, "k": k, "aggregate": aggregate, "per_question_results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\nReport saved: {output_path}")
+    return output_path
+
+
 # ---------------------------------------------------------------------------
 # CLI entry-point
 # ---------------------------------------------------------------------------
@@ -329,7 +408,16 @@ def main():
         default=None,
         help="Limit number of questions to evaluate (for quick tests).",
     )
+    parser.add_argument(
+        "--nr-retrieval",
+        action="store_true",
+        help="Benchmark global vs NR-scoped retrieval (latency and precision@k) without calling the LLM.",
+    )
+    parser.add_argument("--k", type=int, default=5, help="Cut-off for precision@k in --nr-retrieval mode.")
     args = parser.parse_args()
+    if args.nr_retrieval:
+        run_nr_retrieval_benchmark(args.golden_set, args.output_dir, args.k, args.limit)
+        return
     run_evaluation(args.golden_set, args.output_dir, args.limit)
 
 
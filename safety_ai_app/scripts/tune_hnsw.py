@@ -0,0 +1,346 @@
+"""
+tune_hnsw.py — Recall-versus-latency tuning of the ChromaDB HNSW index.
+
+Usage:
+    python scripts/tune_hnsw.py [--k 8] [--synthetic 200] [--m 8,16,32]
+                                [--construction-ef 100,200] [--search-ef 10,50,100]
+                                [--target-recall 0.95] [--apply]
+
+Steps:
+  1. Load every embedding of the nrs_collection and build a query sample from the
+     golden set plus synthetic queries (first sentence of random chunks).
+  2. Compute the exact k nearest neighbours of each query by brute force (numpy).
+  3. For each (hnsw:M, construction_ef, search_ef) combination, build a temporary
+     copy of the collection and measure recall@k, p50/p95 query latency, build
+     time and on-disk size.
+
+The fastest configuration reaching --target-recall is recommended; with --apply it
+is written to data/ai_config.json (hnsw_m / hnsw_construction_ef / hnsw_search_ef).
+The parameters only take effect when the collection is (re)created, e.g. via
+``python scripts/vectorize_nrs.py --reset``.
+Results are saved as JSON in data/eval/results/hnsw_tuning_<timestamp>.json.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Path bootstrap
+# ---------------------------------------------------------------------------
+_script_dir = Path(__file__).parent.resolve()
+_project_root = _script_dir.parent
+_src_path = _project_root / "src"
+if str(_src_path) not in sys.path:
+    sys.path.insert(0, str(_src_path))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+)
+logger = logging.getLogger("tune_hnsw")
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+CHROMADB_PERSIST_DIRECTORY = _project_root / "data" / "chroma_db"
+COLLECTION_NAME = "nrs_collection"
+DEFAULT_GOLDEN_SET = _project_root / "data" / "eval" / "golden_set.json"
+DEFAULT_OUTPUT_DIR = _project_root / "data" / "eval" / "results"
+AI_CONFIG_PATH = _project_root / "data" / "ai_config.json"
+
+DEFAULT_M = [8, 16, 32]
+DEFAULT_CONSTRUCTION_EF = [100, 200]
+DEFAULT_SEARCH_EF = [10, 50, 100]
+
+_ADD_BATCH_SIZE = 2000
+_WARMUP_QUERIES = 5
+
+
+# ---------------------------------------------------------------------------
+# Data loading
+# ---------------------------------------------------------------------------
+
+def load_collection(persist_dir: Path, name: str) -> Tuple[List[str], np.ndarray, List[str], str]:
+    """Return (ids, embeddings, documents, space) of the persisted collection."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=str(persist_dir))
+    collection = client.get_collection(name)
+    data = collection.get(include=["embeddings", "documents"])
+    ids = list(data["ids"])
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    documents = list(data["documents"] or [])
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    logger.info("Coleção '%s': %d vetores de dimensão %d (space=%s).",
+                name, len(ids), embeddings.shape[1] if len(ids) else 0, space)
+    return ids, embeddings, documents, space
+
+
+def build_query_texts(golden_set_path: Path, documents: List[str], n_synthetic: int, seed: int) -> List[str]:
+    """Golden-set questions plus the first sentence of randomly sampled chunks."""
+    queries: List[str] = []
+    if golden_set_path.is_file():
+        with open(golden_set_path, encoding="utf-8") as f:
+            queries.extend(q["question"] for q in json.load(f).get("questions", []))
+
+    rng = random.Random(seed)
+    candidates = list(range(len(documents)))
+    rng.shuffle(candidates)
+    for idx in candidates:
+        if n_synthetic <= 0:
+            break
+        sentences = [s.strip() for s in re.split(r"[.!?;\n]", documents[idx] or "") if len(s.strip()) >= 30]
+        if sentences:
+            queries.append(sentences[0][:300])
+            n_synthetic -= 1
+    logger.info("%d consultas de avaliação preparadas.", len(queries))
+    return queries
+
+
+def embed_queries(texts: List[str]) -> np.ndarray:
+    from safety_ai_app.nr_rag_qa import EMBEDDING_MODEL_NAME
+    from safety_ai_app.rag import CustomHuggingFaceEmbeddings
+
+    embedder = CustomHuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    return np.asarray([embedder.embed_query(t) for t in texts], dtype=np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Exact neighbours
+# ---------------------------------------------------------------------------
+
+def exact_neighbours(embeddings: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """Brute-force top-k indices for each query, using the collection's distance."""
+    if space == "cosine":
+        base = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        q = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        dist = -(q @ base.T)
+    elif space == "ip":
+        dist = -(queries @ embeddings.T)
+    else:
+        sq_norms = np.einsum("ij,ij->i", embeddings, embeddings)
+        dist = sq_norms[None, :] - 2.0 * (queries @ embeddings.T)
+
+    k = min(k, embeddings.shape[0])
+    top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(dist, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+# ---------------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------------
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _release_chroma_clients() -> None:
+    try:
+        from chromadb.api.client import SharedSystemClient
+        SharedSystemClient.clear_system_cache()
+    except Exception:
+        pass
+
+
+def evaluate_config(
+    ids: List[str],
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    truth_ids: List[set],
+    k: int,
+    space: str,
+    m: int,
+    construction_ef: int,
+    search_ef: int,
+) -> Dict[str, Any]:
+    """Build a temporary HNSW copy of the collection and measure it."""
+    import chromadb
+
+    tmp_dir = tempfile.mkdtemp(prefix="hnsw_tune_")
+    try:
+        client = chromadb.PersistentClient(path=tmp_dir)
+        collection = client.create_collection(
+            name="hnsw_tune",
+            metadata={
+                "hnsw:space": space,
+                "hnsw:M": m,
+                "hnsw:construction_ef": construction_ef,
+                "hnsw:search_ef": search_ef,
+            },
+        )
+
+        t0 = time.perf_counter()
+        for start in range(0, len(ids), _ADD_BATCH_SIZE):
+            end = start + _ADD_BATCH_SIZE
+            collection.add(ids=ids[start:end], embeddings=embeddings[start:end].tolist())
+        build_s = time.perf_counter() - t0
+
+        for q in queries[:_WARMUP_QUERIES]:
+            collection.query(query_embeddings=[q.tolist()], n_results=k, include=["distances"])
+
+        latencies_ms: List[float] = []
+        recalls: List[float] = []
+        for q, expected in zip(queries, truth_ids):
+            t_q = time.perf_counter()
+            res = collection.query(query_embeddings=[q.tolist()], n_results=k, include=["distances"])
+            latencies_ms.append((time.perf_counter() - t_q) * 1000)
+            found = set(res["ids"][0])
+            recalls.append(len(found & expected) / max(1, len(expected)))
+
+        size_bytes = _dir_size(tmp_dir)
+        del collection, client
+        return {
+            "hnsw_m": m,
+            "hnsw_construction_ef": construction_ef,
+            "hnsw_search_ef": search_ef,
+            "recall_at_k": round(float(np.mean(recalls)), 4),
+            "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+            "build_s": round(build_s, 3),
+            "disk_mb": round(size_bytes / (1024 * 1024), 2),
+        }
+    finally:
+        _release_chroma_clients()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def choose_config(results: List[Dict[str, Any]], target_recall: float) -> Optional[Dict[str, Any]]:
+    """Lowest p95 latency among configs reaching the target recall (else best recall)."""
+    if not results:
+        return None
+    eligible = [r for r in results if r["recall_at_k"] >= target_recall]
+    if eligible:
+        return min(eligible, key=lambda r: (r["p95_ms"], r["disk_mb"]))
+    return max(results, key=lambda r: (r["recall_at_k"], -r["p95_ms"]))
+
+
+def apply_to_ai_config(config: Dict[str, Any], path: Path = AI_CONFIG_PATH) -> None:
+    cfg: Dict[str, Any] = {}
+    if path.is_file():
+        with open(path, encoding="utf-8") as f:
+            cfg = json.load(f)
+    for key in ("hnsw_m", "hnsw_construction_ef", "hnsw_search_ef"):
+        cfg[key] = config[key]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, ensure_ascii=False, indent=2)
+    logger.info("Parâmetros HNSW gravados em %s (aplicados na próxima criação da coleção).", path)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run_tuning(args: argparse.Namespace) -> Path:
+    ids, embeddings, documents, space = load_collection(args.persist_dir, args.collection)
+    if not ids:
+        raise SystemExit("Coleção vazia — nada para ajustar.")
+
+    query_texts = build_query_texts(args.golden_set, documents, args.synthetic, args.seed)
+    queries = embed_queries(query_texts)
+
+    t0 = time.perf_counter()
+    truth = exact_neighbours(embeddings, queries, args.k, space)
+    truth_ids = [{ids[i] for i in row} for row in truth]
+    logger.info("Vizinhos exatos calculados em %.2fs.", time.perf_counter() - t0)
+
+    grid = list(itertools.product(args.m, args.construction_ef, args.search_ef))
+    results: List[Dict[str, Any]] = []
+    for idx, (m, cef, sef) in enumerate(grid, start=1):
+        logger.info("[%d/%d] M=%d construction_ef=%d search_ef=%d", idx, len(grid), m, cef, sef)
+        result = evaluate_config(ids, embeddings, queries, truth_ids, args.k, space, m, cef, sef)
+        results.append(result)
+        logger.info(
+            "  recall@%d=%.4f  p50=%.2fms  p95=%.2fms  build=%.2fs  disk=%.1fMB",
+            args.k, result["recall_at_k"], result["p50_ms"], result["p95_ms"],
+            result["build_s"], result["disk_mb"],
+        )
+
+    print("\n" + "=" * 84)
+    print(f"{'M':>4} {'c_ef':>6} {'s_ef':>6} {'recall@' + str(args.k):>10} {'p50 ms':>9} {'p95 ms':>9} {'build s':>9} {'disk MB':>9}")
+    print("=" * 84)
+    for r in results:
+        print(f"{r['hnsw_m']:>4} {r['hnsw_construction_ef']:>6} {r['hnsw_search_ef']:>6} "
+              f"{r['recall_at_k']:>10.4f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['build_s']:>9.2f} {r['disk_mb']:>9.1f}")
+    print("=" * 84)
+
+    chosen = choose_config(results, args.target_recall)
+    if chosen:
+        print(f"\nRecomendado (recall ≥ {args.target_recall}): M={chosen['hnsw_m']} "
+              f"construction_ef={chosen['hnsw_construction_ef']} search_ef={chosen['hnsw_search_ef']}")
+        if args.apply:
+            apply_to_ai_config(chosen)
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "timestamp": timestamp,
+        "collection": args.collection,
+        "vectors": len(ids),
+        "dimension": int(embeddings.shape[1]),
+        "space": space,
+        "k": args.k,
+        "queries": len(query_texts),
+        "target_recall": args.target_recall,
+        "results": results,
+        "recommended": chosen,
+    }
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = args.output_dir / f"hnsw_tuning_{timestamp}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nReport saved: {output_path}")
+    return output_path
+
+
+# ---------------------------------------------------------------------------
+# CLI entry-point
+# ---------------------------------------------------------------------------
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep ChromaDB HNSW parameters and report recall/latency trade-offs."
+    )
+    parser.add_argument("--persist-dir", type=Path, default=CHROMADB_PERSIST_DIRECTORY)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--golden-set", type=Path, default=DEFAULT_GOLDEN_SET)
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--k", type=int, default=8, help="Neighbours per query (recall@k).")
+    parser.add_argument("--synthetic", type=int, default=200, help="Number of synthetic queries.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--m", type=_int_list, default=DEFAULT_M, help="Comma-separated hnsw:M values.")
+    parser.add_argument("--construction-ef", type=_int_list, default=DEFAULT_CONSTRUCTION_EF)
+    parser.add_argument("--search-ef", type=_int_list, default=DEFAULT_SEARCH_EF)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--apply", action="store_true",
+                        help="Write the recommended parameters to data/ai_config.json.")
+    run_tuning(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
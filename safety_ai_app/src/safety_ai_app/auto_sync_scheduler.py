@@ -2,28 +2,84 @@
 Auto-sync scheduler for the knowledge base.
 
 Runs incremental Google Drive → ChromaDB synchronization in a background
-thread at a configurable interval.  The scheduler is a process-level
-singleton so only one sync loop ever runs regardless of how many times
-Streamlit rerenders the page.
+thread. Each cycle reads the Drive ``changes.list`` feed since the previous one
+(see ``drive_changes``), so an idle library costs a single request.
+
+The scheduler is a process-level singleton, so Streamlit reruns never start a
+second loop. With several worker processes, each runs its own loop but only
+the one holding the advisory lock ``data/.auto_sync.lock`` (the leader) syncs;
+the others count their cycles as skipped and take over when the leader's
+process exits (the OS releases the lock). The leader publishes its status to
+``data/.auto_sync_status.json`` so every worker's UI shows the same state, and
+picks up "sync now" requests made in other workers from ``data/.auto_sync_trigger``.
+The enable switch and the interval are settings of the whole host: changing them
+in any worker writes ``data/.auto_sync_settings.json``, which every loop re-reads
+while it waits. The lock is only shared between processes on the same host.
+
+The interval adapts: a cycle that indexed documents brings the next one
+closer (edits tend to come in bursts), idle or failed cycles push it further
+out, within bounds derived from the configured interval. Start times are
+jittered so workers started together do not contend for the lock in lockstep.
 """
 
+import json
 import logging
+import os
+import random
 import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Deque, Dict, Optional
+
+from filelock import FileLock, Timeout
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_INTERVAL_MINUTES: int = 30
 _INITIAL_DELAY_SECONDS: int = 90
 
+# Bounds of the adaptive interval, as multiples of the configured interval
+MIN_INTERVAL_FACTOR: float = 0.25
+MAX_INTERVAL_FACTOR: float = 4.0
+IDLE_BACKOFF_FACTOR: float = 1.5
+ERROR_BACKOFF_FACTOR: float = 2.0
+# Each wait is randomised by ± this fraction
+JITTER_FRACTION: float = 0.1
+
+_TRIGGER_POLL_SECONDS: float = 15.0
+_DURATION_HISTORY: int = 20
+_LOCK_FILENAME = '.auto_sync.lock'
+_STATUS_FILENAME = '.auto_sync_status.json'
+_TRIGGER_FILENAME = '.auto_sync_trigger'
+_SETTINGS_FILENAME = '.auto_sync_settings.json'
+
+_DEFAULT_STATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+
+SKIP_NOT_LEADER = "not_leader"
+SKIP_DISABLED = "disabled"
+SKIP_ALREADY_RUNNING = "already_running"
+SKIP_SERVICES_UNAVAILABLE = "services_unavailable"
+
+
+def _default_sync(drive_service: Any, qa: Any) -> int:
+    from safety_ai_app.google_drive_integrator import (
+        synchronize_app_central_library_to_chroma,
+    )
+    return synchronize_app_central_library_to_chroma(drive_service, qa, progress_callback=None)
+
 
 class AutoSyncScheduler:
-    """Background scheduler that periodically syncs Drive → ChromaDB."""
+    """Background scheduler that periodically syncs Drive → ChromaDB (one leader per host)."""
 
-    def __init__(self, interval_minutes: int = DEFAULT_INTERVAL_MINUTES) -> None:
+    def __init__(
+        self,
+        interval_minutes: float = DEFAULT_INTERVAL_MINUTES,
+        state_dir: Optional[str] = None,
+        initial_delay_seconds: float = _INITIAL_DELAY_SECONDS,
+    ) -> None:
         self.interval_minutes = interval_minutes
+        self.initial_delay_seconds = initial_delay_seconds
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._wakeup_event = threading.Event()
@@ -32,6 +88,16 @@ class AutoSyncScheduler:
 
         self._get_qa: Optional[Callable[[], Any]] = None
         self._get_drive_service: Optional[Callable[[], Any]] = None
+        self._sync_fn: Callable[[Any, Any], int] = _default_sync
+
+        state_dir = state_dir or _DEFAULT_STATE_DIR
+        os.makedirs(state_dir, exist_ok=True)
+        self._status_path = os.path.join(state_dir, _STATUS_FILENAME)
+        self._trigger_path = os.path.join(state_dir, _TRIGGER_FILENAME)
+        self._settings_path = os.path.join(state_dir, _SETTINGS_FILENAME)
+        # Not thread-local: the loop thread and "sync now" threads share the process's leadership
+        self._leader_lock = FileLock(os.path.join(state_dir, _LOCK_FILENAME), thread_local=False)
+        self.is_leader: bool = False
 
         self.last_run_time: Optional[datetime] = None
         self.last_run_success: Optional[bool] = None
@@ -41,15 +107,30 @@ class AutoSyncScheduler:
         self.is_syncing: bool = False
         self.enabled: bool = True
 
+        self.current_interval_seconds: float = interval_minutes * 60
+        self.cycles_run: int = 0
+        self.cycle_durations: Deque[float] = deque(maxlen=_DURATION_HISTORY)
+        self.skipped_cycles: Dict[str, int] = {}
+
+        # Settings saved by any worker win over the constructor's interval
+        self._apply_shared_settings()
+
     def configure(
         self,
         get_qa: Callable[[], Any],
         get_drive_service: Callable[[], Any],
+        sync_fn: Optional[Callable[[Any, Any], int]] = None,
     ) -> None:
-        """Attach factory callables that return the QA and Drive service instances."""
+        """Attach factory callables that return the QA and Drive service instances.
+
+        *sync_fn(drive_service, qa) -> processed count* defaults to the central
+        library sync.
+        """
         with self._lock:
             self._get_qa = get_qa
             self._get_drive_service = get_drive_service
+            if sync_fn is not None:
+                self._sync_fn = sync_fn
 
     def start(self) -> None:
         """Start the background sync loop (idempotent)."""
@@ -57,34 +138,43 @@ class AutoSyncScheduler:
             if self._thread and self._thread.is_alive():
                 return
             self._stop_event.clear()
+            initial_delay = self._jittered(self.initial_delay_seconds)
             # Set next_run_time immediately so the UI can show it from the first render.
-            first_run_ts = time.time() + _INITIAL_DELAY_SECONDS
-            self.next_run_time = datetime.fromtimestamp(first_run_ts)
+            self.next_run_time = datetime.fromtimestamp(time.time() + initial_delay)
             self._thread = threading.Thread(
                 target=self._run_loop,
+                args=(initial_delay,),
                 name="AutoSync_Scheduler",
                 daemon=True,
             )
             self._thread.start()
         logger.info(
-            "Auto-sync scheduler started (interval: %d min, initial delay: %d s).",
+            "Auto-sync scheduler started (interval: %s min, initial delay: %.0f s).",
             self.interval_minutes,
-            _INITIAL_DELAY_SECONDS,
+            initial_delay,
         )
 
     def stop(self) -> None:
-        """Signal the background loop to stop and wait briefly."""
+        """Stop this process's loop, wait briefly and give up leadership.
+
+        Another worker takes over the syncs; use ``set_enabled(False)`` to pause
+        them on the whole host.
+        """
         self._stop_event.set()
         self._wakeup_event.set()
         if self._thread:
             self._thread.join(timeout=5)
+        if self.is_leader:
+            self._leader_lock.release(force=True)
+            self.is_leader = False
 
     def update_interval(self, new_interval_minutes: int) -> None:
         """Change the sync interval and wake the sleeping loop so it picks up the new value.
 
         The value is clamped to a safe range (1 – 1440 minutes).  Values outside
         the application's intended option set are accepted but logged as warnings
-        so callers are aware of unexpected inputs.
+        so callers are aware of unexpected inputs. The adaptive interval restarts
+        from the new value.
         """
         clamped = max(1, min(int(new_interval_minutes), 1440))
         if clamped != new_interval_minutes:
@@ -95,19 +185,32 @@ class AutoSyncScheduler:
             )
         with self._lock:
             self.interval_minutes = clamped
+            self.current_interval_seconds = clamped * 60
             self._interval_just_changed = True
+        self._publish_settings()
         self._wakeup_event.set()
         logger.info("Auto-sync interval updated to %d min.", clamped)
 
+    def set_enabled(self, enabled: bool) -> None:
+        """Pause or resume the scheduled cycles in every worker ("sync now" still runs)."""
+        with self._lock:
+            self.enabled = bool(enabled)
+        self._publish_settings()
+        logger.info("Auto-sync %s.", "enabled" if enabled else "disabled")
+
     def trigger_now(self) -> bool:
         """
         Trigger an immediate incremental sync in a one-shot background thread.
 
-        Returns False if a sync is already running.
+        When another process is the leader, the request is handed to it through
+        the trigger file. Returns False if a sync is already running.
         """
         with self._lock:
-            if self.is_syncing:
+            if self.is_syncing or self._read_shared_status().get("is_syncing"):
                 return False
+        if not self._acquire_leadership():
+            self._request_remote_trigger()
+            return True
         t = threading.Thread(
             target=self._do_sync,
             name="AutoSync_OnDemand",
@@ -117,80 +220,247 @@ class AutoSyncScheduler:
         return True
 
     def get_status(self) -> dict:
-        """Return a snapshot of the scheduler state (safe to call from any thread)."""
+        """Return a snapshot of the scheduler state (safe to call from any thread).
+
+        ``enabled`` and ``interval_minutes`` are the host-wide settings. In a
+        worker that is not the leader, the run fields come from the leader's
+        published status.
+        """
+        self._apply_shared_settings()
         with self._lock:
-            return {
+            durations = list(self.cycle_durations)
+            status = {
                 "enabled": self.enabled,
                 "interval_minutes": self.interval_minutes,
+                "current_interval_minutes": round(self.current_interval_seconds / 60, 2),
                 "is_syncing": self.is_syncing,
                 "last_run_time": self.last_run_time,
                 "last_run_success": self.last_run_success,
                 "last_run_message": self.last_run_message,
                 "last_processed_count": self.last_processed_count,
                 "next_run_time": self.next_run_time,
+                "is_leader": self.is_leader,
+                "leader_pid": os.getpid() if self.is_leader else None,
+                "cycles_run": self.cycles_run,
+                "cycle_durations": durations,
+                "last_cycle_seconds": durations[-1] if durations else None,
+                "avg_cycle_seconds": sum(durations) / len(durations) if durations else None,
+                "skipped_cycles": dict(self.skipped_cycles),
+                "skipped_cycles_total": sum(self.skipped_cycles.values()),
             }
+            is_leader = self.is_leader
+        if not is_leader:
+            shared = self._read_shared_status()
+            for key in ("is_syncing", "last_run_success", "last_run_message", "last_processed_count",
+                        "current_interval_minutes", "leader_pid", "cycles_run", "cycle_durations",
+                        "last_cycle_seconds", "avg_cycle_seconds"):
+                if key in shared:
+                    status[key] = shared[key]
+            for key in ("last_run_time", "next_run_time"):
+                if shared.get(key):
+                    status[key] = datetime.fromisoformat(shared[key])
+        return status
+
+    # ------------------------------------------------------------------
+    # Leadership and cross-process status
+    # ------------------------------------------------------------------
+
+    def _acquire_leadership(self) -> bool:
+        if self.is_leader:
+            return True
+        try:
+            self._leader_lock.acquire(timeout=0)
+        except Timeout:
+            return False
+        self.is_leader = True
+        logger.info("Auto-sync: process %d is now the sync leader.", os.getpid())
+        return True
+
+    def _publish_status(self) -> None:
+        status = self.get_status()
+        for key in ("last_run_time", "next_run_time"):
+            status[key] = status[key].isoformat() if status[key] else None
+        status.pop("skipped_cycles", None)
+        status.pop("skipped_cycles_total", None)
+        tmp_path = f"{self._status_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f)
+            os.replace(tmp_path, self._status_path)
+        except OSError as exc:
+            logger.warning("Auto-sync: could not publish status: %s", exc)
+
+    def _read_shared_status(self) -> Dict[str, Any]:
+        try:
+            with open(self._status_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
-    def _run_loop(self) -> None:
-        """Main loop: wait for the initial delay, then sync on every interval."""
-        if self._stop_event.wait(timeout=_INITIAL_DELAY_SECONDS):
+    def _publish_settings(self) -> None:
+        with self._lock:
+            settings = {"enabled": self.enabled, "interval_minutes": self.interval_minutes}
+        tmp_path = f"{self._settings_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f)
+            os.replace(tmp_path, self._settings_path)
+        except OSError as exc:
+            logger.warning("Auto-sync: could not publish settings: %s", exc)
+
+    def _apply_shared_settings(self) -> None:
+        """Adopt the settings saved by any worker; a new interval wakes the loop to restart its timer."""
+        try:
+            with open(self._settings_path, 'r', encoding='utf-8') as f:
+                shared = json.load(f)
+        except (OSError, ValueError):
             return
+        interval = shared.get("interval_minutes")
+        with self._lock:
+            self.enabled = bool(shared.get("enabled", self.enabled))
+            if not isinstance(interval, (int, float)) or interval == self.interval_minutes:
+                return
+            self.interval_minutes = interval
+            self.current_interval_seconds = interval * 60
+            self._interval_just_changed = True
+        self._wakeup_event.set()
+        logger.info("Auto-sync interval set to %s min by another worker.", interval)
+
+    def _request_remote_trigger(self) -> None:
+        try:
+            with open(self._trigger_path, 'w', encoding='utf-8') as f:
+                f.write(str(os.getpid()))
+            logger.info("Auto-sync: immediate sync requested from the leader process.")
+        except OSError as exc:
+            logger.warning("Auto-sync: could not request an immediate sync: %s", exc)
+
+    def _consume_remote_trigger(self) -> bool:
+        try:
+            os.remove(self._trigger_path)
+            return True
+        except OSError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _jittered(seconds: float) -> float:
+        return seconds * random.uniform(1 - JITTER_FRACTION, 1 + JITTER_FRACTION)
+
+    def _adapt_interval(self, success: bool, processed: int) -> None:
+        """Shorten the interval after edits, lengthen it after idle or failed cycles (lock held)."""
+        base = self.interval_minutes * 60
+        if not success:
+            target = self.current_interval_seconds * ERROR_BACKOFF_FACTOR
+        elif processed > 0:
+            target = base * MIN_INTERVAL_FACTOR
+        else:
+            target = self.current_interval_seconds * IDLE_BACKOFF_FACTOR
+        self.current_interval_seconds = max(base * MIN_INTERVAL_FACTOR, min(target, base * MAX_INTERVAL_FACTOR))
+
+    def _skip(self, reason: str) -> None:
+        with self._lock:
+            self.skipped_cycles[reason] = self.skipped_cycles.get(reason, 0) + 1
+
+    def _wait(self, seconds: float) -> str:
+        """Sleep up to *seconds*. Returns "stop", "interval", "trigger" or "timeout"."""
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "timeout"
+            self._wakeup_event.wait(timeout=min(remaining, _TRIGGER_POLL_SECONDS))
+            if self._stop_event.is_set():
+                return "stop"
+            self._apply_shared_settings()
+            if self._wakeup_event.is_set():
+                return "interval"
+            if self.is_leader and self._consume_remote_trigger():
+                return "trigger"
+
+    def _run_loop(self, initial_delay: float) -> None:
+        """Main loop: wait for the initial delay, then run a cycle after every (adaptive) interval."""
+        deadline = time.monotonic() + initial_delay
+        while True:
+            self._wakeup_event.clear()
+            reason = self._wait(deadline - time.monotonic())
+            if reason == "stop":
+                return
+            if reason != "interval":
+                break
 
         while not self._stop_event.is_set():
+            self._apply_shared_settings()
             if self.enabled:
                 self._do_sync()
+            else:
+                self._skip(SKIP_DISABLED)
 
-            # Inner loop: sleep for the configured interval, but restart the
+            # Inner loop: sleep for the current interval, but restart the
             # timer if the interval is changed while sleeping.
             while not self._stop_event.is_set():
-                interval_secs = self.interval_minutes * 60
-                next_ts = time.time() + interval_secs
                 with self._lock:
-                    self.next_run_time = datetime.fromtimestamp(next_ts)
+                    wait_secs = self._jittered(self.current_interval_seconds)
+                    self.next_run_time = datetime.fromtimestamp(time.time() + wait_secs)
                     self._interval_just_changed = False
+                if self.is_leader:
+                    self._publish_status()
 
                 self._wakeup_event.clear()
-                self._wakeup_event.wait(timeout=interval_secs)
+                reason = self._wait(wait_secs)
 
-                if self._stop_event.is_set():
+                if reason == "stop":
                     return
 
                 with self._lock:
                     changed = self._interval_just_changed
 
-                if changed:
+                if reason == "interval" and changed:
                     # Interval was updated — reset the timer without syncing.
                     continue
 
-                # Normal timeout — break inner loop and run the next sync.
+                # Timeout or an immediate-sync request — break inner loop and run the next sync.
                 break
 
     def _do_sync(self) -> None:
-        """Perform one incremental sync cycle."""
+        """Perform one incremental sync cycle (only in the leader process)."""
         with self._lock:
             if self.is_syncing:
-                return
-            self.is_syncing = True
+                running = True
+            else:
+                running = False
+                self.is_syncing = True
+        if running:
+            self._skip(SKIP_ALREADY_RUNNING)
+            return
 
-        logger.info("Auto-sync: Starting incremental sync...")
+        started = time.monotonic()
+        success: Optional[bool] = None
+        count = 0
         try:
+            if not self._acquire_leadership():
+                logger.debug("Auto-sync: another process is the sync leader; cycle skipped.")
+                self._skip(SKIP_NOT_LEADER)
+                return
+            self._publish_status()
+
+            logger.info("Auto-sync: Starting incremental sync...")
             qa = self._get_qa() if self._get_qa else None
             drive_service = self._get_drive_service() if self._get_drive_service else None
 
             if not qa or not drive_service:
                 logger.warning("Auto-sync: QA or Drive service not available, skipping.")
+                self._skip(SKIP_SERVICES_UNAVAILABLE)
                 with self._lock:
                     self.last_run_time = datetime.now()
                     self.last_run_success = False
                     self.last_run_message = "Serviços não disponíveis (QA ou Drive)."
                 return
 
-            from safety_ai_app.google_drive_integrator import (
-                synchronize_app_central_library_to_chroma,
-            )
-
-            count = synchronize_app_central_library_to_chroma(
-                drive_service, qa, progress_callback=None
-            )
+            count = self._sync_fn(drive_service, qa)
+            success = True
 
             with self._lock:
                 self.last_run_time = datetime.now()
@@ -198,14 +468,15 @@ class AutoSyncScheduler:
                 self.last_processed_count = count
                 if count > 0:
                     self.last_run_message = (
-                        f"{count} documento(s) novo(s) indexado(s) com sucesso."
+                        f"{count} documento(s) novo(s) ou alterado(s) indexado(s) com sucesso."
                     )
                 else:
-                    self.last_run_message = "Nenhum documento novo encontrado."
+                    self.last_run_message = "Nenhum documento novo ou alterado encontrado."
 
-            logger.info("Auto-sync: Completed. %d new document(s) indexed.", count)
+            logger.info("Auto-sync: Completed. %d new or modified document(s) indexed.", count)
 
         except Exception as exc:
+            success = False
             logger.error("Auto-sync: Error during sync: %s", exc, exc_info=True)
             with self._lock:
                 self.last_run_time = datetime.now()
@@ -214,6 +485,12 @@ class AutoSyncScheduler:
         finally:
             with self._lock:
                 self.is_syncing = False
+                if success is not None:
+                    self.cycles_run += 1
+                    self.cycle_durations.append(round(time.monotonic() - started, 3))
+                    self._adapt_interval(success, count)
+            if success is not None:
+                self._publish_status()
 
 
 _scheduler: Optional[AutoSyncScheduler] = None
@@ -1,8 +1,19 @@
+import bisect
 import ftplib
+import numpy as np
 import pandas as pd
 import os
+import re
 import logging
+import threading
+import unicodedata
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import shutil
 import streamlit as st
 import zipfile
 import socket
@@ -21,15 +32,354 @@ LOCAL_DATA_DIR = os.path.join("data")
 LOCAL_CA_FILE = os.path.join(LOCAL_DATA_DIR, "ca_data.parquet")
 LAST_UPDATE_FILE = os.path.join(LOCAL_DATA_DIR, "ca_last_update.txt")
 
+# Leitura em streaming do TXT do CAEPI (pipe-delimitado)
+CA_CSV_BLOCK_SIZE = 8 * 1024 * 1024
+CA_ENCODING_SAMPLE_BYTES = 1024 * 1024
+
+CA_COLUMN_MAPPING = {
+    'NR REGISTRO CA': 'ca_numero',
+    'EQUIPAMENTO': 'equipamento_tipo',
+    'DESCRICAO': 'descricao_detalhada',
+    'DESCRICAO EQUIPAMENTO': 'descricao_detalhada',
+    'FABRICANTE': 'fabricante_nome',
+    'SITUACAO': 'situacao_ca',
+    'VALIDADE': 'validade_ca',
+    'DATA DE VALIDADE': 'validade_ca',
+    'REFERENCIA': 'referencia_fabricante',
+    'PROCESSO': 'processo_numero',
+    'DATA_REGISTRO': 'data_registro_ca',
+    'UF': 'fabricante_uf',
+    'CNPJ': 'fabricante_cnpj',
+    'RAZAO_SOCIAL': 'fabricante_razao_social',
+    'NATUREZA': 'natureza_equipamento',
+    'APROVACAO': 'aprovacao_ca',
+    'MARCA CA': 'marca_ca',
+    'COR': 'cor_equipamento',
+    'APROVADO PARA LAUDO': 'aprovado_laudo',
+    'RESTRICAO LAUDO': 'restricao_laudo',
+    'OBSERVACAO ANALISE LAUDO': 'observacao_laudo',
+    'CNPJ LABORATORIO': 'cnpj_laboratorio',
+    'RAZAO SOCIAL LABORATORIO': 'razao_social_laboratorio',
+    'NR LAUDO': 'nr_laudo',
+    'NORMA': 'norma_referencia',
+}
+
+CA_DATE_COLUMNS = ('validade_ca', 'data_registro_ca')
+
+# Colunas de baixa cardinalidade gravadas como dictionary (categorias no pandas)
+CA_DICTIONARY_COLUMNS = (
+    'equipamento_tipo', 'fabricante_nome', 'situacao_ca', 'fabricante_uf',
+    'natureza_equipamento', 'marca_ca', 'cor_equipamento', 'aprovado_laudo',
+    'razao_social_laboratorio', 'cnpj_laboratorio', 'norma_referencia',
+)
+
+SEARCHABLE_COLUMNS = [
+    'ca_numero', 'equipamento_tipo', 'descricao_detalhada',
+    'fabricante_nome', 'referencia_fabricante', 'aprovacao_ca',
+    'situacao_ca', 'marca_ca', 'cor_equipamento',
+]
+
+_TOKEN_PATTERN = r'[a-z0-9]+'
+_TOKEN_RE = re.compile(_TOKEN_PATTERN)
+_CA_NUMBER_QUERY_RE = re.compile(r'^(?:ca\s*[-:.nº°o]*\s*)?(\d+)$')
+
+
+# --- ÍNDICE DE BUSCA ---
+
+def _fold_series(series: pd.Series) -> pd.Series:
+    """Minúsculas e sem acentos (NFKD), vetorizado: 'Proteção' -> 'protecao'."""
+    return (
+        series.astype(object).fillna('').astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+    )
+
+
+def _fold_text(text: str) -> str:
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+# --- LEITURA EM STREAMING DO ARQUIVO DO CAEPI ---
+
+def sniff_encoding(sample: bytes) -> str:
+    """
+    Detecta a codificação uma única vez a partir de uma amostra do início do arquivo.
+
+    UTF-8 só é escolhido quando a amostra tem bytes não-ASCII válidos em UTF-8;
+    amostras puramente ASCII caem para cp1252 (exportação padrão do CAEPI) e o que
+    não decodifica em cp1252 é lido como latin1, que aceita qualquer byte.
+    """
+    cut = sample.rfind(b'\n')
+    if cut > 0:
+        sample = sample[:cut]
+    if not sample.isascii():
+        try:
+            sample.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+def _open_ca_member(zip_ref: zipfile.ZipFile):
+    names = zip_ref.namelist()
+    if EXTRACTED_FILENAME in names:
+        return zip_ref.open(EXTRACTED_FILENAME)
+    txt_members = [n for n in names if n.lower().endswith('.txt')]
+    if not txt_members:
+        raise ValueError(f"Nenhum arquivo TXT encontrado no ZIP do CAEPI: {names}")
+    logger.warning(f"'{EXTRACTED_FILENAME}' não encontrado no ZIP; usando '{txt_members[0]}'.")
+    return zip_ref.open(txt_members[0])
+
+
+def _transform_ca_batch(table: pa.Table, target_names: List[str]) -> pa.Table:
+    """Renomeia e tipa um bloco lido do CSV (CA como texto limpo, datas, dictionary)."""
+    table = table.rename_columns(target_names)
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if name == 'ca_numero':
+            column = pc.utf8_trim_whitespace(column)
+        elif name in CA_DATE_COLUMNS:
+            column = pc.strptime(pc.utf8_trim_whitespace(column), format='%d/%m/%Y', unit='ns', error_is_null=True)
+        elif name in CA_DICTIONARY_COLUMNS:
+            column = pc.dictionary_encode(column)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def build_ca_parquet_from_zip(zip_path: str, parquet_path: str, block_size: int = CA_CSV_BLOCK_SIZE) -> int:
+    """
+    Converte o TXT do CAEPI dentro do ZIP em parquet sem extraí-lo nem carregá-lo inteiro.
+
+    O membro do ZIP é lido em blocos pelo leitor CSV do pyarrow e cada bloco é
+    gravado num ParquetWriter; o arquivo final só substitui o anterior (os.replace)
+    quando a conversão termina sem erros. Retorna o número de registros gravados.
+    """
+    tmp_path = f"{parquet_path}.tmp"
+    skipped_rows = 0
+
+    def _skip_invalid_row(row) -> str:
+        nonlocal skipped_rows
+        skipped_rows += 1
+        return 'skip'
+
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with _open_ca_member(zip_ref) as member:
+            sample = member.read(CA_ENCODING_SAMPLE_BYTES)
+        encoding = sniff_encoding(sample)
+        header_line = sample.split(b'\n', 1)[0].decode(encoding).lstrip('\ufeff').rstrip('\r')
+        logger.info(f"Arquivo CA com codificação detectada: {encoding}")
+
+        # Nomes normalizados do cabeçalho; colunas vazias/duplicadas recebem nomes internos e são descartadas
+        source_names: List[str] = []
+        target_names: List[str] = []
+        include: List[str] = []
+        for i, raw in enumerate(header_line.split('|')):
+            name = raw.strip().upper()
+            target = CA_COLUMN_MAPPING.get(name, name)
+            source_name = name if name and name not in source_names else f"_coluna_{i}"
+            source_names.append(source_name)
+            if name and target not in target_names:
+                include.append(source_name)
+                target_names.append(target)
+
+        if 'ca_numero' not in target_names:
+            logger.error(f"ERRO: A coluna 'ca_numero' não está no cabeçalho do arquivo CA: {header_line!r}")
+            raise ValueError("Crítico: A coluna 'ca_numero' não foi encontrada no cabeçalho do arquivo CA.")
+
+        read_options = pa_csv.ReadOptions(
+            column_names=source_names, skip_rows=1, encoding=encoding, block_size=block_size,
+        )
+        parse_options = pa_csv.ParseOptions(delimiter='|', invalid_row_handler=_skip_invalid_row)
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=include,
+            column_types={name: pa.string() for name in include},
+            strings_can_be_null=True,
+        )
+
+        rows_written = 0
+        writer: Optional[pq.ParquetWriter] = None
+        try:
+            with _open_ca_member(zip_ref) as member:
+                reader = pa_csv.open_csv(
+                    member, read_options=read_options, parse_options=parse_options, convert_options=convert_options,
+                )
+                for batch in reader:
+                    table = _transform_ca_batch(pa.Table.from_batches([batch]), target_names)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                    rows_written += table.num_rows
+            if writer is None:
+                raise ValueError("Arquivo CA sem registros.")
+            writer.close()
+            writer = None
+            os.replace(tmp_path, parquet_path)
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    if skipped_rows:
+        logger.warning(f"{skipped_rows} linha(s) malformada(s) ignorada(s) no arquivo CA.")
+    logger.info(f"Parsing do arquivo CA concluído. {rows_written} registros gravados em {parquet_path}.")
+    return rows_written
+
+
+class CASearchIndex:
+    """
+    Índice invertido dos CAs, construído uma única vez por DataFrame carregado.
+
+    - colunas de busca normalizadas (minúsculas, sem acentos) concatenadas por linha;
+    - vocabulário ordenado de tokens com postings em formato CSR (arrays numpy):
+      os tokens com um dado prefixo formam um intervalo contíguo do vocabulário,
+      então a expansão por prefixo é um único fatiamento;
+    - hash de correspondência exata do número do CA.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        started = datetime.now()
+
+        columns = [c for c in SEARCHABLE_COLUMNS if c in df.columns]
+        if columns:
+            folded = _fold_series(df[columns[0]])
+            for col in columns[1:]:
+                folded = folded + ' ' + _fold_series(df[col])
+        else:
+            folded = pd.Series([''] * len(df), index=df.index)
+        self._folded_rows: np.ndarray = folded.to_numpy(dtype=object)
+
+        # Pares (token, linha) sem repetição -> postings ordenados por token e linha
+        tokens = pd.Series(self._folded_rows).str.findall(_TOKEN_PATTERN).explode().dropna()
+        pairs = pd.DataFrame({
+            'token': tokens.to_numpy(dtype=object),
+            'row': tokens.index.to_numpy(dtype=np.int64),
+        }).drop_duplicates()
+        codes, vocab = pd.factorize(pairs['token'], sort=True)
+        rows = pairs['row'].to_numpy(dtype=np.int32)
+        order = np.lexsort((rows, codes))
+        self._vocab: List[str] = list(vocab)
+        self._postings: np.ndarray = rows[order]
+        counts = np.bincount(codes, minlength=len(self._vocab))
+        self._offsets: np.ndarray = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        self._ca_exact: Dict[str, np.ndarray] = {}
+        if 'ca_numero' in df.columns:
+            ca_numbers = df['ca_numero'].fillna('').astype(str).str.strip().str.lstrip('0').to_numpy()
+            self._ca_exact = {
+                key: np.asarray(positions, dtype=np.int32)
+                for key, positions in pd.Series(ca_numbers).groupby(ca_numbers, sort=False).indices.items()
+            }
+
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(
+            f"Índice de busca de CA construído: {len(df)} registros, {len(self._vocab)} tokens, "
+            f"{len(self._postings)} postings em {elapsed:.2f}s."
+        )
+
+    def _token_postings(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (linhas com o token exato, linhas com algum token que o contém como prefixo)."""
+        empty = np.empty(0, dtype=np.int32)
+        lo = bisect.bisect_left(self._vocab, token)
+        hi = bisect.bisect_left(self._vocab, token + '\uffff', lo)
+        if lo == hi:
+            # Sem prefixo: procura o termo dentro dos tokens do vocabulário (muito menor que a tabela)
+            hits = [i for i, term in enumerate(self._vocab) if token in term]
+            if not hits:
+                return empty, empty
+            return empty, np.unique(np.concatenate(
+                [self._postings[self._offsets[i]:self._offsets[i + 1]] for i in hits]
+            ))
+
+        exact = empty
+        if self._vocab[lo] == token:
+            exact = self._postings[self._offsets[lo]:self._offsets[lo + 1]]
+        prefix_rows = self._postings[self._offsets[lo]:self._offsets[hi]]
+        if hi - lo > 1:
+            prefix_rows = np.unique(prefix_rows)
+        return exact, prefix_rows
+
+    def search(self, search_term: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        Busca por interseção de postings. Retorna (posições das linhas da página, total de resultados).
+
+        Ordenação: número de CA exato primeiro; depois linhas com mais tokens exatos
+        (não apenas por prefixo) e com a frase completa presente.
+        """
+        folded_query = _fold_text(search_term.strip())
+        tokens = list(dict.fromkeys(_TOKEN_RE.findall(folded_query)))
+        if not tokens:
+            return np.empty(0, dtype=np.int32), 0
+
+        exact_ca = np.empty(0, dtype=np.int32)
+        ca_match = _CA_NUMBER_QUERY_RE.match(folded_query)
+        if ca_match:
+            exact_ca = self._ca_exact.get(ca_match.group(1).lstrip('0'), exact_ca)
+
+        per_token = sorted((self._token_postings(token) for token in tokens), key=lambda pair: len(pair[1]))
+        candidates = per_token[0][1]
+        for _, prefix_rows in per_token[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, prefix_rows, assume_unique=True)
+        if len(exact_ca):
+            candidates = np.union1d(candidates, exact_ca)
+
+        total = len(candidates)
+        if total == 0:
+            return candidates, 0
+
+        scores = np.zeros(total, dtype=np.float32)
+        for exact_rows, _ in per_token:
+            if len(exact_rows):
+                scores += np.isin(candidates, exact_rows, assume_unique=True)
+        if len(tokens) > 1:
+            phrase_hits = np.fromiter(
+                (folded_query in text for text in self._folded_rows[candidates]), dtype=bool, count=total
+            )
+            scores += phrase_hits * len(tokens)
+        if len(exact_ca):
+            scores += np.isin(candidates, exact_ca, assume_unique=True) * 1000.0
+
+        # Ordenação estável: empates mantêm a ordem original do arquivo
+        order = np.argsort(-scores, kind='stable')
+        end = None if limit is None else offset + limit
+        return candidates[order[offset:end]], total
+
 class CADataProcessor:
-    def __init__(self):
+    _search_index: Optional[CASearchIndex] = None
+    _search_index_lock = threading.Lock()
+
+    def __init__(self, source_zip_path: Optional[str] = None):
+        """
+        Args:
+            source_zip_path: ZIP local usado no lugar do FTP (testes e ambientes sem acesso ao MTE).
+        """
         os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+        self.source_zip_path = source_zip_path
 
     def _download_ca_file(self, local_zip_path: str) -> bool:
         """
         Baixa o arquivo CA (agora um ZIP) do servidor FTP usando ftplib.
         Tenta usar o caminho sem a barra inicial, como o pacote Go parece fazer.
         """
+        if self.source_zip_path:
+            logger.info(f"Usando arquivo CA local no lugar do FTP: {self.source_zip_path}")
+            try:
+                shutil.copyfile(self.source_zip_path, local_zip_path)
+                return True
+            except OSError as e:
+                logger.warning(f"Arquivo CA local indisponível: {e}. Será utilizado o arquivo local se disponível.")
+                return False
+
         full_ftp_file_path_no_leading_slash = f"{FTP_PATH}{FTP_FILENAME}"
         
         logger.info(f"Iniciando download do arquivo CA do FTP: {FTP_HOST}/{full_ftp_file_path_no_leading_slash}")
@@ -50,88 +400,6 @@ class CADataProcessor:
             logger.error(f"Erro inesperado durante o download do arquivo CA: {e}", exc_info=True)
             return False
 
-    def _parse_ca_txt_to_df(self, txt_path: str) -> pd.DataFrame:
-        """
-        Faz o parsing do arquivo TXT de CA para um DataFrame do Pandas.
-        """
-        logger.info(f"Iniciando parsing do arquivo CA: {txt_path}")
-        try:
-            df = None
-            # CORREÇÃO AQUI: Prioriza UTF-8, depois cp1252, latin1/iso-8859-1
-            encodings_to_try = ['utf-8', 'cp1252', 'latin1', 'iso-8859-1'] 
-            for encoding in encodings_to_try:
-                try:
-                    df = pd.read_csv(txt_path, sep='|', encoding=encoding, low_memory=False)
-                    logger.debug(f"DEBUG: Arquivo CA lido com sucesso usando encoding: {encoding}")
-                    break # Sai do loop se a leitura for bem-sucedida
-                except UnicodeDecodeError:
-                    logger.debug(f"DEBUG: Falha ao ler arquivo CA com encoding: {encoding}. Tentando o próximo.")
-                    continue
-                except Exception as e:
-                    logger.error(f"Erro inesperado ao tentar ler com encoding {encoding}: {e}", exc_info=True)
-                    continue
-            
-            if df is None:
-                raise Exception("Não foi possível ler o arquivo TXT com nenhuma das codificações tentadas.")
-
-            # Limpa e padroniza os nomes das colunas
-            df.columns = [col.strip().upper() for col in df.columns]
-            
-            # Mapeamento de colunas para nomes mais amigáveis e consistentes
-            column_mapping = {
-                'NR REGISTRO CA': 'ca_numero',
-                'EQUIPAMENTO': 'equipamento_tipo',
-                'DESCRICAO': 'descricao_detalhada',
-                'DESCRICAO EQUIPAMENTO': 'descricao_detalhada',
-                'FABRICANTE': 'fabricante_nome',
-                'SITUACAO': 'situacao_ca',
-                'VALIDADE': 'validade_ca',
-                'DATA DE VALIDADE': 'validade_ca',
-                'REFERENCIA': 'referencia_fabricante',
-                'PROCESSO': 'processo_numero',
-                'DATA_REGISTRO': 'data_registro_ca',
-                'UF': 'fabricante_uf',
-                'CNPJ': 'fabricante_cnpj',
-                'RAZAO_SOCIAL': 'fabricante_razao_social',
-                'NATUREZA': 'natureza_equipamento',
-                'APROVACAO': 'aprovacao_ca',
-                'MARCA CA': 'marca_ca',
-                'COR': 'cor_equipamento',
-                'APROVADO PARA LAUDO': 'aprovado_laudo',
-                'RESTRICAO LAUDO': 'restricao_laudo',
-                'OBSERVACAO ANALISE LAUDO': 'observacao_laudo',
-                'CNPJ LABORATORIO': 'cnpj_laboratorio',
-                'RAZAO SOCIAL LABORATORIO': 'razao_social_laboratorio',
-                'NR LAUDO': 'nr_laudo',
-                'NORMA': 'norma_referencia',
-            }
-            
-            # Filtra o mapeamento para incluir apenas colunas que realmente existem no DataFrame
-            actual_column_mapping = {k: v for k, v in column_mapping.items() if k in df.columns}
-            df.rename(columns=actual_column_mapping, inplace=True)
-
-            logger.debug(f"DEBUG: Colunas após renomear em _parse_ca_txt_to_df: {df.columns.tolist()}")
-            if 'ca_numero' not in df.columns:
-                logger.error("ERRO: A coluna 'ca_numero' está faltando após o parsing e renomeação em _parse_ca_txt_to_df!")
-                raise ValueError("Crítico: A coluna 'ca_numero' não foi encontrada após o parsing e renomeação.")
-
-            # Converte colunas para os tipos de dados corretos
-            if 'ca_numero' in df.columns:
-                df['ca_numero'] = df['ca_numero'].astype(str).str.strip()
-            if 'validade_ca' in df.columns:
-                df['validade_ca'] = pd.to_datetime(df['validade_ca'], errors='coerce', format='%d/%m/%Y')
-            if 'data_registro_ca' in df.columns:
-                df['data_registro_ca'] = pd.to_datetime(df['data_registro_ca'], errors='coerce', format='%d/%m/%Y')
-            
-            # DEBUG: Loga as primeiras linhas para verificar a codificação
-            logger.debug(f"DEBUG: Primeiras 5 linhas do DataFrame após parsing e renomeação:\n{df.head().to_string()}")
-
-            logger.info(f"Parsing do arquivo CA concluído. {len(df)} registros carregados.")
-            return df
-        except Exception as e:
-            logger.error(f"Erro ao fazer parse do arquivo CA: {e}", exc_info=True)
-            raise
-
     def _should_update_data(self) -> bool:
         """
         Verifica se os dados de CA precisam ser atualizados.
@@ -159,22 +427,15 @@ class CADataProcessor:
 
     def _update_ca_data(self) -> bool:
         """
-        Coordena o processo de download do ZIP, descompactação, parsing e salvamento dos dados.
+        Coordena o processo de download do ZIP e a conversão em streaming para parquet.
         """
         local_zip_path = os.path.join(LOCAL_DATA_DIR, FTP_FILENAME)
-        local_txt_path = os.path.join(LOCAL_DATA_DIR, EXTRACTED_FILENAME)
 
         try:
             if self._download_ca_file(local_zip_path):
                 logger.info(f"Arquivo CA ZIP baixado com sucesso para: {local_zip_path}")
-                
-                logger.info(f"Descompactando {local_zip_path} para {LOCAL_DATA_DIR}...")
-                with zipfile.ZipFile(local_zip_path, 'r') as zip_ref:
-                    zip_ref.extract(EXTRACTED_FILENAME, LOCAL_DATA_DIR)
-                logger.info("Arquivo CA TXT descompactado com sucesso.")
 
-                df = self._parse_ca_txt_to_df(local_txt_path)
-                df.to_parquet(LOCAL_CA_FILE, index=False)
+                build_ca_parquet_from_zip(local_zip_path, LOCAL_CA_FILE)
                 logger.info(f"Dados CA salvos em {LOCAL_CA_FILE}")
                 
                 with open(LAST_UPDATE_FILE, 'w') as f:
@@ -191,9 +452,6 @@ class CADataProcessor:
             if os.path.exists(local_zip_path):
                 os.remove(local_zip_path)
                 logger.info(f"Arquivo ZIP temporário removido: {local_zip_path}")
-            if os.path.exists(local_txt_path):
-                os.remove(local_txt_path)
-                logger.info(f"Arquivo TXT temporário removido: {local_txt_path}")
 
     @st.cache_resource(ttl=timedelta(hours=24))
     def _get_cached_ca_data(_self) -> pd.DataFrame: # Mantido _self para compatibilidade com st.cache_resource
@@ -265,55 +523,46 @@ class CADataProcessor:
         """
         return self._get_cached_ca_data()
 
+    def get_search_index(self) -> CASearchIndex:
+        """
+        Retorna o índice de busca dos dados em cache, reconstruindo-o quando o DataFrame muda.
+        """
+        df = self.get_ca_data()
+        with CADataProcessor._search_index_lock:
+            index = CADataProcessor._search_index
+            if index is None or index.df is not df:
+                index = CASearchIndex(df)
+                CADataProcessor._search_index = index
+        return index
+
+    def search_ca_paginated(self, search_term: str, page: int = 1, page_size: int = 50) -> Tuple[pd.DataFrame, int]:
+        """
+        Realiza uma busca nos dados de CA retornando uma página ordenada por relevância e o total encontrado.
+        """
+        df = self.get_ca_data()
+        if df.empty or not search_term.strip():
+            return pd.DataFrame(), 0
+
+        offset = max(page - 1, 0) * page_size
+        rows, total = self.get_search_index().search(search_term, offset=offset, limit=page_size)
+        logger.debug(f"DEBUG: Busca de CA '{search_term}': {total} resultado(s), página {page} com {len(rows)} registro(s).")
+        return df.iloc[rows], total
+
     def search_ca(self, search_term: str) -> pd.DataFrame:
         """
-        Realiza uma busca nos dados de CA.
+        Realiza uma busca nos dados de CA (todos os resultados, ordenados por relevância).
         """
         df = self.get_ca_data()
         if df.empty:
             logger.info("DataFrame de CA vazio, retornando sem resultados.")
             return pd.DataFrame()
 
-        search_term_processed = search_term.strip().lower()
-        logger.debug(f"DEBUG: Termo de busca original: '{search_term}'")
-        logger.debug(f"DEBUG: Termo de busca processado (strip().lower()): '{search_term_processed}'")
-        
-        mask = pd.Series([False] * len(df), index=df.index)
-
-        searchable_cols = [
-            'ca_numero', 'equipamento_tipo', 'descricao_detalhada',
-            'fabricante_nome', 'referencia_fabricante', 'aprovacao_ca',
-            'situacao_ca', 'marca_ca', 'cor_equipamento' # Adicionando mais colunas para busca
-        ]
-        
-        # 1. Tentar correspondência exata para 'ca_numero'
-        if 'ca_numero' in df.columns:
-            ca_numbers_cleaned = df['ca_numero'].astype(str).str.strip().fillna('')
-            exact_match_mask = (ca_numbers_cleaned == search_term_processed)
-            
-            if exact_match_mask.any():
-                logger.debug(f"DEBUG: Correspondência EXATA encontrada na coluna 'ca_numero' para '{search_term_processed}'.")
-                mask = mask | exact_match_mask
-            else:
-                logger.debug(f"DEBUG: Nenhuma correspondência EXATA encontrada na coluna 'ca_numero' para '{search_term_processed}'.")
-
-        # 2. Tentar correspondência 'contains' para todas as colunas (incluindo ca_numero para busca parcial)
-        for col in searchable_cols:
-            if col in df.columns:
-                col_data = df[col].astype(str).str.strip().fillna('')
-                col_contains_mask = col_data.str.contains(search_term_processed, case=False, na=False)
-                
-                if col_contains_mask.any():
-                    logger.debug(f"DEBUG: Coluna '{col}' - Correspondências 'CONTAINS' encontradas: {col_contains_mask.sum()}")
-                
-                mask = mask | col_contains_mask
-
-        if not mask.any():
+        rows, total = self.get_search_index().search(search_term)
+        if total == 0:
             logger.info(f"Nenhum CA encontrado para o termo '{search_term}'.")
-            logger.debug(f"DEBUG: Máscara final resultou em 0 correspondências.")
             return pd.DataFrame()
 
-        results = df[mask]
+        results = df.iloc[rows]
         logger.debug(f"DEBUG: Total de correspondências encontradas: {len(results)}")
         logger.debug(f"DEBUG: Amostra dos resultados (primeiros 5 CAs): {results['ca_numero'].head().tolist()}")
-        return results
\ No newline at end of file
+        return results
@@ -1,8 +1,13 @@
+import bisect
+import hashlib
 import pandas as pd
 import logging
 import os
+import pickle
+import re
 import tempfile
 import shutil
+import unicodedata
 import streamlit as st
 from typing import Dict, Any, List, Optional, Tuple
 
@@ -13,10 +18,98 @@ from safety_ai_app.google_drive_integrator import (
 
 logger = logging.getLogger(__name__)
 
+LOCAL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
+CBO_SNAPSHOT_FILE = os.path.join(LOCAL_CACHE_DIR, "cbo_snapshot.pkl")
+# Incrementar quando o formato da estrutura hierárquica mudar
+CBO_SNAPSHOT_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold_text(text: str) -> str:
+    return unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def _file_md5(path: str) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _CargoIndex:
+    """Lista de cargos ordenada uma única vez e índice de tokens sem acentos (prefixo) para a busca."""
+
+    def __init__(self, cargos_dict: Dict[str, Any]):
+        self.sorted_cargos: List[Dict[str, str]] = sorted(
+            ({"COD_OCUPACAO": k, "CARGO": v["CARGO"]} for k, v in cargos_dict.items()),
+            key=lambda x: x["CARGO"],
+        )
+        self._folded_names: List[str] = [_fold_text(c["CARGO"]) for c in self.sorted_cargos]
+        self._codes: List[str] = [re.sub(r"[^0-9a-z]", "", _fold_text(c["COD_OCUPACAO"])) for c in self.sorted_cargos]
+        self._sorted_codes: List[Tuple[str, int]] = sorted((code, i) for i, code in enumerate(self._codes))
+
+        postings: Dict[str, set] = {}
+        for i, name in enumerate(self._folded_names):
+            for token in set(_TOKEN_RE.findall(name)):
+                postings.setdefault(token, set()).add(i)
+        self._postings = postings
+        self._vocab: List[str] = sorted(postings)
+
+    def _token_hits(self, token: str) -> Dict[int, int]:
+        hits: Dict[int, int] = {}
+        start = bisect.bisect_left(self._vocab, token)
+        for term in self._vocab[start:]:
+            if not term.startswith(token):
+                break
+            weight = 2 if term == token else 1
+            for i in self._postings[term]:
+                if hits.get(i, 0) < weight:
+                    hits[i] = weight
+        return hits
+
+    def search(self, query: str) -> List[Dict[str, str]]:
+        folded = _fold_text(query).strip()
+        if not folded:
+            return []
+        scores: Dict[int, float] = {}
+
+        code_query = re.sub(r"[^0-9a-z]", "", folded)
+        if code_query.isdigit():
+            start = bisect.bisect_left(self._sorted_codes, (code_query, -1))
+            for code, i in self._sorted_codes[start:]:
+                if not code.startswith(code_query):
+                    break
+                scores[i] = 100.0 if code == code_query else 50.0
+
+        tokens = list(dict.fromkeys(_TOKEN_RE.findall(folded)))
+        if tokens:
+            per_token = sorted((self._token_hits(t) for t in tokens), key=len)
+            candidates = set(per_token[0])
+            for hits in per_token[1:]:
+                candidates &= hits.keys()
+            for i in candidates:
+                score = float(sum(hits[i] for hits in per_token))
+                if self._folded_names[i].startswith(folded):
+                    score += len(tokens)
+                scores[i] = max(scores.get(i, 0.0), score)
+
+        if not scores:
+            # Trecho no meio de uma palavra (comportamento da busca anterior da página)
+            for i, name in enumerate(self._folded_names):
+                if folded in name:
+                    scores[i] = 0.0
+
+        # Empates mantêm a ordem alfabética de sorted_cargos
+        return [dict(self.sorted_cargos[i]) for i in sorted(scores, key=lambda i: (-scores[i], i))]
+
+
 class CBODatabase:
     _instance: Optional['CBODatabase'] = None
     _data: Optional[pd.DataFrame] = None
     _cargos_dict: Optional[Dict[str, Any]] = None
+    _cargo_index: Optional[_CargoIndex] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -27,15 +120,55 @@ class CBODatabase:
     def __init__(self):
         pass
 
+    @staticmethod
+    def _load_snapshot(expected_md5: Optional[str] = None) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        if not os.path.exists(CBO_SNAPSHOT_FILE):
+            return None
+        try:
+            with open(CBO_SNAPSHOT_FILE, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("version") != CBO_SNAPSHOT_VERSION:
+                return None
+            if expected_md5 and snapshot.get("md5") != expected_md5:
+                return None
+            logger.info(f"Snapshot da CBO carregado de '{CBO_SNAPSHOT_FILE}' (md5 {snapshot.get('md5')}).")
+            return snapshot["data"], snapshot["cargos_dict"]
+        except Exception as e:
+            logger.warning(f"Não foi possível carregar o snapshot da CBO: {e}")
+            return None
+
+    @staticmethod
+    def _save_snapshot(md5: str, data: pd.DataFrame, cargos_dict: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{CBO_SNAPSHOT_FILE}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {"version": CBO_SNAPSHOT_VERSION, "md5": md5, "data": data, "cargos_dict": cargos_dict},
+                    f, protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, CBO_SNAPSHOT_FILE)
+            logger.info(f"Snapshot da CBO salvo em '{CBO_SNAPSHOT_FILE}'.")
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar o snapshot da CBO: {e}")
+
     @staticmethod
     @st.cache_data(ttl=3600)
     def _load_cbo_data_cached() -> Tuple[pd.DataFrame, Dict[str, Any]]:
         logger.info("Iniciando carregamento dos dados da CBO do Google Drive.")
-        
+
         integrator = get_service_account_drive_integrator_instance()
         if not integrator:
             logger.error("Não foi possível obter o integrador do Google Drive.")
-            return pd.DataFrame(), {}
+            snapshot = CBODatabase._load_snapshot()
+            return snapshot if snapshot is not None else (pd.DataFrame(), {})
+
+        # Mesmo md5 no Drive: usa a estrutura já processada sem baixar o arquivo
+        remote_md5 = integrator.get_file_metadata(CBO2025_FILE_ID).get("md5_checksum")
+        if remote_md5:
+            snapshot = CBODatabase._load_snapshot(remote_md5)
+            if snapshot is not None:
+                return snapshot
 
         temp_dir = tempfile.mkdtemp()
         temp_file_path = os.path.join(temp_dir, "CBO2025.xlsx")
@@ -44,14 +177,25 @@ class CBODatabase:
             integrator.download_file_from_drive(CBO2025_FILE_ID, temp_file_path)
             logger.info(f"Arquivo CBO2025.xlsx baixado com sucesso para '{temp_file_path}'.")
 
+            file_md5 = remote_md5 or _file_md5(temp_file_path)
+            snapshot = CBODatabase._load_snapshot(file_md5)
+            if snapshot is not None:
+                return snapshot
+
             data = pd.read_excel(temp_file_path)
             logger.info(f"Dados da CBO carregados com sucesso de '{temp_file_path}'.")
-            
+
             cargos_dict = CBODatabase._process_cbo_data_static(data)
+            if cargos_dict:
+                CBODatabase._save_snapshot(file_md5, data, cargos_dict)
             return data, cargos_dict
 
         except Exception as e:
             logger.error(f"Erro ao carregar ou processar CBO: {e}", exc_info=True)
+            snapshot = CBODatabase._load_snapshot()
+            if snapshot is not None:
+                logger.warning("Utilizando snapshot local da CBO após falha no Google Drive.")
+                return snapshot
             return pd.DataFrame(), {}
         finally:
             if os.path.exists(temp_dir):
@@ -71,26 +215,30 @@ class CBODatabase:
             logger.error(f"Colunas obrigatórias não encontradas no arquivo CBO. Esperadas: {required_cols}. Encontradas: {data.columns.tolist()}")
             return {}
 
-        for _, row in data.iterrows():
-            cod_ocupacao = str(row['COD_OCUPACAO']).strip()
-            cargo_nome = str(row['CARGO']).strip()
-            nome_grande_area = str(row['NOME_GRANDE_AREA']).strip()
-            cod_atividade = str(row['COD_ATIVIDADE']).strip()
-            nome_atividade = str(row['NOME_ATIVIDADE']).strip()
-
-            if cod_ocupacao not in cargos_dict:
-                cargos_dict[cod_ocupacao] = {
-                    "CARGO": cargo_nome,
-                    "AREAS_DE_ATUACAO": {}
-                }
-
-            if nome_grande_area not in cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"]:
-                cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"][nome_grande_area] = []
-
-            cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"][nome_grande_area].append({
-                "COD_ATIVIDADE": cod_atividade,
-                "NOME_ATIVIDADE": nome_atividade
-            })
+        df = pd.DataFrame({
+            col: data[col].astype(str).str.strip()
+            for col in ['COD_OCUPACAO', 'CARGO', 'NOME_GRANDE_AREA', 'COD_ATIVIDADE', 'NOME_ATIVIDADE']
+        })
+
+        # Nome do cargo: primeira ocorrência de cada código
+        first_rows = df.drop_duplicates(subset='COD_OCUPACAO', keep='first')
+        for cod_ocupacao, cargo_nome in zip(first_rows['COD_OCUPACAO'], first_rows['CARGO']):
+            cargos_dict[cod_ocupacao] = {"CARGO": cargo_nome, "AREAS_DE_ATUACAO": {}}
+
+        # Atividades por (cargo, área), já ordenadas pelo nome da atividade
+        activities = df[['COD_ATIVIDADE', 'NOME_ATIVIDADE']].to_dict('records')
+        ordered = df.assign(_pos=range(len(df))).sort_values('NOME_ATIVIDADE', kind='stable')
+        original_positions = ordered['_pos'].to_numpy()
+        groups = ordered.groupby(['COD_OCUPACAO', 'NOME_GRANDE_AREA'], sort=False).indices
+        for (cod_ocupacao, nome_grande_area), positions in groups.items():
+            cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"][nome_grande_area] = [
+                activities[i] for i in original_positions[positions]
+            ]
+
+        # Áreas em ordem alfabética (ordem usada pelos getters e pela página)
+        for cargo in cargos_dict.values():
+            cargo["AREAS_DE_ATUACAO"] = dict(sorted(cargo["AREAS_DE_ATUACAO"].items()))
+
         logger.info("Dados da CBO processados com sucesso.")
         return cargos_dict
 
@@ -98,23 +246,30 @@ class CBODatabase:
         data, cargos_dict = CBODatabase._load_cbo_data_cached()
         self._data = data
         self._cargos_dict = cargos_dict
+        self._cargo_index = _CargoIndex(cargos_dict) if cargos_dict else None
 
     def get_all_cargos(self) -> List[Dict[str, str]]:
-        if self._cargos_dict is None:
+        if self._cargo_index is None:
+            return []
+        # Copies: the index keeps serving searches from these entries
+        return [dict(cargo) for cargo in self._cargo_index.sorted_cargos]
+
+    def search_cargos(self, query: str) -> List[Dict[str, str]]:
+        """Busca cargos por código (prefixo) ou palavras do nome, sem acentos; ordenado por relevância."""
+        if self._cargo_index is None or not query:
             return []
-        sorted_cargos = sorted([{"COD_OCUPACAO": k, "CARGO": v["CARGO"]} for k, v in self._cargos_dict.items()], key=lambda x: x["CARGO"])
-        return sorted_cargos
+        return self._cargo_index.search(query)
 
     def get_areas_by_cargo_code(self, cod_ocupacao: str) -> List[str]:
         if self._cargos_dict and cod_ocupacao in self._cargos_dict:
-            return sorted(list(self._cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"].keys()))
+            return list(self._cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"].keys())
         return []
 
     def get_activities_by_cargo_and_area(self, cod_ocupacao: str, area_nome: str) -> List[Dict[str, str]]:
         if self._cargos_dict and cod_ocupacao in self._cargos_dict:
             areas = self._cargos_dict[cod_ocupacao]["AREAS_DE_ATUACAO"]
             if area_nome in areas:
-                return sorted(areas[area_nome], key=lambda x: x["NOME_ATIVIDADE"])
+                return [dict(a) for a in areas[area_nome]]
         return []
 
     def get_cargo_name_by_code(self, cod_ocupacao: str) -> Optional[str]:
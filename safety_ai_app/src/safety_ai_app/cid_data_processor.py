@@ -1,10 +1,15 @@
+import bisect
+import functools
+import hashlib
 import logging
 import os
 import requests
 import json
+import threading
 import time
 import tempfile
 import shutil
+from requests.adapters import HTTPAdapter
 import streamlit as st
 from typing import Dict, List, Any, Optional, Tuple
 import re
@@ -31,20 +36,283 @@ ICD_11_API_SEARCH_ENDPOINT = f"https://id.who.int/icd/release/11/{ICD_11_API_REL
 CID10_LOCAL_FILE_NAME = "CID10.xlsx"
 
 CID10_CODE_PATTERN = re.compile(r"^[A-Z]\d{2}(\.\d{1,2})?$")
+CID10_CODE_QUERY_PATTERN = re.compile(r"^[A-Z]\d{0,3}[A-Z0-9]?$")
+_CID10_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
 ICD_API_CLIENT_ID = os.getenv("ICD_API_CLIENT_ID")
 ICD_API_CLIENT_SECRET = os.getenv("ICD_API_CLIENT_SECRET")
 
+# Token renovado em segundo plano quando faltar menos que isso para expirar
+ICD_TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# Cache em disco das respostas da API (release fixo, conteúdo muda pouco)
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ICD_CACHE_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", "data", ".icd11_cache"))
+ICD_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ICD_CACHE_STALE_SECONDS = 30 * 24 * 3600
+ICD_CACHE_MAX_ENTRIES = 20_000
+ICD_CACHE_PRUNE_INTERVAL_SECONDS = 3600
+ICD_HTTP_POOL_SIZE = 16
+
+
+# ---------------------------------------------------------------------------
+# Cliente HTTP da API ICD-11: sessão com pool, single-flight e cache em disco
+# ---------------------------------------------------------------------------
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """Sessão compartilhada (keep-alive) para o token e as buscas na API ICD-11."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=ICD_HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+class _SingleFlight:
+    """Chamadas concorrentes com a mesma chave compartilham uma única execução."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, Any]] = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["event"].set()
+
+    def do_in_background(self, key: str, fn) -> None:
+        """Dispara fn numa thread daemon, a menos que já exista uma chamada em andamento para a chave."""
+        with self._lock:
+            if key in self._calls:
+                return
+
+        def _run() -> None:
+            try:
+                self.do(key, fn)
+            except Exception as e:
+                logger.warning(f"Atualização em segundo plano '{key[:60]}' falhou: {e}")
+
+        threading.Thread(target=_run, name="ICD11_Revalidate", daemon=True).start()
+
+
+class _ICDResponseCache:
+    """Cache em disco (um JSON por chave) com idade da entrada para TTL / stale-while-revalidate."""
+
+    def __init__(self, cache_dir: str, max_entries: int = ICD_CACHE_MAX_ENTRIES) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Retorna (valor, idade em segundos) ou None."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry["value"], time.time() - entry["stored_at"]
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, IOError) as e:
+            logger.warning(f"Entrada inválida no cache da API ICD-11: {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "stored_at": time.time(), "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            logger.error(f"Erro ao gravar cache da API ICD-11: {e}")
+            return
+        self._maybe_prune()
+
+    def _maybe_prune(self) -> None:
+        """No máximo uma vez por intervalo: remove entradas além da janela stale e limita o total."""
+        now = time.time()
+        with self._prune_lock:
+            if now - self._last_prune < ICD_CACHE_PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune = now
+        try:
+            # mtime == stored_at: cada set() reescreve o arquivo
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        entries.append((entry.stat().st_mtime, entry.path))
+        except OSError as e:
+            logger.warning(f"Erro ao listar cache da API ICD-11: {e}")
+            return
+        entries.sort()
+        expired = sum(1 for mtime, _ in entries if now - mtime >= ICD_CACHE_STALE_SECONDS)
+        doomed = entries[:max(expired, len(entries) - self.max_entries)]
+        for _, path in doomed:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Não foi possível remover entrada do cache da API ICD-11: {e}")
+        if doomed:
+            logger.info(f"Cache da API ICD-11: {len(doomed)} entrada(s) antiga(s) removida(s).")
+
+
+_icd_flight = _SingleFlight()
+_icd_cache = _ICDResponseCache(ICD_CACHE_DIR)
+
+def _compact_cid_code(code: str) -> str:
+    """'a00.1' / 'A00-1' / 'A00 1' -> 'A001' (chave do trie de códigos)."""
+    return re.sub(r"[^A-Z0-9]", "", code.upper())
+
+
+@functools.lru_cache(maxsize=2048)
+def _normalize_query(query: str) -> str:
+    return CIDDatabase._normalize_text_static(query.strip())
+
+
+class CID10Index:
+    """
+    Índice do CID-10 local, construído uma vez no carregamento dos dados.
+
+    - trie de prefixos sobre os códigos compactados (A00, A00.1 e A001 caem no mesmo nó);
+    - índice invertido dos tokens das descrições sem acentos, com vocabulário
+      ordenado para expansão por prefixo via bisect;
+    - descrições normalizadas pré-calculadas para o fallback por substring.
+    """
+
+    _ENTRIES_KEY = ""
+
+    def __init__(self, entries: List[Dict[str, str]]):
+        self.entries = entries
+        self._trie: Dict[str, Any] = {}
+        self._postings: Dict[str, set] = {}
+        self._descriptions: List[str] = []
+        self._codes: List[str] = []
+
+        for idx, entry in enumerate(entries):
+            code = _compact_cid_code(entry["COD_CID"])
+            self._codes.append(code)
+            node = self._trie
+            for char in code:
+                node = node.setdefault(char, {})
+            node.setdefault(self._ENTRIES_KEY, []).append(idx)
+
+            description = CIDDatabase._normalize_text_static(entry["DESCRICAO_CID"])
+            self._descriptions.append(description)
+            for token in set(_CID10_TOKEN_RE.findall(description)):
+                self._postings.setdefault(token, set()).add(idx)
+
+        self._vocab: List[str] = sorted(self._postings)
+        logger.info(f"Índice CID-10 construído: {len(entries)} códigos, {len(self._vocab)} termos.")
+
+    def _code_prefix_matches(self, code_prefix: str) -> List[int]:
+        node = self._trie
+        for char in code_prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        matches: List[int] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            matches.extend(current.get(self._ENTRIES_KEY, []))
+            stack.extend(current[k] for k in sorted(current, reverse=True) if k != self._ENTRIES_KEY)
+        return matches
+
+    def _token_matches(self, token: str) -> Dict[int, int]:
+        """{índice: 2 se o token aparece inteiro, 1 se apenas como prefixo de um termo}."""
+        hits: Dict[int, int] = {}
+        start = bisect.bisect_left(self._vocab, token)
+        for term in self._vocab[start:]:
+            if not term.startswith(token):
+                break
+            weight = 2 if term == token else 1
+            for idx in self._postings[term]:
+                if hits.get(idx, 0) < weight:
+                    hits[idx] = weight
+        return hits
+
+    def search(self, query: str) -> List[Dict[str, str]]:
+        normalized_query = _normalize_query(query)
+        if not normalized_query:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        code_query = _compact_cid_code(normalized_query)
+        if CID10_CODE_QUERY_PATTERN.match(code_query):
+            for idx in self._code_prefix_matches(code_query):
+                # Código exato primeiro, depois os mais próximos (categoria antes das subcategorias)
+                scores[idx] = 100.0 - (len(self._codes[idx]) - len(code_query))
+
+        tokens = list(dict.fromkeys(_CID10_TOKEN_RE.findall(normalized_query)))
+        if tokens:
+            per_token = sorted((self._token_matches(t) for t in tokens), key=len)
+            candidates = set(per_token[0])
+            for hits in per_token[1:]:
+                candidates &= hits.keys()
+            for idx in candidates:
+                score = float(sum(hits[idx] for hits in per_token))
+                if normalized_query in self._descriptions[idx]:
+                    score += len(tokens)
+                # Descrições mais curtas (mais específicas ao termo) primeiro
+                score -= len(self._descriptions[idx]) / 1000.0
+                scores[idx] = max(scores.get(idx, 0.0), score)
+
+        if not scores:
+            # Fallback: trecho no meio de uma palavra (comportamento da busca antiga)
+            for idx, description in enumerate(self._descriptions):
+                if normalized_query in description:
+                    scores[idx] = 0.0
+
+        ranked = sorted(scores, key=lambda idx: (-scores[idx], self._codes[idx]))
+        return [self.entries[idx] for idx in ranked]
+
+
 class CIDDatabase:
     _instance: Optional['CIDDatabase'] = None
     _access_token: Optional[str] = None
     _token_expiry_time: Optional[float] = None
     _cid10_local_data: List[Dict[str, str]] = []
+    _cid10_index: Optional[CID10Index] = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(CIDDatabase, cls).__new__(cls)
             cls._instance._cid10_local_data = CIDDatabase._load_cid10_data_cached()
+            cls._instance._cid10_index = CID10Index(cls._instance._cid10_local_data)
         return cls._instance
 
     @staticmethod
@@ -118,10 +386,16 @@ class CIDDatabase:
             return []
 
     def _get_access_token(self) -> Optional[str]:
-        if self._access_token and self._token_expiry_time and self._token_expiry_time > time.time():
-            logger.info("Token de acesso do ICD API ainda válido.")
+        now = time.time()
+        if self._access_token and self._token_expiry_time and self._token_expiry_time > now:
+            if self._token_expiry_time - now < ICD_TOKEN_REFRESH_MARGIN_SECONDS:
+                logger.info("Token de acesso do ICD API perto de expirar. Renovando em segundo plano.")
+                _icd_flight.do_in_background("token", self._request_access_token)
             return self._access_token
 
+        return _icd_flight.do("token", self._request_access_token)
+
+    def _request_access_token(self) -> Optional[str]:
         if not ICD_API_CLIENT_ID or not ICD_API_CLIENT_SECRET:
             logger.error("ICD_API_CLIENT_ID ou ICD_API_CLIENT_SECRET não configurados no .env. Verifique o arquivo .env.")
             return None
@@ -140,13 +414,13 @@ class CIDDatabase:
         for attempt in range(MAX_RETRIES):
             try:
                 logger.info(f"Obtendo novo token de acesso do ICD API... (tentativa {attempt + 1}/{MAX_RETRIES})")
-                response = requests.post(ICD_API_AUTH_URL, headers=headers, data=data, timeout=10)
+                response = _get_http_session().post(ICD_API_AUTH_URL, headers=headers, data=data, timeout=10)
                 response.raise_for_status()
-                
+
                 token_info = response.json()
-                self._access_token = token_info.get('access_token')
                 expires_in = token_info.get('expires_in', 3600)
                 self._token_expiry_time = time.time() + expires_in - 60
+                self._access_token = token_info.get('access_token')
                 logger.info("Token de acesso do ICD API obtido com sucesso.")
                 return self._access_token
 
@@ -158,23 +432,15 @@ class CIDDatabase:
                     backoff *= 2
                 else:
                     logger.warning("API ICD-11 não disponível após todas as tentativas. Será usado fallback local CID-10.")
-                    self._access_token = None
-                    self._token_expiry_time = None
                     return None
             except requests.exceptions.RequestException as e:
                 logger.error(f"Erro ao obter token de acesso do ICD API: {e}", exc_info=True)
-                self._access_token = None
-                self._token_expiry_time = None
                 return None
             except json.JSONDecodeError as e:
                 logger.error(f"Erro ao decodificar resposta JSON do token do ICD API: {e}", exc_info=True)
-                self._access_token = None
-                self._token_expiry_time = None
                 return None
             except Exception as e:
                 logger.error(f"Erro inesperado ao obter token do ICD API: {e}", exc_info=True)
-                self._access_token = None
-                self._token_expiry_time = None
                 return None
         return None
 
@@ -200,7 +466,7 @@ class CIDDatabase:
         for attempt in range(MAX_RETRIES):
             try:
                 logger.info(f"Buscando '{query}' na API do ICD-11 (tentativa {attempt + 1}/{MAX_RETRIES})...")
-                response = requests.get(ICD_11_API_SEARCH_ENDPOINT, headers=headers, params=params_query, timeout=10) 
+                response = _get_http_session().get(ICD_11_API_SEARCH_ENDPOINT, headers=headers, params=params_query, timeout=10)
                 response.raise_for_status()
                 
                 search_results = response.json()
@@ -243,28 +509,64 @@ class CIDDatabase:
                 return [], False
         return [], False
 
+    def _fetch_cid11_search(self, cache_key: str, query: str) -> Optional[List[Dict[str, str]]]:
+        """Busca na API (token + retry) e grava no cache. None quando a API não respondeu."""
+        token = self._get_access_token()
+        if not token:
+            logger.warning("Não foi possível obter token de acesso para a API do ICD-11.")
+            return None
+        results, api_available = CIDDatabase._search_cid11_text_with_retry(query, token)
+        if not api_available:
+            return None
+        _icd_cache.set(cache_key, results)
+        return results
+
+    def _search_cid11_cached(self, query: str) -> Tuple[List[Dict[str, str]], bool]:
+        """
+        Busca no ICD-11 passando pelo cache em disco.
+
+        Entrada dentro do TTL é servida direto; entrada velha (até ICD_CACHE_STALE_SECONDS)
+        é servida e revalidada em segundo plano; sem entrada utilizável a busca é feita na
+        hora. Buscas idênticas concorrentes compartilham a mesma chamada (single-flight) e,
+        se a API falhar, uma entrada velha ainda é preferida ao fallback local.
+        """
+        cache_key = f"search|{ICD_11_API_SEARCH_ENDPOINT}|{_normalize_query(query)}"
+        cached = _icd_cache.get(cache_key)
+        if cached is not None:
+            value, age = cached
+            if age < ICD_CACHE_TTL_SECONDS:
+                return value, True
+            if age < ICD_CACHE_STALE_SECONDS:
+                _icd_flight.do_in_background(cache_key, lambda: self._fetch_cid11_search(cache_key, query))
+                return value, True
+
+        try:
+            results = _icd_flight.do(cache_key, lambda: self._fetch_cid11_search(cache_key, query))
+        except Exception as e:
+            logger.error(f"Erro inesperado ao buscar '{query}' na API do ICD-11: {e}", exc_info=True)
+            results = None
+
+        if results is not None:
+            return results, True
+        if cached is not None:
+            logger.warning(f"API ICD-11 indisponível. Servindo resultado expirado do cache para '{query}'.")
+            return cached[0], True
+        return [], False
+
     def search_cid11_text(self, query: str, fallback_to_local: bool = True) -> Tuple[List[Dict[str, str]], str]:
         if not query:
             return [], ""
 
-        token = self._get_access_token()
-        if not token:
-            logger.warning("Não foi possível obter token de acesso para a API do ICD-11. Utilizando dados locais CID-10.")
-            if fallback_to_local and self._cid10_local_data:
-                local_results = self.search_cid10_local(query)
-                return local_results, "⚠️ API ICD-11 indisponível. Exibindo resultados do banco de dados local CID-10."
-            return [], "⚠️ API ICD-11 indisponível e não há dados locais disponíveis."
+        results, api_available = self._search_cid11_cached(query)
 
-        results, api_available = CIDDatabase._search_cid11_text_with_retry(query, token)
-        
         if api_available:
             return results, ""
-        
+
         if fallback_to_local and self._cid10_local_data:
             logger.warning("API ICD-11 offline. Utilizando fallback para dados locais CID-10.")
             local_results = self.search_cid10_local(query)
             return local_results, "⚠️ API ICD-11 temporariamente indisponível. Exibindo resultados do banco de dados local CID-10."
-        
+
         return [], "⚠️ API ICD-11 indisponível e não há dados locais disponíveis."
 
     @staticmethod
@@ -274,19 +576,10 @@ class CIDDatabase:
             return []
         
         instance = CIDDatabase._instance
-        if not instance or not instance._cid10_local_data:
+        if not instance or not instance._cid10_local_data or instance._cid10_index is None:
             return []
 
-        normalized_query = CIDDatabase._normalize_text_static(query)
-        results = []
-
-        for cid_entry in instance._cid10_local_data:
-            normalized_code = CIDDatabase._normalize_text_static(cid_entry["COD_CID"])
-            normalized_description = CIDDatabase._normalize_text_static(cid_entry["DESCRICAO_CID"])
-
-            if normalized_query in normalized_code or normalized_query in normalized_description:
-                results.append(cid_entry)
-        
+        results = instance._cid10_index.search(query)
         logger.info(f"Encontrados {len(results)} CIDs no banco de dados local para a query '{query}'.")
         return results
 
@@ -1,6 +1,10 @@
+import bisect
 import logging
 from datetime import date, timedelta
-from typing import Dict, Any, Tuple, Optional, List
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Tuple, Optional, List
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +72,35 @@ CIPA_DIMENSIONING_TABLE: Dict[int, Dict[Tuple[int, int], Dict[str, Any]]] = {
     }
 }
 
+CIPA_OBS_BELOW_20 = 'Estabelecimento com menos de 20 funcionários não se enquadra no Quadro I da NR-05 para constituição de CIPA. A organização deve nomear um representante da organização para auxiliar nas ações de prevenção.'
+CIPA_OBS_INVALID_GRADE = 'Grau de Risco inválido ou fora do intervalo esperado (1-4).'
+CIPA_OBS_NOT_FOUND = 'Não foi possível determinar o dimensionamento. Verifique os dados de entrada.'
+
+# Situação de cada linha em get_cipa_dimensioning_batch
+CIPA_STATUS_OK = 0
+CIPA_STATUS_BELOW_20 = 1
+CIPA_STATUS_INVALID_GRADE = 2
+CIPA_STATUS_NOT_FOUND = 3
+
+
+def _compile_cipa_intervals(
+    table: Dict[int, Dict[Tuple[int, int], Dict[str, Any]]]
+) -> Dict[int, Tuple[List[int], List[float], List[Dict[str, Any]]]]:
+    """Quadro I como faixas ordenadas por limite inferior (limites, tetos, dados) para busca binária."""
+    compiled = {}
+    for grau_risco, ranges in table.items():
+        ordered = sorted(ranges.items(), key=lambda item: item[0][0])
+        compiled[grau_risco] = (
+            [low for (low, _), _ in ordered],
+            [high for (_, high), _ in ordered],
+            [data for _, data in ordered],
+        )
+    return compiled
+
+
+_CIPA_INTERVALS = _compile_cipa_intervals(CIPA_DIMENSIONING_TABLE)
+
+
 def get_cipa_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any]:
     """
     Retorna o dimensionamento da CIPA (membros efetivos e suplentes)
@@ -83,33 +116,76 @@ def get_cipa_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any]
     """
     if num_employees < 20:
         logger.info(f"Estabelecimento com {num_employees} funcionários não se enquadra no Quadro I da NR-05 para constituição de CIPA.")
-        return {'efetivos': 0, 'suplentes': 0, 'observacao': 'Estabelecimento com menos de 20 funcionários não se enquadra no Quadro I da NR-05 para constituição de CIPA. A organização deve nomear um representante da organização para auxiliar nas ações de prevenção.'}
+        return {'efetivos': 0, 'suplentes': 0, 'observacao': CIPA_OBS_BELOW_20}
 
     if grau_risco not in CIPA_DIMENSIONING_TABLE:
         logger.error(f"Grau de Risco {grau_risco} inválido ou não encontrado na tabela de dimensionamento da CIPA.")
-        return {'efetivos': 0, 'suplentes': 0, 'observacao': 'Grau de Risco inválido ou fora do intervalo esperado (1-4).'}
-
-    risk_table = CIPA_DIMENSIONING_TABLE[grau_risco]
-
-    for (min_emp, max_emp), data in risk_table.items():
-        if min_emp <= num_employees <= max_emp:
-            if max_emp == float('inf'): # Caso especial para mais de 10.000 funcionários
-                efetivos = data['base_efetivos']
-                suplentes = data['base_suplentes']
-                
-                remaining_employees = num_employees - data['increment_base']
-                if remaining_employees > 0:
-                    # Calcula o número de grupos de incremento, arredondando para cima
-                    num_groups = (remaining_employees + data['increment_per_group'] - 1) // data['increment_per_group']
-                    efetivos += num_groups * data['efetivos_add']
-                    suplentes += num_groups * data['suplentes_add']
-                
-                return {'efetivos': efetivos, 'suplentes': suplentes}
-            else:
-                return {'efetivos': data['efetivos'], 'suplentes': data['suplentes']}
-    
+        return {'efetivos': 0, 'suplentes': 0, 'observacao': CIPA_OBS_INVALID_GRADE}
+
+    lows, highs, rows = _CIPA_INTERVALS[grau_risco]
+    index = bisect.bisect_right(lows, num_employees) - 1
+    if index >= 0 and num_employees <= highs[index]:
+        data = rows[index]
+        if highs[index] == float('inf'): # Caso especial para mais de 10.000 funcionários
+            efetivos = data['base_efetivos']
+            suplentes = data['base_suplentes']
+
+            remaining_employees = num_employees - data['increment_base']
+            if remaining_employees > 0:
+                # Calcula o número de grupos de incremento, arredondando para cima
+                num_groups = (remaining_employees + data['increment_per_group'] - 1) // data['increment_per_group']
+                efetivos += num_groups * data['efetivos_add']
+                suplentes += num_groups * data['suplentes_add']
+
+            return {'efetivos': efetivos, 'suplentes': suplentes}
+        return {'efetivos': data['efetivos'], 'suplentes': data['suplentes']}
+
     logger.warning(f"Não foi possível encontrar dimensionamento para GR {grau_risco} e {num_employees} funcionários.")
-    return {'efetivos': 0, 'suplentes': 0, 'observacao': 'Não foi possível determinar o dimensionamento. Verifique os dados de entrada.'}
+    return {'efetivos': 0, 'suplentes': 0, 'observacao': CIPA_OBS_NOT_FOUND}
+
+
+def get_cipa_dimensioning_batch(
+    graus_risco: Iterable[int], num_employees: Iterable[int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Versão vetorizada de get_cipa_dimensioning para muitos estabelecimentos.
+
+    Returns:
+        Arrays (efetivos, suplentes, situacao) alinhados à entrada; situacao usa
+        as constantes CIPA_STATUS_* (observações correspondentes em CIPA_OBS_*).
+    """
+    grades = np.asarray(graus_risco, dtype=np.int64)
+    employees = np.asarray(num_employees, dtype=np.int64)
+    efetivos = np.zeros(len(employees), dtype=np.int64)
+    suplentes = np.zeros(len(employees), dtype=np.int64)
+    status = np.full(len(employees), CIPA_STATUS_INVALID_GRADE, dtype=np.int8)
+
+    for grau_risco, (lows, highs, rows) in _CIPA_INTERVALS.items():
+        rows_idx = np.flatnonzero((grades == grau_risco) & (employees >= 20))
+        if not len(rows_idx):
+            continue
+        n = employees[rows_idx]
+        index = np.searchsorted(np.asarray(lows), n, side='right') - 1
+        highs_arr = np.asarray(highs, dtype=np.float64)
+        found = (index >= 0) & (n <= highs_arr[np.maximum(index, 0)])
+        status[rows_idx] = np.where(found, CIPA_STATUS_OK, CIPA_STATUS_NOT_FOUND)
+
+        for i, data in enumerate(rows):
+            hit = found & (index == i)
+            if not hit.any():
+                continue
+            target = rows_idx[hit]
+            if highs[i] == float('inf'):
+                remaining = np.maximum(employees[target] - data['increment_base'], 0)
+                groups = (remaining + data['increment_per_group'] - 1) // data['increment_per_group']
+                efetivos[target] = data['base_efetivos'] + groups * data['efetivos_add']
+                suplentes[target] = data['base_suplentes'] + groups * data['suplentes_add']
+            else:
+                efetivos[target] = data['efetivos']
+                suplentes[target] = data['suplentes']
+
+    status[employees < 20] = CIPA_STATUS_BELOW_20
+    return efetivos, suplentes, status
 
 
 # --- Funções e Dados para o Cronograma Eleitoral da CIPA ---
@@ -161,35 +237,33 @@ BRAZILIAN_NATIONAL_HOLIDAYS: List[date] = [
     date(2027, 12, 25)  # Natal
 ]
 
+@lru_cache(maxsize=8)
+def _busday_calendar(holidays: Tuple[date, ...]) -> np.busdaycalendar:
+    return np.busdaycalendar(weekmask='1111100', holidays=np.array(holidays, dtype='datetime64[D]'))
+
+def get_busday_calendar(holidays: Iterable[date] = BRAZILIAN_NATIONAL_HOLIDAYS) -> np.busdaycalendar:
+    """Calendário de dias úteis (segunda a sexta, sem os feriados) para numpy.busday_offset."""
+    return _busday_calendar(tuple(holidays))
+
 def is_working_day(day: date, holidays: List[date]) -> bool:
     """Verifica se um determinado dia é um dia útil (não é fim de semana nem feriado)."""
-    return day.weekday() < 5 and day not in holidays
+    return bool(np.is_busday(np.datetime64(day, 'D'), busdaycal=get_busday_calendar(holidays)))
 
 def find_next_working_day(start_day: date, holidays: List[date]) -> date:
     """Encontra o próximo dia útil a partir de (e incluindo) start_day."""
-    current_day = start_day
-    while not is_working_day(current_day, holidays):
-        current_day += timedelta(days=1)
-    return current_day
+    return np.busday_offset(np.datetime64(start_day, 'D'), 0, roll='forward',
+                            busdaycal=get_busday_calendar(holidays)).astype(date)
 
 def find_previous_working_day(start_day: date, holidays: List[date]) -> date:
     """Encontra o dia útil anterior a partir de (e incluindo) start_day."""
-    current_day = start_day
-    while not is_working_day(current_day, holidays):
-        current_day -= timedelta(days=1)
-    return current_day
+    return np.busday_offset(np.datetime64(start_day, 'D'), 0, roll='backward',
+                            busdaycal=get_busday_calendar(holidays)).astype(date)
 
 def add_working_days(start_day: date, days_to_add: int, holidays: List[date]) -> date:
     """Adiciona um número especificado de dias úteis a uma data de início."""
-    current_day = start_day
-    # Garante que o dia de início seja um dia útil para começar a contagem
-    current_day = find_next_working_day(current_day, holidays)
-    
-    while days_to_add > 0:
-        current_day += timedelta(days=1)
-        if is_working_day(current_day, holidays):
-            days_to_add -= 1
-    return current_day
+    # roll='forward' garante que a contagem comece em um dia útil
+    return np.busday_offset(np.datetime64(start_day, 'D'), max(days_to_add, 0), roll='forward',
+                            busdaycal=get_busday_calendar(holidays)).astype(date)
 
 def calculate_election_schedule(
     mandate_end_date: date, # Agora este é o input principal
@@ -361,3 +435,89 @@ def calculate_election_schedule(
     schedule['ordered_items'] = sorted(ordered_items_raw, key=lambda x: (x[0], x[3])) # Usando o key para ordenação
     schedule['warnings'] = warnings
     return schedule
+
+
+# Colunas de calculate_election_schedules, na ordem cronológica usual
+ELECTION_SCHEDULE_COLUMNS = [
+    'data_publicacao_edital', 'constituicao_comissao_eleitoral', 'comunicacao_sindicato',
+    'inicio_inscricoes', 'fim_inscricoes', 'publicacao_relacao_inscritos', 'data_eleicao',
+    'apuracao_votos', 'divulgacao_resultado', 'prazo_final_denuncias', 'data_posse', 'ata_da_posse',
+    'criar_calendario_reunioes', 'prazo_final_treinamento_mandato_subsequente',
+    'prazo_final_treinamento_primeiro_mandato',
+]
+
+
+def calculate_election_schedules(
+    mandate_end_dates: Iterable[Any],
+    holidays: List[date] = BRAZILIAN_NATIONAL_HOLIDAYS,
+    today: Optional[date] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Versão vetorizada de calculate_election_schedule para muitos mandatos.
+
+    Aplica as mesmas regras da NR-05 com numpy.busday_offset sobre arrays
+    datetime64[D]. Datas de término ausentes (NaT) resultam em NaT.
+
+    Returns:
+        Dicionário coluna -> array datetime64[D] (ELECTION_SCHEDULE_COLUMNS) e
+        arrays booleanos com os avisos: 'mandato_no_passado', 'edital_atrasado',
+        'edital_menos_60_dias', 'eleicao_atrasada', 'eleicao_menos_30_dias'.
+    """
+    end = np.asarray(mandate_end_dates, dtype='datetime64[D]')
+    valid = ~np.isnat(end)
+    cal = get_busday_calendar(holidays)
+    day = np.timedelta64(1, 'D')
+
+    def forward(days: np.ndarray, offset: int = 0) -> np.ndarray:
+        return np.busday_offset(days, offset, roll='forward', busdaycal=cal)
+
+    def backward(days: np.ndarray) -> np.ndarray:
+        return np.busday_offset(days, 0, roll='backward', busdaycal=cal)
+
+    e = end[valid]
+    posse = forward(e + day)
+    eleicao = backward(e - 30 * day)
+    publicacao_inscritos = backward(eleicao - day)
+    fim_inscricoes = backward(publicacao_inscritos - day)
+    inicio_inscricoes = forward(fim_inscricoes - 14 * day)
+    edital = np.minimum(backward(e - 60 * day), backward(inicio_inscricoes - day))
+    dia_apos_posse = forward(posse + day)
+
+    computed = {
+        'data_publicacao_edital': edital,
+        'constituicao_comissao_eleitoral': edital,
+        'comunicacao_sindicato': forward(edital + day),
+        'inicio_inscricoes': inicio_inscricoes,
+        'fim_inscricoes': fim_inscricoes,
+        'publicacao_relacao_inscritos': publicacao_inscritos,
+        'data_eleicao': eleicao,
+        'apuracao_votos': eleicao,
+        'divulgacao_resultado': eleicao,
+        'prazo_final_denuncias': forward(eleicao + 30 * day),
+        'data_posse': posse,
+        'ata_da_posse': dia_apos_posse,
+        'criar_calendario_reunioes': dia_apos_posse,
+        'prazo_final_treinamento_mandato_subsequente': backward(posse - day),
+        'prazo_final_treinamento_primeiro_mandato': forward(posse, 30),
+    }
+
+    schedules: Dict[str, np.ndarray] = {}
+    for column in ELECTION_SCHEDULE_COLUMNS:
+        values = np.full(len(end), np.datetime64('NaT'), dtype='datetime64[D]')
+        values[valid] = computed[column]
+        schedules[column] = values
+
+    today_d = np.datetime64(today or date.today(), 'D')
+    with np.errstate(invalid='ignore'):
+        edital_atrasado = valid & (schedules['data_publicacao_edital'] < today_d)
+        eleicao_atrasada = valid & (schedules['data_eleicao'] < today_d)
+        schedules['mandato_no_passado'] = valid & (end < today_d)
+        schedules['edital_atrasado'] = edital_atrasado
+        schedules['edital_menos_60_dias'] = (
+            valid & ~edital_atrasado & ((end - schedules['data_publicacao_edital']) < 60 * day)
+        )
+        schedules['eleicao_atrasada'] = eleicao_atrasada
+        schedules['eleicao_menos_30_dias'] = (
+            valid & ~eleicao_atrasada & ((end - schedules['data_eleicao']) < 30 * day)
+        )
+    return schedules
@@ -1,6 +1,13 @@
+import bisect
+import json
 import logging
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from safety_ai_app.cnae_risk_data_processor import CNAERiskDataProcessor
 
@@ -8,16 +15,304 @@ logger = logging.getLogger(__name__)
 
 CNAE_BASE_URL = "https://servicodados.ibge.gov.br/api/v2/cnae/"
 
+# --- SNAPSHOT LOCAL DA HIERARQUIA ---
+LOCAL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
+CNAE_SNAPSHOT_FILE = os.path.join(LOCAL_CACHE_DIR, "cnae_hierarchy_snapshot.json")
+CNAE_SNAPSHOT_MAX_AGE = timedelta(days=30)
+CNAE_SNAPSHOT_CHECK_INTERVAL_SECONDS = 6 * 3600
+# Incrementar quando o formato do snapshot mudar: snapshots de outra versão são descartados e baixados de novo
+CNAE_SNAPSHOT_VERSION = 1
+
+CNAE_LEVELS = ["secoes", "divisoes", "grupos", "classes", "subclasses"]
+# Chave do objeto pai em cada item retornado pela API do IBGE
+CNAE_PARENT_KEYS = {"divisoes": "secao", "grupos": "divisao", "classes": "grupo", "subclasses": "classe"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold_text(text: str) -> str:
+    return unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def _split_ids(ids: str) -> List[str]:
+    """'01.11-3|0112-1' -> ['01113', '01121'] (mesmo formato de lista aceito pela API)."""
+    return [re.sub(r"[^0-9A-Za-z]", "", part).upper() for part in ids.split("|") if part.strip()]
+
+
+class CNAEHierarchy:
+    """
+    Hierarquia completa da CNAE em memória.
+
+    Cada nível guarda arrays paralelos (ids, descrições, índice do pai no nível
+    anterior, atividades quando a API as fornece) e a lista de filhos no nível
+    seguinte; as descrições de todos os
+    níveis alimentam um índice invertido de tokens sem acentos com vocabulário
+    ordenado para expansão por prefixo.
+    """
+
+    def __init__(self, levels: Dict[str, Dict[str, List[Any]]], built_at: datetime):
+        self.built_at = built_at
+        self.ids: Dict[str, List[str]] = {}
+        self.descricoes: Dict[str, List[str]] = {}
+        self.parents: Dict[str, List[int]] = {}
+        self.atividades: Dict[str, Optional[List[List[str]]]] = {}
+        self.children: Dict[str, List[List[int]]] = {}
+        self._positions: Dict[str, Dict[str, int]] = {}
+
+        for level in CNAE_LEVELS:
+            data = levels[level]
+            self.ids[level] = data["ids"]
+            self.descricoes[level] = data["descricoes"]
+            self.parents[level] = data.get("parents") or [-1] * len(data["ids"])
+            self.atividades[level] = data.get("atividades")
+            self._positions[level] = {cnae_id: i for i, cnae_id in enumerate(data["ids"])}
+
+        for parent_level, child_level in zip(CNAE_LEVELS, CNAE_LEVELS[1:]):
+            children: List[List[int]] = [[] for _ in self.ids[parent_level]]
+            for child_idx, parent_idx in enumerate(self.parents[child_level]):
+                if parent_idx >= 0:
+                    children[parent_idx].append(child_idx)
+            self.children[parent_level] = children
+
+        self._postings: Dict[str, List[Tuple[str, int]]] = {}
+        for level in CNAE_LEVELS:
+            for idx, descricao in enumerate(self.descricoes[level]):
+                for token in set(_TOKEN_RE.findall(_fold_text(descricao))):
+                    self._postings.setdefault(token, []).append((level, idx))
+        self._vocab: List[str] = sorted(self._postings)
+
+    # ------------------------------------------------------------------
+    # Construção / persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_api_items(cls, items_by_level: Dict[str, List[Dict[str, Any]]]) -> 'CNAEHierarchy':
+        """Monta a hierarquia a partir das listas completas de cada nível retornadas pela API."""
+        levels: Dict[str, Dict[str, List[Any]]] = {}
+        for level in CNAE_LEVELS:
+            items = sorted(items_by_level[level], key=lambda item: str(item.get("id", "")))
+            ids = [str(item["id"]) for item in items]
+            descricoes = [item.get("descricao", "") for item in items]
+            parents: List[int] = []
+            parent_key = CNAE_PARENT_KEYS.get(level)
+            if parent_key:
+                parent_level = CNAE_LEVELS[CNAE_LEVELS.index(level) - 1]
+                parent_positions = {cnae_id: i for i, cnae_id in enumerate(levels[parent_level]["ids"])}
+                for item in items:
+                    parent_id = str((item.get(parent_key) or {}).get("id", ""))
+                    parents.append(parent_positions.get(parent_id, -1))
+            levels[level] = {"ids": ids, "descricoes": descricoes, "parents": parents}
+            if any("atividades" in item for item in items):
+                levels[level]["atividades"] = [list(item.get("atividades") or []) for item in items]
+        return cls(levels, datetime.now())
+
+    def to_dict(self) -> Dict[str, Any]:
+        levels: Dict[str, Dict[str, Any]] = {}
+        for level in CNAE_LEVELS:
+            levels[level] = {"ids": self.ids[level], "descricoes": self.descricoes[level], "parents": self.parents[level]}
+            if self.atividades[level] is not None:
+                levels[level]["atividades"] = self.atividades[level]
+        return {"version": CNAE_SNAPSHOT_VERSION, "built_at": self.built_at.isoformat(), "levels": levels}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CNAEHierarchy':
+        if data.get("version") != CNAE_SNAPSHOT_VERSION:
+            raise ValueError(f"versão {data.get('version')} do snapshot, esperada {CNAE_SNAPSHOT_VERSION}")
+        return cls(data["levels"], datetime.fromisoformat(data["built_at"]))
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _with_ancestors(self, level: str, idx: int) -> Dict[str, Any]:
+        """{id, descricao} com a cadeia de pais aninhada (classe → grupo → divisao → secao), como na API."""
+        node: Dict[str, Any] = {"id": self.ids[level][idx], "descricao": self.descricoes[level][idx]}
+        parent_key = CNAE_PARENT_KEYS.get(level)
+        parent_idx = self.parents[level][idx] if parent_key else -1
+        if parent_key and parent_idx >= 0:
+            parent_level = CNAE_LEVELS[CNAE_LEVELS.index(level) - 1]
+            node[parent_key] = self._with_ancestors(parent_level, parent_idx)
+        return node
+
+    def item(self, level: str, idx: int) -> Dict[str, Any]:
+        """Item no formato da API: id, descricao, pais aninhados até a seção e atividades."""
+        item = self._with_ancestors(level, idx)
+        atividades = self.atividades[level]
+        if atividades is not None:
+            item["atividades"] = list(atividades[idx])
+        return item
+
+    def lookup(self, level: str, ids: Optional[str] = None) -> List[int]:
+        if not ids:
+            return list(range(len(self.ids[level])))
+        positions = self._positions[level]
+        return [positions[cnae_id] for cnae_id in _split_ids(ids) if cnae_id in positions]
+
+    def descendants(self, ancestor_level: str, ancestor_ids: str, level: str) -> List[int]:
+        indices = self.lookup(ancestor_level, ancestor_ids)
+        current_level = ancestor_level
+        while current_level != level:
+            indices = [child for idx in indices for child in self.children[current_level][idx]]
+            current_level = CNAE_LEVELS[CNAE_LEVELS.index(current_level) + 1]
+        return indices
+
+    def search(self, query: str, level: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Todos os tokens da consulta (por prefixo), ordenado por acertos exatos e nível mais amplo."""
+        tokens = list(dict.fromkeys(_TOKEN_RE.findall(_fold_text(query))))
+        if not tokens:
+            return []
+
+        scores: Optional[Dict[Tuple[str, int], int]] = None
+        for token in tokens:
+            hits: Dict[Tuple[str, int], int] = {}
+            start = bisect.bisect_left(self._vocab, token)
+            for term in self._vocab[start:]:
+                if not term.startswith(token):
+                    break
+                weight = 2 if term == token else 1
+                for key in self._postings[term]:
+                    if hits.get(key, 0) < weight:
+                        hits[key] = weight
+            if scores is None:
+                scores = hits
+            else:
+                scores = {key: score + hits[key] for key, score in scores.items() if key in hits}
+            if not scores:
+                return []
+
+        matches = [key for key in scores if level is None or key[0] == level]
+        matches.sort(key=lambda key: (-scores[key], CNAE_LEVELS.index(key[0]), self.ids[key[0]][key[1]]))
+        return matches
+
+
 class CNAEDataProcessor:
     _instance: Optional['CNAEDataProcessor'] = None
     _risk_processor: Optional[CNAERiskDataProcessor] = None
+    _hierarchy: Optional[CNAEHierarchy] = None
+    _refresh_thread: Optional[threading.Thread] = None
+    _stop_event = threading.Event()
+    _refresh_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None: # CORREÇÃO AQUI: === substituído por is
             cls._instance = super(CNAEDataProcessor, cls).__new__(cls)
             cls._instance._risk_processor = CNAERiskDataProcessor()
+            cls._instance._init_snapshot()
         return cls._instance
 
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def _init_snapshot(self) -> None:
+        self._hierarchy = self._load_snapshot()
+        if self._hierarchy is None:
+            self.refresh_snapshot()
+        self._start_refresh_schedule()
+
+    @staticmethod
+    def _load_snapshot() -> Optional[CNAEHierarchy]:
+        if not os.path.exists(CNAE_SNAPSHOT_FILE):
+            return None
+        try:
+            with open(CNAE_SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+                hierarchy = CNAEHierarchy.from_dict(json.load(f))
+            logger.info(f"Snapshot da hierarquia CNAE carregado (gerado em {hierarchy.built_at:%Y-%m-%d}).")
+            return hierarchy
+        except (json.JSONDecodeError, KeyError, ValueError, IOError) as e:
+            logger.warning(f"Snapshot da hierarquia CNAE inválido em '{CNAE_SNAPSHOT_FILE}': {e}")
+            return None
+
+    @staticmethod
+    def _save_snapshot(hierarchy: CNAEHierarchy) -> None:
+        try:
+            os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{CNAE_SNAPSHOT_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(hierarchy.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, CNAE_SNAPSHOT_FILE)
+            logger.info(f"Snapshot da hierarquia CNAE salvo em '{CNAE_SNAPSHOT_FILE}'.")
+        except IOError as e:
+            logger.warning(f"Não foi possível salvar o snapshot da hierarquia CNAE: {e}")
+
+    @staticmethod
+    def _fetch_level(level: str) -> List[Dict[str, Any]]:
+        response = requests.get(f"{CNAE_BASE_URL}{level}", timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        return [data] if isinstance(data, dict) else data
+
+    def refresh_snapshot(self) -> bool:
+        """
+        Baixa a hierarquia completa (uma requisição por nível) e troca o snapshot em memória e em disco.
+        Em caso de falha o snapshot anterior continua em uso.
+        """
+        with CNAEDataProcessor._refresh_lock:
+            try:
+                logger.info("Atualizando snapshot da hierarquia CNAE a partir da API do IBGE...")
+                items_by_level = {level: self._fetch_level(level) for level in CNAE_LEVELS}
+                hierarchy = CNAEHierarchy.from_api_items(items_by_level)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                logger.warning(f"API CNAE indisponível para atualizar o snapshot: {e}. Mantendo a versão local.")
+                return False
+            self._save_snapshot(hierarchy)
+            self._hierarchy = hierarchy
+            logger.info(
+                "Snapshot da hierarquia CNAE atualizado: "
+                + ", ".join(f"{len(hierarchy.ids[level])} {level}" for level in CNAE_LEVELS)
+            )
+            return True
+
+    def _start_refresh_schedule(self) -> None:
+        if CNAEDataProcessor._refresh_thread and CNAEDataProcessor._refresh_thread.is_alive():
+            return
+
+        def _loop() -> None:
+            while not CNAEDataProcessor._stop_event.wait(timeout=CNAE_SNAPSHOT_CHECK_INTERVAL_SECONDS):
+                hierarchy = self._hierarchy
+                if hierarchy is None or datetime.now() - hierarchy.built_at > CNAE_SNAPSHOT_MAX_AGE:
+                    self.refresh_snapshot()
+
+        hierarchy = self._hierarchy
+        if hierarchy is not None and datetime.now() - hierarchy.built_at > CNAE_SNAPSHOT_MAX_AGE:
+            threading.Thread(target=self.refresh_snapshot, name="CNAE_SnapshotRefresh", daemon=True).start()
+
+        CNAEDataProcessor._refresh_thread = threading.Thread(target=_loop, name="CNAE_SnapshotSchedule", daemon=True)
+        CNAEDataProcessor._refresh_thread.start()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _add_risk_levels(self, items: List[Dict[str, Any]], level: str) -> List[Dict[str, Any]]:
+        if level not in ("classes", "subclasses"):
+            return items
+        for item in items:
+            cnae_id = item.get('id')
+            if cnae_id:
+                risk_level = self._risk_processor.get_risk_level(cnae_id)
+                if risk_level is not None:
+                    item['grau_de_risco'] = risk_level
+                    logger.debug(f"Grau de Risco {risk_level} adicionado para CNAE {cnae_id}.")
+        return items
+
+    def _serve(
+        self,
+        endpoint: str,
+        level: str,
+        ids: Optional[str] = None,
+        ancestor: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Responde do snapshot em memória; sem snapshot, consulta a API diretamente."""
+        hierarchy = self._hierarchy
+        if hierarchy is None:
+            return self._make_api_request(endpoint, ids)
+        if ancestor:
+            indices = hierarchy.descendants(ancestor[0], ancestor[1], level)
+        else:
+            indices = hierarchy.lookup(level, ids)
+        return self._add_risk_levels([hierarchy.item(level, idx) for idx in indices], level)
+
     def _make_api_request(self, endpoint: str, ids: Optional[str] = None) -> List[Dict[str, Any]]:
         url = f"{CNAE_BASE_URL}{endpoint}"
         if ids:
@@ -54,39 +349,39 @@ class CNAEDataProcessor:
         return []
 
     def get_sections(self, ids: Optional[str] = None) -> List[Dict[str, Any]]:
-        return self._make_api_request("secoes", ids)
+        return self._serve("secoes", "secoes", ids)
 
     def get_divisions(self, ids: Optional[str] = None, section_ids: Optional[str] = None) -> List[Dict[str, Any]]:
         if section_ids:
-            return self._make_api_request(f"secoes/{section_ids}/divisoes")
-        return self._make_api_request("divisoes", ids)
+            return self._serve(f"secoes/{section_ids}/divisoes", "divisoes", ancestor=("secoes", section_ids))
+        return self._serve("divisoes", "divisoes", ids)
 
     def get_groups(self, ids: Optional[str] = None, division_ids: Optional[str] = None, section_ids: Optional[str] = None) -> List[Dict[str, Any]]:
         if division_ids:
-            return self._make_api_request(f"divisoes/{division_ids}/grupos")
+            return self._serve(f"divisoes/{division_ids}/grupos", "grupos", ancestor=("divisoes", division_ids))
         if section_ids:
-            return self._make_api_request(f"secoes/{section_ids}/grupos")
-        return self._make_api_request("grupos", ids)
+            return self._serve(f"secoes/{section_ids}/grupos", "grupos", ancestor=("secoes", section_ids))
+        return self._serve("grupos", "grupos", ids)
 
     def get_classes(self, ids: Optional[str] = None, group_ids: Optional[str] = None, division_ids: Optional[str] = None, section_ids: Optional[str] = None) -> List[Dict[str, Any]]:
         if group_ids:
-            return self._make_api_request(f"grupos/{group_ids}/classes")
+            return self._serve(f"grupos/{group_ids}/classes", "classes", ancestor=("grupos", group_ids))
         if division_ids:
-            return self._make_api_request(f"divisoes/{division_ids}/classes")
+            return self._serve(f"divisoes/{division_ids}/classes", "classes", ancestor=("divisoes", division_ids))
         if section_ids:
-            return self._make_api_request(f"secoes/{section_ids}/classes")
-        return self._make_api_request("classes", ids)
+            return self._serve(f"secoes/{section_ids}/classes", "classes", ancestor=("secoes", section_ids))
+        return self._serve("classes", "classes", ids)
 
     def get_subclasses(self, ids: Optional[str] = None, class_ids: Optional[str] = None, group_ids: Optional[str] = None, division_ids: Optional[str] = None, section_ids: Optional[str] = None) -> List[Dict[str, Any]]:
         if class_ids:
-            return self._make_api_request(f"classes/{class_ids}/subclasses")
+            return self._serve(f"classes/{class_ids}/subclasses", "subclasses", ancestor=("classes", class_ids))
         if group_ids:
-            return self._make_api_request(f"grupos/{group_ids}/subclasses")
+            return self._serve(f"grupos/{group_ids}/subclasses", "subclasses", ancestor=("grupos", group_ids))
         if division_ids:
-            return self._make_api_request(f"divisoes/{division_ids}/subclasses")
+            return self._serve(f"divisoes/{division_ids}/subclasses", "subclasses", ancestor=("divisoes", division_ids))
         if section_ids:
-            return self._make_api_request(f"secoes/{section_ids}/subclasses")
-        return self._make_api_request("subclasses", ids)
+            return self._serve(f"secoes/{section_ids}/subclasses", "subclasses", ancestor=("secoes", section_ids))
+        return self._serve("subclasses", "subclasses", ids)
 
     def search_cnae_by_id(self, cnae_id: str, level: str) -> List[Dict[str, Any]]:
         if not cnae_id:
@@ -97,8 +392,24 @@ class CNAEDataProcessor:
             logger.warning(f"Nível de busca '{level}' inválido. Retornando lista vazia.")
             return []
             
-        return self._make_api_request(level, cnae_id)
+        return self._serve(level, level, cnae_id)
+
+    def search_cnae_by_description(self, query: str, level: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Busca por palavras da descrição (sem acentos, por prefixo) em todos os níveis ou só em `level`.
+        Cada item traz a chave 'nivel' com o nível da hierarquia.
+        """
+        if not query:
+            return []
+        hierarchy = self._hierarchy
+        if hierarchy is None:
+            logger.warning("Snapshot da hierarquia CNAE indisponível. Busca por descrição não realizada.")
+            return []
 
-    def search_cnae_by_description(self, query: str) -> List[Dict[str, Any]]:
-        logger.warning("A busca por descrição da CNAE não é diretamente suportada pela API do IBGE de forma eficiente. Considere implementar um cache local ou buscar por ID.")
-        return []
\ No newline at end of file
+        results = []
+        for match_level, idx in hierarchy.search(query, level):
+            item = hierarchy.item(match_level, idx)
+            item['nivel'] = match_level
+            results.append(self._add_risk_levels([item], match_level)[0])
+        logger.info(f"Encontrados {len(results)} CNAEs para a descrição '{query}'.")
+        return results
@@ -1,11 +1,12 @@
 import logging
 import os
+import re
 import pandas as pd
 import streamlit as st
 import io
 import tempfile
 import shutil
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 import requests
 
 from safety_ai_app.google_drive_integrator import (
@@ -18,10 +19,21 @@ logger = logging.getLogger(__name__)
 LOCAL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
 CNAE_RISK_CACHE_FILE = os.path.join(LOCAL_CACHE_DIR, "cnae_risk_cache.parquet")
 
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def _normalize_cnae_code(cnae_code: Any) -> str:
+    """'01.11-3/01' -> '0111301'."""
+    return _NON_DIGIT_RE.sub("", str(cnae_code))
+
+
 class CNAERiskDataProcessor:
     _instance: Optional['CNAERiskDataProcessor'] = None
     _data: Optional[pd.DataFrame] = None
     _is_loaded: bool = False
+    # Código normalizado -> grau de risco (códigos da planilha) e grupo (3 dígitos) -> maior grau das suas classes
+    _risk_map: Dict[str, int] = {}
+    _group_risk_map: Dict[str, int] = {}
 
     def __new__(cls):
         if cls._instance is None:
@@ -31,8 +43,33 @@ class CNAERiskDataProcessor:
     def __init__(self):
         if not CNAERiskDataProcessor._is_loaded:
             CNAERiskDataProcessor._data = self._load_excel_data_cached()
+            CNAERiskDataProcessor._risk_map, CNAERiskDataProcessor._group_risk_map = (
+                self._build_risk_maps(CNAERiskDataProcessor._data)
+            )
             CNAERiskDataProcessor._is_loaded = True
 
+    @staticmethod
+    def _build_risk_maps(df: Optional[pd.DataFrame]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Monta os dicionários de consulta a partir da planilha carregada.
+
+        O fallback por grupo usa o maior grau entre as classes do grupo, o valor
+        conservador para o dimensionamento de SESMT/CIPA.
+        """
+        if df is None or df.empty or 'CNAE' not in df.columns or 'Grau de Risco' not in df.columns:
+            return {}, {}
+        codes = df['CNAE'].astype(str).str.replace(r"\D", "", regex=True)
+        grades = pd.to_numeric(df['Grau de Risco'], errors='coerce')
+        valid = (codes != "") & grades.notna()
+        table = pd.DataFrame({'code': codes[valid], 'grade': grades[valid].astype(int)})
+        table = table.drop_duplicates(subset='code', keep='first')
+
+        risk_map = dict(zip(table['code'], table['grade']))
+        class_codes = table[table['code'].str.len() >= 5]
+        group_risk_map = class_codes.groupby(class_codes['code'].str[:3])['grade'].max().to_dict()
+        logger.info(f"Tabela de Grau de Risco da CNAE indexada: {len(risk_map)} códigos, {len(group_risk_map)} grupos.")
+        return risk_map, {k: int(v) for k, v in group_risk_map.items()}
+
     @staticmethod
     def _save_to_local_cache(df: pd.DataFrame) -> None:
         try:
@@ -125,40 +162,48 @@ class CNAERiskDataProcessor:
                 logger.info(f"Diretório temporário '{temp_dir}' removido.")
 
     @staticmethod
-    @st.cache_data(ttl=3600)
     def _get_risk_level_cached(cnae_code: str) -> Optional[int]:
-        if CNAERiskDataProcessor._data is None or CNAERiskDataProcessor._data.empty:
-            return None
-        
-        cleaned_cnae_code = str(cnae_code).replace('.', '').replace('-', '').replace('/', '').strip()
-        
-        cnae_for_lookup = cleaned_cnae_code
-        if len(cleaned_cnae_code) == 7:
-            cnae_for_lookup = cleaned_cnae_code[:5]
-        elif len(cleaned_cnae_code) != 5:
-            return None
-        
-        if cnae_for_lookup not in CNAERiskDataProcessor._data['CNAE'].values:
+        """Consulta O(1): código exato, depois a classe (5 dígitos) e por fim o grupo (3 dígitos)."""
+        code = _normalize_cnae_code(cnae_code)
+        if len(code) not in (3, 5, 7):
             return None
 
-        result = CNAERiskDataProcessor._data[CNAERiskDataProcessor._data['CNAE'] == cnae_for_lookup]
-        
-        if not result.empty:
-            risk_level = result['Grau de Risco'].iloc[0]
-            try:
-                return int(risk_level)
-            except ValueError:
-                return None
-        return None
+        risk_map = CNAERiskDataProcessor._risk_map
+        risk_level = risk_map.get(code)
+        if risk_level is None and len(code) == 7:
+            risk_level = risk_map.get(code[:5])
+        if risk_level is None:
+            risk_level = CNAERiskDataProcessor._group_risk_map.get(code[:3])
+        return risk_level
 
     def get_risk_level(self, cnae_code: str) -> Optional[int]:
-        if CNAERiskDataProcessor._data is None or CNAERiskDataProcessor._data.empty:
+        if not CNAERiskDataProcessor._risk_map:
             logger.warning("Dados de Grau de Risco da CNAE não carregados ou vazios.")
             return None
-        
+
         result = CNAERiskDataProcessor._get_risk_level_cached(cnae_code)
         if result is not None:
             logger.debug(f"get_risk_level: Grau de Risco '{result}' encontrado para CNAE '{cnae_code}'.")
         else:
             logger.debug(f"get_risk_level: Nenhum Grau de Risco encontrado para CNAE '{cnae_code}'.")
         return result
+
+    def get_risk_levels(self, cnae_codes: Iterable[Any]) -> pd.Series:
+        """
+        Consulta em lote (ex.: planilha de estabelecimentos). Retorna uma Series Int64
+        alinhada à entrada, com <NA> para códigos sem grau de risco.
+        """
+        codes = cnae_codes if isinstance(cnae_codes, pd.Series) else pd.Series(list(cnae_codes), dtype=object)
+        if not CNAERiskDataProcessor._risk_map:
+            logger.warning("Dados de Grau de Risco da CNAE não carregados ou vazios.")
+            return pd.Series(pd.NA, index=codes.index, dtype="Int64")
+
+        normalized = codes.astype(str).str.replace(r"\D", "", regex=True)
+        valid_length = normalized.str.len().isin([3, 5, 7])
+        risk_map = CNAERiskDataProcessor._risk_map
+
+        levels = normalized.map(risk_map)
+        subclass = normalized.str.len() == 7
+        levels = levels.where(~(levels.isna() & subclass), normalized.str[:5].map(risk_map))
+        levels = levels.fillna(normalized.str[:3].map(CNAERiskDataProcessor._group_risk_map))
+        return levels.where(valid_length).astype("Int64")
@@ -0,0 +1,90 @@
+"""Dimensionamento em lote de CIPA/SESMT e cronogramas eleitorais para carteiras de estabelecimentos.
+
+Consultorias que acompanham milhares de unidades precisam da resposta para a
+carteira inteira de uma vez. Este módulo recebe um DataFrame com uma linha por
+estabelecimento e delega para as versões vetorizadas de cada processador:
+faixas compiladas com busca binária (CIPA/SESMT) e numpy.busday_offset com o
+calendário de feriados (cronograma eleitoral da CIPA).
+"""
+import logging
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+
+from safety_ai_app.cipa_data_processor import (
+    BRAZILIAN_NATIONAL_HOLIDAYS,
+    CIPA_OBS_BELOW_20,
+    CIPA_OBS_INVALID_GRADE,
+    CIPA_OBS_NOT_FOUND,
+    CIPA_STATUS_BELOW_20,
+    CIPA_STATUS_INVALID_GRADE,
+    CIPA_STATUS_NOT_FOUND,
+    calculate_election_schedules,
+    get_cipa_dimensioning_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+COL_GRAU_RISCO = "grau_risco"
+COL_NUM_EMPREGADOS = "num_empregados"
+COL_FIM_MANDATO = "fim_mandato"
+
+_CIPA_OBSERVATIONS = {
+    CIPA_STATUS_BELOW_20: CIPA_OBS_BELOW_20,
+    CIPA_STATUS_INVALID_GRADE: CIPA_OBS_INVALID_GRADE,
+    CIPA_STATUS_NOT_FOUND: CIPA_OBS_NOT_FOUND,
+}
+
+
+def dimension_portfolio(
+    establishments: pd.DataFrame,
+    include_sesmt: bool = True,
+    holidays: List[date] = BRAZILIAN_NATIONAL_HOLIDAYS,
+    today: Optional[date] = None,
+) -> pd.DataFrame:
+    """
+    Dimensiona CIPA (e opcionalmente SESMT) e calcula o cronograma eleitoral de
+    cada estabelecimento.
+
+    Args:
+        establishments: DataFrame com as colunas 'grau_risco', 'num_empregados'
+            e, opcionalmente, 'fim_mandato' (data de término do mandato atual da CIPA).
+        include_sesmt: Inclui as quantidades de profissionais do SESMT (NR-04).
+        holidays: Feriados considerados nos dias úteis do cronograma.
+        today: Data de referência para os avisos de prazo (padrão: hoje).
+
+    Returns:
+        Cópia da entrada com as colunas 'cipa_efetivos', 'cipa_suplentes',
+        'cipa_observacao', 'sesmt_<profissional>' / 'sesmt_erro' (se include_sesmt)
+        e as datas/avisos de calculate_election_schedules (se houver 'fim_mandato').
+    """
+    missing = [c for c in (COL_GRAU_RISCO, COL_NUM_EMPREGADOS) if c not in establishments.columns]
+    if missing:
+        raise KeyError(f"Colunas obrigatórias ausentes: {missing}")
+
+    result = establishments.copy()
+    grades = pd.to_numeric(result[COL_GRAU_RISCO], errors="coerce").fillna(0).astype("int64").to_numpy()
+    employees = pd.to_numeric(result[COL_NUM_EMPREGADOS], errors="coerce").fillna(-1).astype("int64").to_numpy()
+
+    efetivos, suplentes, status = get_cipa_dimensioning_batch(grades, employees)
+    result["cipa_efetivos"] = efetivos
+    result["cipa_suplentes"] = suplentes
+    result["cipa_observacao"] = pd.Series(status, index=result.index).map(_CIPA_OBSERVATIONS)
+
+    if include_sesmt:
+        # Importado sob demanda: o módulo carrega a planilha do SESMT do Google Drive na importação
+        from safety_ai_app.sesmt_data_processor import PROFESSIONAL_NAMES, get_sesmt_dimensioning_batch
+
+        sesmt = get_sesmt_dimensioning_batch(grades, employees)
+        for role_key in PROFESSIONAL_NAMES:
+            result[f"sesmt_{role_key}"] = [r[role_key]["qty"] if role_key in r else None for r in sesmt]
+        result["sesmt_erro"] = [r.get("error") for r in sesmt]
+
+    if COL_FIM_MANDATO in result.columns:
+        end_dates = pd.to_datetime(result[COL_FIM_MANDATO], errors="coerce").to_numpy(dtype="datetime64[D]")
+        for column, values in calculate_election_schedules(end_dates, holidays, today).items():
+            result[column] = values
+
+    logger.info(f"Carteira dimensionada: {len(result)} estabelecimentos.")
+    return result
@@ -0,0 +1,213 @@
+"""
+Transactional store of the local download metadata (``data/.download_metadata.sqlite3``).
+
+Replaces ``.download_metadata.json``, which was read and rewritten in full for
+every downloaded file: updates are per-file upserts on an SQLite database in
+WAL mode, so threads of the app and the separate indexer subprocess can write
+concurrently without losing each other's rows, and ``should_download`` is a
+primary-key lookup. The legacy JSON file is imported automatically on first use;
+the import is recorded in a ``meta`` row rather than by renaming the file,
+which is versioned in git.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DB_FILENAME = '.download_metadata.sqlite3'
+_LEGACY_JSON_FILENAME = '.download_metadata.json'
+_BUSY_TIMEOUT_MS = 30_000
+DEFAULT_BATCH_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    file_id       TEXT PRIMARY KEY,
+    local_path    TEXT,
+    modified_time TEXT,
+    md5_checksum  TEXT,
+    downloaded_at TEXT
+)
+"""
+_UPSERT = """
+INSERT INTO downloads (file_id, local_path, modified_time, md5_checksum, downloaded_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(file_id) DO UPDATE SET
+    local_path = excluded.local_path,
+    modified_time = excluded.modified_time,
+    md5_checksum = excluded.md5_checksum,
+    downloaded_at = excluded.downloaded_at
+"""
+_META_SCHEMA = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+_LEGACY_MIGRATED_KEY = 'legacy_json_migrated_at'
+_COLUMNS = ('local_path', 'modified_time', 'md5_checksum', 'downloaded_at')
+
+Row = Tuple[str, Optional[str], Optional[str], Optional[str], str]
+
+
+class DownloadMetadataStore:
+    """Per-file download metadata (local path, modifiedTime, md5) keyed by Drive file id."""
+
+    def __init__(self, data_dir: str) -> None:
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, _DB_FILENAME)
+        self._local = threading.local()
+        os.makedirs(data_dir, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_META_SCHEMA)
+        self._migrate_legacy_json()
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads: one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        # IMMEDIATE: take the write lock up front instead of upgrading mid-transaction (avoids SQLITE_BUSY deadlocks)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Legacy JSON migration
+    # ------------------------------------------------------------------
+
+    def _migrate_legacy_json(self) -> None:
+        legacy_path = os.path.join(self.data_dir, _LEGACY_JSON_FILENAME)
+        if not os.path.exists(legacy_path):
+            return
+        done = self._connection().execute(
+            'SELECT value FROM meta WHERE key = ?', (_LEGACY_MIGRATED_KEY,)
+        ).fetchone()
+        if done:
+            return
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Erro ao ler metadados de download legados para migração: {e}")
+            return
+
+        rows = [
+            (file_id, meta.get('local_path'), meta.get('modified_time'),
+             meta.get('md5_checksum'), meta.get('downloaded_at'))
+            for file_id, meta in legacy.items() if isinstance(meta, dict)
+        ]
+        # OR IGNORE: outro processo pode já ter migrado ou gravado dados mais novos
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO downloads (file_id, local_path, modified_time, md5_checksum, downloaded_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                (_LEGACY_MIGRATED_KEY, datetime.now().isoformat()),
+            )
+        logger.info(f"Metadados de download migrados de JSON para SQLite: {len(rows)} arquivos.")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT local_path, modified_time, md5_checksum, downloaded_at FROM downloads WHERE file_id = ?',
+            (file_id,),
+        ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connection().execute(
+            'SELECT file_id, local_path, modified_time, md5_checksum, downloaded_at FROM downloads'
+        ).fetchall()
+        return {row[0]: dict(zip(_COLUMNS, row[1:])) for row in rows}
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM downloads').fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row(file_id: str, local_path: str, remote_meta: Dict[str, Any]) -> Row:
+        return (file_id, local_path, remote_meta.get('modified_time'),
+                remote_meta.get('md5_checksum'), datetime.now().isoformat())
+
+    def upsert(self, file_id: str, local_path: str, remote_meta: Dict[str, Any]) -> None:
+        """Grava os metadados de um arquivo; dentro de batch() a gravação é acumulada."""
+        row = self._row(file_id, local_path, remote_meta)
+        pending: Optional[List[Row]] = getattr(self._local, 'pending', None)
+        if pending is not None:
+            pending.append(row)
+            if len(pending) >= self._local.batch_size:
+                self._flush()
+            return
+        with self._transaction() as conn:
+            conn.execute(_UPSERT, row)
+
+    def upsert_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """(file_id, local_path, remote_meta) em uma única transação."""
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT, [self._row(*r) for r in rows])
+
+    def delete(self, file_ids: Iterable[str]) -> None:
+        with self._transaction() as conn:
+            conn.executemany('DELETE FROM downloads WHERE file_id = ?', [(fid,) for fid in file_ids])
+
+    def _flush(self) -> None:
+        pending: List[Row] = self._local.pending
+        if not pending:
+            return
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT, pending)
+        pending.clear()
+
+    @contextmanager
+    def batch(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator['DownloadMetadataStore']:
+        """
+        Acumula os upserts da thread atual e grava a cada ``batch_size`` arquivos
+        (e ao sair), em transações curtas para não bloquear outros processos.
+        """
+        if getattr(self._local, 'pending', None) is not None:
+            yield self  # batch aninhado: o externo grava
+            return
+        self._local.pending = []
+        self._local.batch_size = max(1, batch_size)
+        try:
+            yield self
+        finally:
+            try:
+                self._flush()
+            finally:
+                self._local.pending = None
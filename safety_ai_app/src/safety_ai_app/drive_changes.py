@@ -0,0 +1,423 @@
+"""
+Change-feed tracking of a Drive folder tree for incremental syncs.
+
+Listing the whole library tree on every sync costs one ``files.list`` round per
+tree level and a comparison per file, even when nothing changed. The tracker
+instead keeps the tree membership (folders and processable files, with the
+metadata that identifies a revision) persisted in ``data/`` together with a
+``changes.list`` page token; each poll reads only the changes since that token
+and turns them into files to (re)index and files to remove.
+
+Folders moved into the tree are listed with ``DriveCrawler``; folders trashed or
+moved out drop every file beneath them. When there is no token yet, or Drive
+rejects it (expired / invalid), the tree is crawled in full and compared with
+the previous membership and the ids already indexed.
+
+Work is recorded as *pending* before the token is advanced and cleared only
+when the caller confirms it (``mark_indexed`` / ``mark_removed``), so a failed
+download or a crash mid-sync is retried on the next poll.
+
+Several processes (Streamlit, FastAPI, the indexer) can hold a tracker for the
+same tree: ``poll`` and ``mark_*`` run under a file lock next to the state file
+and reload the state first when another process saved it since.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from filelock import FileLock
+from googleapiclient.errors import HttpError
+
+from safety_ai_app.drive_crawler import FOLDER_MIME, PAGE_SIZE, DriveCrawler, get_drive_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+_FILE_FIELDS = (
+    'id, name, mimeType, size, md5Checksum, modifiedTime, version, headRevisionId, parents, trashed, webViewLink'
+)
+# Statuses Drive answers for a page token it no longer accepts
+_INVALID_TOKEN_STATUSES = {400, 404, 410}
+
+MODE_CHANGES = 'changes'
+MODE_FULL = 'full'
+
+
+class DriveChangeTracker:
+    """Persisted membership + ``changes.list`` token of one folder tree."""
+
+    def __init__(
+        self,
+        service: Any,
+        root_folder_id: str,
+        data_dir: str,
+        mime_filter: Optional[Iterable[str]] = None,
+        file_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        state_name: str = '.drive_changes',
+    ) -> None:
+        self.service = service
+        self.root_folder_id = root_folder_id
+        self.mime_filter = list(mime_filter) if mime_filter is not None else None
+        self.file_filter = file_filter
+        # Consumers of the same tree with their own pending work (sync, name index) use distinct state files
+        self._path = os.path.join(data_dir, f'{state_name}_{root_folder_id}.json')
+        # Reentrant: callers hold it for a whole sync cycle around poll/mark calls
+        self.lock = threading.RLock()
+        os.makedirs(data_dir, exist_ok=True)
+        self._file_lock = FileLock(f'{self._path}.lock', thread_local=False)
+        # (mtime_ns, size) of the state file as last loaded or saved by this process
+        self._state_stamp: Optional[Tuple[int, int]] = None
+
+        self._page_token: Optional[str] = None
+        self._folders: Dict[str, List[str]] = {root_folder_id: []}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._pending: Set[str] = set()
+        self._pending_removals: Set[str] = set()
+        # Derived parent -> children maps, so a dropped folder only touches its own subtree
+        self._child_folders: Dict[str, Set[str]] = {}
+        self._child_files: Dict[str, Set[str]] = {}
+        self.last_poll: Optional[datetime] = None
+        # Bumped whenever the membership may have changed (own poll or state saved by another process)
+        self.membership_version: int = 0
+        self.last_mode: Optional[str] = None
+        self.last_change_count: int = 0
+        self.last_request_count: int = 0
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> None:
+        """(Re)load the state file unless it is the version this process last loaded or saved."""
+        stamp = self._stamp(self._path)
+        if stamp is None or stamp == self._state_stamp:
+            return
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('root_folder_id') != self.root_folder_id:
+                return
+            self._page_token = data.get('page_token')
+            self._folders = data.get('folders', {})
+            self._folders.setdefault(self.root_folder_id, [])
+            self._files = data.get('files', {})
+            self._pending = set(data.get('pending', [])) & set(self._files)
+            self._pending_removals = set(data.get('pending_removals', []))
+            self.last_poll = datetime.fromisoformat(data['last_poll']) if data.get('last_poll') else None
+            self._child_folders, self._child_files = {}, {}
+            for fid, parents in self._folders.items():
+                self._link(self._child_folders, fid, parents)
+            for fid, meta in self._files.items():
+                self._link(self._child_files, fid, meta.get('parents', []))
+            self._state_stamp = stamp
+            self.membership_version += 1
+            logger.info(
+                f"Estado do feed de alterações carregado: {len(self._files)} arquivos, "
+                f"{len(self._pending)} pendente(s)."
+            )
+        except (json.JSONDecodeError, IOError, ValueError) as e:
+            logger.warning(f"Erro ao carregar estado do feed de alterações do Drive: {e}")
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = f"{self._path}.tmp"
+            # json.dumps (C encoder) rather than json.dump: the state holds every file of the library
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'root_folder_id': self.root_folder_id,
+                    'page_token': self._page_token,
+                    'last_poll': self.last_poll.isoformat() if self.last_poll else None,
+                    'folders': self._folders,
+                    'files': self._files,
+                    'pending': sorted(self._pending),
+                    'pending_removals': sorted(self._pending_removals),
+                }, ensure_ascii=False))
+            os.replace(tmp_path, self._path)
+            self._state_stamp = self._stamp(self._path)
+        except IOError as e:
+            logger.error(f"Erro ao salvar estado do feed de alterações do Drive: {e}")
+
+    @contextmanager
+    def _shared_state(self) -> Iterator[None]:
+        """Hold the thread lock and the state file lock, with the latest saved state loaded."""
+        with self.lock, self._file_lock:
+            self._load()
+            yield
+
+    # ------------------------------------------------------------------
+    # Membership
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _slim(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'name': item.get('name', ''),
+            'mimeType': item.get('mimeType', ''),
+            'size': item.get('size'),
+            'md5Checksum': item.get('md5Checksum'),
+            'modifiedTime': item.get('modifiedTime'),
+            'version': item.get('version'),
+            'headRevisionId': item.get('headRevisionId'),
+            'parents': item.get('parents', []),
+            'webViewLink': item.get('webViewLink', ''),
+        }
+
+    @staticmethod
+    def _revision(meta: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+        if meta is None:
+            return None
+        return meta.get('name'), meta.get('modifiedTime'), meta.get('md5Checksum')
+
+    def _accepts(self, item: Dict[str, Any]) -> bool:
+        if self.mime_filter is not None and item.get('mimeType') not in self.mime_filter:
+            return False
+        return self.file_filter(item) if self.file_filter else True
+
+    @staticmethod
+    def _link(children: Dict[str, Set[str]], item_id: str, parents: Iterable[str]) -> None:
+        for parent in parents:
+            children.setdefault(parent, set()).add(item_id)
+
+    @staticmethod
+    def _unlink(children: Dict[str, Set[str]], item_id: str, parents: Iterable[str]) -> None:
+        for parent in parents:
+            siblings = children.get(parent)
+            if siblings is not None:
+                siblings.discard(item_id)
+                if not siblings:
+                    del children[parent]
+
+    def _in_tree(self, parents: Iterable[str]) -> bool:
+        return any(p in self._folders for p in parents)
+
+    def _set_folder(self, folder_id: str, parents: List[str]) -> None:
+        self._unlink(self._child_folders, folder_id, self._folders.get(folder_id, []))
+        self._folders[folder_id] = parents
+        self._link(self._child_folders, folder_id, parents)
+
+    def _track_file(self, file_id: str, item: Dict[str, Any]) -> None:
+        meta = self._slim(item)
+        previous = self._files.get(file_id)
+        if self._revision(previous) != self._revision(meta):
+            self._pending.add(file_id)
+        if previous is not None:
+            self._unlink(self._child_files, file_id, previous['parents'])
+        self._files[file_id] = meta
+        self._link(self._child_files, file_id, meta['parents'])
+        self._pending_removals.discard(file_id)
+
+    def _untrack_file(self, file_id: str) -> None:
+        previous = self._files.pop(file_id, None)
+        if previous is not None:
+            self._unlink(self._child_files, file_id, previous['parents'])
+            self._pending_removals.add(file_id)
+        self._pending.discard(file_id)
+
+    def _drop_folder(self, folder_id: str) -> None:
+        """Remove *folder_id* and its subtree; files left without a tracked parent are untracked."""
+        dropped = []
+        stack = [folder_id]
+        while stack:
+            fid = stack.pop()
+            if fid not in self._folders:
+                continue
+            self._unlink(self._child_folders, fid, self._folders.pop(fid))
+            dropped.append(fid)
+            for child in list(self._child_folders.get(fid, ())):
+                # A subfolder that also lives under another tracked folder stays
+                if not self._in_tree(self._folders.get(child, [])):
+                    stack.append(child)
+        for fid in dropped:
+            for file_id in list(self._child_files.get(fid, ())):
+                if not self._in_tree(self._files[file_id]['parents']):
+                    self._untrack_file(file_id)
+
+    def _crawl(self, folder_id: str) -> int:
+        """List the tree under *folder_id* into the membership. Returns the requests made."""
+        crawler = DriveCrawler(self.service, limiter=get_drive_rate_limiter())
+        items = crawler.crawl(folder_id, mime_filter=self.mime_filter, file_fields=_FILE_FIELDS)
+        for fid, folder in crawler.folders.items():
+            self._set_folder(fid, folder.get('parents', []))
+        for item in items:
+            if self._accepts(item):
+                self._track_file(item['id'], item)
+        return crawler.requests_made
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def _full_resync(self, indexed_ids: Iterable[str]) -> None:
+        start_token = self.service.changes().getStartPageToken().execute().get('startPageToken')
+        previous_files, previous_pending, previous_removals = self._files, self._pending, self._pending_removals
+        self._folders, self._files = {self.root_folder_id: []}, {}
+        self._child_folders, self._child_files = {}, {}
+        self._pending, self._pending_removals = set(), set()
+        self.last_request_count = 1 + self._crawl(self.root_folder_id)
+
+        # Files already indexed at the same revision (or indexed before any state existed) are kept
+        indexed = set(indexed_ids)
+        current = set(self._files)
+        self._pending = {
+            fid for fid in current
+            if fid not in indexed or fid in previous_pending or fid in previous_removals
+            or (fid in previous_files and self._revision(previous_files[fid]) != self._revision(self._files[fid]))
+        }
+        self._pending_removals = (previous_removals | set(previous_files) | indexed) - current
+        self._page_token = start_token
+        self.last_mode, self.last_change_count = MODE_FULL, len(self._files)
+        logger.info(
+            f"Varredura completa da pasta '{self.root_folder_id}': {len(self._files)} arquivos em "
+            f"{len(self._folders)} pastas, {len(self._pending)} a indexar, "
+            f"{len(self._pending_removals)} a remover."
+        )
+
+    def _read_changes(self) -> Tuple[Dict[str, Dict[str, Any]], Optional[str], int]:
+        """Every change since the stored token, last one per file id wins."""
+        changes: Dict[str, Dict[str, Any]] = {}
+        page_token, new_start_token, requests = self._page_token, None, 0
+        while page_token:
+            get_drive_rate_limiter().acquire()
+            resp = self.service.changes().list(
+                pageToken=page_token,
+                pageSize=PAGE_SIZE,
+                spaces='drive',
+                includeRemoved=True,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({_FILE_FIELDS}))",
+            ).execute()
+            requests += 1
+            for change in resp.get('changes', []):
+                if change.get('fileId'):
+                    changes.pop(change['fileId'], None)
+                    changes[change['fileId']] = change
+            new_start_token = resp.get('newStartPageToken') or new_start_token
+            page_token = resp.get('nextPageToken')
+        return changes, new_start_token, requests
+
+    def _apply_changes(self) -> None:
+        changes, new_start_token, requests = self._read_changes()
+
+        def _live(change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            item = change.get('file') or {}
+            return None if change.get('removed') or item.get('trashed') else item
+
+        # Folders first, until stable: a folder can land under another one moved in by the same batch
+        folder_changes = {
+            fid: _live(c) for fid, c in changes.items()
+            if fid != self.root_folder_id and ((c.get('file') or {}).get('mimeType') == FOLDER_MIME
+                                               or (c.get('removed') and fid in self._folders))
+        }
+        added: List[str] = []
+        changed = True
+        while changed:
+            changed = False
+            for fid, item in folder_changes.items():
+                if item is not None and self._in_tree(item.get('parents', [])):
+                    if fid not in self._folders:
+                        added.append(fid)
+                        changed = True
+                    if self._folders.get(fid) != item.get('parents', []):
+                        self._set_folder(fid, item.get('parents', []))
+                elif fid in self._folders:
+                    self._drop_folder(fid)
+                    changed = True
+
+        # Folders that entered the tree bring their existing contents, which produce no change entries
+        for fid in added:
+            if fid in self._folders and not any(p in added for p in self._folders[fid]):
+                requests += self._crawl(fid)
+
+        for fid, change in changes.items():
+            if fid in folder_changes:
+                continue
+            item = _live(change)
+            if item is not None and self._in_tree(item.get('parents', [])) and self._accepts(item):
+                self._track_file(fid, item)
+            else:
+                self._untrack_file(fid)
+
+        if new_start_token:
+            self._page_token = new_start_token
+        self.last_mode, self.last_change_count, self.last_request_count = MODE_CHANGES, len(changes), requests
+
+    def poll(self, indexed_ids: Callable[[], Iterable[str]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Bring the membership up to date and return ``(to_index, to_remove)``.
+
+        *to_index* holds file dicts (``id``, ``name``, ``mimeType``, ``size``,
+        ``md5Checksum``, ...) that are new or whose revision changed; *to_remove*
+        the ids of files that left the tree. Both include work left pending by
+        earlier polls. *indexed_ids* is only called on a full crawl, to compare
+        against what the index already holds.
+        """
+        with self._shared_state():
+            previous_token = self._page_token
+            if self._page_token:
+                try:
+                    self._apply_changes()
+                except HttpError as e:
+                    if e.resp.status not in _INVALID_TOKEN_STATUSES:
+                        raise
+                    logger.warning(
+                        f"Token do feed de alterações do Drive rejeitado ({e.resp.status}). "
+                        f"Refazendo varredura completa."
+                    )
+                    self._full_resync(indexed_ids())
+            else:
+                self._full_resync(indexed_ids())
+            self.last_poll = datetime.now()
+            # An idle cycle writes nothing: the state file grows with the library, not with the changes
+            if self.last_mode == MODE_FULL or self.last_change_count or self._page_token != previous_token:
+                self.membership_version += 1
+                self._save()
+            to_index = [{'id': fid, **self._files[fid]} for fid in sorted(self._pending)]
+            return to_index, sorted(self._pending_removals)
+
+    def mark_indexed(self, file_ids: Iterable[str]) -> None:
+        with self._shared_state():
+            before = len(self._pending)
+            self._pending.difference_update(file_ids)
+            if len(self._pending) != before:
+                self._save()
+
+    def mark_removed(self, file_ids: Iterable[str]) -> None:
+        with self._shared_state():
+            before = len(self._pending_removals)
+            self._pending_removals.difference_update(file_ids)
+            if len(self._pending_removals) != before:
+                self._save()
+
+    def reset(self) -> None:
+        """Forget the token so the next poll crawls the whole tree."""
+        with self._shared_state():
+            self._page_token = None
+            self._save()
+
+    def tracked_files(self) -> Dict[str, Dict[str, Any]]:
+        """Current membership: file id -> metadata (``name``, ``mimeType``, ``parents``, ...).
+
+        A shallow copy: tracked metadata dicts are replaced on change, never mutated.
+        """
+        with self.lock:
+            # os.replace keeps the saved file whole: reading it needs no file lock
+            self._load()
+            return dict(self._files)
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
@@ -0,0 +1,182 @@
+"""
+Breadth-first, concurrent crawl of a Drive folder tree.
+
+The previous listing recursed into each subfolder in turn: one paginated
+``files.list`` per folder, each waiting for the previous one. Here every level
+of the tree is listed at once — sibling folders are grouped into a single
+``'a' in parents or 'b' in parents`` query (``pageSize`` 1000, minimal
+``fields`` mask) and the groups run on a bounded thread pool. All calls go
+through a process-wide token bucket sized below Drive's per-user query quota.
+
+googleapiclient's default ``httplib2.Http`` is not thread-safe, so each worker
+thread executes requests on its own authorized ``Http`` built from the
+service's credentials (``authorized_http_for_thread``).
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import google_auth_httplib2
+import httplib2
+
+logger = logging.getLogger(__name__)
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+DEFAULT_MAX_WORKERS: int = 8
+# Parents OR'ed in one query; keeps the q string well below the API limit
+DEFAULT_FOLDER_BATCH_SIZE: int = 40
+PAGE_SIZE: int = 1000
+
+# Drive API: 12,000 queries per minute per user. Stay at 80% to leave room for
+# the downloads and lookups running alongside the crawl.
+DRIVE_QUERIES_PER_MINUTE_PER_USER: int = 12_000
+DEFAULT_QUERIES_PER_SECOND: float = DRIVE_QUERIES_PER_MINUTE_PER_USER * 0.8 / 60
+DEFAULT_BURST: int = 50
+
+
+class TokenBucket:
+    """Blocking token bucket: *rate* tokens per second, at most *capacity* saved up."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take *tokens*, sleeping until they are available. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_shared_limiter = TokenBucket(DEFAULT_QUERIES_PER_SECOND, DEFAULT_BURST)
+_thread_local = threading.local()
+
+
+def get_drive_rate_limiter() -> TokenBucket:
+    """Process-wide limiter for Drive API calls (the service account is a single quota user)."""
+    return _shared_limiter
+
+
+def authorized_http_for_thread(service: Any) -> Optional[Any]:
+    """An ``Http`` authorized with *service*'s credentials, one per thread.
+
+    None when the service carries no credentials (e.g. a fake service in scripts);
+    callers then fall back to the service's own ``Http``.
+    """
+    credentials = getattr(getattr(service, '_http', None), 'credentials', None)
+    if credentials is None:
+        return None
+    by_credentials = getattr(_thread_local, 'http_by_credentials', None)
+    if by_credentials is None:
+        by_credentials = _thread_local.http_by_credentials = {}
+    entry = by_credentials.get(id(credentials))
+    if entry is None or entry[0] is not credentials:
+        entry = by_credentials[id(credentials)] = (
+            credentials, google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        )
+    return entry[1]
+
+
+class DriveCrawler:
+    """Level-by-level listing of a folder tree with batched parent queries."""
+
+    def __init__(
+        self,
+        service: Any,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        folder_batch_size: int = DEFAULT_FOLDER_BATCH_SIZE,
+        limiter: Optional[TokenBucket] = None,
+    ) -> None:
+        self.service = service
+        self.max_workers = max(1, max_workers)
+        self.folder_batch_size = max(1, folder_batch_size)
+        self.limiter = limiter or get_drive_rate_limiter()
+        self.requests_made = 0
+        # Folder items listed by the last crawl (same fields mask as the files), by id
+        self.folders: Dict[str, Dict[str, Any]] = {}
+        self._counter_lock = threading.Lock()
+
+    def _execute(self, request: Any) -> Dict[str, Any]:
+        self.limiter.acquire()
+        with self._counter_lock:
+            self.requests_made += 1
+        http = authorized_http_for_thread(self.service)
+        return request.execute(http=http) if http is not None else request.execute()
+
+    def _list_children(self, folder_ids: List[str], mime_filter: Optional[Iterable[str]], fields: str) -> List[Dict[str, Any]]:
+        parents = ' or '.join(f"'{fid}' in parents" for fid in folder_ids)
+        query = f"({parents}) and trashed=false"
+        if mime_filter is not None:
+            mimes = ' or '.join(f"mimeType='{mt}'" for mt in [*mime_filter, FOLDER_MIME])
+            query += f" and ({mimes})"
+        items: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            resp = self._execute(self.service.files().list(
+                q=query, spaces='drive', pageSize=PAGE_SIZE,
+                fields=f"nextPageToken, files({fields})", pageToken=page_token,
+            ))
+            items.extend(resp.get('files', []))
+            page_token = resp.get('nextPageToken')
+            if not page_token:
+                return items
+
+    def crawl(
+        self,
+        root_folder_id: str,
+        mime_filter: Optional[Iterable[str]] = None,
+        file_fields: str = 'id, name, mimeType, size',
+    ) -> List[Dict[str, Any]]:
+        """
+        Every non-folder item under *root_folder_id* (any depth), each once.
+
+        *mime_filter* restricts the listed files to those MIME types (folders are
+        always listed to keep descending); *file_fields* is the ``files(...)`` mask,
+        to which ``mimeType`` is added when missing.
+        """
+        mime_filter = list(mime_filter) if mime_filter is not None else None
+        fields = file_fields if 'mimeType' in file_fields else f'{file_fields}, mimeType'
+
+        files: Dict[str, Dict[str, Any]] = {}
+        self.folders = {}
+        seen_folders: Set[str] = {root_folder_id}
+        frontier = [root_folder_id]
+        depth = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="DriveCrawler") as pool:
+            while frontier:
+                batches = [frontier[i:i + self.folder_batch_size]
+                           for i in range(0, len(frontier), self.folder_batch_size)]
+                next_frontier: List[str] = []
+                for items in pool.map(lambda batch: self._list_children(batch, mime_filter, fields), batches):
+                    for item in items:
+                        if item.get('mimeType') == FOLDER_MIME:
+                            # Folders with several parents (or cycles) are listed once
+                            if item['id'] not in seen_folders:
+                                seen_folders.add(item['id'])
+                                self.folders[item['id']] = item
+                                next_frontier.append(item['id'])
+                        else:
+                            files.setdefault(item['id'], item)
+                frontier = next_frontier
+                depth += 1
+        logger.debug(
+            f"Varredura do Drive em '{root_folder_id}': {len(files)} arquivos, {len(seen_folders)} pastas, "
+            f"{depth} níveis, {self.requests_made} requisições."
+        )
+        return list(files.values())
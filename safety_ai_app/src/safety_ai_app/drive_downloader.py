@@ -1,18 +1,28 @@
+import hashlib
 import io
-import json
 import logging
 import os
+import random
 import tempfile
 import shutil
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.client import HTTPException
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import httplib2
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
 import streamlit as st
 
 from pathlib import Path
 
+from safety_ai_app.download_metadata_store import DEFAULT_BATCH_SIZE, DownloadMetadataStore
+from safety_ai_app.drive_crawler import PAGE_SIZE, DriveCrawler, authorized_http_for_thread, get_drive_rate_limiter
+from safety_ai_app.drive_metadata_cache import DriveMetadataFetcher, get_shared_metadata_cache
+from safety_ai_app.drive_path_cache import KIND_FILE, KIND_FOLDER, DrivePathCache
 from safety_ai_app.text_extractors import (
     PROCESSABLE_MIME_TYPES,
     get_mime_type_for_drive_export,
@@ -21,8 +31,9 @@ from safety_ai_app.text_extractors import (
 
 logger = logging.getLogger(__name__)
 
-_METADATA_FILENAME = '.download_metadata.json'
-
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+STREAM_MAX_RETRIES = 5
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
 
 def get_download_metadata(file_name: str, original_mime_type: str) -> tuple:
     """Return (local_file_name, export_mime_type) for a Drive file."""
@@ -38,74 +49,81 @@ class DriveDownloader:
     All cache-heavy operations use Streamlit's ``@st.cache_data`` with the
     ``_self`` convention so that the instance itself is excluded from hashing
     (safe because ``GoogleDriveIntegrator`` is itself a ``@st.cache_resource``
-    singleton).
+    singleton). Per-file metadata is the exception: it goes through
+    ``DriveMetadataFetcher`` (an sqlite TTL cache in *data_dir* shared by every
+    process).
+
+    Name lookups go through *path_cache* when one is given (service-account
+    Drive only: ``'root'`` differs per account).
     """
 
-    def __init__(self, service: Any, data_dir: str) -> None:
+    def __init__(self, service: Any, data_dir: str, path_cache: Optional[DrivePathCache] = None) -> None:
         self.service = service
         self.data_dir = data_dir
+        self.path_cache = path_cache
+        self._metadata_store: Optional[DownloadMetadataStore] = None
+        self._metadata_store_lock = threading.Lock()
+        self._metadata_fetcher: Optional[DriveMetadataFetcher] = None
 
     # ------------------------------------------------------------------
-    # Remote metadata (cached)
+    # Remote metadata (cached across processes)
     # ------------------------------------------------------------------
 
-    @st.cache_data(ttl=300)
-    def get_file_metadata(_self, file_id: str) -> Dict[str, Any]:
-        if not _self.service:
-            return {"file_id": file_id, "modified_time": None, "md5_checksum": None}
+    @property
+    def metadata_fetcher(self) -> DriveMetadataFetcher:
+        # Shared sqlite TTL cache when there is a data dir (the user-OAuth helpers pass '')
+        if self._metadata_fetcher is None:
+            cache = None
+            if self.data_dir:
+                try:
+                    cache = get_shared_metadata_cache(self.data_dir)
+                except Exception as e:
+                    logger.warning(f"Cache de metadados do Drive indisponível: {e}")
+            self._metadata_fetcher = DriveMetadataFetcher(self.service, cache)
+        return self._metadata_fetcher
+
+    def get_file_metadata(self, file_id: str) -> Dict[str, Any]:
+        """Remote modifiedTime / md5 of *file_id*; None fields when it could not be fetched."""
         try:
-            meta = _self.service.files().get(
-                fileId=file_id, fields='id, modifiedTime, md5Checksum'
-            ).execute()
-            return {
-                "file_id": file_id,
-                "modified_time": meta.get('modifiedTime'),
-                "md5_checksum": meta.get('md5Checksum'),
-            }
+            found = self.metadata_fetcher.fetch(file_id)
         except Exception as e:
             logger.error(f"Erro ao obter metadados do arquivo {file_id}: {e}")
-            return {"file_id": file_id, "modified_time": None, "md5_checksum": None}
+            found = None
+        return found or {"file_id": file_id, "modified_time": None, "md5_checksum": None}
 
     # ------------------------------------------------------------------
     # Local download-metadata management
     # ------------------------------------------------------------------
 
-    def _metadata_path(self) -> str:
-        return os.path.join(self.data_dir, _METADATA_FILENAME)
+    @property
+    def metadata_store(self) -> DownloadMetadataStore:
+        # Opened on first use: several short-lived DriveDownloader instances never touch it
+        if self._metadata_store is None:
+            with self._metadata_store_lock:
+                if self._metadata_store is None:
+                    self._metadata_store = DownloadMetadataStore(self.data_dir)
+        return self._metadata_store
 
-    def _load_metadata(self) -> Dict[str, Any]:
-        path = self._metadata_path()
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Erro ao carregar metadados de download: {e}")
-        return {}
-
-    def _save_metadata(self, metadata: Dict[str, Any]) -> None:
-        path = self._metadata_path()
-        try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            logger.error(f"Erro ao salvar metadados de download: {e}")
+    @contextmanager
+    def metadata_batch(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[None]:
+        """Group the metadata writes of a multi-file sync into a few transactions."""
+        with self.metadata_store.batch(batch_size):
+            yield
 
     def _update_metadata(self, file_id: str, local_path: str, remote_meta: Dict[str, Any]) -> None:
-        all_meta = self._load_metadata()
-        all_meta[file_id] = {
-            "local_path": local_path,
-            "modified_time": remote_meta.get("modified_time"),
-            "md5_checksum": remote_meta.get("md5_checksum"),
-            "downloaded_at": datetime.now().isoformat(),
-        }
-        self._save_metadata(all_meta)
+        try:
+            self.metadata_store.upsert(file_id, local_path, remote_meta)
+        except Exception as e:
+            logger.error(f"Erro ao salvar metadados de download: {e}")
 
     def should_download(self, file_id: str, local_path: str) -> bool:
         if not os.path.exists(local_path):
             return True
-        local = self._load_metadata().get(file_id)
+        try:
+            local = self.metadata_store.get(file_id)
+        except Exception as e:
+            logger.warning(f"Erro ao carregar metadados de download: {e}")
+            return True
         if not local:
             return True
         remote = self.get_file_metadata(file_id)
@@ -121,21 +139,76 @@ class DriveDownloader:
     # File/folder lookup
     # ------------------------------------------------------------------
 
+    def _query_file_id_in_folder(self, parent_folder_id: str, file_name: str, is_folder: bool) -> Optional[str]:
+        query = f"'{parent_folder_id}' in parents and name = '{file_name}' and trashed = false"
+        if is_folder:
+            query += " and mimeType = 'application/vnd.google-apps.folder'"
+        results = self.service.files().list(
+            q=query, spaces='drive', fields='files(id, name, mimeType)'
+        ).execute()
+        for item in results.get('files', []):
+            if is_folder and item.get('mimeType') == 'application/vnd.google-apps.folder':
+                return item['id']
+            elif not is_folder and item.get('mimeType') != 'application/vnd.google-apps.folder':
+                return item['id']
+        return None
+
+    def _query_folder_id_by_name(self, parent_folder_id: str, folder_name: str) -> Optional[str]:
+        query = (
+            f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' "
+            f"and '{parent_folder_id}' in parents and trashed = false"
+        )
+        results = self.service.files().list(
+            q=query, spaces='drive', fields='files(id, name)'
+        ).execute()
+        items = results.get('files', [])
+        if items:
+            return items[0]['id']
+        if parent_folder_id == 'root':
+            query_all = (
+                f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' "
+                "and trashed = false"
+            )
+            results_all = self.service.files().list(
+                q=query_all, corpora='allDrives',
+                includeItemsFromAllDrives=True, supportsAllDrives=True,
+                fields='files(id, name, parents)'
+            ).execute()
+            for item in results_all.get('files', []):
+                return item['id']
+        return None
+
+    def _cached_lookup(
+        self, parent_id: str, name: str, kind: str,
+        query: Callable[[], Optional[str]], refresh: bool = False,
+    ) -> Tuple[Optional[str], bool]:
+        """Return ``(id, served_from_cache)``. API errors propagate and are never cached."""
+        if self.path_cache is not None and not refresh:
+            hit, cached_id = self.path_cache.get(parent_id, name, kind)
+            if hit:
+                return cached_id, True
+        found = query()
+        if self.path_cache is not None:
+            self.path_cache.put(parent_id, name, kind, found)
+        return found, False
+
+    def _forget_if_not_found(self, error: Exception, file_id: str) -> bool:
+        """On a 404 for a cached id, drop it from the path cache. True when a fresh lookup is worth retrying."""
+        if self.path_cache is None or not isinstance(error, HttpError) or error.resp.status != 404:
+            return False
+        return self.path_cache.invalidate_id(file_id) > 0
+
     def get_file_id_in_folder(self, parent_folder_id: str, file_name: str, is_folder: bool = False) -> Optional[str]:
         if not self.service:
             return None
         try:
-            query = f"'{parent_folder_id}' in parents and name = '{file_name}' and trashed = false"
             if is_folder:
-                query += " and mimeType = 'application/vnd.google-apps.folder'"
-            results = self.service.files().list(
-                q=query, spaces='drive', fields='files(id, name, mimeType)'
-            ).execute()
-            for item in results.get('files', []):
-                if is_folder and item.get('mimeType') == 'application/vnd.google-apps.folder':
-                    return item['id']
-                elif not is_folder and item.get('mimeType') != 'application/vnd.google-apps.folder':
-                    return item['id']
+                return self._query_file_id_in_folder(parent_folder_id, file_name, True)
+            file_id, _ = self._cached_lookup(
+                parent_folder_id, file_name, KIND_FILE,
+                partial(self._query_file_id_in_folder, parent_folder_id, file_name, False),
+            )
+            return file_id
         except Exception as e:
             logger.error(f"Erro ao buscar '{file_name}' em '{parent_folder_id}': {e}", exc_info=True)
         return None
@@ -144,28 +217,11 @@ class DriveDownloader:
         if not self.service:
             return None
         try:
-            query = (
-                f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' "
-                f"and '{parent_folder_id}' in parents and trashed = false"
+            folder_id, _ = self._cached_lookup(
+                parent_folder_id, folder_name, KIND_FOLDER,
+                partial(self._query_folder_id_by_name, parent_folder_id, folder_name),
             )
-            results = self.service.files().list(
-                q=query, spaces='drive', fields='files(id, name)'
-            ).execute()
-            items = results.get('files', [])
-            if items:
-                return items[0]['id']
-            if parent_folder_id == 'root':
-                query_all = (
-                    f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' "
-                    "and trashed = false"
-                )
-                results_all = self.service.files().list(
-                    q=query_all, corpora='allDrives',
-                    includeItemsFromAllDrives=True, supportsAllDrives=True,
-                    fields='files(id, name, parents)'
-                ).execute()
-                for item in results_all.get('files', []):
-                    return item['id']
+            return folder_id
         except Exception as e:
             logger.error(f"Erro ao buscar ID da pasta '{folder_name}': {e}", exc_info=True)
         return None
@@ -196,6 +252,131 @@ class DriveDownloader:
             logger.error(f"Erro inesperado ao baixar arquivo {file_id}: {e}", exc_info=True)
         return b''
 
+    @staticmethod
+    def _stream_to_part(
+        http: Any, uri: str, headers: Dict[str, str], part_path: str,
+        chunk_size: int, max_retries: int, ranged: bool, resume: bool,
+    ) -> Tuple[str, int]:
+        """Append the body of *uri* to *part_path*. Returns ``(md5 hex digest, bytes reused from an earlier .part)``."""
+        digest = hashlib.md5()
+        offset = 0
+        if resume and os.path.exists(part_path):
+            with open(part_path, 'rb') as fh:
+                for block in iter(lambda: fh.read(1024 * 1024), b''):
+                    digest.update(block)
+                    offset += len(block)
+        resumed_from = offset
+        total: Optional[int] = None
+        failures = 0
+        with open(part_path, 'ab' if offset else 'wb') as fh:
+            while total is None or offset < total:
+                request_headers = dict(headers)
+                if ranged:
+                    request_headers['range'] = f'bytes={offset}-{offset + chunk_size - 1}'
+                try:
+                    resp, content = http.request(uri, method='GET', headers=request_headers)
+                    error: Any = None if resp.status not in _RETRYABLE_STATUS else HttpError(resp, content, uri=uri)
+                except (OSError, HTTPException, httplib2.HttpLib2Error) as e:
+                    error = e
+                if error is not None:
+                    failures += 1
+                    if failures > max_retries:
+                        if isinstance(error, HttpError):
+                            raise error
+                        raise ConnectionError(f"Download interrompido em {offset} bytes após {max_retries} tentativas: {error}")
+                    logger.warning(f"Falha transitória no download ({error}); retomando do byte {offset}.")
+                    time.sleep(min(2 ** failures, 30) * (0.5 + random.random() / 2))
+                    continue
+                if resp.status == 416:
+                    # Range starting at the end of the file: nothing left to fetch
+                    break
+                if resp.status >= 300:
+                    raise HttpError(resp, content, uri=uri)
+                if resp.status == 200 and offset:
+                    # Range ignored by the server: the full body came back, start over
+                    fh.seek(0)
+                    fh.truncate()
+                    digest, offset, resumed_from = hashlib.md5(), 0, 0
+                fh.write(content)
+                digest.update(content)
+                offset += len(content)
+                failures = 0
+                if resp.status == 206:
+                    content_range = resp.get('content-range', '')
+                    size = content_range.rsplit('/', 1)[-1]
+                    total = int(size) if size.isdigit() else None
+                    if total is None and len(content) < chunk_size:
+                        total = offset
+                else:
+                    total = offset
+        return digest.hexdigest(), resumed_from
+
+    def download_stream_to_path(
+        self,
+        file_id: str,
+        original_mime_type: str,
+        export_mime_type: str,
+        local_path: str,
+        expected_md5: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        max_retries: int = STREAM_MAX_RETRIES,
+        raise_errors: bool = False,
+    ) -> bool:
+        """Stream a file to *local_path* holding at most one chunk in memory.
+
+        Chunks are appended to ``<local_path>.part`` and hashed as they arrive.
+        Transient failures resume from the last byte written with an HTTP Range
+        request, including a ``.part`` left by an earlier interrupted call. The
+        file is renamed into place once complete, and only if it matches
+        *expected_md5* when one is given (Google-native exports have no md5 and
+        no Range support, so they restart from zero instead).
+
+        With *raise_errors* the API/network error is raised instead of logged, for
+        callers that schedule their own retries (the ``.part`` is kept either way).
+        """
+        if not self.service:
+            return False
+        is_export = (original_mime_type.startswith('application/vnd.google-apps')
+                     and export_mime_type != original_mime_type)
+        part_path = f"{local_path}.part"
+        try:
+            if is_export:
+                request = self.service.files().export_media(fileId=file_id, mimeType=export_mime_type)
+            else:
+                request = self.service.files().get_media(fileId=file_id)
+            http = authorized_http_for_thread(self.service) or request.http
+            os.makedirs(os.path.dirname(local_path) or '.', exist_ok=True)
+
+            digest, resumed_from = self._stream_to_part(
+                http, request.uri, request.headers, part_path, chunk_size, max_retries,
+                ranged=not is_export, resume=not is_export,
+            )
+            if expected_md5 and not is_export and digest != expected_md5 and resumed_from:
+                # The leftover .part was from an older revision: download again from zero
+                logger.info(f"Parcial de '{file_id}' desatualizado; baixando novamente do início.")
+                digest, _ = self._stream_to_part(
+                    http, request.uri, request.headers, part_path, chunk_size, max_retries,
+                    ranged=True, resume=False,
+                )
+            if expected_md5 and not is_export and digest != expected_md5:
+                logger.error(f"md5 divergente ao baixar {file_id}: esperado {expected_md5}, obtido {digest}.")
+                os.remove(part_path)
+                return False
+            os.replace(part_path, local_path)
+            return True
+        except HttpError as e:
+            if e.resp.status not in _RETRYABLE_STATUS and os.path.exists(part_path):
+                os.remove(part_path)
+            if raise_errors:
+                raise
+            logger.error(f"Erro HTTP ao baixar arquivo {file_id}: {e}")
+        except Exception as e:
+            # The .part is kept: the next call resumes from it
+            if raise_errors:
+                raise
+            logger.error(f"Erro inesperado ao baixar arquivo {file_id}: {e}", exc_info=True)
+        return False
+
     # ------------------------------------------------------------------
     # File download to local path
     # ------------------------------------------------------------------
@@ -206,55 +387,91 @@ class DriveDownloader:
         if not force and not self.should_download(file_id, local_path):
             logger.info(f"Arquivo '{file_id}' não modificado. Usando cache local.")
             return
-        file_meta = self.service.files().get(fileId=file_id, fields='mimeType, name').execute()
+        file_meta = self.service.files().get(
+            fileId=file_id, fields='mimeType, name, modifiedTime, md5Checksum'
+        ).execute()
         original_mime = file_meta['mimeType']
         _, export_mime = get_download_metadata(file_meta['name'], original_mime)
-        data = self.download_bytes(file_id, original_mime, export_mime)
-        if not data:
+        if not self.download_stream_to_path(
+            file_id, original_mime, export_mime, local_path, expected_md5=file_meta.get('md5Checksum')
+        ):
             raise Exception(f"Falha ao baixar '{file_meta['name']}'.")
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        with open(local_path, 'wb') as fh:
-            fh.write(data)
-        self._update_metadata(file_id, local_path, self.get_file_metadata(file_id))
+        self._update_metadata(file_id, local_path, {
+            "file_id": file_id,
+            "modified_time": file_meta.get('modifiedTime'),
+            "md5_checksum": file_meta.get('md5Checksum'),
+        })
 
     def download_from_folder(self, folder_id: str, file_name: str, local_path: str) -> Optional[str]:
-        file_id = self.get_file_id_in_folder(folder_id, file_name, is_folder=False)
-        if not file_id:
-            logger.error(f"Arquivo '{file_name}' não encontrado na pasta '{folder_id}'.")
-            return None
-        try:
-            self.download_to_path(file_id, local_path)
-            return local_path
-        except Exception as e:
-            logger.error(f"Falha ao baixar '{file_name}' da pasta '{folder_id}': {e}", exc_info=True)
-            return None
+        for attempt in range(2):
+            file_id = self.get_file_id_in_folder(folder_id, file_name, is_folder=False)
+            if not file_id:
+                logger.error(f"Arquivo '{file_name}' não encontrado na pasta '{folder_id}'.")
+                return None
+            try:
+                self.download_to_path(file_id, local_path)
+                return local_path
+            except Exception as e:
+                if attempt == 0 and self._forget_if_not_found(e, file_id):
+                    continue
+                logger.error(f"Falha ao baixar '{file_name}' da pasta '{folder_id}': {e}", exc_info=True)
+                return None
+        return None
 
-    def download_by_path(self, drive_file_path: str, local_save_path: str) -> bool:
-        if not self.service:
-            return False
+    def _resolve_path(self, drive_file_path: str, refresh: bool) -> Tuple[Optional[str], bool]:
+        """Resolve segment by segment. Returns ``(file id, suspect)``, where *suspect* flags an
+        API miss right below a cached folder id (which may have been moved or deleted)."""
         path_parts = drive_file_path.split('/')
         current_parent = 'root'
+        parent_from_cache = False
         for part in path_parts[:-1]:
-            folder_id = self.get_folder_id_by_name(current_parent, part)
+            folder_id, from_cache = self._cached_lookup(
+                current_parent, part, KIND_FOLDER,
+                partial(self._query_folder_id_by_name, current_parent, part), refresh,
+            )
             if not folder_id:
                 logger.error(f"Pasta '{part}' não encontrada.")
-                return False
-            current_parent = folder_id
+                return None, parent_from_cache and not from_cache
+            current_parent, parent_from_cache = folder_id, from_cache
         file_name = path_parts[-1]
-        file_id = self.get_file_id_in_folder(current_parent, file_name, is_folder=False)
-        if not file_id:
-            return False
+        file_id, from_cache = self._cached_lookup(
+            current_parent, file_name, KIND_FILE,
+            partial(self._query_file_id_in_folder, current_parent, file_name, False), refresh,
+        )
+        return file_id, file_id is None and parent_from_cache and not from_cache
+
+    def get_file_id_by_path(self, drive_file_path: str, refresh: bool = False) -> Optional[str]:
+        if not self.service:
+            return None
         try:
-            file_meta = self.service.files().get(fileId=file_id, fields='mimeType, name').execute()
-            _, export_mime = get_download_metadata(file_name, file_meta['mimeType'])
-            data = self.download_bytes(file_id, file_meta['mimeType'], export_mime)
-            if data:
-                os.makedirs(os.path.dirname(local_save_path), exist_ok=True)
-                with open(local_save_path, 'wb') as fh:
-                    fh.write(data)
-                return True
+            file_id, suspect = self._resolve_path(drive_file_path, refresh)
+            if suspect:
+                file_id, _ = self._resolve_path(drive_file_path, refresh=True)
+            return file_id
         except Exception as e:
-            logger.error(f"Erro ao baixar '{file_name}' por caminho: {e}", exc_info=True)
+            logger.error(f"Erro ao resolver o caminho '{drive_file_path}' no Drive: {e}", exc_info=True)
+        return None
+
+    def download_by_path(self, drive_file_path: str, local_save_path: str) -> bool:
+        if not self.service:
+            return False
+        file_name = drive_file_path.split('/')[-1]
+        for attempt in range(2):
+            file_id = self.get_file_id_by_path(drive_file_path, refresh=attempt > 0)
+            if not file_id:
+                return False
+            try:
+                file_meta = self.service.files().get(fileId=file_id, fields='mimeType, name, md5Checksum').execute()
+                _, export_mime = get_download_metadata(file_name, file_meta['mimeType'])
+                return self.download_stream_to_path(
+                    file_id, file_meta['mimeType'], export_mime, local_save_path,
+                    expected_md5=file_meta.get('md5Checksum'),
+                )
+            except Exception as e:
+                if attempt == 0 and self._forget_if_not_found(e, file_id):
+                    continue
+                logger.error(f"Erro ao baixar '{file_name}' por caminho: {e}", exc_info=True)
+                return False
         return False
 
     # ------------------------------------------------------------------
@@ -266,13 +483,16 @@ class DriveDownloader:
         folders: List[Dict[str, str]] = []
         if not _self.service:
             return folders
+        limiter = get_drive_rate_limiter()
         page_token = None
         while True:
             try:
+                limiter.acquire()
                 resp = _self.service.files().list(
                     q=(f"'{parent_id}' in parents and "
                        "mimeType='application/vnd.google-apps.folder' and trashed=false"),
-                    spaces='drive', fields='nextPageToken, files(id, name)', pageToken=page_token
+                    spaces='drive', pageSize=PAGE_SIZE,
+                    fields='nextPageToken, files(id, name)', pageToken=page_token
                 ).execute()
                 for f in resp.get('files', []):
                     folders.append({'id': f['id'], 'name': f['name']})
@@ -288,29 +508,26 @@ class DriveDownloader:
     def get_processable_files(_self, folder_id: str) -> List[Dict[str, str]]:
         if not _self.service:
             return []
-        files: List[Dict[str, str]] = []
         try:
-            mime_queries = [f"mimeType='{mt}'" for mt in PROCESSABLE_MIME_TYPES]
-            mime_queries.append("mimeType='application/vnd.google-apps.folder'")
-            query = f"'{folder_id}' in parents and trashed=false and ({' or '.join(mime_queries)})"
-            page_token = None
-            while True:
-                results = _self.service.files().list(
-                    pageSize=1000, q=query,
-                    fields="nextPageToken, files(id, name, mimeType, size)",
-                    pageToken=page_token
-                ).execute()
-                for item in results.get('files', []):
-                    if item['mimeType'] == 'application/vnd.google-apps.folder':
-                        files.extend(_self.get_processable_files(item['id']))
-                    elif item['mimeType'] in PROCESSABLE_MIME_TYPES:
-                        files.append({
-                            'id': item['id'], 'name': item['name'],
-                            'mimeType': item['mimeType'], 'size': item.get('size')
-                        })
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
+            return _self.list_processable_files(folder_id)
         except Exception as e:
             logger.error(f"Erro ao listar arquivos processáveis em '{folder_id}': {e}", exc_info=True)
-        return files
+            return []
+
+    def list_processable_files(self, folder_id: str) -> List[Dict[str, str]]:
+        """Uncached listing of the processable files under *folder_id*; API errors propagate.
+
+        Syncs reconcile against this listing, so a failed call must not look like an
+        empty folder (which would remove every indexed file).
+        """
+        items = DriveCrawler(self.service).crawl(
+            folder_id, mime_filter=PROCESSABLE_MIME_TYPES,
+            file_fields='id, name, mimeType, size, md5Checksum, modifiedTime, version, headRevisionId',
+        )
+        return [
+            {'id': item['id'], 'name': item['name'], 'mimeType': item['mimeType'],
+             'size': item.get('size'), 'md5Checksum': item.get('md5Checksum'),
+             'modifiedTime': item.get('modifiedTime'), 'version': item.get('version'),
+             'headRevisionId': item.get('headRevisionId')}
+            for item in items
+        ]
@@ -0,0 +1,200 @@
+"""
+Local index of the Drive library file names.
+
+Used for the post-answer document suggestions in the chat: instead of a live
+``files.list`` full-text search on every answer, file names and metadata of the
+library folder tree are kept in memory and queried with accent-folded trigram /
+word-prefix matching.
+
+Tree membership comes from a ``DriveChangeTracker`` with its own state file
+(``data/.drive_file_index_<folder id>.json``): it polls the ``changes.list``
+feed, lists folders moved into the tree with ``DriveCrawler``, drops the files
+of folders moved out, and crawls the whole tree when the token is missing or
+rejected. The search structures are rebuilt from that membership after every
+poll that changed it.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from safety_ai_app.drive_changes import DriveChangeTracker
+
+logger = logging.getLogger(__name__)
+
+_STATE_NAME = '.drive_file_index'
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+DEFAULT_REFRESH_INTERVAL_SECONDS: int = 600
+
+
+def fold_text(text: str) -> str:
+    """Lowercase and strip accents (NFKD), e.g. 'Ação' -> 'acao'."""
+    normalized = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in normalized if not unicodedata.combining(c)).lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class DriveFileIndex:
+    """In-memory name index of every file under a Drive folder tree, fed by a ``DriveChangeTracker``."""
+
+    def __init__(self, service: Any, root_folder_id: str, data_dir: str) -> None:
+        self.service = service
+        self.root_folder_id = root_folder_id
+        self.tracker = DriveChangeTracker(service, root_folder_id, data_dir, state_name=_STATE_NAME)
+        self._lock = threading.Lock()
+
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # tracker.membership_version the search structures were built from
+        self._membership_version = -1
+        self.last_refresh: Optional[datetime] = None
+
+        # Derived search structures (rebuilt on every change set)
+        self._folded: Dict[str, str] = {}
+        self._trigram_postings: Dict[str, Set[str]] = {}
+        self._words: List[tuple] = []
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # Membership persisted by the tracker: searchable before the first poll of this process
+        if self.tracker.last_poll is not None:
+            self._load_membership()
+            self.last_refresh = self.tracker.last_poll
+            logger.info(f"Índice local do Drive carregado: {len(self._files)} arquivos.")
+
+    # ------------------------------------------------------------------
+    # Search structures
+    # ------------------------------------------------------------------
+
+    def _load_membership(self) -> None:
+        files = self.tracker.tracked_files()
+        self._membership_version = self.tracker.membership_version
+        folded: Dict[str, str] = {}
+        postings: Dict[str, Set[str]] = {}
+        words: List[tuple] = []
+        for file_id, meta in files.items():
+            name = fold_text(meta.get('name', ''))
+            folded[file_id] = name
+            for tri in _trigrams(name):
+                postings.setdefault(tri, set()).add(file_id)
+            for word in set(_WORD_RE.findall(name)):
+                words.append((word, file_id))
+        words.sort()
+        self._files, self._folded, self._trigram_postings, self._words = files, folded, postings, words
+
+    def _prefix_matches(self, prefix: str) -> Set[str]:
+        start = bisect.bisect_left(self._words, (prefix, ''))
+        matches: Set[str] = set()
+        for word, file_id in self._words[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.add(file_id)
+        return matches
+
+    def _substring_matches(self, token: str) -> Set[str]:
+        grams = _trigrams(token)
+        candidates: Optional[Set[str]] = None
+        for gram in sorted(grams, key=lambda g: len(self._trigram_postings.get(g, ()))):
+            posting = self._trigram_postings.get(gram)
+            if not posting:
+                return set()
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+        return {fid for fid in (candidates or set()) if token in self._folded.get(fid, '')}
+
+    @property
+    def is_ready(self) -> bool:
+        return self.last_refresh is not None
+
+    def search(self, keyword: str, max_results: int = 10) -> List[Dict[str, str]]:
+        """Rank library files by how many query tokens match their (folded) name.
+
+        Returns dicts with keys id, name, mimeType, webViewLink — the same shape as
+        ``google_drive_integrator.list_drive_files_by_keyword``.
+        """
+        tokens = [t for t in _WORD_RE.findall(fold_text(keyword)) if t]
+        if not tokens:
+            return []
+
+        scores: Dict[str, float] = {}
+        for token in tokens:
+            prefix_hits = self._prefix_matches(token)
+            substring_hits = self._substring_matches(token) if len(token) >= 3 else set()
+            for fid in prefix_hits:
+                scores[fid] = scores.get(fid, 0.0) + 2.0
+            for fid in substring_hits - prefix_hits:
+                scores[fid] = scores.get(fid, 0.0) + 1.0
+
+        ranked = sorted(scores, key=lambda fid: (-scores[fid], len(self._folded.get(fid, ''))))
+        results = []
+        for fid in ranked[:max_results]:
+            meta = self._files.get(fid)
+            if meta is None:
+                continue
+            results.append({
+                'id': fid,
+                'name': meta.get('name', ''),
+                'mimeType': meta.get('mimeType', ''),
+                'webViewLink': meta.get('webViewLink', ''),
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Bring the index up to date through the tracker (changes feed, full crawl when needed)."""
+        if not self.service:
+            return
+        with self._lock:
+            try:
+                with self.tracker.lock:
+                    to_index, to_remove = self.tracker.poll(lambda: list(self._files))
+                    # The name index applies the whole membership at once: nothing stays pending
+                    self.tracker.mark_indexed(item['id'] for item in to_index)
+                    self.tracker.mark_removed(to_remove)
+                # Another process may have consumed the changes and saved the membership first
+                if (to_index or to_remove or self.last_refresh is None
+                        or self.tracker.membership_version != self._membership_version):
+                    self._load_membership()
+                self.last_refresh = datetime.now()
+                logger.debug(
+                    f"Índice local do Drive ({self.tracker.last_mode}): {len(to_index)} arquivo(s) novo(s) ou "
+                    f"alterado(s), {len(to_remove)} removido(s), {self.tracker.last_request_count} requisição(ões)."
+                )
+            except Exception as e:
+                logger.error(f"Erro ao atualizar índice local do Drive: {e}", exc_info=True)
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def start_background_refresh(self, interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS) -> None:
+        """Refresh now and then every *interval_seconds* in a daemon thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _loop() -> None:
+            while True:
+                self.refresh()
+                if self._stop_event.wait(timeout=interval_seconds):
+                    return
+
+        self._thread = threading.Thread(target=_loop, name="DriveFileIndex_Refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
@@ -0,0 +1,187 @@
+"""
+Drive file-metadata lookups behind a TTL cache shared by every process
+(``data/.drive_metadata_cache.sqlite3``).
+
+``get_file_metadata`` used to memoize its ``files.get`` with ``st.cache_data``,
+which the FastAPI process, the indexer subprocess and the scheduler thread never
+see. ``DriveMetadataFetcher`` serves fresh entries from an SQLite cache (WAL,
+per-thread connections, like the download metadata store) and fetches a missing
+one with ``files.get``, taking a token from the process-wide limiter; calls
+answered with a rate-limit or server error are retried with exponential backoff.
+Every caller checks a single file (the CBO/SESMT/fines checks, ``should_download``):
+the multi-file syncs read md5 and modifiedTime from their listings.
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from googleapiclient.errors import HttpError
+
+from safety_ai_app.drive_crawler import authorized_http_for_thread, get_drive_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+_DB_FILENAME = '.drive_metadata_cache.sqlite3'
+_BUSY_TIMEOUT_MS = 30_000
+DEFAULT_TTL_SECONDS = 300
+FETCH_MAX_ATTEMPTS = 5
+FETCH_BACKOFF_BASE_SECONDS = 1.0
+FETCH_BACKOFF_CAP_SECONDS = 32.0
+METADATA_FIELDS = 'id, modifiedTime, md5Checksum'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_metadata (
+    file_id       TEXT PRIMARY KEY,
+    modified_time TEXT,
+    md5_checksum  TEXT,
+    fetched_at    REAL NOT NULL
+)
+"""
+_UPSERT = """
+INSERT INTO file_metadata (file_id, modified_time, md5_checksum, fetched_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(file_id) DO UPDATE SET
+    modified_time = excluded.modified_time,
+    md5_checksum = excluded.md5_checksum,
+    fetched_at = excluded.fetched_at
+"""
+
+
+def _is_retryable(error: Exception) -> bool:
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    return status in (429, 500, 502, 503, 504) or (
+        status == 403 and b'ateLimitExceeded' in (error.content or b'')
+    )
+
+
+class DriveMetadataCache:
+    """``{"file_id", "modified_time", "md5_checksum"}`` per Drive file id, fresh for *ttl_seconds*."""
+
+    def __init__(self, data_dir: str, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, _DB_FILENAME)
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        os.makedirs(data_dir, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Fresh entry for *file_id*, or None when it is expired or unknown."""
+        row = self._connection().execute(
+            'SELECT modified_time, md5_checksum FROM file_metadata WHERE file_id = ? AND fetched_at >= ?',
+            (file_id, time.time() - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"file_id": file_id, "modified_time": row[0], "md5_checksum": row[1]}
+
+    def put(self, meta: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(_UPSERT, (meta["file_id"], meta.get("modified_time"), meta.get("md5_checksum"), now))
+            conn.execute('DELETE FROM file_metadata WHERE fetched_at < ?', (now - self.ttl_seconds,))
+
+    def invalidate(self, file_ids: Iterable[str]) -> None:
+        with self._transaction() as conn:
+            conn.executemany('DELETE FROM file_metadata WHERE file_id = ?', [(fid,) for fid in file_ids])
+
+
+class DriveMetadataFetcher:
+    """Metadata of one file: shared cache first, then ``files.get`` with retries."""
+
+    def __init__(self, service: Any, cache: Optional[DriveMetadataCache] = None) -> None:
+        self.service = service
+        self.cache = cache
+        # HTTP round trips issued, for logs and benchmarks
+        self.requests = 0
+
+    def fetch(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        ``{"file_id", "modified_time", "md5_checksum"}``, or None when it could not
+        be fetched (not found, no access, retries exhausted).
+        """
+        found = self.cache.get(file_id) if self.cache is not None else None
+        if found is not None or not self.service:
+            return found
+        fetched = self._fetch_remote(file_id)
+        if self.cache is not None and fetched is not None:
+            try:
+                self.cache.put(fetched)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar cache de metadados do Drive: {e}")
+        return fetched
+
+    @staticmethod
+    def _backoff(attempt: int) -> None:
+        delay = min(FETCH_BACKOFF_CAP_SECONDS, FETCH_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def _fetch_remote(self, file_id: str) -> Optional[Dict[str, Any]]:
+        for attempt in range(1, FETCH_MAX_ATTEMPTS + 1):
+            get_drive_rate_limiter().acquire()
+            try:
+                self.requests += 1
+                request = self.service.files().get(fileId=file_id, fields=METADATA_FIELDS)
+                http = authorized_http_for_thread(self.service)
+                response = request.execute(http=http) if http is not None else request.execute()
+                return {
+                    "file_id": file_id,
+                    "modified_time": response.get('modifiedTime'),
+                    "md5_checksum": response.get('md5Checksum'),
+                }
+            except Exception as e:
+                if not _is_retryable(e) or attempt == FETCH_MAX_ATTEMPTS:
+                    logger.error(f"Erro ao obter metadados do arquivo {file_id}: {e}")
+                    return None
+            self._backoff(attempt)
+        return None
+
+
+_shared_caches: Dict[str, DriveMetadataCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_metadata_cache(data_dir: str) -> DriveMetadataCache:
+    """One cache object per data dir and process (connections are per thread)."""
+    key = os.path.abspath(data_dir)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = DriveMetadataCache(data_dir)
+        return cache
@@ -0,0 +1,150 @@
+"""
+Persisted cache of Drive name lookups used to resolve paths.
+
+Resolving ``SafetyAI/Tabelas/CID10.xlsx`` costs one ``files.list`` call per
+segment. Each segment lookup is cached as ``(parent id, name, kind) -> id``, so
+paths sharing a prefix share the cached folder ids. Entries expire after a TTL;
+misses are cached too (negative caching, shorter TTL). An id the API no longer
+knows (404) is dropped together with everything resolved beneath it. The map
+is persisted to ``data/`` so restarts and short-lived processes skip the
+lookups entirely.
+
+Only meant for the app's service-account Drive: ``'root'`` means a different
+folder for every account, so user OAuth lookups must not share it.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CACHE_FILENAME = '.drive_path_cache.json'
+
+KIND_FILE = 'file'
+KIND_FOLDER = 'folder'
+
+DEFAULT_TTL_SECONDS: int = 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS: int = 120
+
+_Key = Tuple[str, str, str]
+
+
+class DrivePathCache:
+    """Thread-safe ``(parent id, name, kind) -> Drive id`` map with TTLs, persisted as JSON."""
+
+    def __init__(
+        self,
+        data_dir: Optional[str],
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        negative_ttl_seconds: int = DEFAULT_NEGATIVE_TTL_SECONDS,
+    ) -> None:
+        self._path = os.path.join(data_dir, _CACHE_FILENAME) if data_dir else None
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (id or None for "not found", expires_at epoch seconds)
+        self._entries: Dict[_Key, Tuple[Optional[str], float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            for parent_id, name, kind, file_id, expires_at in data.get('entries', []):
+                if expires_at > now:
+                    self._entries[(parent_id, name, kind)] = (file_id, expires_at)
+            logger.debug(f"Cache de caminhos do Drive carregado: {len(self._entries)} entradas.")
+        except (json.JSONDecodeError, IOError, ValueError, TypeError) as e:
+            logger.warning(f"Erro ao carregar cache de caminhos do Drive: {e}")
+
+    def _save(self) -> None:
+        if not self._path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = f"{self._path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'entries': [[*key, file_id, expires_at] for key, (file_id, expires_at) in self._entries.items()],
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
+        except IOError as e:
+            logger.error(f"Erro ao salvar cache de caminhos do Drive: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, parent_id: str, name: str, kind: str) -> Tuple[bool, Optional[str]]:
+        """Return ``(hit, id)``; ``(True, None)`` is a cached "not found"."""
+        with self._lock:
+            entry = self._entries.get((parent_id, name, kind))
+            if entry is None or entry[1] <= time.time():
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, parent_id: str, name: str, kind: str, file_id: Optional[str]) -> None:
+        ttl = self.ttl_seconds if file_id else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[(parent_id, name, kind)] = (file_id, time.time() + ttl)
+            self._save()
+
+    def invalidate(self, parent_id: str, name: str, kind: str) -> None:
+        with self._lock:
+            if self._entries.pop((parent_id, name, kind), None) is not None:
+                self._save()
+
+    def invalidate_id(self, file_id: str) -> int:
+        """Drop every entry resolving to *file_id* and everything cached beneath it. Returns entries dropped."""
+        with self._lock:
+            dropped: List[_Key] = []
+            pending = {file_id}
+            while pending:
+                stale = pending.pop()
+                for key, (cached_id, _) in list(self._entries.items()):
+                    if cached_id == stale or key[0] == stale:
+                        del self._entries[key]
+                        dropped.append(key)
+                        if cached_id and cached_id != stale:
+                            pending.add(cached_id)
+            if dropped:
+                self._save()
+                logger.info(f"Cache de caminhos do Drive: {len(dropped)} entrada(s) invalidada(s) para '{file_id}'.")
+            return len(dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_shared_caches: Dict[str, DrivePathCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_path_cache(data_dir: str) -> DrivePathCache:
+    """One cache per data dir and process, so instances don't overwrite each other's file."""
+    key = os.path.abspath(data_dir)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = DrivePathCache(data_dir)
+        return cache
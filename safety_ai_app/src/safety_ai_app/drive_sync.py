@@ -1,14 +1,398 @@
 import os
 import logging
+import queue
+import random
 import tempfile
 import shutil
+import threading
+import time
 import uuid
-from typing import Optional, Callable, Any
+from contextlib import contextmanager
+from http.client import HTTPException
+from typing import Optional, Callable, Any, Dict, Iterator, List, Tuple
 
+import httplib2
+from googleapiclient.errors import HttpError
+
+from safety_ai_app.drive_crawler import get_drive_rate_limiter
+from safety_ai_app.export_cache import revision_key
 from safety_ai_app.text_extractors import get_extension_from_mime_type
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DOWNLOAD_WORKERS = 6
+DOWNLOAD_MAX_ATTEMPTS = 5
+DOWNLOAD_BACKOFF_BASE_SECONDS = 1.0
+DOWNLOAD_BACKOFF_CAP_SECONDS = 32.0
+# Successful downloads needed before the concurrency limit grows by one again
+CONCURRENCY_RAMP_UP_SUCCESSES = 8
+
+
+class AdaptiveConcurrency:
+    """AIMD cap on concurrent downloads: halved on rate limiting, +1 after a run of successes."""
+
+    def __init__(self, max_limit: int, ramp_up_successes: int = CONCURRENCY_RAMP_UP_SUCCESSES) -> None:
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.lowest_limit = self.limit
+        self.rate_limited = 0
+        self._ramp_up_successes = ramp_up_successes
+        self._successes = 0
+        self._active = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._ramp_up_successes and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self.lowest_limit = min(self.lowest_limit, self.limit)
+            self.rate_limited += 1
+            self._successes = 0
+
+
+class SyncTimeline:
+    """Start/end of every file's download and processing, for the per-stage report."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.events: List[Tuple[str, str, float, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, file_id: str, stage: str, start: float, end: float) -> None:
+        with self._lock:
+            self.events.append((file_id, stage, start - self.started, end - self.started))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: files, busy seconds (summed over workers), first start and last end (s since start)."""
+        stages: Dict[str, Dict[str, float]] = {}
+        for _, stage, start, end in self.events:
+            s = stages.setdefault(stage, {'files': 0, 'busy_s': 0.0, 'first_start_s': start, 'last_end_s': end})
+            s['files'] += 1
+            s['busy_s'] += end - start
+            s['first_start_s'] = min(s['first_start_s'], start)
+            s['last_end_s'] = max(s['last_end_s'], end)
+        return stages
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def format(self) -> str:
+        lines = [f"tempo total {self.wall_seconds:.1f}s"]
+        for stage, s in self.summary().items():
+            lines.append(
+                f"{stage}: {int(s['files'])} arquivo(s), ocupado {s['busy_s']:.1f}s, "
+                f"de {s['first_start_s']:.1f}s a {s['last_end_s']:.1f}s"
+            )
+        return "; ".join(lines)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    return status == 429 or (status == 403 and b'ateLimitExceeded' in (error.content or b''))
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return _is_rate_limited(error) or error.resp.status >= 500
+    return isinstance(error, (OSError, HTTPException, httplib2.HttpLib2Error))
+
+
+def _size_key(item: Dict[str, Any]) -> int:
+    # Native Google docs have no size (exports are small): they go first too
+    try:
+        return int(item.get('size') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _download_one(
+    integrator: Any,
+    item: Dict[str, Any],
+    temp_dir: str,
+    concurrency: AdaptiveConcurrency,
+    timeline: SyncTimeline,
+) -> Tuple[Dict[str, Any], Optional[str], str]:
+    """Download *item* with per-file retries. Returns (item, temp path or None on failure, export MIME)."""
+    from safety_ai_app.drive_downloader import get_download_metadata
+
+    _, export_mime_type = get_download_metadata(item['name'], item['mimeType'])
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}.{get_extension_from_mime_type(export_mime_type)}")
+    export_cache = getattr(integrator, 'export_cache', None)
+    revision = revision_key(item) if export_cache is not None else None
+    started = time.monotonic()
+    ok = False
+    try:
+        if revision and export_cache.fetch_export(item['id'], revision, export_mime_type, temp_path):
+            return item, temp_path, export_mime_type
+        for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+            try:
+                with concurrency.slot():
+                    get_drive_rate_limiter().acquire()
+                    # max_retries=0: transient errors come back here, where the pool adapts to them
+                    ok = integrator._download_file_to_path_internal(
+                        item['id'], item['mimeType'], export_mime_type, temp_path, item.get('md5Checksum'),
+                        max_retries=0, raise_errors=True,
+                    )
+                concurrency.on_success()
+                break
+            except Exception as e:
+                if _is_rate_limited(e):
+                    concurrency.on_rate_limited()
+                if attempt == DOWNLOAD_MAX_ATTEMPTS or not _is_retryable(e):
+                    logger.error(f"Falha ao baixar '{item['name']}' após {attempt} tentativa(s): {e}")
+                    break
+                delay = min(DOWNLOAD_BACKOFF_CAP_SECONDS, DOWNLOAD_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+    finally:
+        timeline.record(item['id'], 'download', started, time.monotonic())
+
+    if ok and os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
+        if revision:
+            try:
+                export_cache.store_export(item['id'], revision, export_mime_type, temp_path)
+            except Exception as e:
+                logger.warning(f"Não foi possível guardar a exportação de '{item['name']}' em cache: {e}")
+        return item, temp_path, export_mime_type
+    logger.warning(f"Arquivo '{item['name']}' vazio ou falha no download. Ignorando.")
+    for leftover in (temp_path, f"{temp_path}.part"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    return item, None, export_mime_type
+
+
+def download_and_process(
+    integrator: Any,
+    items: List[Dict[str, Any]],
+    process: Callable[[Dict[str, Any], str, str], bool],
+    temp_dir: str,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    timeline: Optional[SyncTimeline] = None,
+) -> int:
+    """
+    Download *items* on a bounded pool (smallest first) while the calling thread
+    processes the files already downloaded.
+
+    ``process(item, temp_path, export_mime_type)`` runs on the calling thread, in
+    download-completion order, and returns True when the file was ingested; the
+    temp file is removed afterwards. The ready queue is bounded, so downloads
+    pause while processing lags behind. Returns the number of files processed.
+    """
+    timeline = timeline if timeline is not None else SyncTimeline()
+    total = len(items)
+    pending: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    for item in sorted(items, key=_size_key):
+        pending.put(item)
+    ready: "queue.Queue[Tuple[Dict[str, Any], Optional[str], str]]" = queue.Queue(maxsize=max(2, 2 * max_workers))
+    concurrency = AdaptiveConcurrency(max_workers)
+    stop = threading.Event()
+
+    def _worker() -> None:
+        while not stop.is_set():
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result = _download_one(integrator, item, temp_dir, concurrency, timeline)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao baixar '{item.get('name')}': {e}", exc_info=True)
+                result = (item, None, '')
+            while True:
+                try:
+                    ready.put(result, timeout=0.5)
+                    break
+                except queue.Full:
+                    if stop.is_set():
+                        if result[1] and os.path.exists(result[1]):
+                            os.remove(result[1])
+                        return
+
+    workers = [
+        threading.Thread(target=_worker, name=f"DriveSyncDownload-{i}", daemon=True)
+        for i in range(max(1, min(max_workers, total)))
+    ]
+    for w in workers:
+        w.start()
+
+    processed = 0
+    try:
+        for _ in range(total):
+            item, temp_path, export_mime_type = ready.get()
+            if progress_callback:
+                progress_callback(processed, total, item['name'])
+            if temp_path is None:
+                continue
+            started = time.monotonic()
+            try:
+                if process(item, temp_path, export_mime_type):
+                    processed += 1
+            except Exception as e:
+                logger.error(f"Erro ao processar '{item['name']}' para ChromaDB: {e}", exc_info=True)
+            finally:
+                timeline.record(item['id'], 'process', started, time.monotonic())
+                if os.path.exists(temp_path):
+                    try:
+                        os.remove(temp_path)
+                    except OSError as e:
+                        logger.warning(f"Não foi possível remover '{temp_path}': {e}")
+    finally:
+        stop.set()
+        for w in workers:
+            w.join(timeout=5)
+        timeline.finished = time.monotonic()
+
+    if concurrency.rate_limited:
+        logger.warning(
+            f"Downloads limitados pelo Drive {concurrency.rate_limited} vez(es); "
+            f"concorrência reduzida até {concurrency.lowest_limit}."
+        )
+    return processed
+
+
+def _revision_metadata(item: Dict[str, Any]) -> Dict[str, str]:
+    """Chunk metadata identifying the Drive revision that was indexed (Chroma rejects None values)."""
+    meta = {}
+    if item.get('modifiedTime'):
+        meta["drive_modified_time"] = item['modifiedTime']
+    if item.get('md5Checksum'):
+        meta["drive_md5_checksum"] = item['md5Checksum']
+    return meta
+
+
+def _same_revision(item: Dict[str, Any], indexed: Dict[str, Optional[str]]) -> bool:
+    # Binary files carry an md5; native Google docs only a modifiedTime
+    if item.get('md5Checksum') and indexed.get('md5Checksum'):
+        return item['md5Checksum'] == indexed['md5Checksum']
+    if item.get('modifiedTime') and indexed.get('modifiedTime'):
+        return item['modifiedTime'] == indexed['modifiedTime']
+    # Indexed before revisions were recorded: re-index once
+    return False
+
+
+def _index_drive_file(
+    qa_system: Any,
+    item: Dict[str, Any],
+    temp_path: Optional[str],
+    export_mime_type: str,
+    source_description: str,
+    source_type_metadata: str,
+    export_cache: Any = None,
+    documents: Optional[List[Any]] = None,
+) -> None:
+    """(Re)index one Drive file from *temp_path* or from already extracted *documents*."""
+    revision = revision_key(item) if export_cache is not None else None
+    if documents is None and revision:
+        documents = qa_system.load_documents(temp_path, export_mime_type)
+        try:
+            export_cache.store_pages(item['id'], revision, export_mime_type, [
+                {"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents
+            ])
+        except Exception as e:
+            logger.warning(f"Não foi possível guardar o texto de '{item['name']}' em cache: {e}")
+    # Replaces the chunks of the previous revision (and of a partial earlier attempt)
+    qa_system.remove_document_by_id(item['id'])
+    qa_system.process_document_to_chroma(
+        file_path=temp_path or '',
+        document_name=item['name'],
+        source=source_description,
+        file_type=export_mime_type,
+        additional_metadata={
+            "source_type": source_type_metadata, "drive_file_id": item['id'], **_revision_metadata(item)
+        },
+        documents=documents,
+    )
+
+
+def _index_cached_exports(
+    integrator: Any,
+    items: List[Dict[str, Any]],
+    index: Callable[..., bool],
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Index the native Google files whose extracted pages are cached for their
+    current revision, with no export. Returns (files indexed, items still to download).
+    """
+    export_cache = getattr(integrator, 'export_cache', None)
+    if export_cache is None:
+        return 0, items
+
+    from langchain_core.documents import Document
+
+    from safety_ai_app.drive_downloader import get_download_metadata
+
+    to_download: List[Dict[str, Any]] = []
+    processed = 0
+    for item in items:
+        revision = revision_key(item)
+        _, export_mime_type = get_download_metadata(item['name'], item['mimeType'])
+        pages = export_cache.get_pages(item['id'], revision, export_mime_type) if revision else None
+        if pages is None:
+            to_download.append(item)
+            continue
+        if progress_callback:
+            progress_callback(processed, len(items), item['name'])
+        documents = [Document(page_content=p["page_content"], metadata=p["metadata"]) for p in pages]
+        try:
+            if index(item, None, export_mime_type, documents=documents):
+                processed += 1
+        except Exception as e:
+            logger.error(f"Erro ao processar '{item['name']}' para ChromaDB: {e}", exc_info=True)
+    if processed:
+        logger.info(f"{processed} documento(s) nativo(s) do Google indexado(s) a partir do cache de exportação.")
+    return processed, to_download
+
+
+def _offset_progress(
+    progress_callback: Optional[Callable[[int, int, str], None]], done: int, total: int
+) -> Optional[Callable[[int, int, str], None]]:
+    if progress_callback is None or not done:
+        return progress_callback
+    return lambda current, _total, name: progress_callback(done + current, total, name)
+
+
+def reconcile_drive_listing(
+    listing: List[Dict[str, Any]],
+    indexed: Dict[str, Dict[str, Optional[str]]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+    """
+    Three-way reconcile of a folder listing against the indexed revisions.
+
+    Returns ``(to_add, to_update, to_delete)``: files not indexed yet, files whose
+    md5 / modifiedTime differs from the indexed one, and ids indexed but no
+    longer listed.
+    """
+    listed = {item['id'] for item in listing}
+    to_add = [item for item in listing if item['id'] not in indexed]
+    to_update = [item for item in listing if item['id'] in indexed and not _same_revision(item, indexed[item['id']])]
+    to_delete = sorted(file_id for file_id in indexed if file_id not in listed)
+    return to_add, to_update, to_delete
+
 
 def synchronize_drive_folder_to_chroma(
     integrator: Any,
@@ -17,9 +401,16 @@ def synchronize_drive_folder_to_chroma(
     source_description: str,
     source_type_metadata: str,
     progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    timeline: Optional[SyncTimeline] = None,
 ) -> int:
+    """
+    Reconcile the folder's current listing with what is indexed for
+    *source_type_metadata*: new files are indexed, changed files have their
+    chunks replaced and files no longer in the folder have them removed.
+    Returns the number of files (re)indexed.
+    """
     from safety_ai_app.nr_rag_qa import NRQuestionAnswering
-    from safety_ai_app.drive_downloader import get_download_metadata
 
     if not integrator.service or not isinstance(qa_system, NRQuestionAnswering):
         logger.error("Serviço do Drive ou sistema QA não disponível para sincronização.")
@@ -27,64 +418,55 @@ def synchronize_drive_folder_to_chroma(
             progress_callback(0, 0, "Erro interno: Serviço indisponível")
         return 0
 
-    all_files = integrator.get_processable_drive_files_in_folder(folder_id)
+    try:
+        all_files = integrator.list_processable_drive_files_in_folder(folder_id)
+    except Exception as e:
+        logger.error(f"Erro ao listar a pasta '{folder_id}' para sincronização: {e}", exc_info=True)
+        if progress_callback:
+            progress_callback(0, 0, f"Erro ao listar a pasta: {e}")
+        return 0
 
-    if not all_files:
-        logger.info(f"Nenhum arquivo processável encontrado na pasta '{folder_id}'.")
+    indexed = qa_system.get_drive_file_revisions_in_chroma(source_type=source_type_metadata)
+    if indexed is None:
+        logger.error("Não foi possível ler os documentos indexados; sincronização cancelada.")
         if progress_callback:
-            progress_callback(0, 0, "Nenhum arquivo encontrado")
+            progress_callback(0, 0, "Erro: índice indisponível")
         return 0
 
-    existing_ids = qa_system.get_drive_file_ids_in_chroma(source_type=source_type_metadata)
-    files_to_process = [f for f in all_files if f['id'] not in existing_ids]
+    to_add, to_update, to_delete = reconcile_drive_listing(all_files, indexed)
+    logger.info(
+        f"Pasta '{folder_id}' ({source_type_metadata}): {len(all_files)} arquivo(s); "
+        f"{len(to_add)} novo(s), {len(to_update)} alterado(s), {len(to_delete)} removido(s)."
+    )
+
+    for file_id in to_delete:
+        qa_system.remove_document_by_id(file_id)
 
+    files_to_process = to_add + to_update
     if not files_to_process:
         logger.info("Todos os arquivos já estão sincronizados.")
         if progress_callback:
             progress_callback(0, 0, "Todos os arquivos já sincronizados")
         return 0
 
-    logger.info(f"Preparando para sincronizar {len(files_to_process)} novo(s) documento(s).")
     total = len(files_to_process)
     processed = 0
+    timeline = timeline if timeline is not None else SyncTimeline()
     temp_dir = tempfile.mkdtemp(prefix=f"drive_chroma_sync_{source_type_metadata}_")
 
-    try:
-        for item in files_to_process:
-            file_id = item['id']
-            file_name = item['name']
-            original_mime_type = item['mimeType']
-
-            if progress_callback:
-                progress_callback(processed, total, file_name)
-
-            final_file_name, export_mime_type = get_download_metadata(file_name, original_mime_type)
-            unique_name = f"{uuid.uuid4().hex}.{get_extension_from_mime_type(export_mime_type)}"
-            temp_path = os.path.join(temp_dir, unique_name)
+    def _process(item: Dict[str, Any], temp_path: Optional[str], export_mime_type: str, documents: Any = None) -> bool:
+        _index_drive_file(
+            qa_system, item, temp_path, export_mime_type, source_description, source_type_metadata,
+            getattr(integrator, 'export_cache', None), documents,
+        )
+        return True
 
-            try:
-                file_bytes = integrator._download_file_bytes_internal(file_id, original_mime_type, export_mime_type)
-                if file_bytes:
-                    with open(temp_path, 'wb') as f:
-                        f.write(file_bytes)
-                    qa_system.process_document_to_chroma(
-                        file_path=temp_path,
-                        document_name=file_name,
-                        source=source_description,
-                        file_type=export_mime_type,
-                        additional_metadata={"source_type": source_type_metadata, "drive_file_id": file_id}
-                    )
-                    processed += 1
-                else:
-                    logger.warning(f"Arquivo '{file_name}' vazio ou falha no download. Ignorando.")
-            except Exception as e:
-                logger.error(f"Erro ao processar '{file_name}' para ChromaDB: {e}", exc_info=True)
-            finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except OSError as e:
-                        logger.warning(f"Não foi possível remover '{temp_path}': {e}")
+    try:
+        processed, to_download = _index_cached_exports(integrator, files_to_process, _process, progress_callback)
+        processed += download_and_process(
+            integrator, to_download, _process, temp_dir, max_workers=max_workers,
+            progress_callback=_offset_progress(progress_callback, processed, total), timeline=timeline,
+        )
     except Exception as e:
         logger.error(f"Erro geral durante a sincronização Drive→Chroma: {e}", exc_info=True)
         if progress_callback:
@@ -96,19 +478,116 @@ def synchronize_drive_folder_to_chroma(
             except OSError as e:
                 logger.warning(f"Erro ao remover diretório temporário '{temp_dir}': {e}")
 
+    logger.info(f"Sincronização Drive→Chroma ({source_type_metadata}): {processed}/{total} — {timeline.format()}")
     if progress_callback:
         progress_callback(processed, total, "Concluído")
 
     return processed
 
 
+def synchronize_drive_changes_to_chroma(
+    integrator: Any,
+    tracker: Any,
+    qa_system: Any,
+    source_description: str,
+    source_type_metadata: str,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    timeline: Optional[SyncTimeline] = None,
+) -> int:
+    """
+    Incremental sync driven by a ``DriveChangeTracker``: only files added,
+    modified, trashed or moved since the last poll are touched.
+
+    Modified files have their chunks replaced; files that left the tree have them
+    removed. Files whose download or processing fails stay pending in the tracker
+    and are retried on the next cycle. Returns the number of files (re)indexed.
+    """
+    from safety_ai_app.nr_rag_qa import NRQuestionAnswering
+
+    if not integrator.service or not isinstance(qa_system, NRQuestionAnswering):
+        logger.error("Serviço do Drive ou sistema QA não disponível para sincronização.")
+        if progress_callback:
+            progress_callback(0, 0, "Erro interno: Serviço indisponível")
+        return 0
+
+    with tracker.lock:
+        to_index, to_remove = tracker.poll(
+            lambda: qa_system.get_drive_file_ids_in_chroma(source_type=source_type_metadata)
+        )
+        logger.info(
+            f"Feed de alterações ({tracker.last_mode}): {tracker.last_change_count} alteração(ões) em "
+            f"{tracker.last_request_count} requisição(ões); {len(to_index)} a indexar, {len(to_remove)} a remover."
+        )
+
+        removed = []
+        for file_id in to_remove:
+            qa_system.remove_document_by_id(file_id)
+            removed.append(file_id)
+        if removed:
+            tracker.mark_removed(removed)
+
+        if not to_index:
+            if progress_callback:
+                progress_callback(0, 0, "Todos os arquivos já sincronizados")
+            return 0
+
+        total = len(to_index)
+        indexed: List[str] = []
+        timeline = timeline if timeline is not None else SyncTimeline()
+        temp_dir = tempfile.mkdtemp(prefix=f"drive_chroma_sync_{source_type_metadata}_")
+
+        def _process(item: Dict[str, Any], temp_path: Optional[str], export_mime_type: str, documents: Any = None) -> bool:
+            _index_drive_file(
+                qa_system, item, temp_path, export_mime_type, source_description, source_type_metadata,
+                getattr(integrator, 'export_cache', None), documents,
+            )
+            indexed.append(item['id'])
+            return True
+
+        try:
+            _, to_download = _index_cached_exports(integrator, to_index, _process, progress_callback)
+            download_and_process(
+                integrator, to_download, _process, temp_dir, max_workers=max_workers,
+                progress_callback=_offset_progress(progress_callback, len(indexed), total), timeline=timeline,
+            )
+        except Exception as e:
+            logger.error(f"Erro geral durante a sincronização Drive→Chroma: {e}", exc_info=True)
+            if progress_callback:
+                progress_callback(len(indexed), total, f"Erro: {str(e)}")
+        finally:
+            tracker.mark_indexed(indexed)
+            if os.path.exists(temp_dir):
+                try:
+                    shutil.rmtree(temp_dir)
+                except OSError as e:
+                    logger.warning(f"Erro ao remover diretório temporário '{temp_dir}': {e}")
+
+    if len(indexed) < total:
+        logger.warning(f"{total - len(indexed)} arquivo(s) ficaram pendentes para o próximo ciclo.")
+    logger.info(f"Sincronização Drive→Chroma ({source_type_metadata}): {len(indexed)}/{total} — {timeline.format()}")
+    if progress_callback:
+        progress_callback(len(indexed), total, "Concluído")
+    return len(indexed)
+
+
 def synchronize_app_central_library(
     integrator: Any,
     qa_system: Any,
     ai_chat_sync_folder_id: str,
     progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    tracker: Optional[Any] = None,
 ) -> int:
     logger.info("Iniciando sincronização incremental da Biblioteca Central (Base de dados IA).")
+    if tracker is not None:
+        return synchronize_drive_changes_to_chroma(
+            integrator,
+            tracker,
+            qa_system,
+            source_description="Biblioteca Central do App (Base de dados IA)",
+            source_type_metadata="app_central_library_sync",
+            progress_callback=progress_callback,
+        )
     return synchronize_drive_folder_to_chroma(
         integrator,
         ai_chat_sync_folder_id,
@@ -133,11 +612,7 @@ def synchronize_user_drive_folder(
             progress_callback(0, 0, "Erro interno: QA indisponível")
         return 0
 
-    logger.info("Iniciando sincronização da pasta do Drive do usuário. Documentos antigos serão removidos.")
-    removed = qa_system.clear_docs_by_source_type(source_type_to_remove="user_uploaded_drive")
-    if removed > 0:
-        logger.info(f"{removed} chunks removidos para re-sincronização.")
-
+    logger.info("Iniciando sincronização da pasta do Drive do usuário (somente arquivos novos, alterados ou removidos).")
     return synchronize_drive_folder_to_chroma(
         integrator,
         folder_id,
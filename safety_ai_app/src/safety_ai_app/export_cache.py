@@ -0,0 +1,281 @@
+"""
+Disk cache of exported Google-native documents and their extracted text (``data/.export_cache/``).
+
+Docs, Sheets and Slides are exported by the Drive export endpoint, which
+returns no md5, so every sync had to export and extract them again. Entries
+are keyed by (file id, revision, export MIME), where the revision is the
+file's ``headRevisionId`` or, for native files that have none, its
+``version``. Exported bytes and the extracted pages (JSON) are stored
+content-addressed under ``objects/`` and indexed in an SQLite database shared
+by the app and the indexer subprocess. Objects are evicted least recently used
+once their total size exceeds ``max_bytes``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from safety_ai_app.text_extractors import GOOGLE_NATIVE_EXPORT_MIMES
+
+logger = logging.getLogger(__name__)
+
+_DB_FILENAME = 'index.sqlite3'
+_OBJECTS_DIRNAME = 'objects'
+_BUSY_TIMEOUT_MS = 30_000
+_HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS objects (
+        sha256    TEXT PRIMARY KEY,
+        size      INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        file_id     TEXT NOT NULL,
+        revision    TEXT NOT NULL,
+        export_mime TEXT NOT NULL,
+        export_sha  TEXT,
+        text_sha    TEXT,
+        PRIMARY KEY (file_id, revision, export_mime)
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used)',
+)
+
+
+def revision_key(item: Dict[str, Any]) -> Optional[str]:
+    """The revision an export is cached under, or None when *item* can't be cached."""
+    if item.get('mimeType') not in GOOGLE_NATIVE_EXPORT_MIMES:
+        return None
+    revision = item.get('headRevisionId') or item.get('version')
+    return str(revision) if revision else None
+
+
+class ExportCache:
+    """Exported bytes and extracted pages of native Google files, keyed by revision."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, _OBJECTS_DIRNAME)
+        self.db_path = os.path.join(cache_dir, _DB_FILENAME)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def _write_object(self, write: Any) -> Tuple[str, int]:
+        """Write a new object through *write(file)*; returns (sha256, size)."""
+        tmp_path = os.path.join(self.objects_dir, f".{uuid.uuid4().hex}.tmp")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as f:
+                write(f, digest)
+            size = os.path.getsize(tmp_path)
+            sha256 = digest.hexdigest()
+            path = self._object_path(sha256)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return sha256, size
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _lookup(self, file_id: str, revision: str, export_mime: str, column: str) -> Optional[str]:
+        row = self._connection().execute(
+            f'SELECT {column} FROM entries WHERE file_id = ? AND revision = ? AND export_mime = ?',
+            (file_id, revision, export_mime),
+        ).fetchone()
+        if not row or not row[0]:
+            return None
+        sha256 = row[0]
+        if not os.path.exists(self._object_path(sha256)):
+            return None
+        with self._transaction() as conn:
+            conn.execute('UPDATE objects SET last_used = ? WHERE sha256 = ?', (time.time(), sha256))
+        return sha256
+
+    def _store(self, file_id: str, revision: str, export_mime: str, column: str, sha256: str, size: int) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO objects (sha256, size, last_used) VALUES (?, ?, ?) '
+                'ON CONFLICT(sha256) DO UPDATE SET last_used = excluded.last_used',
+                (sha256, size, time.time()),
+            )
+            # Older revisions of the file are never asked for again
+            conn.execute(
+                'DELETE FROM entries WHERE file_id = ? AND export_mime = ? AND revision != ?',
+                (file_id, export_mime, revision),
+            )
+            conn.execute(
+                f'INSERT INTO entries (file_id, revision, export_mime, {column}) VALUES (?, ?, ?, ?) '
+                f'ON CONFLICT(file_id, revision, export_mime) DO UPDATE SET {column} = excluded.{column}',
+                (file_id, revision, export_mime, sha256),
+            )
+            doomed = self._drop_unreferenced(conn) + self._evict(conn)
+        self._remove_objects(doomed)
+
+    @staticmethod
+    def _drop_unreferenced(conn: sqlite3.Connection) -> List[str]:
+        rows = conn.execute(
+            'SELECT sha256 FROM objects WHERE sha256 NOT IN '
+            '(SELECT export_sha FROM entries WHERE export_sha IS NOT NULL '
+            ' UNION SELECT text_sha FROM entries WHERE text_sha IS NOT NULL)'
+        ).fetchall()
+        doomed = [row[0] for row in rows]
+        conn.executemany('DELETE FROM objects WHERE sha256 = ?', [(sha,) for sha in doomed])
+        return doomed
+
+    def _evict(self, conn: sqlite3.Connection) -> List[str]:
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+        doomed: List[str] = []
+        if total <= self.max_bytes:
+            return doomed
+        for sha256, size in conn.execute('SELECT sha256, size FROM objects ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            doomed.append(sha256)
+            total -= size
+        for sha256 in doomed:
+            conn.execute('DELETE FROM objects WHERE sha256 = ?', (sha256,))
+            conn.execute('UPDATE entries SET export_sha = NULL WHERE export_sha = ?', (sha256,))
+            conn.execute('UPDATE entries SET text_sha = NULL WHERE text_sha = ?', (sha256,))
+        conn.execute('DELETE FROM entries WHERE export_sha IS NULL AND text_sha IS NULL')
+        return doomed
+
+    def _remove_objects(self, doomed: List[str]) -> None:
+        for sha256 in doomed:
+            try:
+                os.remove(self._object_path(sha256))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Não foi possível remover objeto do cache de exportação '{sha256}': {e}")
+
+    # ------------------------------------------------------------------
+    # Exported bytes
+    # ------------------------------------------------------------------
+
+    def fetch_export(self, file_id: str, revision: str, export_mime: str, local_path: str) -> bool:
+        """Copy the cached export of this revision to *local_path*; False on a miss."""
+        sha256 = self._lookup(file_id, revision, export_mime, 'export_sha')
+        if sha256 is None:
+            return False
+        try:
+            shutil.copyfile(self._object_path(sha256), local_path)
+            return True
+        except OSError as e:
+            # Evicted by another process between the lookup and the copy
+            logger.debug(f"Exportação em cache indisponível para {file_id}: {e}")
+            return False
+
+    def store_export(self, file_id: str, revision: str, export_mime: str, local_path: str) -> None:
+        def write(f: Any, digest: Any) -> None:
+            with open(local_path, 'rb') as src:
+                for block in iter(lambda: src.read(_HASH_CHUNK_SIZE), b''):
+                    digest.update(block)
+                    f.write(block)
+
+        sha256, size = self._write_object(write)
+        self._store(file_id, revision, export_mime, 'export_sha', sha256, size)
+
+    # ------------------------------------------------------------------
+    # Extracted text
+    # ------------------------------------------------------------------
+
+    def get_pages(self, file_id: str, revision: str, export_mime: str) -> Optional[List[Dict[str, Any]]]:
+        """Extracted pages (``[{"page_content": ..., "metadata": {...}}]``) of this revision, or None."""
+        sha256 = self._lookup(file_id, revision, export_mime, 'text_sha')
+        if sha256 is None:
+            return None
+        try:
+            with open(self._object_path(sha256), 'r', encoding='utf-8') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError) as e:
+            logger.debug(f"Texto em cache indisponível para {file_id}: {e}")
+            return None
+
+    def store_pages(self, file_id: str, revision: str, export_mime: str, pages: List[Dict[str, Any]]) -> None:
+        data = json.dumps(pages, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+
+        def write(f: Any, digest: Any) -> None:
+            digest.update(data)
+            f.write(data)
+
+        sha256, size = self._write_object(write)
+        self._store(file_id, revision, export_mime, 'text_sha', sha256, size)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+
+_shared_caches: Dict[str, ExportCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_export_cache(data_dir: str) -> ExportCache:
+    """One cache object per data dir and process (connections are per thread)."""
+    key = os.path.abspath(data_dir)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = ExportCache(os.path.join(data_dir, '.export_cache'))
+        return cache
@@ -2,9 +2,16 @@
 
 Lê uma planilha Excel do Google Drive e calcula penalidades com base
 no número de funcionários, tipo de infração e reincidência.
+
+As tabelas limpas ficam em cache no processo (revalidado pelo md5 do arquivo
+no Drive) e em um snapshot parquet em disco, de modo que novas sessões não
+baixam nem reprocessam a planilha enquanto ela não mudar.
 """
+import hashlib
+import json
 import os
 import logging
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
@@ -13,12 +20,137 @@ from safety_ai_app.google_drive_integrator import GoogleDriveIntegrator
 
 logger = logging.getLogger(__name__)
 
+FINES_SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "fines_snapshot")
+# Incrementar quando a limpeza/tipagem das tabelas mudar
+FINES_SNAPSHOT_VERSION = 1
+
+_SHEETS = {
+    "gradacao_sst": "MULTAS_EM_REAIS_SEG",
+    "gradacao_med": "MULTAS_EM_REAIS_MED",
+    "itens": "Itens",
+}
+_RANGE_MAP = {
+    "01-10": "01 à 10", "11-25": "11 à 25", "26-50": "26 à 50",
+    "51-100": "51 à 100", "101-250": "101 à 250",
+    "251-500": "251 à 500", "501-1000": "501 à 1000",
+    "Mais de 1000": "Mais de 1000",
+}
+_GRADACAO_KEYS = ["infracao", "num_empregados", "tipo"]
+
 
 def format_currency_br(value: float) -> str:
     """Formata um float para o padrão monetário brasileiro (ex: 1.234,56)."""
     return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
+def _parse_brl_series(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(
+        series.astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+        errors="coerce",
+    ).astype("float64")
+
+
+def _clean_gradacao(df: pd.DataFrame, sheet_label: str) -> pd.DataFrame:
+    df = df.copy()
+    df.columns = ["infracao", "num_empregados", "minimo", "maximo", "reincidencia"]
+    for col in ["minimo", "maximo", "reincidencia"]:
+        df[col] = _parse_brl_series(df[col])
+    df["num_empregados"] = df["num_empregados"].astype(str).replace(_RANGE_MAP).str.strip()
+    df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce").round().astype("Int64")
+    logger.info(f"DataFrame '{sheet_label}' limpo e processado.")
+    return df
+
+
+def _clean_itens(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.columns = ["nr", "anexo", "item_subitem", "codigo", "infracao", "tipo"]
+    df = df.dropna(how="all")
+    df["nr"] = pd.to_numeric(df["nr"], errors="coerce").round().astype("Int64")
+    df["anexo"] = df["anexo"].fillna("").astype(str)
+    df["item_subitem"] = df["item_subitem"].astype(str)
+    df["codigo"] = df["codigo"].astype(str)
+    df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce").round().astype("Int64")
+    df["tipo"] = df["tipo"].astype(str)
+    logger.info("DataFrame 'Itens' limpo e processado.")
+    return df.reset_index(drop=True)
+
+
+class _FinesTables:
+    """Tabelas limpas da planilha e estruturas derivadas para o cálculo (imutáveis, compartilhadas)."""
+
+    def __init__(self, version: Optional[str], gradacao_sst: pd.DataFrame,
+                 gradacao_med: pd.DataFrame, itens: pd.DataFrame) -> None:
+        self.version = version
+        self.gradacao_sst = gradacao_sst
+        self.gradacao_med = gradacao_med
+        self.itens = itens
+
+        # Primeira linha de cada código (mesma escolha do .iloc[0] usado antes)
+        self.items_by_code = itens.drop_duplicates(subset="codigo", keep="first")[
+            ["codigo", "nr", "item_subitem", "infracao", "tipo"]
+        ]
+        gradacao = pd.concat(
+            [gradacao_sst.assign(tipo="SEG"), gradacao_med.assign(tipo="MED")], ignore_index=True
+        )
+        gradacao = gradacao.dropna(subset=["infracao"]).drop_duplicates(subset=_GRADACAO_KEYS, keep="first")
+        self.gradacao = gradacao[_GRADACAO_KEYS + ["minimo", "maximo", "reincidencia"]].reset_index(drop=True)
+        # (infração, faixa, tipo) -> valores
+        self.fine_lookup: Dict[Tuple[int, str, str], Dict[str, float]] = {
+            (int(infracao), faixa, tipo): {"minimo": minimo, "maximo": maximo, "reincidencia": reincidencia}
+            for infracao, faixa, tipo, minimo, maximo, reincidencia in self.gradacao.itertuples(index=False)
+        }
+
+
+# Cache do processo: caminho no Drive -> tabelas (compartilhado entre sessões do Streamlit)
+_tables_cache: Dict[str, _FinesTables] = {}
+_tables_cache_lock = threading.Lock()
+
+
+def _snapshot_paths(drive_file_path: str) -> Dict[str, str]:
+    key = hashlib.sha1(drive_file_path.encode("utf-8")).hexdigest()[:16]
+    paths = {name: os.path.join(FINES_SNAPSHOT_DIR, f"{key}_{name}.parquet") for name in _SHEETS}
+    paths["meta"] = os.path.join(FINES_SNAPSHOT_DIR, f"{key}.json")
+    return paths
+
+
+def _load_snapshot(drive_file_path: str, expected_version: Optional[str] = None) -> Optional[_FinesTables]:
+    paths = _snapshot_paths(drive_file_path)
+    if not os.path.exists(paths["meta"]):
+        return None
+    try:
+        with open(paths["meta"], "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FINES_SNAPSHOT_VERSION:
+            return None
+        if expected_version and meta.get("version") != expected_version:
+            return None
+        frames = {name: pd.read_parquet(paths[name]) for name in _SHEETS}
+        logger.info(f"Snapshot das tabelas de multas carregado (versão {meta.get('version')}).")
+        return _FinesTables(meta.get("version"), frames["gradacao_sst"], frames["gradacao_med"], frames["itens"])
+    except Exception as e:
+        logger.warning(f"Não foi possível carregar o snapshot das tabelas de multas: {e}")
+        return None
+
+
+def _save_snapshot(drive_file_path: str, tables: _FinesTables) -> None:
+    paths = _snapshot_paths(drive_file_path)
+    try:
+        os.makedirs(FINES_SNAPSHOT_DIR, exist_ok=True)
+        for name in _SHEETS:
+            tmp_path = f"{paths[name]}.tmp"
+            getattr(tables, name).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, paths[name])
+        # Metadados por último: só validam o snapshot depois que as três tabelas foram gravadas
+        tmp_meta = f"{paths['meta']}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"format": FINES_SNAPSHOT_VERSION, "version": tables.version,
+                       "drive_file_path": drive_file_path}, f)
+        os.replace(tmp_meta, paths["meta"])
+        logger.info(f"Snapshot das tabelas de multas salvo em '{FINES_SNAPSHOT_DIR}'.")
+    except Exception as e:
+        logger.warning(f"Não foi possível salvar o snapshot das tabelas de multas: {e}")
+
+
 class FinesDataProcessor:
     """Processa dados de multas e infrações da NR 28 a partir de um arquivo Excel do Google Drive."""
 
@@ -36,10 +168,49 @@ class FinesDataProcessor:
         self.df_gradacao_sst: Optional[pd.DataFrame] = None
         self.df_gradacao_med: Optional[pd.DataFrame] = None
         self.df_itens: Optional[pd.DataFrame] = None
+        self._tables: Optional[_FinesTables] = None
 
         self._load_and_process_data()
 
+    def _remote_version(self) -> Optional[str]:
+        """md5 do arquivo no Drive (modifiedTime para arquivos nativos, que não têm md5)."""
+        try:
+            file_id = self.google_drive_integrator.get_file_id_by_path(self.drive_file_path)
+            if not file_id:
+                return None
+            meta = self.google_drive_integrator.get_file_metadata(file_id)
+            return meta.get("md5_checksum") or meta.get("modified_time")
+        except Exception as e:
+            logger.warning(f"Não foi possível obter a versão de '{self.drive_file_path}' no Drive: {e}")
+            return None
+
     def _load_and_process_data(self) -> None:
+        """Obtém as tabelas do cache do processo, do snapshot local ou, se mudaram, do Drive."""
+        remote_version = self._remote_version()
+
+        with _tables_cache_lock:
+            tables = _tables_cache.get(self.drive_file_path)
+            if tables is not None and (remote_version is None or tables.version == remote_version):
+                logger.info(f"Tabelas de multas servidas do cache do processo (versão {tables.version}).")
+            else:
+                tables = _load_snapshot(self.drive_file_path, remote_version) if remote_version else None
+                if tables is None:
+                    try:
+                        tables = self._download_and_parse(remote_version)
+                        _save_snapshot(self.drive_file_path, tables)
+                    except Exception:
+                        tables = _load_snapshot(self.drive_file_path)
+                        if tables is None:
+                            raise
+                        logger.warning("Utilizando snapshot local das tabelas de multas após falha no Google Drive.")
+                _tables_cache[self.drive_file_path] = tables
+
+        self._tables = tables
+        self.df_gradacao_sst = tables.gradacao_sst
+        self.df_gradacao_med = tables.gradacao_med
+        self.df_itens = tables.itens
+
+    def _download_and_parse(self, remote_version: Optional[str]) -> _FinesTables:
         """Baixa o arquivo Excel do Google Drive e carrega os dados das abas."""
         if not self.google_drive_integrator.download_file_by_path(
             self.drive_file_path, self.excel_path
@@ -50,12 +221,19 @@ class FinesDataProcessor:
         logger.info(f"Arquivo '{self.drive_file_path}' baixado com sucesso.")
 
         try:
+            if remote_version is None:
+                with open(self.excel_path, "rb") as f:
+                    remote_version = hashlib.md5(f.read()).hexdigest()
+
             with pd.ExcelFile(self.excel_path) as xls:
-                self.df_gradacao_sst = pd.read_excel(xls, sheet_name="MULTAS_EM_REAIS_SEG", header=0)
-                self.df_gradacao_med = pd.read_excel(xls, sheet_name="MULTAS_EM_REAIS_MED", header=0)
-                self.df_itens = pd.read_excel(xls, sheet_name="Itens", header=0)
+                frames = {name: pd.read_excel(xls, sheet_name=sheet, header=0) for name, sheet in _SHEETS.items()}
 
-            self._clean_data()
+            return _FinesTables(
+                remote_version,
+                _clean_gradacao(frames["gradacao_sst"], _SHEETS["gradacao_sst"]),
+                _clean_gradacao(frames["gradacao_med"], _SHEETS["gradacao_med"]),
+                _clean_itens(frames["itens"]),
+            )
 
         except ValueError as e:
             try:
@@ -87,50 +265,6 @@ class FinesDataProcessor:
                 except OSError as e:
                     logger.error(f"Erro ao remover arquivo temporário '{self.excel_path}': {e}", exc_info=True)
 
-    def _clean_data(self) -> None:
-        """Realiza a limpeza e padronização dos DataFrames carregados."""
-        _range_map = {
-            "01-10": "01 à 10", "11-25": "11 à 25", "26-50": "26 à 50",
-            "51-100": "51 à 100", "101-250": "101 à 250",
-            "251-500": "251 à 500", "501-1000": "501 à 1000",
-            "Mais de 1000": "Mais de 1000",
-        }
-
-        for attr, sheet_label in [
-            ("df_gradacao_sst", "MULTAS_EM_REAIS_SEG"),
-            ("df_gradacao_med", "MULTAS_EM_REAIS_MED"),
-        ]:
-            df = getattr(self, attr)
-            if df is None:
-                continue
-            df = df.copy()
-            df.columns = ["infracao", "num_empregados", "minimo", "maximo", "reincidencia"]
-            for col in ["minimo", "maximo", "reincidencia"]:
-                df[col] = (
-                    df[col]
-                    .astype(str)
-                    .str.replace(".", "", regex=False)
-                    .str.replace(",", ".", regex=False)
-                )
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-            df["num_empregados"] = df["num_empregados"].astype(str).replace(_range_map).str.strip()
-            df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce")
-            setattr(self, attr, df)
-            logger.info(f"DataFrame '{sheet_label}' limpo e processado.")
-
-        if self.df_itens is not None:
-            df = self.df_itens.copy()
-            df.columns = ["nr", "anexo", "item_subitem", "codigo", "infracao", "tipo"]
-            df = df.dropna(how="all")
-            df["nr"] = pd.to_numeric(df["nr"], errors="coerce")
-            df["anexo"] = df["anexo"].fillna("").astype(str)
-            df["item_subitem"] = df["item_subitem"].astype(str)
-            df["codigo"] = df["codigo"].astype(str)
-            df["infracao"] = pd.to_numeric(df["infracao"], errors="coerce")
-            df["tipo"] = df["tipo"].astype(str)
-            self.df_itens = df
-            logger.info("DataFrame 'Itens' limpo e processado.")
-
     def get_fines_data(self) -> Dict[str, Optional[pd.DataFrame]]:
         """Retorna os DataFrames processados."""
         return {
@@ -139,6 +273,14 @@ class FinesDataProcessor:
             "itens": self.df_itens,
         }
 
+    def get_fine_values(
+        self, infraction_level: int, employee_range_str: str, item_tipo: str
+    ) -> Optional[Dict[str, float]]:
+        """Valores (mínimo, máximo, reincidência) para uma infração, faixa de empregados e tipo (SEG/MED)."""
+        if self._tables is None:
+            return None
+        return self._tables.fine_lookup.get((int(infraction_level), employee_range_str, item_tipo))
+
     def calculate_total_fine(
         self,
         employee_range_str: str,
@@ -150,70 +292,60 @@ class FinesDataProcessor:
         Returns:
             Tupla (total_base, total_seg, total_med, detalhes_por_item).
         """
-        total_base = 0.0
-        total_seg = 0.0
-        total_med = 0.0
-        details: List[Dict[str, Any]] = []
-
-        if self.df_itens is None or self.df_gradacao_sst is None or self.df_gradacao_med is None:
+        if self._tables is None:
             logger.error("DataFrames de itens ou gradação de multas não carregados.")
             return 0.0, 0.0, 0.0, []
 
-        for item_code in selected_item_codes:
-            item_info = self.df_itens[self.df_itens["codigo"] == item_code]
-            if item_info.empty:
-                logger.warning(f"Item de infração '{item_code}' não encontrado.")
-                continue
-
-            item_infracao_level = pd.to_numeric(item_info["infracao"].iloc[0], errors="coerce")
-            if pd.isna(item_infracao_level):
-                logger.warning(f"Nível de infração inválido para o item '{item_code}'. Pulando.")
-                continue
-
-            item_tipo = item_info["tipo"].iloc[0]
-            item_description = f"NR {item_info['nr'].iloc[0]} - {item_info['item_subitem'].iloc[0]}"
-
-            if item_tipo == "SEG":
-                gradacao_df = self.df_gradacao_sst
-            elif item_tipo == "MED":
-                gradacao_df = self.df_gradacao_med
-            else:
-                logger.warning(f"Tipo de infração desconhecido '{item_tipo}' para '{item_code}'. Pulando.")
-                continue
-
-            fine_data = gradacao_df[
-                (pd.to_numeric(gradacao_df["infracao"], errors="coerce") == item_infracao_level)
-                & (gradacao_df["num_empregados"] == employee_range_str)
-            ]
-
-            if fine_data.empty:
-                logger.warning(
-                    f"Dados de multa não encontrados para Infração {item_infracao_level}, "
-                    f"Faixa '{employee_range_str}', Tipo '{item_tipo}'."
-                )
-                continue
-
-            if has_recidivism:
-                current_fine = fine_data["reincidencia"].iloc[0]
-                fine_type = "Reincidência"
-            else:
-                current_fine = fine_data["maximo"].iloc[0]
-                fine_type = "Base (Máximo)"
-
-            total_base += current_fine
-            if item_tipo == "SEG":
-                total_seg += current_fine
-            else:
-                total_med += current_fine
+        selected = pd.DataFrame({"codigo": [str(code) for code in selected_item_codes]})
+        if selected.empty:
+            return 0.0, 0.0, 0.0, []
 
-            details.append({
-                "item_codigo": item_code,
-                "item_descricao": item_description,
-                "tipo_infracao": item_tipo,
-                "nivel_infracao": item_infracao_level,
+        rows = selected.merge(self._tables.items_by_code, on="codigo", how="left", sort=False, indicator=True)
+        for code in rows.loc[rows["_merge"] == "left_only", "codigo"]:
+            logger.warning(f"Item de infração '{code}' não encontrado.")
+        rows = rows[rows["_merge"] == "both"].drop(columns="_merge")
+
+        for code in rows.loc[rows["infracao"].isna(), "codigo"]:
+            logger.warning(f"Nível de infração inválido para o item '{code}'. Pulando.")
+        rows = rows[rows["infracao"].notna()]
+
+        known_type = rows["tipo"].isin(["SEG", "MED"])
+        for code, tipo in rows.loc[~known_type, ["codigo", "tipo"]].itertuples(index=False):
+            logger.warning(f"Tipo de infração desconhecido '{tipo}' para '{code}'. Pulando.")
+        rows = rows[known_type]
+
+        value_column = "reincidencia" if has_recidivism else "maximo"
+        fine_type = "Reincidência" if has_recidivism else "Base (Máximo)"
+        rows = rows.assign(num_empregados=employee_range_str).merge(
+            self._tables.gradacao[_GRADACAO_KEYS + [value_column]], on=_GRADACAO_KEYS, how="left", sort=False
+        )
+
+        missing = rows[value_column].isna()
+        for level, tipo in rows.loc[missing, ["infracao", "tipo"]].drop_duplicates().itertuples(index=False):
+            logger.warning(
+                f"Dados de multa não encontrados para Infração {level}, "
+                f"Faixa '{employee_range_str}', Tipo '{tipo}'."
+            )
+        rows = rows[~missing]
+
+        values = rows[value_column]
+        is_seg = rows["tipo"] == "SEG"
+        total_seg = float(values[is_seg].sum())
+        total_med = float(values[~is_seg].sum())
+
+        details: List[Dict[str, Any]] = [
+            {
+                "item_codigo": code,
+                "item_descricao": f"NR {nr} - {item_subitem}",
+                "tipo_infracao": tipo,
+                "nivel_infracao": int(level),
                 "faixa_empregados": employee_range_str,
-                "valor_multa": current_fine,
+                "valor_multa": float(value),
                 "base_calculo": fine_type,
-            })
+            }
+            for code, nr, item_subitem, level, tipo, value in zip(
+                rows["codigo"], rows["nr"], rows["item_subitem"], rows["infracao"], rows["tipo"], values
+            )
+        ]
 
-        return total_base, total_seg, total_med, details
+        return total_seg + total_med, total_seg, total_med, details
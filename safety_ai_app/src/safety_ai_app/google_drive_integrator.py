@@ -14,7 +14,11 @@ from safety_ai_app.auth.google_auth import (
     SCOPES_USER,
     SCOPES_SERVICE_ACCOUNT,
 )
+from safety_ai_app.drive_changes import DriveChangeTracker
 from safety_ai_app.drive_downloader import DriveDownloader, get_download_metadata
+from safety_ai_app.drive_file_index import DriveFileIndex
+from safety_ai_app.drive_path_cache import get_shared_path_cache
+from safety_ai_app.export_cache import get_shared_export_cache
 from safety_ai_app.drive_sync import (
     synchronize_app_central_library,
     synchronize_user_drive_folder,
@@ -75,7 +79,11 @@ class GoogleDriveIntegrator:
         self.service = get_service_account_service()
         if not self.service:
             raise ConnectionError("Não foi possível inicializar o serviço do Google Drive.")
-        self._dl = DriveDownloader(self.service, os.path.join(_project_root, 'data'))
+        data_dir = os.path.join(_project_root, 'data')
+        self._data_dir = data_dir
+        self._dl = DriveDownloader(self.service, data_dir, path_cache=get_shared_path_cache(data_dir))
+        self.export_cache = get_shared_export_cache(data_dir)
+        self._change_trackers: Dict[str, DriveChangeTracker] = {}
 
     # ------------------------------------------------------------------
     # Download / listing — delegate to DriveDownloader
@@ -84,6 +92,17 @@ class GoogleDriveIntegrator:
     def _download_file_bytes_internal(self, file_id: str, original_mime: str, export_mime: str) -> bytes:
         return self._dl.download_bytes(file_id, original_mime, export_mime)
 
+    def _download_file_to_path_internal(
+        self, file_id: str, original_mime: str, export_mime: str, local_path: str,
+        expected_md5: Optional[str] = None, **stream_options: Any
+    ) -> bool:
+        return self._dl.download_stream_to_path(
+            file_id, original_mime, export_mime, local_path, expected_md5, **stream_options
+        )
+
+    def get_file_metadata(self, file_id: str) -> Dict[str, Any]:
+        return self._dl.get_file_metadata(file_id)
+
     def download_file_from_drive(self, file_id: str, local_path: str, force_download: bool = False) -> None:
         self._dl.download_to_path(file_id, local_path, force=force_download)
 
@@ -96,6 +115,9 @@ class GoogleDriveIntegrator:
     def get_folder_id_by_name(self, parent_folder_id: str, folder_name: str) -> Optional[str]:
         return self._dl.get_folder_id_by_name(parent_folder_id, folder_name)
 
+    def get_file_id_by_path(self, drive_file_path: str) -> Optional[str]:
+        return self._dl.get_file_id_by_path(drive_file_path)
+
     def download_file_by_path(self, drive_file_path: str, local_save_path: str) -> bool:
         return self._dl.download_by_path(drive_file_path, local_save_path)
 
@@ -107,6 +129,10 @@ class GoogleDriveIntegrator:
         # Aplica a validação estrita de integridade e MIME Type
         return [f for f in all_files if _validate_drive_file_integrity(f)]
 
+    def list_processable_drive_files_in_folder(self, folder_id: str) -> List[Dict[str, str]]:
+        """Fresh (uncached) listing for reconciling syncs; raises on API errors."""
+        return [f for f in self._dl.list_processable_files(folder_id) if _validate_drive_file_integrity(f)]
+
     # ------------------------------------------------------------------
     # Upload
     # ------------------------------------------------------------------
@@ -198,7 +224,19 @@ class GoogleDriveIntegrator:
             if progress_callback:
                 progress_callback(0, 0, "Erro: Pasta não configurada")
             return 0
-        return synchronize_app_central_library(self, qa_system, folder_id, progress_callback)
+        return synchronize_app_central_library(
+            self, qa_system, folder_id, progress_callback, tracker=self.get_change_tracker(folder_id)
+        )
+
+    def get_change_tracker(self, folder_id: str) -> DriveChangeTracker:
+        """The ``changes.list`` tracker of *folder_id*'s tree (one per folder, kept for the process)."""
+        tracker = self._change_trackers.get(folder_id)
+        if tracker is None:
+            tracker = self._change_trackers.setdefault(folder_id, DriveChangeTracker(
+                self.service, folder_id, self._data_dir,
+                mime_filter=ALLOWED_MIME_TYPES, file_filter=_validate_drive_file_integrity,
+            ))
+        return tracker
 
     def synchronize_user_drive_folder_to_chroma(
         self, folder_id: str, qa_system: Any, progress_callback: Optional[Callable[[int, int, str], None]] = None
@@ -227,6 +265,10 @@ class GoogleDriveIntegrator:
 # Module-level singleton + helpers
 # ==========================================================================
 
+# Marker stored in session state (e.g. chat download suggestions) for "the service-account Drive"
+APP_SERVICE = "app_service"
+
+
 @st.cache_resource
 def get_service_account_drive_integrator_instance() -> Optional[GoogleDriveIntegrator]:
     try:
@@ -237,7 +279,9 @@ def get_service_account_drive_integrator_instance() -> Optional[GoogleDriveInteg
 
 
 def _is_app_service(drive_service: Any) -> bool:
-    """True when *drive_service* is the singleton service-account service."""
+    """True when *drive_service* is the singleton service-account service (or the ``APP_SERVICE`` marker)."""
+    if isinstance(drive_service, str) and drive_service == APP_SERVICE:
+        return True
     integrator = get_service_account_drive_integrator_instance()
     return integrator is not None and integrator.service is drive_service
 
@@ -250,15 +294,30 @@ class _ExternalDriveContext:
 
     def __init__(self, service: Any) -> None:
         self.service = service
+        # Keyed by file id + revision: only reachable for files this service has just listed
+        self.export_cache = get_shared_export_cache(os.path.join(_project_root, 'data'))
 
     def get_processable_drive_files_in_folder(self, folder_id: str) -> List[Dict[str, str]]:
         dl = DriveDownloader(self.service, '')
         return dl.get_processable_files(folder_id)
 
+    def list_processable_drive_files_in_folder(self, folder_id: str) -> List[Dict[str, str]]:
+        dl = DriveDownloader(self.service, '')
+        return [f for f in dl.list_processable_files(folder_id) if _validate_drive_file_integrity(f)]
+
     def _download_file_bytes_internal(self, file_id: str, original_mime: str, export_mime: str) -> bytes:
         dl = DriveDownloader(self.service, '')
         return dl.download_bytes(file_id, original_mime, export_mime)
 
+    def _download_file_to_path_internal(
+        self, file_id: str, original_mime: str, export_mime: str, local_path: str,
+        expected_md5: Optional[str] = None, **stream_options: Any
+    ) -> bool:
+        dl = DriveDownloader(self.service, '')
+        return dl.download_stream_to_path(
+            file_id, original_mime, export_mime, local_path, expected_md5, **stream_options
+        )
+
 
 # ==========================================================================
 # Public API wrappers — the callers (pages) use these
@@ -411,6 +470,36 @@ def list_drive_files_by_keyword(drive_service: Any, keyword: str, max_results: i
     return _execute(drive_service)
 
 
+@st.cache_resource
+def get_library_file_index() -> Optional[DriveFileIndex]:
+    """Process-wide local name index of the library folder, refreshed in background."""
+    integrator = get_service_account_drive_integrator_instance()
+    if not integrator:
+        return None
+    folder_id = integrator._get_library_folder_id()
+    if not folder_id:
+        logger.warning("Pasta da Biblioteca não encontrada — índice local do Drive desativado.")
+        return None
+    index = DriveFileIndex(integrator.service, folder_id, os.path.join(_project_root, 'data'))
+    index.start_background_refresh()
+    return index
+
+
+def search_library_files_by_keyword(keyword: str, max_results: int = 10) -> Optional[List[Dict[str, str]]]:
+    """Search the local library index (no network round-trip).
+
+    Returns None when the index is not available yet, so callers can fall back
+    to ``list_drive_files_by_keyword``. The files belong to the service-account
+    Drive: download them through ``APP_SERVICE``, not the user's service.
+    """
+    if not keyword or not keyword.strip():
+        return []
+    index = get_library_file_index()
+    if index is None or not index.is_ready:
+        return None
+    return index.search(keyword, max_results=max_results)
+
+
 def get_file_bytes_by_id(drive_service_object: Any, file_id: str, original_mime_type: str) -> bytes:
     _, export_mime = get_download_metadata("dummy", original_mime_type)
     if _is_app_service(drive_service_object):
@@ -23,6 +23,7 @@ from .rag import (
     create_llm,
     initialize_bm25_retriever,
     create_ensemble_retriever,
+    create_nr_scoped_retriever,
     is_jailbreak_response,
     is_off_domain_response,
     SAFE_REFUSAL,
@@ -85,6 +86,18 @@ _AI_CONFIG_DEFAULTS: Dict[str, Any] = {
     "retriever_top_k": 6,
     "bm25_weight": 0.3,
     "semantic_weight": 0.7,
+    "nr_partition_min_hits": 3,
+    "hnsw_m": None,
+    "hnsw_construction_ef": None,
+    "hnsw_search_ef": None,
+}
+
+# Mapping between ai_config.json keys and Chroma HNSW collection metadata.
+# Only honoured when the collection is created; see scripts/tune_hnsw.py.
+_HNSW_CONFIG_KEYS: Dict[str, str] = {
+    "hnsw_m": "hnsw:M",
+    "hnsw_construction_ef": "hnsw:construction_ef",
+    "hnsw_search_ef": "hnsw:search_ef",
 }
 
 
@@ -103,6 +116,23 @@ def _load_ai_config() -> Dict[str, Any]:
         logger.warning("Failed to load AI config from %s: %s — using hardcoded defaults.", _AI_CONFIG_PATH, exc)
     return cfg
 
+
+def _hnsw_collection_metadata(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build Chroma collection metadata from the hnsw_* keys of the AI config.
+
+    Returns None when no HNSW parameter is configured, so Chroma keeps its defaults.
+    """
+    metadata: Dict[str, Any] = {}
+    for cfg_key, chroma_key in _HNSW_CONFIG_KEYS.items():
+        value = cfg.get(cfg_key)
+        if value is None:
+            continue
+        try:
+            metadata[chroma_key] = int(value)
+        except (TypeError, ValueError):
+            logger.warning("Valor inválido para '%s' em ai_config.json: %r — ignorado.", cfg_key, value)
+    return metadata or None
+
 # Callback signature: (level: str, message: str) -> None
 # where level is one of "info", "warning", "error", "success".
 # Use make_streamlit_status_callback() to get a Streamlit-routing version,
@@ -196,6 +226,7 @@ class NRQuestionAnswering:
         self._llm = None
         self._bm25_retriever = None
         self._ensemble_retriever = None
+        self._nr_retrievers: Dict[int, Any] = {}
         self._rag_chain = None
 
         logger.info(f"NRQuestionAnswering instanciado em {time.time() - t_init:.3f}s (componentes pesados em modo lazy).")
@@ -221,6 +252,7 @@ class NRQuestionAnswering:
                 embedding_function=self.embedding_function,
                 client=self.chroma_client,
                 persist_directory=self.chroma_persist_directory,
+                collection_metadata=_hnsw_collection_metadata(self._ai_cfg),
             )
         return self._vector_db
 
@@ -276,6 +308,7 @@ class NRQuestionAnswering:
         self._retriever_top_k: int = int(cfg.get("retriever_top_k", _AI_CONFIG_DEFAULTS["retriever_top_k"]))
         self._bm25_weight: float = float(cfg.get("bm25_weight", _AI_CONFIG_DEFAULTS["bm25_weight"]))
         self._semantic_weight: float = float(cfg.get("semantic_weight", _AI_CONFIG_DEFAULTS["semantic_weight"]))
+        self._nr_partition_min_hits: int = int(cfg.get("nr_partition_min_hits", _AI_CONFIG_DEFAULTS["nr_partition_min_hits"]))
         self._guardrail_threshold: float = max(0.0, min(1.0, float(
             cfg.get("guardrail_threshold", _AI_CONFIG_DEFAULTS["guardrail_threshold"])
         )))
@@ -303,6 +336,7 @@ class NRQuestionAnswering:
             self._llm = None
             self._bm25_retriever = None
             self._ensemble_retriever = None
+            self._nr_retrievers = {}
             self._rag_chain = None
 
             logger.info("Pipeline config marked for reload. New settings will be applied on next query.")
@@ -382,7 +416,7 @@ class NRQuestionAnswering:
                     docs=RunnableLambda(lambda x: rerank_documents(
                         x["question"],
                         self._get_retriever_for_query(
-                            x.get("expanded_query") or x["question"]
+                            x["question"]
                         ).invoke(x.get("expanded_query") or x["question"]),
                     )),
                     query=itemgetter("question"),
@@ -412,10 +446,25 @@ class NRQuestionAnswering:
         return rag_chain
 
     def _get_retriever_for_query(self, query: str):
+        """Return the NR-scoped retriever when the query names an NR, else the global one."""
         nr_detected = extract_nr_from_query(query)
-        if nr_detected:
-            logger.info(f"NR '{nr_detected}' detectada — filtro via post-filtering.")
-        return self.retriever
+        if not nr_detected:
+            return self.retriever
+
+        nr = int(nr_detected.replace("nr-", ""))
+        if nr not in self._nr_retrievers:
+            self._nr_retrievers[nr] = create_nr_scoped_retriever(
+                self.vector_db,
+                self.bm25_retriever,
+                self.retriever,
+                nr,
+                getattr(self, "_retriever_top_k", _AI_CONFIG_DEFAULTS["retriever_top_k"]),
+                getattr(self, "_semantic_weight", _AI_CONFIG_DEFAULTS["semantic_weight"]),
+                getattr(self, "_bm25_weight", _AI_CONFIG_DEFAULTS["bm25_weight"]),
+                getattr(self, "_nr_partition_min_hits", _AI_CONFIG_DEFAULTS["nr_partition_min_hits"]),
+            )
+        logger.info(f"NR '{nr_detected}' detectada — busca restrita à partição da NR.")
+        return self._nr_retrievers[nr]
 
     def _expand_query(self, query: str) -> str:
         """
@@ -636,6 +685,7 @@ class NRQuestionAnswering:
     # ------------------------------------------------------------------
 
     def update_retrievers(self):
+        self._nr_retrievers = {}
         try:
             self.chroma_doc_count = self.vector_db._collection.count()
             self.vector_retriever = self.vector_db.as_retriever(search_type="similarity", search_kwargs={"k": 10})
@@ -661,6 +711,10 @@ class NRQuestionAnswering:
     def _get_loader_for_file_type(self, file_path: str, file_type: str) -> UniversalDocumentLoader:
         return UniversalDocumentLoader(file_path, file_type)
 
+    def load_documents(self, file_path: str, file_type: str) -> List[Document]:
+        """Extract the pages of *file_path* without indexing them."""
+        return self._get_loader_for_file_type(file_path, file_type).load()
+
     def _extract_text_content_debug(self, documents: List[Document]) -> str:
         all_text = ""
         for i, doc in enumerate(documents):
@@ -684,10 +738,12 @@ class NRQuestionAnswering:
         source: str = "Local",
         file_type: str = "application/pdf",
         additional_metadata: Optional[Dict[str, Any]] = None,
+        documents: Optional[List[Document]] = None,
     ):
+        """Index a document; *documents* are pages already extracted (e.g. cached), *file_path* is then not read."""
         logger.info(f"Processando documento: '{document_name}' ({file_type})")
         try:
-            if not os.path.exists(file_path):
+            if documents is None and not os.path.exists(file_path):
                 logger.error(f"Arquivo não encontrado: {file_path}")
                 self._notify("error", f"Arquivo '{document_name}' não encontrado.")
                 return
@@ -697,8 +753,8 @@ class NRQuestionAnswering:
                 self._notify("warning", f"Tipo '{file_type}' não suportado. Documento '{document_name}' ignorado.")
                 return
 
-            loader = self._get_loader_for_file_type(file_path, file_type)
-            documents = loader.load()
+            if documents is None:
+                documents = self.load_documents(file_path, file_type)
             logger.info(f"'{document_name}' carregado: {len(documents)} páginas/elementos.")
 
             doc_meta_id = (
@@ -876,7 +932,36 @@ class NRQuestionAnswering:
             logger.error(f"Erro ao buscar drive_file_ids (source_type={source_type}): {e}", exc_info=True)
             return []
 
+    def get_drive_file_revisions_in_chroma(
+        self, source_type: Optional[str] = None
+    ) -> Optional[Dict[str, Dict[str, Optional[str]]]]:
+        """
+        {drive_file_id: {"modifiedTime", "md5Checksum"}} of the indexed Drive files.
+
+        The revision fields are None for documents indexed before they were
+        recorded. Returns None (not an empty dict) when the collection cannot be
+        read, so callers do not mistake an error for an empty index.
+        """
+        if not (hasattr(self, 'vector_db') and self.vector_db and
+                hasattr(self.vector_db, '_collection') and self.vector_db._collection):
+            return None
+        try:
+            where_clause = {"source_type": source_type} if source_type else {}
+            results = self.vector_db._collection.get(where=where_clause, ids=None, include=['metadatas'])
+            revisions: Dict[str, Dict[str, Optional[str]]] = {}
+            for m in results.get('metadatas', []):
+                if m.get('drive_file_id') and m['drive_file_id'] not in revisions:
+                    revisions[m['drive_file_id']] = {
+                        "modifiedTime": m.get('drive_modified_time'),
+                        "md5Checksum": m.get('drive_md5_checksum'),
+                    }
+            return revisions
+        except Exception as e:
+            logger.error(f"Erro ao buscar revisões dos arquivos do Drive (source_type={source_type}): {e}", exc_info=True)
+            return None
+
     def clear_chroma_collection(self) -> None:
+        self._nr_retrievers = {}
         try:
             if self.vector_db and self.vector_db._client:
                 self.vector_db._client.delete_collection(self.vector_db._collection.name)
@@ -887,6 +972,7 @@ class NRQuestionAnswering:
                 embedding_function=self.embedding_function,
                 client=self.chroma_client,
                 persist_directory=self.chroma_persist_directory,
+                collection_metadata=_hnsw_collection_metadata(self._ai_cfg),
             )
             self.vector_retriever = self.vector_db.as_retriever(search_type="similarity", search_kwargs={"k": 10})
             self.bm25_retriever = None
@@ -3,7 +3,9 @@ from .retriever import (
     EnsembleRetriever,
     rerank_documents,
     initialize_bm25_retriever,
-    create_ensemble_retriever
+    create_ensemble_retriever,
+    create_nr_scoped_retriever,
+    NRPartitionedBM25Retriever,
 )
 from .indexer import split_nr_document_structurally, get_indexed_nr_numbers_from_mte
 from .warmup import start_model_warmup, is_warmup_complete
@@ -25,6 +27,8 @@ __all__ = [
     "rerank_documents",
     "initialize_bm25_retriever",
     "create_ensemble_retriever",
+    "create_nr_scoped_retriever",
+    "NRPartitionedBM25Retriever",
     "split_nr_document_structurally",
     "get_indexed_nr_numbers_from_mte",
     "start_model_warmup",
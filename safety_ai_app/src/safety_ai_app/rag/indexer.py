@@ -21,6 +21,16 @@ _NR_CHAPTER_PATTERN = re.compile(
 _NR_NUMBER_FROM_NAME = re.compile(r'NR[\s\-_]?(\d{1,2})', re.IGNORECASE)
 _NR_ITEM_META = re.compile(r'^(\d{1,2})(?:\.(\d+))?(?:\.\d+)*\s+')
 
+def normalize_nr_number(value: Any) -> Optional[int]:
+    """Normalize the heterogeneous nr_number metadata values ("05", "NR-5", 5) to int."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    m = re.search(r'(\d{1,2})', str(value))
+    return int(m.group(1)) if m else None
+
+
 def extract_nr_metadata_from_content(text: str, doc_name: str = "") -> Dict[str, str]:
     """Extract nr_number, article, and item from chunk text and document name."""
     nr_number = ""
@@ -12,7 +12,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel, RunnableLambda
 from operator import itemgetter
 from urllib.parse import quote_plus
-from .indexer import extract_nr_metadata_from_content
+from .indexer import extract_nr_metadata_from_content, normalize_nr_number
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +86,9 @@ def process_retrieved_docs(docs: List[Any], query: str) -> Dict[str, Any]:
             rf"NR[\s]*{nr_number}[\s]*[\-\:]",
         ]
         for doc in docs:
+            if normalize_nr_number(doc.metadata.get('nr_number')) == int(nr_number):
+                filtered_docs.append(doc)
+                continue
             name_raw = doc.metadata.get('document_name', '')
             content = doc.page_content or ''
             in_name = any(re.search(p, name_raw, re.IGNORECASE) for p in search_patterns)
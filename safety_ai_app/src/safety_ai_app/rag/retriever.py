@@ -5,26 +5,65 @@ from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.callbacks.manager import CallbackManagerForRetrieverRun
 from langchain_community.retrievers import BM25Retriever
+from .indexer import normalize_nr_number
 
 logger = logging.getLogger(__name__)
 
-def initialize_bm25_retriever(vector_db, doc_count: int, top_k: int) -> Optional[BM25Retriever]:
+
+class NRPartitionedBM25Retriever(BaseRetriever):
+    """BM25 sobre todo o corpus, com um shard adicional por NR (metadata nr_number).
+
+    ``invoke`` pesquisa o corpus global; ``shard_for(nr)`` devolve o shard da NR
+    para que consultas com NR identificada toquem apenas a partição relevante.
+    """
+
+    global_retriever: BM25Retriever
+    shards: Dict[int, BM25Retriever] = {}
+
+    def shard_for(self, nr: int) -> Optional[BM25Retriever]:
+        return self.shards.get(nr)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.global_retriever.invoke(query)
+
+
+def initialize_bm25_retriever(vector_db, doc_count: int, top_k: int) -> Optional[NRPartitionedBM25Retriever]:
     """
-    Initialize a BM25 retriever using documents from ChromaDB.
+    Initialize a BM25 retriever using documents from ChromaDB, partitioned by NR.
     """
     if doc_count > 0:
-        results = vector_db._collection.get(
-            ids=vector_db._collection.get()['ids'],
-            include=['documents', 'metadatas'],
-        )
+        results = vector_db._collection.get(include=['documents', 'metadatas'])
         all_docs = [
-            Document(page_content=content, metadata=meta)
+            Document(page_content=content, metadata=meta or {})
             for content, meta in zip(results['documents'], results['metadatas'])
         ]
-        logger.info(f"BM25Retriever: {len(all_docs)} documentos indexados (k={top_k}).")
-        return BM25Retriever.from_documents(all_docs, k=top_k)
+
+        by_nr: Dict[int, List[Document]] = {}
+        for doc in all_docs:
+            nr = normalize_nr_number(doc.metadata.get("nr_number"))
+            if nr is not None:
+                by_nr.setdefault(nr, []).append(doc)
+        shards = {nr: BM25Retriever.from_documents(docs, k=top_k) for nr, docs in by_nr.items()}
+
+        logger.info(
+            f"BM25Retriever: {len(all_docs)} documentos indexados (k={top_k}), "
+            f"{len(shards)} partições por NR."
+        )
+        return NRPartitionedBM25Retriever(
+            global_retriever=BM25Retriever.from_documents(all_docs, k=top_k),
+            shards=shards,
+        )
     return None
 
+
+def nr_where_filter(nr: int) -> Dict[str, Any]:
+    """Chroma ``where`` clause matching every nr_number format used by the indexers."""
+    variants: List[Any] = [nr, str(nr), f"{nr:02d}", f"NR-{nr}", f"NR-{nr:02d}"]
+    unique = list(dict.fromkeys(variants))
+    return {"$or": [{"nr_number": v} for v in unique]}
+
 def create_ensemble_retriever(
     vector_db,
     bm25_retriever: Optional[BM25Retriever],
@@ -44,6 +83,57 @@ def create_ensemble_retriever(
     logger.warning("Usando apenas Vector Retriever (ChromaDB vazio ou sem documentos).")
     return vr
 
+
+class NRScopedRetriever(BaseRetriever):
+    """Pesquisa primeiro a partição da NR e completa com a busca global se vier pouco."""
+
+    scoped: Any
+    fallback: Any
+    min_hits: int = 3
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        docs = self.scoped.invoke(query)
+        if len(docs) >= self.min_hits:
+            return docs
+
+        logger.info(f"Partição NR retornou {len(docs)} docs (< {self.min_hits}) — completando com busca global.")
+        seen = {doc.page_content[:200] for doc in docs}
+        for doc in self.fallback.invoke(query):
+            key = doc.page_content[:200]
+            if key not in seen:
+                seen.add(key)
+                docs.append(doc)
+        return docs
+
+
+def create_nr_scoped_retriever(
+    vector_db,
+    bm25_retriever: Optional[NRPartitionedBM25Retriever],
+    fallback: BaseRetriever,
+    nr: int,
+    top_k: int,
+    semantic_weight: float,
+    bm25_weight: float,
+    min_hits: int,
+) -> BaseRetriever:
+    """
+    Create a retriever restricted to one NR: Chroma ``where`` filter on nr_number plus
+    the NR's BM25 shard, falling back to ``fallback`` when the partition is too small.
+    """
+    vr = vector_db.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": top_k, "filter": nr_where_filter(nr)},
+    )
+    shard = bm25_retriever.shard_for(nr) if bm25_retriever is not None else None
+    scoped: BaseRetriever = (
+        EnsembleRetriever(retrievers=[vr, shard], weights=[semantic_weight, bm25_weight])
+        if shard is not None else vr
+    )
+    logger.info(f"Retriever com filtro NR-{nr:02d} configurado (BM25 shard: {'sim' if shard else 'não'}).")
+    return NRScopedRetriever(scoped=scoped, fallback=fallback, min_hits=min_hits)
+
 RERANKER_MODEL_NAME = 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1'
 RERANKER_TOP_N = 5
 
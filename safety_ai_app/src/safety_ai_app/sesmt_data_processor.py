@@ -1,8 +1,12 @@
+import bisect
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 import os
+import pickle
 import re
-from typing import Dict, Any, Tuple, Union, Optional
+from typing import Dict, Any, Iterable, List, Tuple, Union, Optional
 from functools import lru_cache
 
 from src.safety_ai_app.google_drive_integrator import GoogleDriveIntegrator
@@ -14,6 +18,11 @@ SESMT_EXCEL_FILE_NAME = "Dimensionamento_SESMT.xlsx"
 LOCAL_TEMP_DIR = "temp_docs_local"
 LOCAL_SESMT_FILE_PATH = os.path.join(LOCAL_TEMP_DIR, SESMT_EXCEL_FILE_NAME)
 
+LOCAL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
+SESMT_COMPILED_TABLE_FILE = os.path.join(LOCAL_CACHE_DIR, "sesmt_compiled_table.pkl")
+# Incrementar quando a estrutura das tabelas compiladas mudar
+SESMT_COMPILED_TABLE_VERSION = 1
+
 PROFESSIONAL_NAMES = {
     'tecnico_seguranca': 'Técnico de Segurança do Trabalho',
     'engenheiro_seguranca': 'Engenheiro de Segurança do Trabalho',
@@ -40,22 +49,145 @@ PROFESSIONAL_COLUMN_MAP = {
     "Médico do Trabalho": "medico",
 }
 
+SESMT_OBS_BELOW_50 = "Para estabelecimentos com menos de 50 empregados, a constituição do SESMT pode não ser obrigatória, dependendo de outras condições da NR-04 (ex: SESMT compartilhado, etc.). Consulte a NR-04 para casos específicos."
+
 def _clean_text(text: Any) -> str:
     if pd.isna(text):
         return ""
     cleaned = str(text).replace('\n', ' ').strip()
     return re.sub(r'\s+', ' ', cleaned)
 
-@lru_cache(maxsize=1)
-def _load_sesmt_data_from_drive() -> Tuple[
+SesmtTables = Tuple[
     Dict[int, Dict[Tuple[int, int], Dict[str, Union[int, str]]]],
     Dict[int, Dict[str, Union[int, str]]]
-]:
+]
+
+
+def _file_md5(path: str) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_compiled_table(expected_md5: Optional[str] = None) -> Optional[SesmtTables]:
+    """Tabela já compilada em disco (compartilhada entre processos), se a versão e o md5 conferirem."""
+    if not os.path.exists(SESMT_COMPILED_TABLE_FILE):
+        return None
+    try:
+        with open(SESMT_COMPILED_TABLE_FILE, 'rb') as f:
+            compiled = pickle.load(f)
+        if compiled.get("version") != SESMT_COMPILED_TABLE_VERSION:
+            return None
+        if expected_md5 and compiled.get("md5") != expected_md5:
+            return None
+        logger.info(f"Tabela compilada do SESMT carregada de '{SESMT_COMPILED_TABLE_FILE}' (md5 {compiled.get('md5')}).")
+        return compiled["dimensioning"], compiled["above_5000"]
+    except Exception as e:
+        logger.warning(f"Não foi possível carregar a tabela compilada do SESMT: {e}")
+        return None
+
+
+def _save_compiled_table(md5: str, tables: SesmtTables) -> None:
+    try:
+        os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SESMT_COMPILED_TABLE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(
+                {"version": SESMT_COMPILED_TABLE_VERSION, "md5": md5,
+                 "dimensioning": tables[0], "above_5000": tables[1]},
+                f, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, SESMT_COMPILED_TABLE_FILE)
+        logger.info(f"Tabela compilada do SESMT salva em '{SESMT_COMPILED_TABLE_FILE}'.")
+    except Exception as e:
+        logger.warning(f"Não foi possível salvar a tabela compilada do SESMT: {e}")
+
+
+def _parse_sesmt_excel(excel_path: str) -> SesmtTables:
+    df_raw = pd.read_excel(excel_path, sheet_name=0, header=None)
+    logger.debug(f"DataFrame raw (primeiras 5 linhas):\n{df_raw.head()}")
+
+    header_row = df_raw.iloc[0]
+    cleaned_header_names = [_clean_text(col_name) for col_name in header_row]
+
+    if len(cleaned_header_names) > 9 and "Acima de 5.000" in cleaned_header_names[9]:
+        cleaned_header_names[9] = "Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**"
+
+    df = df_raw.iloc[1:].copy()
+    df.columns = cleaned_header_names[:len(df.columns)]
+
+    expected_grau_risco_col = 'Grau de Risco'
+    expected_profissionais_col = 'Profissionais'
+    expected_above_5000_col = 'Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**'
+
+    critical_columns = [expected_grau_risco_col, expected_profissionais_col, expected_above_5000_col] + list(EMPLOYEE_RANGE_COLUMNS.keys())
+    for col_name in critical_columns:
+        if col_name not in df.columns:
+            logger.error(f"CRÍTICO: Coluna essencial '{col_name}' não encontrada no DataFrame. Estrutura do Excel inesperada. Colunas disponíveis: {df.columns.tolist()}")
+            raise KeyError(f"Coluna '{col_name}' não encontrada. A estrutura do Excel 'Dimensionamento_SESMT.xlsx' não corresponde ao esperado.")
+
+    df[expected_grau_risco_col] = df[expected_grau_risco_col].ffill()
+    df = df.dropna(subset=[expected_grau_risco_col, expected_profissionais_col])
+
+    professional_names = df[expected_profissionais_col].map(_clean_text)
+    professional_keys = professional_names.map(PROFESSIONAL_COLUMN_MAP)
+    for index, professional_name in professional_names[professional_keys.isna()].items():
+        logger.warning(f"Nome de profissional desconhecido '{professional_name}' encontrado no Excel. Pulando linha {index}.")
+        logger.warning(f"Nomes disponíveis no mapeamento: {list(PROFESSIONAL_COLUMN_MAP.keys())}")
+
+    # Células vazias valem '0'; demais valores como texto sem espaços (mantém marcações '*' e '***')
+    value_columns = list(EMPLOYEE_RANGE_COLUMNS.keys()) + [expected_above_5000_col]
+    raw_values = df[value_columns]
+    values = raw_values.astype(str).apply(lambda col: col.str.strip()).where(raw_values.notna(), '0')
+    values.insert(0, 'professional_key', professional_keys)
+    values.insert(0, 'grau_risco', pd.to_numeric(df[expected_grau_risco_col], errors='coerce'))
+    values = values[values['professional_key'].notna() & values['grau_risco'].notna()]
+    values['grau_risco'] = values['grau_risco'].astype(int)
+    # Linha repetida para o mesmo grau/profissional: vale a última, como no processamento linha a linha
+    values = values.drop_duplicates(subset=['grau_risco', 'professional_key'], keep='last')
+
+    parsed_dimensioning_table: Dict[int, Dict[Tuple[int, int], Dict[str, Union[int, str]]]] = {gr: {} for gr in range(1, 5)}
+    parsed_above_5000_rule: Dict[int, Dict[str, Union[int, str]]] = {gr: {} for gr in range(1, 5)}
+
+    for grau_risco, group in values.groupby('grau_risco', sort=True):
+        for col_name_range, emp_range_tuple in EMPLOYEE_RANGE_COLUMNS.items():
+            roles = {pk: '0' for pk in PROFESSIONAL_COLUMN_MAP.values()}
+            roles.update(zip(group['professional_key'], group[col_name_range]))
+            parsed_dimensioning_table.setdefault(grau_risco, {})[emp_range_tuple] = roles
+        parsed_above_5000_rule.setdefault(grau_risco, {}).update(
+            zip(group['professional_key'], group[expected_above_5000_col])
+        )
+
+    logger.debug(f"parsed_dimensioning_table carregado: {parsed_dimensioning_table}")
+    logger.debug(f"parsed_above_5000_rule carregado: {parsed_above_5000_rule}")
+    return parsed_dimensioning_table, parsed_above_5000_rule
+
+
+@lru_cache(maxsize=1)
+def _load_sesmt_data_from_drive() -> SesmtTables:
+    """
+    Carrega as tabelas do SESMT: usa a tabela compilada em disco quando o md5 do
+    arquivo no Drive não mudou; caso contrário baixa, analisa e recompila.
+    """
     logger.info(f"Tentando carregar dados do SESMT do Google Drive: {SESMT_EXCEL_FILE_NAME}")
-    
-    os.makedirs(LOCAL_TEMP_DIR, exist_ok=True)
 
-    drive_integrator = GoogleDriveIntegrator()
+    try:
+        drive_integrator = GoogleDriveIntegrator()
+    except Exception as e:
+        logger.error(f"Google Drive indisponível para carregar '{SESMT_EXCEL_FILE_NAME}': {e}")
+        compiled = _load_compiled_table()
+        return compiled if compiled is not None else ({}, {})
+
+    file_id = drive_integrator._get_file_id_in_folder(GOOGLE_DRIVE_SESMT_FOLDER_ID, SESMT_EXCEL_FILE_NAME)
+    remote_md5 = drive_integrator.get_file_metadata(file_id).get("md5_checksum") if file_id else None
+    if remote_md5:
+        compiled = _load_compiled_table(remote_md5)
+        if compiled is not None:
+            return compiled
+
+    os.makedirs(LOCAL_TEMP_DIR, exist_ok=True)
     downloaded_path = drive_integrator.download_file_from_folder(
         GOOGLE_DRIVE_SESMT_FOLDER_ID,
         SESMT_EXCEL_FILE_NAME,
@@ -63,103 +195,57 @@ def _load_sesmt_data_from_drive() -> Tuple[
     )
 
     if not downloaded_path:
+        compiled = _load_compiled_table()
+        if compiled is not None:
+            logger.warning(f"Falha ao baixar '{SESMT_EXCEL_FILE_NAME}' do Google Drive. Usando a última tabela compilada.")
+            return compiled
         logger.error(f"Falha ao baixar '{SESMT_EXCEL_FILE_NAME}' do Google Drive. Usando tabelas vazias.")
         return {}, {}
 
     try:
-        df_raw = pd.read_excel(downloaded_path, sheet_name=0, header=None)
-        logger.debug(f"DataFrame raw (primeiras 5 linhas):\n{df_raw.head()}")
-
-        header_row = df_raw.iloc[0]
-        cleaned_header_names = [_clean_text(col_name) for col_name in header_row]
-
-        if len(cleaned_header_names) > 9 and "Acima de 5.000" in cleaned_header_names[9]:
-            cleaned_header_names[9] = "Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**"
-        
-        df = df_raw.iloc[1:].copy()
-        df.columns = cleaned_header_names[:len(df.columns)]
-
-        logger.debug(f"Colunas do DataFrame renomeadas (single-level, após limpeza e correção):\n{df.columns.tolist()}")
-        logger.debug(f"DataFrame após atribuição de cabeçalho (primeiras 5 linhas):\n{df.head()}")
-
-        expected_grau_risco_col = 'Grau de Risco'
-        expected_profissionais_col = 'Profissionais'
-        expected_above_5000_col = 'Acima de 5.000 Para cada grupo De 4.000 ou fração acima 2.000**'
-
-        critical_columns = [expected_grau_risco_col, expected_profissionais_col, expected_above_5000_col] + list(EMPLOYEE_RANGE_COLUMNS.keys())
-        for col_name in critical_columns:
-            if col_name not in df.columns:
-                logger.error(f"CRÍTICO: Coluna essencial '{col_name}' não encontrada no DataFrame. Estrutura do Excel inesperada. Colunas disponíveis: {df.columns.tolist()}")
-                raise KeyError(f"Coluna '{col_name}' não encontrada. A estrutura do Excel 'Dimensionamento_SESMT.xlsx' não corresponde ao esperado.")
-
-        df[expected_grau_risco_col] = df[expected_grau_risco_col].ffill()
-        df = df.dropna(subset=[expected_grau_risco_col, expected_profissionais_col])
-        
-        logger.debug(f"DataFrame após ffill e dropna (primeiras 5 linhas):\n{df.head()}")
-
-        parsed_dimensioning_table: Dict[int, Dict[Tuple[int, int], Dict[str, Union[int, str]]]] = {gr: {} for gr in range(1, 5)}
-        parsed_above_5000_rule: Dict[int, Dict[str, Union[int, str]]] = {gr: {} for gr in range(1, 5)}
-
-        for index, row in df.iterrows():
-            grau_risco = int(row[expected_grau_risco_col])
-            professional_name = _clean_text(row[expected_profissionais_col])
-            internal_professional_key = PROFESSIONAL_COLUMN_MAP.get(professional_name)
-
-            if not internal_professional_key:
-                logger.warning(f"Nome de profissional desconhecido '{professional_name}' encontrado no Excel. Pulando linha {index}.")
-                logger.warning(f"Nomes disponíveis no mapeamento: {list(PROFESSIONAL_COLUMN_MAP.keys())}")
-                continue
-
-            logger.debug(f"Processando linha: Index={index}, Grau de Risco={grau_risco}, Profissional='{professional_name}'")
-            logger.debug(f"Conteúdo completo da linha: {row.to_dict()}")
-            
-            for col_name_range, emp_range_tuple in EMPLOYEE_RANGE_COLUMNS.items():
-                if emp_range_tuple not in parsed_dimensioning_table[grau_risco]:
-                    parsed_dimensioning_table[grau_risco][emp_range_tuple] = {pk: '0' for pk in PROFESSIONAL_COLUMN_MAP.values()}
-                
-                if col_name_range in df.columns and pd.notna(row[col_name_range]):
-                    value = str(row[col_name_range]).strip()
-                    logger.debug(f"  - Faixa '{col_name_range}': Valor bruto='{row[col_name_range]}', Valor limpo='{value}'")
-                    parsed_dimensioning_table[grau_risco][emp_range_tuple][internal_professional_key] = value
-                else:
-                    logger.debug(f"  - Faixa '{col_name_range}': Valor não presente ou é NaN para o profissional '{professional_name}'. Definindo como '0'.")
-                    parsed_dimensioning_table[grau_risco][emp_range_tuple][internal_professional_key] = '0'
-
-            if expected_above_5000_col in df.columns and pd.notna(row[expected_above_5000_col]):
-                value = str(row[expected_above_5000_col]).strip()
-                parsed_above_5000_rule[grau_risco][internal_professional_key] = value
-            else:
-                parsed_above_5000_rule[grau_risco][internal_professional_key] = '0'
-
+        tables = _parse_sesmt_excel(downloaded_path)
+        _save_compiled_table(remote_md5 or _file_md5(downloaded_path), tables)
         logger.info("Dados do SESMT carregados e analisados com sucesso do Google Drive.")
-        logger.debug(f"parsed_dimensioning_table carregado: {parsed_dimensioning_table}")
-        logger.debug(f"parsed_above_5000_rule carregado: {parsed_above_5000_rule}")
-        return parsed_dimensioning_table, parsed_above_5000_rule
+        return tables
 
     except Exception as e:
         logger.error(f"Erro ao analisar o arquivo Excel do SESMT '{downloaded_path}': {e}", exc_info=True)
-        return {}, {}
-    finally:
-        pass
+        compiled = _load_compiled_table()
+        return compiled if compiled is not None else ({}, {})
 
 SESMT_DIMENSIONING_TABLE, SESMT_ABOVE_5000_RULE_ADDITIONAL = _load_sesmt_data_from_drive()
 
-def get_sesmt_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any]:
-    logger.info(f"Iniciando dimensionamento do SESMT para GR: {grau_risco}, Empregados: {num_employees}")
 
-    if not (1 <= grau_risco <= 4):
-        logger.error(f"Grau de Risco inválido: {grau_risco}. Deve ser entre 1 e 4.")
-        return {"error": "Grau de Risco inválido. Deve ser entre 1 e 4."}
-    
-    if num_employees < 0:
-        logger.error(f"Número de empregados inválido: {num_employees}. Deve ser um valor positivo.")
-        return {"error": "Número de empregados inválido. Deve ser um valor positivo."}
+def _compile_sesmt_intervals(
+    table: Dict[int, Dict[Tuple[int, int], Dict[str, Union[int, str]]]]
+) -> Dict[int, Tuple[List[int], List[Tuple[int, int]]]]:
+    """Faixas de cada grau de risco ordenadas pelo limite inferior (limites, faixas) para busca binária."""
+    compiled = {}
+    for grau_risco, ranges in table.items():
+        ordered = sorted(ranges)
+        compiled[grau_risco] = ([low for low, _ in ordered], ordered)
+    return compiled
+
+
+_SESMT_INTERVALS = _compile_sesmt_intervals(SESMT_DIMENSIONING_TABLE)
 
-    if not SESMT_DIMENSIONING_TABLE or not SESMT_ABOVE_5000_RULE_ADDITIONAL:
-        logger.error("Dados de dimensionamento do SESMT não carregados. Não é possível realizar o cálculo.")
-        return {"error": "Dados de dimensionamento do SESMT não carregados. Verifique o arquivo Excel no Google Drive e as permissões."}
 
-    result: Dict[str, Any] = {
+def _find_sesmt_range(grau_risco: int, num_employees: int) -> Optional[Tuple[int, int]]:
+    lows, ranges = _SESMT_INTERVALS.get(grau_risco, ([], []))
+    index = bisect.bisect_right(lows, num_employees) - 1
+    if index >= 0 and num_employees <= ranges[index][1]:
+        return ranges[index]
+    return None
+
+
+def _sesmt_additional_groups(num_employees: int) -> int:
+    """Grupos de 4.000 (ou fração) acima de 5.000 empregados."""
+    excess_employees = num_employees - 5000
+    return ((excess_employees - 1) // 4000) + 1 if excess_employees > 0 else 0
+
+
+def _empty_sesmt_result() -> Dict[str, Any]:
+    return {
         'tecnico_seguranca': {'qty': '0', 'specific_observation': None},
         'engenheiro_seguranca': {'qty': '0', 'specific_observation': None},
         'aux_tec_enfermagem': {'qty': '0', 'specific_observation': None},
@@ -168,94 +254,85 @@ def get_sesmt_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any
         'general_observations': []
     }
 
-    if num_employees < 50:
-        result['general_observations'].append("Para estabelecimentos com menos de 50 empregados, a constituição do SESMT pode não ser obrigatória, dependendo de outras condições da NR-04 (ex: SESMT compartilhado, etc.). Consulte a NR-04 para casos específicos.")
-        logger.info(f"SESMT não obrigatório para {num_employees} empregados (GR {grau_risco}).")
-        return result
 
+def _compose_sesmt_result(
+    grau_risco: int, emp_range: Optional[Tuple[int, int]], num_additional_groups: int
+) -> Dict[str, Any]:
+    """
+    Quantidades e observações para uma faixa do quadro ou, sem faixa e com grupos
+    adicionais, para a regra acima de 5.000 empregados.
+    """
+    result = _empty_sesmt_result()
     base_roles: Dict[str, str] = {}
-    found_range = False
-
-    for (min_emp, max_emp), roles in SESMT_DIMENSIONING_TABLE[grau_risco].items():
-        if min_emp <= num_employees <= max_emp:
-            base_roles = roles.copy()
-            found_range = True
-            break
-    
-    if not found_range and num_employees > 5000:
+
+    if emp_range is not None:
+        base_roles = SESMT_DIMENSIONING_TABLE[grau_risco][emp_range].copy()
+
+    elif num_additional_groups > 0:
         base_roles = SESMT_DIMENSIONING_TABLE[grau_risco][(3501, 5000)].copy()
-        
-        excess_employees = num_employees - 5000
-        num_additional_groups = 0
-        
-        if excess_employees > 0:
-            num_additional_groups = ((excess_employees - 1) // 4000) + 1
-        
-        logger.info(f"Empregados acima de 5000: {excess_employees}, Grupos adicionais: {num_additional_groups}")
-        
-        if num_additional_groups > 0:
-            for role_key in PROFESSIONAL_COLUMN_MAP.values():
-                original_base_qty_str = str(base_roles.get(role_key, '0'))
-                additional_qty_str = str(SESMT_ABOVE_5000_RULE_ADDITIONAL[grau_risco].get(role_key, '0'))
-
-                base_val = int(original_base_qty_str.replace('*', '').replace('***', ''))
-                add_val = int(additional_qty_str.replace('*', '').replace('***', ''))
-
-                current_num_full_time = 0
-                current_num_part_time_star = 0
-                current_num_part_time_triple_star = 0
-
-                if '*' not in original_base_qty_str and '***' not in original_base_qty_str:
-                    current_num_full_time += base_val
-                elif '***' in original_base_qty_str:
-                    current_num_part_time_triple_star += base_val
-                elif '*' in original_base_qty_str:
-                    current_num_part_time_star += base_val
-
-                if '*' not in additional_qty_str and '***' not in additional_qty_str:
-                    current_num_full_time += add_val * num_additional_groups
-                elif '***' in additional_qty_str:
-                    current_num_part_time_triple_star += add_val * num_additional_groups
-                elif '*' in additional_qty_str:
-                    current_num_part_time_star += add_val * num_additional_groups
-
-                # Construção da string de quantidade (qty)
-                qty_parts_display = []
-                if current_num_full_time > 0:
-                    qty_parts_display.append(str(current_num_full_time))
-                if current_num_part_time_star > 0:
-                    qty_parts_display.append(f"{current_num_part_time_star}*")
-                if current_num_part_time_triple_star > 0:
-                    qty_parts_display.append(f"{current_num_part_time_triple_star}***")
-                
-                final_qty_str = " + ".join(qty_parts_display)
-                if not final_qty_str: # Caso todos sejam 0
-                    final_qty_str = '0'
-                
-                # Construção da observação específica
-                specific_observation = None
-                obs_details_parts = []
-                if current_num_full_time > 0:
-                    obs_details_parts.append(f"{current_num_full_time} profissional(is) em tempo integral")
-                if current_num_part_time_star > 0:
-                    obs_details_parts.append(f"{current_num_part_time_star} profissional(is) em tempo parcial (mín. 15h semanais)")
-                if current_num_part_time_triple_star > 0:
-                    obs_details_parts.append(f"{current_num_part_time_triple_star} profissional(is) com opção de substituição (tempo parcial)")
-                
-                if obs_details_parts: # Se há alguma observação a ser feita
-                    specific_observation = "Inclui " + ", ".join(obs_details_parts) + "."
-                
-                # Adiciona a observação específica para Auxiliar/Técnico de Enfermagem do Trabalho se houver ***
-                if current_num_part_time_triple_star > 0 and role_key == 'aux_tec_enfermagem':
-                    aux_obs_text = "O empregador pode optar pela contratação de um Enfermeiro do Trabalho em tempo parcial (mín. 15h semanais), em substituição ao auxiliar ou técnico de enfermagem do trabalho."
-                    if specific_observation and aux_obs_text not in specific_observation:
-                        specific_observation += " " + aux_obs_text
-                    elif not specific_observation:
-                        specific_observation = aux_obs_text
-
-                base_roles[role_key] = final_qty_str
-                result[role_key]['specific_observation'] = specific_observation
-        
+
+        for role_key in PROFESSIONAL_COLUMN_MAP.values():
+            original_base_qty_str = str(base_roles.get(role_key, '0'))
+            additional_qty_str = str(SESMT_ABOVE_5000_RULE_ADDITIONAL[grau_risco].get(role_key, '0'))
+
+            base_val = int(original_base_qty_str.replace('*', '').replace('***', ''))
+            add_val = int(additional_qty_str.replace('*', '').replace('***', ''))
+
+            current_num_full_time = 0
+            current_num_part_time_star = 0
+            current_num_part_time_triple_star = 0
+
+            if '*' not in original_base_qty_str and '***' not in original_base_qty_str:
+                current_num_full_time += base_val
+            elif '***' in original_base_qty_str:
+                current_num_part_time_triple_star += base_val
+            elif '*' in original_base_qty_str:
+                current_num_part_time_star += base_val
+
+            if '*' not in additional_qty_str and '***' not in additional_qty_str:
+                current_num_full_time += add_val * num_additional_groups
+            elif '***' in additional_qty_str:
+                current_num_part_time_triple_star += add_val * num_additional_groups
+            elif '*' in additional_qty_str:
+                current_num_part_time_star += add_val * num_additional_groups
+
+            # Construção da string de quantidade (qty)
+            qty_parts_display = []
+            if current_num_full_time > 0:
+                qty_parts_display.append(str(current_num_full_time))
+            if current_num_part_time_star > 0:
+                qty_parts_display.append(f"{current_num_part_time_star}*")
+            if current_num_part_time_triple_star > 0:
+                qty_parts_display.append(f"{current_num_part_time_triple_star}***")
+
+            final_qty_str = " + ".join(qty_parts_display)
+            if not final_qty_str: # Caso todos sejam 0
+                final_qty_str = '0'
+
+            # Construção da observação específica
+            specific_observation = None
+            obs_details_parts = []
+            if current_num_full_time > 0:
+                obs_details_parts.append(f"{current_num_full_time} profissional(is) em tempo integral")
+            if current_num_part_time_star > 0:
+                obs_details_parts.append(f"{current_num_part_time_star} profissional(is) em tempo parcial (mín. 15h semanais)")
+            if current_num_part_time_triple_star > 0:
+                obs_details_parts.append(f"{current_num_part_time_triple_star} profissional(is) com opção de substituição (tempo parcial)")
+
+            if obs_details_parts: # Se há alguma observação a ser feita
+                specific_observation = "Inclui " + ", ".join(obs_details_parts) + "."
+
+            # Adiciona a observação específica para Auxiliar/Técnico de Enfermagem do Trabalho se houver ***
+            if current_num_part_time_triple_star > 0 and role_key == 'aux_tec_enfermagem':
+                aux_obs_text = "O empregador pode optar pela contratação de um Enfermeiro do Trabalho em tempo parcial (mín. 15h semanais), em substituição ao auxiliar ou técnico de enfermagem do trabalho."
+                if specific_observation and aux_obs_text not in specific_observation:
+                    specific_observation += " " + aux_obs_text
+                elif not specific_observation:
+                    specific_observation = aux_obs_text
+
+            base_roles[role_key] = final_qty_str
+            result[role_key]['specific_observation'] = specific_observation
+
         result['general_observations'].append(
             "Para o dimensionamento acima de 5.000 empregados, a NR-04 estabelece que o cálculo é feito "
             "com base na faixa de 3.501 a 5.000, acrescido de profissionais para cada grupo de 4.000 "
@@ -270,11 +347,91 @@ def get_sesmt_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any
                 result[role_key]['specific_observation'] = "O empregador pode optar pela contratação de um Enfermeiro do Trabalho em tempo parcial (mín. 15h semanais), em substituição."
             elif '*' in qty_str and role_key in ['engenheiro_seguranca', 'enfermeiro', 'medico']:
                 result[role_key]['specific_observation'] = "Tempo Parcial (mín. 15h semanais)."
-        
+
         result[role_key]['qty'] = qty_str
-    
+
     result['general_observations'].append("Observação: Hospitais, ambulatórios, maternidades, casas de saúde e repouso, clínicas e estabelecimentos similares deverão contratar um Enfermeiro do Trabalho em tempo integral (30h semanais) quando possuírem mais de quinhentos trabalhadores.")
     result['general_observations'].append("Observação: Em virtude das características das atribuições do SESMT, não se faz necessária a supervisão do técnico de enfermagem do trabalho por enfermeiro do trabalho, salvo quando a atividade for executada em hospitais, ambulatórios, maternidades, casas de saúde e repouso, clínicas e estabelecimentos similares.")
+    return result
+
+
+def get_sesmt_dimensioning(grau_risco: int, num_employees: int) -> Dict[str, Any]:
+    logger.info(f"Iniciando dimensionamento do SESMT para GR: {grau_risco}, Empregados: {num_employees}")
 
+    if not (1 <= grau_risco <= 4):
+        logger.error(f"Grau de Risco inválido: {grau_risco}. Deve ser entre 1 e 4.")
+        return {"error": "Grau de Risco inválido. Deve ser entre 1 e 4."}
+
+    if num_employees < 0:
+        logger.error(f"Número de empregados inválido: {num_employees}. Deve ser um valor positivo.")
+        return {"error": "Número de empregados inválido. Deve ser um valor positivo."}
+
+    if not SESMT_DIMENSIONING_TABLE or not SESMT_ABOVE_5000_RULE_ADDITIONAL:
+        logger.error("Dados de dimensionamento do SESMT não carregados. Não é possível realizar o cálculo.")
+        return {"error": "Dados de dimensionamento do SESMT não carregados. Verifique o arquivo Excel no Google Drive e as permissões."}
+
+    if num_employees < 50:
+        result = _empty_sesmt_result()
+        result['general_observations'].append(SESMT_OBS_BELOW_50)
+        logger.info(f"SESMT não obrigatório para {num_employees} empregados (GR {grau_risco}).")
+        return result
+
+    emp_range = _find_sesmt_range(grau_risco, num_employees)
+    num_additional_groups = _sesmt_additional_groups(num_employees) if emp_range is None else 0
+    if num_additional_groups:
+        logger.info(f"Empregados acima de 5000: {num_employees - 5000}, Grupos adicionais: {num_additional_groups}")
+
+    result = _compose_sesmt_result(grau_risco, emp_range, num_additional_groups)
     logger.info(f"Dimensionamento final para GR {grau_risco}, {num_employees} empregados: {result}")
-    return result
\ No newline at end of file
+    return result
+
+
+def get_sesmt_dimensioning_batch(graus_risco: Iterable[int], num_employees: Iterable[int]) -> List[Dict[str, Any]]:
+    """
+    Versão em lote de get_sesmt_dimensioning para muitos estabelecimentos.
+
+    As faixas são localizadas com numpy.searchsorted e cada combinação distinta
+    (grau, faixa, grupos acima de 5.000) é montada uma única vez; linhas iguais
+    compartilham o mesmo dicionário de resultado, que não deve ser alterado.
+    """
+    grades = np.asarray(graus_risco, dtype=np.int64)
+    employees = np.asarray(num_employees, dtype=np.int64)
+    results: List[Dict[str, Any]] = [{} for _ in range(len(employees))]
+
+    if not SESMT_DIMENSIONING_TABLE or not SESMT_ABOVE_5000_RULE_ADDITIONAL:
+        error = {"error": "Dados de dimensionamento do SESMT não carregados. Verifique o arquivo Excel no Google Drive e as permissões."}
+        return [error] * len(employees)
+
+    below_50 = _empty_sesmt_result()
+    below_50['general_observations'].append(SESMT_OBS_BELOW_50)
+    invalid_grade = {"error": "Grau de Risco inválido. Deve ser entre 1 e 4."}
+    invalid_employees = {"error": "Número de empregados inválido. Deve ser um valor positivo."}
+
+    range_index = np.full(len(employees), -1, dtype=np.int64)
+    for grau_risco, (lows, ranges) in _SESMT_INTERVALS.items():
+        mask = grades == grau_risco
+        if not mask.any():
+            continue
+        index = np.searchsorted(np.asarray(lows), employees[mask], side='right') - 1
+        highs = np.asarray([high for _, high in ranges])
+        found = (index >= 0) & (employees[mask] <= highs[np.maximum(index, 0)])
+        range_index[mask] = np.where(found, index, -1)
+    excess = employees - 5000
+    additional_groups = np.where((range_index < 0) & (excess > 0), (excess - 1) // 4000 + 1, 0)
+
+    composed: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+    for i, (grau_risco, n, idx, groups) in enumerate(zip(grades.tolist(), employees.tolist(),
+                                                         range_index.tolist(), additional_groups.tolist())):
+        if not (1 <= grau_risco <= 4):
+            results[i] = invalid_grade
+        elif n < 0:
+            results[i] = invalid_employees
+        elif n < 50:
+            results[i] = below_50
+        else:
+            key = (grau_risco, idx, groups)
+            if key not in composed:
+                emp_range = _SESMT_INTERVALS[grau_risco][1][idx] if idx >= 0 else None
+                composed[key] = _compose_sesmt_result(grau_risco, emp_range, groups)
+            results[i] = composed[key]
+    return results
@@ -107,7 +107,7 @@ def _tab_advanced_config() -> None:
             scheduler = get_scheduler()
             status = scheduler.get_status()
 
-            is_running = status.get("running", False)
+            is_running = status.get("enabled", True)
             interval = status.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
 
             st.markdown(f"""
@@ -130,11 +130,11 @@ def _tab_advanced_config() -> None:
             )
             if sync_enabled_toggle != is_running:
                 try:
+                    # Host-wide setting: the leader may be another worker process
+                    scheduler.set_enabled(sync_enabled_toggle)
                     if sync_enabled_toggle:
-                        scheduler.start()
                         st.success("▶ Sincronização automática activada.")
                     else:
-                        scheduler.stop()
                         st.success("⏹ Sincronização automática desactivada.")
                     st.rerun()
                 except Exception as exc:
@@ -147,14 +147,14 @@ def _tab_advanced_config() -> None:
             with scol1:
                 if st.button("🔄 Sincronizar Agora", key="admin_sync_now", type="primary", use_container_width=True):
                     try:
-                        scheduler.trigger_sync()
+                        scheduler.trigger_now()
                         st.success("Sincronização iniciada!")
                     except Exception as exc:
                         st.error(f"Erro: {exc}")
             with scol2:
                 if st.button("💾 Aplicar Intervalo", key="admin_sync_apply", use_container_width=True):
                     try:
-                        scheduler.set_interval(new_interval)
+                        scheduler.update_interval(new_interval)
                         st.success(f"Intervalo actualizado para {new_interval} min.")
                     except Exception as exc:
                         st.error(f"Erro: {exc}")
@@ -202,7 +202,9 @@ def _tab_advanced_config() -> None:
         ai_btn_col1, ai_btn_col2 = st.columns(2)
         with ai_btn_col1:
             if st.button("💾 Aplicar Configurações de IA", key="ai_cfg_save", type="primary", use_container_width=True):
+                # Preserve keys not editable here (chunking, HNSW tuning, ...)
                 new_cfg = {
+                    **ai_cfg,
                     "model": new_model,
                     "temperature_factual": new_temp_f,
                     "temperature_document": new_temp_d,
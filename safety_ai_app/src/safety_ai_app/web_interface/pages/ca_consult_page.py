@@ -228,7 +228,7 @@ def ca_consult_page() -> None:
 
     with st.spinner("Buscando..."):
         try:
-            results_df = ca_processor.search_ca(search_term)
+            results_df, total_found = ca_processor.search_ca_paginated(search_term, page=1, page_size=_CA_LIMIT)
         except Exception as e:
             logger.error(f"Erro ao buscar CA: {e}", exc_info=True)
             st.markdown(
@@ -256,8 +256,7 @@ def ca_consult_page() -> None:
         )
         return
 
-    total_found = len(results_df)
-    displayed_df = results_df.iloc[:_CA_LIMIT]
+    displayed_df = results_df
     truncated = total_found > _CA_LIMIT
 
     if truncated:
@@ -92,11 +92,7 @@ def cbo_consult_page() -> None:
             )
             return
 
-        filtered = [
-            c for c in all_cargos
-            if normalized_search in normalize_text(c["CARGO"])
-            or normalized_search in normalize_text(c["COD_OCUPACAO"])
-        ]
+        filtered = cbo_db.search_cargos(search_term)
 
         total = len(filtered)
         shown = filtered[:_MAX_RESULTS]
@@ -15,12 +15,13 @@ from ._logic import (
     SHORTCUT_CHIPS, 
     generate_follow_ups, 
     extract_drive_search_keyword, 
-    export_chat_docx
+    ChatDocxExporter,
 )
 from ._renderer import (
     render_message, 
     render_typing_indicator, 
-    render_follow_ups
+    render_follow_ups,
+    StreamRenderThrottle,
 )
 
 # Imports Compartilhados da App
@@ -30,7 +31,7 @@ from safety_ai_app.input_validators import sanitize_text_input
 from safety_ai_app.security.rate_limiter import check_rate_limit, RateLimitExceeded
 from safety_ai_app.security.security_logger import log_security_event, SecurityEvent
 from safety_ai_app.api_client import SafetyAIAPIClient
-from safety_ai_app.google_drive_integrator import list_drive_files_by_keyword
+from safety_ai_app.google_drive_integrator import APP_SERVICE, list_drive_files_by_keyword, search_library_files_by_keyword
 
 # Imports de Controle de Acesso (Feature Flags/Quota)
 try:
@@ -112,9 +113,13 @@ def render_page() -> None:
             st.rerun()
     with hcols[2]:
         if st.session_state.messages:
-            docx_bytes = export_chat_docx(st.session_state.messages)
+            # DOCX gerado apenas sob demanda; o exporter memoiza e cresce incrementalmente
+            exporter = st.session_state.setdefault("chat_docx_exporter", ChatDocxExporter())
+            docx_bytes = exporter.cached_for(st.session_state.messages)
+            if docx_bytes is None and st.button("⬇ Exportar", use_container_width=True):
+                docx_bytes = exporter.export(st.session_state.messages)
             if docx_bytes:
-                st.download_button("⬇ Exportar", data=docx_bytes, 
+                st.download_button("⬇ Baixar DOCX", data=docx_bytes, 
                                  file_name=f"SafetyAI_Chat_{datetime.now().strftime('%Y%m%d_%H%M')}.docx",
                                  mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                                  use_container_width=True)
@@ -194,20 +199,28 @@ def render_page() -> None:
                     mode_prompt = "MODO CONSULTA RÁPIDA: Seja objetivo." if st.session_state.chat_mode == "quick" else "MODO ANÁLISE TÉCNICA: Detalhe NRs."
                     context = [mode_prompt]
                     
-                    # Streaming
-                    full_text = ""
-                    for chunk in api_client.stream_ask(query_to_process, chat_history, context):
-                        full_text += chunk
-                        content_html = get_safe_markdown(full_text + " ▌")
+                    # Streaming (re-renderização limitada por frame rate e fronteiras de Markdown)
+                    def _render_stream(text: str, cursor: bool) -> None:
+                        content_html = get_safe_markdown(text + " ▌" if cursor else text)
                         stream_slot.markdown(f'<div class="msg-ai"><div class="msg-ai-avatar">{_get_material_icon_html("smart_toy")}</div><div class="msg-ai-content">{content_html}</div></div>', unsafe_allow_html=True)
+
+                    throttle = StreamRenderThrottle(_render_stream)
+                    for chunk in api_client.stream_ask(query_to_process, chat_history, context):
+                        throttle.feed(chunk)
+                    full_text = throttle.flush()
                     
                     # Pós-processamento: Downloads e Follow-ups
                     downloads = api_client.get_last_suggested_downloads()
                     kw = extract_drive_search_keyword(query_to_process)
                     if kw:
-                        files = list_drive_files_by_keyword(st.session_state.get("user_drive_service", "app_service"), kw)
+                        # Índice local da Biblioteca; busca ao vivo só enquanto o índice não estiver pronto.
+                        # Os arquivos são do Drive da conta de serviço: o download também passa por ela.
+                        files = search_library_files_by_keyword(kw)
+                        if files is None:
+                            files = list_drive_files_by_keyword(APP_SERVICE, kw)
                         for f in files[:3]:
-                            downloads.append({"document_name": f['name'], "file_type": f['mimeType'], "drive_file_id": f['id']})
+                            downloads.append({"document_name": f['name'], "file_type": f['mimeType'],
+                                              "drive_file_id": f['id'], "drive_service": APP_SERVICE})
                     
                     st.session_state.messages.append({
                         "role": "assistant", "content": full_text, "suggested_downloads": downloads
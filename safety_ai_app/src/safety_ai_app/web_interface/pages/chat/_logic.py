@@ -4,8 +4,10 @@ Responsabilidade: Follow-ups, detecção de intenção de busca e exportação.
 """
 
 import re
+import hashlib
 import logging
-from typing import Optional, List
+from io import BytesIO
+from typing import Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
@@ -101,30 +103,125 @@ def generate_follow_ups(query: str, response: str) -> List[str]:
 
     return found[:3]
 
-def export_chat_docx(messages: list) -> bytes:
-    """Gera um arquivo DOCX formatado com o histórico do chat."""
-    try:
+def _message_digest(previous: str, msg: dict) -> str:
+    """Elo do hash acumulado do histórico: depende da mensagem e de todas as anteriores."""
+    h = hashlib.sha1(previous.encode("ascii"))
+    h.update(str(msg.get("role", "")).encode("utf-8"))
+    h.update(b"\x00")
+    h.update(str(msg.get("content", "")).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ChatDocxExporter:
+    """Gera o DOCX do histórico do chat sob demanda, de forma incremental.
+
+    Guarda o hash acumulado de cada mensagem do último histórico visto: a cada
+    rerun só as mensagens acrescentadas desde a chamada anterior são hasheadas,
+    e o prefixo conhecido é conferido re-hasheando a primeira e a última
+    mensagem dele (o histórico só cresce no fim ou é truncado/trocado).
+
+    O documento python-docx fica em cache junto com quantas mensagens já foram
+    escritas nele e o hash da última delas. Quando a conversa cresce, apenas as
+    novas mensagens são acrescentadas; se o histórico mudar (ex.: limpeza), o
+    documento é refeito. Os bytes exportados são memoizados pelo hash da
+    conversa inteira.
+    """
+
+    def __init__(self):
+        self._hashes: List[str] = []
+        self._doc: Any = None
+        self._doc_len = 0
+        self._doc_hash = ""
+        self._bytes: Optional[bytes] = None
+        self._bytes_hash: Optional[str] = None
+
+    @staticmethod
+    def conversation_hash(messages: list) -> str:
+        digest = ""
+        for msg in messages:
+            digest = _message_digest(digest, msg)
+        return digest
+
+    def _chain_for(self, messages: list) -> List[str]:
+        """Hash acumulado de cada mensagem, reaproveitando a cadeia da chamada anterior."""
+        chain = self._hashes
+        n_known = min(len(chain), len(messages))
+        if n_known:
+            previous = chain[n_known - 2] if n_known > 1 else ""
+            if (_message_digest("", messages[0]) != chain[0]
+                    or _message_digest(previous, messages[n_known - 1]) != chain[n_known - 1]):
+                n_known = 0
+        del chain[n_known:]
+        digest = chain[-1] if chain else ""
+        for msg in messages[n_known:]:
+            digest = _message_digest(digest, msg)
+            chain.append(digest)
+        return chain
+
+    def cached_for(self, messages: list) -> Optional[bytes]:
+        """Bytes já exportados para exatamente ``messages``, ou None (sem gerar nada)."""
+        if self._bytes is None:
+            return None
+        chain = self._chain_for(messages)
+        if self._bytes_hash == (chain[-1] if chain else ""):
+            return self._bytes
+        return None
+
+    def _new_document(self) -> Any:
         from docx import Document
-        from docx.shared import Pt, RGBColor
-    except ImportError:
-        logger.error("Biblioteca 'python-docx' não encontrada.")
-        return b""
 
-    doc = Document()
-    doc.add_heading('Histórico de Consultoria — SafetyAI', 0)
+        doc = Document()
+        doc.add_heading('Histórico de Consultoria — SafetyAI', 0)
+        return doc
+
+    def _append_message(self, msg: dict) -> None:
+        from docx.shared import RGBColor
 
-    for msg in messages:
         role = "Usuário" if msg["role"] == "user" else "SafetyAI"
-        p = doc.add_paragraph()
+        p = self._doc.add_paragraph()
         run = p.add_run(f"{role}: ")
         run.bold = True
         if role == "SafetyAI":
             run.font.color.rgb = RGBColor(34, 197, 94) # Verde neon
-        
+
         p.add_run(str(msg["content"]))
-        doc.add_paragraph("-" * 20)
+        self._doc.add_paragraph("-" * 20)
+
+    def export(self, messages: list) -> bytes:
+        """Devolve o DOCX de ``messages``, reaproveitando o que já foi gerado."""
+        try:
+            import docx  # noqa: F401
+        except ImportError:
+            logger.error("Biblioteca 'python-docx' não encontrada.")
+            return b""
+
+        digests = self._chain_for(messages)
+        digest = digests[-1] if digests else ""
+
+        if self._bytes is not None and self._bytes_hash == digest:
+            return self._bytes
+
+        n_cached = self._doc_len
+        reusable = (
+            self._doc is not None
+            and n_cached <= len(digests)
+            and (n_cached == 0 or digests[n_cached - 1] == self._doc_hash)
+        )
+        if not reusable:
+            self._doc = self._new_document()
+            n_cached = 0
 
-    from io import BytesIO
-    target = BytesIO()
-    doc.save(target)
-    return target.getvalue()
+        for msg in messages[n_cached:]:
+            self._append_message(msg)
+        self._doc_len, self._doc_hash = len(messages), digest
+
+        target = BytesIO()
+        self._doc.save(target)
+        self._bytes = target.getvalue()
+        self._bytes_hash = digest
+        return self._bytes
+
+
+def export_chat_docx(messages: list) -> bytes:
+    """Gera um arquivo DOCX formatado com o histórico do chat."""
+    return ChatDocxExporter().export(messages)
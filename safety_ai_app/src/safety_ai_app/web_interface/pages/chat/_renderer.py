@@ -5,12 +5,17 @@ Responsabilidade: Exibir mensagens, downloads, indicadores de digitação e foll
 
 import streamlit as st
 import logging
+import time
 from typing import Callable
 from safety_ai_app.theme_config import _get_material_icon_html
 from safety_ai_app.google_drive_integrator import get_file_bytes_for_download
 
 logger = logging.getLogger(__name__)
 
+# Limites de re-renderização durante o streaming da resposta
+STREAM_RENDER_MAX_FPS = 8.0
+STREAM_RENDER_MAX_WAIT_S = 1.0
+
 def render_message(msg: dict, idx: int, markdown_func: Callable):
     """Renderiza uma única mensagem (usuário ou IA) com seu estilo correspondente."""
     content = msg.get("content", "")
@@ -72,9 +77,10 @@ def render_downloads(downloads: list, msg_idx: int):
             label_type = mime_labels.get(doc.get('file_type', ''), 'Arquivo')
             short_name = doc['document_name'][:22] + "…" if len(doc['document_name']) > 22 else doc['document_name']
             try:
-                # Recupera bytes do Drive (orquestrado via service no session_state)
+                # Recupera bytes do Drive: sugestões da Biblioteca indicam a conta de serviço,
+                # as demais usam o service do usuário no session_state
                 file_bytes = get_file_bytes_for_download(
-                    st.session_state.user_drive_service,
+                    doc.get('drive_service') or st.session_state.user_drive_service,
                     doc['drive_file_id'],
                     doc['file_type'],
                     doc['file_type']
@@ -125,3 +131,86 @@ def render_typing_indicator():
         </div>
     </div>
     """, unsafe_allow_html=True)
+
+class StreamRenderThrottle:
+    """Agrupa chunks do streaming e re-renderiza a resposta a uma taxa limitada.
+
+    Só renderiza até a última fronteira segura de Markdown (fim de linha fora de um
+    bloco de código aberto), evitando tabelas, listas e code fences pela metade. Se
+    nenhuma fronteira surgir em ``max_wait_s``, renderiza até o último espaço para
+    manter o texto fluindo. ``flush()`` renderiza o texto completo no fim do stream.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[str, bool], None],
+        max_fps: float = STREAM_RENDER_MAX_FPS,
+        max_wait_s: float = STREAM_RENDER_MAX_WAIT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._render = render
+        self._min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._max_wait_s = max_wait_s
+        self._clock = clock
+
+        self.text = ""
+        self._rendered_upto = 0
+        self._last_render_at = clock()
+        # Estado incremental da varredura de linhas (evita reescanear o texto todo)
+        self._scan_pos = 0
+        self._in_fence = False
+        self._last_safe = 0
+
+        self.chunks = 0
+        self.renders = 0
+        self.bytes_rendered = 0
+
+    def _advance_scan(self) -> None:
+        while True:
+            nl = self.text.find("\n", self._scan_pos)
+            if nl < 0:
+                return
+            line = self.text[self._scan_pos:nl].lstrip()
+            if line.startswith("```") or line.startswith("~~~"):
+                self._in_fence = not self._in_fence
+            if not self._in_fence:
+                self._last_safe = nl + 1
+            self._scan_pos = nl + 1
+
+    def _emit(self, upto: int, cursor: bool) -> None:
+        visible = self.text[:upto]
+        self._render(visible, cursor)
+        self._rendered_upto = upto
+        self._last_render_at = self._clock()
+        self.renders += 1
+        self.bytes_rendered += len(visible.encode("utf-8"))
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self.text += chunk
+        self.chunks += 1
+
+        now = self._clock()
+        elapsed = now - self._last_render_at
+        if elapsed < self._min_interval:
+            return
+
+        self._advance_scan()
+        upto = self._last_safe
+        if upto <= self._rendered_upto:
+            if elapsed < self._max_wait_s or self._in_fence:
+                return
+            upto = self.text.rfind(" ", self._rendered_upto) + 1
+            if upto <= self._rendered_upto:
+                return
+        self._emit(upto, cursor=True)
+
+    def flush(self) -> str:
+        """Renderiza o texto completo (sem cursor) e devolve-o."""
+        self._emit(len(self.text), cursor=False)
+        logger.debug(
+            "Stream render: %d chunks → %d renders, %d bytes enviados ao navegador.",
+            self.chunks, self.renders, self.bytes_rendered,
+        )
+        return self.text
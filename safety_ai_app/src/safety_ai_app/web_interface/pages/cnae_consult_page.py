@@ -173,6 +173,8 @@ def cnae_consult_page() -> None:
             if api_level:
                 cleaned = search.replace('.', '').replace('-', '').replace('/', '')
                 results = cnae_processor.search_cnae_by_id(cleaned, api_level)
+                if not results and not cleaned.isdigit():
+                    results = cnae_processor.search_cnae_by_description(search, level=api_level)
         except Exception as e:
             logger.error(f"Erro ao buscar CNAE: {e}", exc_info=True)
             st.markdown(
@@ -523,7 +523,8 @@ def _apply_admin_settings(admin: Dict[str, Any]) -> None:
         from safety_ai_app.auto_sync_scheduler import get_scheduler
         scheduler = get_scheduler()
         new_interval = int(admin.get("auto_sync_interval_minutes", 30))
-        if scheduler.interval_minutes != new_interval:
+        # get_status() reads the host-wide setting, which any worker may have changed
+        if scheduler.get_status()["interval_minutes"] != new_interval:
             scheduler.update_interval(new_interval)
     except Exception as exc:
         logger.error("Erro ao aplicar configurações de administração: %s", exc)